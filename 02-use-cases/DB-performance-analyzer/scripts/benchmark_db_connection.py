@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Per-invocation overhead benchmark for the DB performance analyzer Lambdas.
+
+Calls the PGStat lambda_handler repeatedly, as a warm Lambda container
+would, against a fake DB-API driver and fake SSM / Secrets Manager calls
+that sleep for configurable latencies. Real boto3 clients are still
+constructed so their creation cost is included. Compares:
+
+  - no caching: a new client, parameter lookup, secret fetch, connection
+    and CREATE EXTENSION on every invocation (how the handlers worked before)
+  - db_connection: cached clients, parameters and secrets, a pooled
+    connection and a cached extension check
+
+Usage:
+    REGION=us-west-2 python scripts/benchmark_db_connection.py --invocations 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+
+os.environ.setdefault('REGION', 'us-west-2')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from psycopg2_stand_in import install_if_missing  # noqa: E402
+
+# The driver is faked below; the modules only need psycopg2's exceptions
+install_if_missing()
+import db_connection  # noqa: E402
+import pgstat_analyse_database  # noqa: E402
+
+CALLS = Counter()
+
+SECRET = {'host': 'db.local', 'dbname': 'postgres', 'username': 'bench', 'password': 'x', 'port': 5432}
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        CALLS['query'] += 1
+        time.sleep(self.conn.latency['query'])
+        self._extension_check = 'pg_extension' in query
+        if 'CREATE EXTENSION' in query:
+            self.conn.server['extensions'] = True
+        self.description = [('value',)]
+
+    def fetchone(self):
+        if self._extension_check:
+            return (1,) if self.conn.server['extensions'] else None
+        return (1,)
+
+    def fetchall(self):
+        # An idle database: every report section comes back empty
+        return []
+
+
+class FakeConnection:
+    def __init__(self, latency, server):
+        self.latency = latency
+        self.server = server
+        self.closed = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def reset(self):
+        time.sleep(self.latency['query'])
+
+    def close(self):
+        self.closed = 1
+
+
+class FakeAWSClient:
+    """Builds the real client, but answers the two calls used with a sleep."""
+
+    def __init__(self, service_name, latency, **kwargs):
+        CALLS[f'{service_name} client'] += 1
+        real = boto3.session.Session().client(service_name, region_name=os.environ['REGION'])
+        self.exceptions = real.exceptions
+        self.latency = latency
+
+    def get_parameter(self, Name):
+        CALLS['get_parameter'] += 1
+        time.sleep(self.latency['aws'])
+        return {'Parameter': {'Value': 'bench-secret'}}
+
+    def get_secret_value(self, SecretId):
+        CALLS['get_secret_value'] += 1
+        time.sleep(self.latency['aws'])
+        return {'SecretString': db_connection.json.dumps(SECRET), 'VersionId': 'v1'}
+
+
+def _run(mode, invocations, latency, action_type):
+    server = {'extensions': False}
+
+    def connect(**kwargs):
+        CALLS['connect'] += 1
+        time.sleep(latency['connect'])
+        return FakeConnection(latency, server)
+
+    db_connection.boto3.client = lambda service_name, **kwargs: FakeAWSClient(service_name, latency, **kwargs)
+    db_connection.pool = db_connection.ConnectionPool(connect=connect)
+    db_connection._clients.clear()
+    db_connection._secrets.clear()
+    db_connection._parameters.clear()
+    db_connection._extensions.clear()
+    if mode == 'no caching':
+        db_connection.SECRET_CACHE_TTL = 0
+        # One connection per invocation, running the queries one at a time
+        pgstat_analyse_database._executor = ThreadPoolExecutor(max_workers=1)
+    else:
+        db_connection.SECRET_CACHE_TTL = 300
+        pgstat_analyse_database._executor = None
+    CALLS.clear()
+
+    event = {'environment': 'prod', 'action_type': action_type}
+    timings = []
+    for _ in range(invocations):
+        if mode == 'no caching':
+            db_connection._clients.clear()
+            db_connection.pool.discard('bench-secret')
+        started = time.perf_counter()
+        response = pgstat_analyse_database.lambda_handler(event, None)
+        timings.append((time.perf_counter() - started) * 1000)
+        if 'responseBody' not in response['functionResponse']:
+            raise RuntimeError(response['functionResponse'])
+    return timings, dict(CALLS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-invocation connection overhead')
+    parser.add_argument('--invocations', type=int, default=50, help='Handler invocations per mode')
+    parser.add_argument('--connect-ms', type=float, default=30, help='Fake connection setup latency (TLS + auth)')
+    parser.add_argument('--aws-ms', type=float, default=15, help='Fake SSM / Secrets Manager call latency')
+    parser.add_argument('--query-ms', type=float, default=1, help='Fake latency per statement')
+    parser.add_argument('--action-type', default='slow_query', help='PGStat action to invoke')
+    args = parser.parse_args()
+
+    latency = {'connect': args.connect_ms / 1000, 'aws': args.aws_ms / 1000, 'query': args.query_ms / 1000}
+    # The handlers print progress; keep it out of the report
+    real_stdout = sys.stdout
+
+    print(f"invocations={args.invocations} connect={args.connect_ms}ms aws={args.aws_ms}ms "
+          f"query={args.query_ms}ms action={args.action_type}")
+    print(f"{'mode':<16}{'first':>9}{'warm p50':>10}{'warm p95':>10}  calls per invocation")
+    for mode in ('no caching', 'db_connection'):
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            timings, calls = _run(mode, args.invocations, latency, args.action_type)
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        warm = sorted(timings[1:]) or timings
+        per_call = ', '.join(f"{name} {count / args.invocations:.2f}" for name, count in sorted(calls.items()))
+        print(f"{mode:<16}{timings[0]:>7.1f}ms{statistics.median(warm):>8.1f}ms"
+              f"{warm[int(len(warm) * 0.95) - 1]:>8.1f}ms  {per_call}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Round-trip and latency benchmark for extract_database_object_ddl.
+
+Runs the extraction against a fake connection holding a generated schema of
+--tables tables (each with an index, a view and a trigger, plus a function
+per table). The catalog version probe costs one round trip; the DDL query
+costs a round trip plus --object-ms of catalog work per object it returns.
+Reports wall time and queries sent for:
+
+  - per object: one call per object with nothing cached (how the extraction
+    worked before)
+  - bulk: one call with object_type 'all' and no object_name
+  - cached: one call per object after the bulk call
+  - after DDL: a catalog change, then the bulk call and the per object
+    calls again; the change empties the cache and the bulk call refills it
+
+Usage:
+    python scripts/benchmark_ddl_cache.py --tables 200
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from psycopg2_stand_in import install_if_missing  # noqa: E402
+
+install_if_missing()
+import pg_analyze_performance  # noqa: E402
+
+SCHEMA = 'app'
+
+
+def generate_schema(tables):
+    """{object_type: [(name, row)]} for a schema with the given number of tables"""
+    objects = {object_type: [] for object_type in pg_analyze_performance.queries}
+    oid = 16384
+    for i in range(tables):
+        table = f"orders_{i}"
+        columns = ",\n".join(f"    col_{c} integer NOT NULL" for c in range(12))
+        definitions = {
+            'table': (table, f"CREATE TABLE {SCHEMA}.{table} (\n{columns}\n);"),
+            'index': (f"{table}_pkey", f"CREATE UNIQUE INDEX {table}_pkey ON {SCHEMA}.{table} USING btree (col_0)"),
+            'view': (f"{table}_recent", f"CREATE OR REPLACE VIEW {SCHEMA}.{table}_recent AS\n SELECT * FROM {table} WHERE col_1 > 0"),
+            'trigger': (f"{table}_audit", f"CREATE TRIGGER {table}_audit AFTER UPDATE ON {SCHEMA}.{table} FOR EACH ROW EXECUTE FUNCTION audit()"),
+            'function': (f"{table}_total", f"CREATE OR REPLACE FUNCTION {SCHEMA}.{table}_total(id integer)\n RETURNS integer\nAS $$ BEGIN RETURN 1; END $$"),
+        }
+        for object_type, (name, definition) in definitions.items():
+            oid += 1
+            objects[object_type].append((name, {
+                'oid': oid,
+                'object_name': f"{SCHEMA}.{name}",
+                'object_type': object_type.upper(),
+                'definition': definition,
+                'description': None,
+            }))
+    return objects
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.queries += 1
+        time.sleep(self.conn.round_trip)
+        if query == pg_analyze_performance.DDL_CATALOG_VERSION_QUERY:
+            self._rows = [tuple(f"{self.conn.version}:0" for _ in pg_analyze_performance.DDL_CATALOGS)]
+            return
+        self._rows = []
+        object_types = re.findall(r"SELECT '(\w+)' AS ddl_object_type", query)
+        for object_type, pattern in zip(object_types, params[::2]):
+            regex = pg_analyze_performance.like_pattern_regex(pattern)
+            for name, row in self.conn.objects[object_type]:
+                if regex.fullmatch(name):
+                    self._rows.append((object_type, dict(row)))
+        # Catalog work for every object the query builds a definition for
+        time.sleep(self.conn.object_cost * len(self._rows))
+
+    def fetchone(self):
+        return self._rows[0]
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeConnection:
+    def __init__(self, objects, round_trip_ms, object_ms):
+        self.objects = objects
+        self.round_trip = round_trip_ms / 1000
+        self.object_cost = object_ms / 1000
+        self.version = 1
+        self.queries = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+def _measure(conn, calls, clear_cache=False):
+    conn.queries = 0
+    started = time.perf_counter()
+    found = 0
+    for object_type, object_name in calls:
+        if clear_cache:
+            pg_analyze_performance._ddl_cache.clear()
+        results = pg_analyze_performance.extract_database_object_ddl(
+            'bench', object_type, object_name=object_name, object_schema=SCHEMA
+        )
+        found += len(results) if isinstance(results, list) else 0
+    return time.perf_counter() - started, conn.queries, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cached and bulk DDL extraction')
+    parser.add_argument('--tables', type=int, default=200, help='Tables in the generated schema')
+    parser.add_argument('--round-trip-ms', type=float, default=1.0, help='Simulated latency per query')
+    parser.add_argument('--object-ms', type=float, default=0.5, help='Simulated catalog work per extracted object')
+    args = parser.parse_args()
+
+    objects = generate_schema(args.tables)
+    conn = FakeConnection(objects, args.round_trip_ms, args.object_ms)
+    pg_analyze_performance.connect_to_db = lambda secret_name: conn
+    pg_analyze_performance.release_connection = lambda c: None
+
+    per_object = [(object_type, name) for object_type, rows in objects.items() for name, _ in rows]
+    bulk = [(pg_analyze_performance.ALL_OBJECT_TYPES, None)]
+    scenarios = [
+        ('per object', per_object, True),
+        ('bulk', bulk, False),
+        ('cached', per_object, False),
+        ('after DDL', bulk + per_object, False),
+    ]
+
+    real_stdout = sys.stdout
+    print(f"tables={args.tables} objects={len(per_object)} round_trip={args.round_trip_ms:g}ms "
+          f"object_cost={args.object_ms:g}ms")
+    print(f"{'mode':<12}{'time':>10}{'queries':>9}{'objects':>9}")
+    pg_analyze_performance._ddl_cache.clear()
+    for mode, calls, clear_cache in scenarios:
+        if mode == 'after DDL':
+            conn.version += 1
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            elapsed, queries, found = _measure(conn, calls, clear_cache)
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        print(f"{mode:<12}{elapsed * 1000:>8.1f}ms{queries:>9}{found:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Wall-clock benchmark for the PGStat analyses at different concurrency.
+
+Invokes each PGStat action, and the combined full_report, against the fake
+driver from benchmark_db_connection.py. Every catalog query sleeps for a
+latency between --min-query-ms and --max-query-ms (fixed per query, so each
+run sees the same workload); other statements take --query-ms. Reports the
+wall time per action with DIAGNOSTIC_CONCURRENCY of 1 (queries one after
+another, as before) and each --concurrency value, alongside the sum and the
+max of the query latencies.
+
+Usage:
+    REGION=us-west-2 python scripts/benchmark_diagnostics.py --concurrency 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import benchmark_db_connection as bench  # noqa: E402
+import db_connection  # noqa: E402
+import pgstat_analyse_database  # noqa: E402
+
+ACTIONS = [
+    'slow_query', 'connection_management_issues', 'index_analysis', 'autovacuum_analysis',
+    'io_analysis', 'replication_analysis', 'system_health', 'full_report',
+]
+
+# Catalog query text -> simulated latency in seconds
+QUERY_LATENCY = {}
+
+
+def _is_catalog_query(query):
+    return query.lstrip().upper().startswith(('SELECT', 'WITH')) and 'pg_extension' not in query
+
+
+def _catalog_latency(query, args):
+    """A latency that depends only on the query text"""
+    spread = args.max_query_ms - args.min_query_ms
+    ms = args.min_query_ms + zlib.crc32(query.encode()) % 1000 / 1000 * spread
+    return ms / 1000
+
+
+class DiagnosticCursor(bench.FakeCursor):
+    def execute(self, query, params=None):
+        if _is_catalog_query(query):
+            bench.CALLS['query'] += 1
+            self._extension_check = False
+            self.description = [('value',)]
+            # Statistics snapshot queries run during the warm-up invocation only
+            time.sleep(QUERY_LATENCY.get(query, 0))
+        else:
+            super().execute(query, params)
+
+
+class DiagnosticConnection(bench.FakeConnection):
+    def cursor(self):
+        return DiagnosticCursor(self)
+
+
+def _collect_latencies(args, queries_by_action):
+    """Capture the query texts of every analysis and assign their latencies"""
+    captured = []
+
+    def capture(secret_name, queries):
+        captured.append(queries)
+        return {name: [] for name in queries}
+
+    run_real = pgstat_analyse_database.run_diagnostic_queries
+    pgstat_analyse_database.run_diagnostic_queries = capture
+    try:
+        for action in ACTIONS[:-1]:
+            captured.clear()
+            pgstat_analyse_database.lambda_handler({'environment': 'prod', 'action_type': action}, None)
+            queries_by_action[action] = list(captured[0].values())
+    finally:
+        pgstat_analyse_database.run_diagnostic_queries = run_real
+    for queries in queries_by_action.values():
+        for query in queries:
+            QUERY_LATENCY[query] = _catalog_latency(query, args)
+    queries_by_action['full_report'] = [q for a in ACTIONS[:-1] for q in queries_by_action[a]]
+
+
+def _time_action(action, concurrency, latency):
+    pgstat_analyse_database._executor = ThreadPoolExecutor(max_workers=concurrency)
+    server = {'extensions': True}
+    db_connection.pool = db_connection.ConnectionPool(
+        connect=lambda **kwargs: DiagnosticConnection(latency, server), max_idle=concurrency
+    )
+    event = {'environment': 'prod', 'action_type': action}
+    # Warm the pool and caches, as in a warm Lambda container
+    pgstat_analyse_database.lambda_handler(event, None)
+    started = time.perf_counter()
+    response = pgstat_analyse_database.lambda_handler(event, None)
+    elapsed = time.perf_counter() - started
+    if 'responseBody' not in response['functionResponse']:
+        raise RuntimeError(response['functionResponse'])
+    pgstat_analyse_database._executor.shutdown()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent PGStat diagnostics')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[4, 8], help='DIAGNOSTIC_CONCURRENCY values to compare with 1')
+    parser.add_argument('--min-query-ms', type=float, default=20, help='Fastest simulated catalog query')
+    parser.add_argument('--max-query-ms', type=float, default=200, help='Slowest simulated catalog query')
+    parser.add_argument('--query-ms', type=float, default=1, help='Latency of other statements')
+    args = parser.parse_args()
+
+    latency = {'connect': 0.03, 'aws': 0.015, 'query': args.query_ms / 1000}
+    db_connection.boto3.client = lambda service_name, **kwargs: bench.FakeAWSClient(service_name, latency, **kwargs)
+
+    real_stdout = sys.stdout
+    levels = [1] + args.concurrency
+    queries_by_action = {}
+    rows = []
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        _collect_latencies(args, queries_by_action)
+        for action in ACTIONS:
+            rows.append((action, [_time_action(action, level, latency) for level in levels]))
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+
+    print(f"catalog query latency {args.min_query_ms:g}-{args.max_query_ms:g}ms, wall time in seconds")
+    print(f"{'action':<30}{'queries':>8}{'sum':>7}{'max':>7}" + ''.join(f"{'c=' + str(level):>8}" for level in levels))
+    for action, timings in rows:
+        latencies = [QUERY_LATENCY[q] for q in queries_by_action[action]]
+        print(f"{action:<30}{len(latencies):>8}{sum(latencies):>7.2f}{max(latencies):>7.2f}"
+              + ''.join(f"{t:>8.2f}" for t in timings))
+
+
+if __name__ == '__main__':
+    main()
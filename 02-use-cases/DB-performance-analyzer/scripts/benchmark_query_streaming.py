@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Memory and latency benchmark for fetching read-only query results.
+
+Runs a SELECT whose result is much larger than what the analyzer returns
+against a fake DB-API driver that charges --network-mbps for every byte sent
+to the client: a regular cursor receives the whole result on execute, a named
+(server-side) cursor only the batches that are fetched. Reports wall time,
+peak Python memory (tracemalloc) and the size of the JSON response for:
+
+  - fetchall: fetch every row, then keep the first max_rows (how
+    execute_read_query worked before)
+  - streaming: fetch_limited_rows with a server-side cursor, the row limit
+    and the QUERY_RESULT_MAX_BYTES budget
+
+Usage:
+    python scripts/benchmark_query_streaming.py --rows 20000 --value-kb 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from psycopg2_stand_in import install_if_missing  # noqa: E402
+
+install_if_missing()
+import pg_analyze_performance  # noqa: E402
+
+# (name, PostgreSQL type OID)
+COLUMNS = [('id', 23), ('created_at', 1184), ('payload', 25), ('attributes', 3802)]
+
+
+class FakeCursor:
+    def __init__(self, conn, name):
+        self.conn = conn
+        self.name = name
+        self.description = None
+        self._rows = None
+
+    def execute(self, query, params=None):
+        self._rows = self.conn.result(self.conn.rows)
+        if self.name is None:
+            # A regular cursor transfers the whole result before returning
+            self._rows = iter(list(self._rows))
+            self.description = list(COLUMNS)
+
+    def fetchmany(self, size):
+        # One round trip per batch
+        time.sleep(self.conn.round_trip)
+        batch = [row for _, row in zip(range(size), self._rows)]
+        self.description = list(COLUMNS)
+        return batch
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def close(self):
+        self._rows = None
+
+
+class FakeConnection:
+    def __init__(self, rows, value_kb, network_mbps, round_trip_ms):
+        self.rows = rows
+        self.value = 'x' * int(value_kb * 1024)
+        self.bytes_per_second = network_mbps * 1e6 / 8
+        self.round_trip = round_trip_ms / 1000
+
+    def result(self, count):
+        started = pg_analyze_performance.datetime(2024, 1, 1)
+        for i in range(count):
+            # A fresh copy per row, as the driver decodes each value separately
+            value = self.value[:-1] + str(i % 10)
+            row = (i, started, value, {'key': i, 'tags': ['a', 'b'], 'note': value})
+            # Time to send the row over the network
+            time.sleep(2 * len(self.value) / self.bytes_per_second)
+            yield row
+
+    def cursor(self, name=None):
+        return FakeCursor(self, name)
+
+
+def fetch_all_then_truncate(conn, stmt, max_rows):
+    """The previous execute_read_query: fetchall, then slice to max_rows"""
+    cur = conn.cursor()
+    cur.execute(stmt)
+    columns = [desc[0] for desc in cur.description]
+    rows = cur.fetchall()
+    truncated = len(rows) > max_rows
+    return columns, [dict(zip(columns, row)) for row in rows[:max_rows]], truncated
+
+
+def stream(conn, stmt, max_rows):
+    columns, rows, _, limit_hit = pg_analyze_performance.fetch_limited_rows(
+        conn, stmt, max_rows, pg_analyze_performance.QUERY_RESULT_MAX_BYTES, cursor_name='read_query_1'
+    )
+    return columns, rows, limit_hit is not None
+
+
+def _measure(fetch, conn, stmt, max_rows):
+    tracemalloc.start()
+    started = time.perf_counter()
+    columns, rows, truncated = fetch(conn, stmt, max_rows)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    response = json.dumps({'columns': columns, 'rows': rows}, default=str)
+    return elapsed, peak, len(response), len(rows), truncated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark streaming of read-only query results')
+    parser.add_argument('--rows', type=int, default=20000, help='Rows produced by the query (its own LIMIT)')
+    parser.add_argument('--value-kb', type=float, default=4, help='Size of the text value in each row, also embedded in the jsonb value')
+    parser.add_argument('--max-rows', type=int, default=20, help='Rows returned per statement')
+    parser.add_argument('--network-mbps', type=float, default=1000, help='Simulated network bandwidth')
+    parser.add_argument('--round-trip-ms', type=float, default=0.5, help='Simulated latency per fetchmany')
+    args = parser.parse_args()
+
+    conn = FakeConnection(args.rows, args.value_kb, args.network_mbps, args.round_trip_ms)
+    stmt = f"SELECT * FROM events LIMIT {args.rows}"
+    print(f"rows={args.rows} value={args.value_kb}KB max_rows={args.max_rows} "
+          f"network={args.network_mbps:g}Mbps budget={pg_analyze_performance.QUERY_RESULT_MAX_BYTES} bytes")
+    print(f"{'mode':<12}{'time':>10}{'peak memory':>14}{'response':>12}{'rows':>7}  truncated")
+    for mode, fetch in (('fetchall', fetch_all_then_truncate), ('streaming', stream)):
+        elapsed, peak, response_bytes, row_count, truncated = _measure(fetch, conn, stmt, args.max_rows)
+        print(f"{mode:<12}{elapsed * 1000:>8.1f}ms{peak / 1e6:>12.2f}MB{response_bytes / 1e6:>10.2f}MB"
+              f"{row_count:>7}  {truncated}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for SQL statement splitting, validation and complexity
+analysis in pg_analyze_performance.
+
+Generates batches of SELECT statements (string literals containing
+semicolons and quotes, comments, joins, subqueries and aggregates) of
+increasing size and times validate_query followed by
+analyze_query_complexity on every statement. Compares:
+
+  - the previous implementation, which rescanned the text from the start
+    for every semicolon (quadratic) and made several passes per statement;
+    only run up to --max-before-kb
+  - the single-pass tokenizer
+
+Usage:
+    python scripts/benchmark_sql_tokenizer.py --sizes-kb 64 256 1024 4096
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from psycopg2_stand_in import install_if_missing  # noqa: E402
+
+install_if_missing()
+import pg_analyze_performance  # noqa: E402
+
+TEMPLATES = [
+    "SELECT o.id, c.name, 'note; with '' quote' AS note\n"
+    "FROM orders o JOIN customers c ON c.id = o.customer_id\n"
+    "WHERE o.status = 'open;pending' AND o.total > {n} AND c.region = 'eu'",
+    "SELECT /* report {n}; totals */ region, count(*), sum(total), avg(total)\n"
+    "FROM orders WHERE created_at > now() - interval '{n} days' GROUP BY region",
+    "SELECT * FROM products p -- items; ordered often\n"
+    "WHERE p.id IN (SELECT product_id FROM order_items WHERE qty > {n})",
+    "SHOW search_path",
+]
+
+
+def _analyze_query_complexity_before(query):
+    """The previous analyze_query_complexity: several passes over the text"""
+    query_lower = query.lower()
+    complexity_score = 0
+    warnings = []
+    
+    # Check for joins
+    join_count = sum(1 for join_type in ['join', 'inner join', 'left join', 'right join', 'full join'] 
+                    if join_type in query_lower)
+    complexity_score += join_count * 2
+    if join_count > 3:
+        warnings.append(f"Query contains {join_count} joins - consider simplifying")
+    
+    # Check for subqueries
+    subquery_count = query_lower.count('(select')
+    complexity_score += subquery_count * 3
+    if subquery_count > 2:
+        warnings.append(f"Query contains {subquery_count} subqueries - consider restructuring")
+    
+    # Check for aggregations
+    agg_functions = ['count(', 'sum(', 'avg(', 'max(', 'min(']
+    agg_count = sum(query_lower.count(func) for func in agg_functions)
+    complexity_score += agg_count
+    
+    # Check for window functions
+    if 'over(' in query_lower or 'partition by' in query_lower:
+        complexity_score += 3
+        warnings.append("Query uses window functions - monitor performance")
+    
+    # Check for complex WHERE conditions
+    where_pos = query_lower.find('where')
+    if where_pos != -1:
+        where_clause = query_lower[where_pos:]
+        and_count = where_clause.count(' and ')
+        or_count = where_clause.count(' or ')
+        complexity_score += (and_count + or_count)
+        if (and_count + or_count) > 5:
+            warnings.append(f"Complex WHERE clause with {and_count + or_count} conditions")
+    
+    return {
+        'complexity_score': complexity_score,
+        'warnings': warnings,
+        'join_count': join_count,
+        'subquery_count': subquery_count,
+        'aggregation_count': agg_count
+    }
+
+
+def _validate_query_before(query):
+    """The previous validate_query: rescans the text for every semicolon"""
+    if not query or not isinstance(query, str):
+        raise ValueError("Query must be a non-empty string")
+
+    def is_within_quotes(text, position):
+        """Check if a position in text is within quotes"""
+        single_quotes = False
+        double_quotes = False
+        for i in range(position):
+            if text[i] == "'" and not double_quotes:
+                single_quotes = not single_quotes
+            elif text[i] == '"' and not single_quotes:
+                double_quotes = not double_quotes
+        return single_quotes or double_quotes
+
+    def split_statements(query_text):
+        """Split query into individual statements, respecting quotes and comments"""
+        statements = []
+        current_stmt = []
+        i = 0
+        comment_block = False
+        line_comment = False
+        
+        while i < len(query_text):
+            char = query_text[i]
+            
+            # Handle comment blocks
+            if query_text[i:i+2] == '/*' and not line_comment:
+                comment_block = True
+                current_stmt.append(char)
+                i += 1
+            elif query_text[i:i+2] == '*/' and comment_block:
+                comment_block = False
+                current_stmt.append(char)
+                i += 1
+            # Handle line comments
+            elif query_text[i:i+2] == '--' and not comment_block:
+                line_comment = True
+                current_stmt.append(char)
+                i += 1
+            elif char == '\n' and line_comment:
+                line_comment = False
+                current_stmt.append(char)
+            # Handle semicolons
+            elif char == ';' and not comment_block and not line_comment and not is_within_quotes(query_text, i):
+                current_stmt.append(char)
+                stmt = ''.join(current_stmt).strip()
+                if stmt:
+                    statements.append(stmt)
+                current_stmt = []
+            else:
+                current_stmt.append(char)
+            i += 1
+        
+        # Add the last statement if exists
+        last_stmt = ''.join(current_stmt).strip()
+        if last_stmt:
+            statements.append(last_stmt)
+        
+        return [stmt for stmt in statements if stmt]
+
+    # Split into statements
+    statements = split_statements(query)
+    validated_statements = []
+
+    # Validate each statement
+    for stmt in statements:
+        stmt = stmt.strip()
+        if stmt.endswith(';'):
+            stmt = stmt[:-1]
+        
+        stmt_lower = stmt.lower().strip()
+        
+        # Get the command type
+        first_word = stmt_lower.split()[0] if stmt_lower.split() else ''
+        
+        if first_word not in ['select', 'show']:
+            raise ValueError(f"Prohibited operation detected: {first_word}")
+        
+        # For SELECT statements, check for dangerous operations
+        if first_word == 'select':
+            dangerous_operations = [
+                r'\binsert\b', r'\bupdate\b', r'\bdelete\b', r'\bdrop\b', 
+                r'\btruncate\b', r'\balter\b', r'\bcreate\b', r'\bgrant\b', 
+                r'\brevoke\b', r'\bexecute\b', r'\bcopy\b'
+            ]
+            
+            # Remove content within quotes for checking
+            query_for_check = ''
+            in_quote = False
+            quote_char = None
+            
+            for char in stmt:
+                if char in ["'", '"'] and (not quote_char or char == quote_char):
+                    if not in_quote:
+                        quote_char = char
+                        in_quote = True
+                    else:
+                        quote_char = None
+                        in_quote = False
+                elif not in_quote:
+                    query_for_check += char
+            
+            # Check for dangerous operations
+            for operation in dangerous_operations:
+                if re.search(operation, query_for_check.lower()):
+                    raise ValueError(f"Statement contains prohibited operation: {operation}")
+        
+        validated_statements.append(stmt)
+    
+    return validated_statements
+
+
+def _generate_batch(size_bytes):
+    statements = []
+    size = 0
+    n = 0
+    while size < size_bytes:
+        statement = TEMPLATES[n % len(TEMPLATES)].format(n=n)
+        statements.append(statement)
+        size += len(statement) + 2
+        n += 1
+    return ";\n".join(statements) + ";"
+
+
+def _run_before(batch):
+    started = time.perf_counter()
+    statements = _validate_query_before(batch)
+    for statement in statements:
+        if statement.lower().startswith('select'):
+            _analyze_query_complexity_before(statement)
+    return time.perf_counter() - started, len(statements)
+
+
+def _run_tokenizer(batch):
+    """What execute_read_query does: validate, then analyze with the same tokens"""
+    started = time.perf_counter()
+    statements = pg_analyze_performance.validate_sql_statements(batch)
+    for statement, tokens in statements:
+        if statement.lower().startswith('select'):
+            pg_analyze_performance.analyze_query_complexity(statement, tokens)
+    return time.perf_counter() - started, len(statements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQL splitting, validation and complexity analysis")
+    parser.add_argument("--sizes-kb", type=int, nargs="+", default=[16, 64, 256, 1024, 4096], help="Batch sizes in KB")
+    parser.add_argument("--max-before-kb", type=int, default=64, help="Largest batch to run the quadratic implementation on")
+    args = parser.parse_args()
+
+    print(f"{'batch':>8}{'statements':>12}{'before':>10}{'tokenizer':>11}{'MB/s':>8}")
+    for size_kb in args.sizes_kb:
+        batch = _generate_batch(size_kb * 1024)
+        after, count = _run_tokenizer(batch)
+        if size_kb <= args.max_before_kb:
+            before, before_count = _run_before(batch)
+            if before_count != count:
+                raise RuntimeError(f"Statement count differs: {before_count} before, {count} now")
+            before_text = f"{before:>9.2f}s"
+        else:
+            before_text = f"{'skipped':>10}"
+        print(f"{size_kb:>6}KB{count:>12}{before_text}{after:>10.3f}s{len(batch) / after / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Golden-file check for the query plan analysis.
+
+Runs analyze_execution_plan and format_analysis_output over every EXPLAIN
+(FORMAT JSON) plan in explain_plans/ and compares the report with the
+matching .expected.txt file. Plans without an "Execution Time" are treated
+as generic plans. Exits non-zero and prints a diff when a report changed;
+with --update the expected files are rewritten instead.
+
+Usage:
+    python scripts/check_plan_analysis.py
+    python scripts/check_plan_analysis.py --update
+"""
+
+import argparse
+import difflib
+import glob
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from psycopg2_stand_in import install_if_missing  # noqa: E402
+
+install_if_missing()
+import pg_analyze_performance  # noqa: E402
+
+PLAN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'explain_plans')
+
+
+def report_for(plan_file):
+    with open(plan_file) as f:
+        plan = json.load(f)[0]
+    is_generic_plan = 'Execution Time' not in plan
+    analysis = pg_analyze_performance.analyze_execution_plan(plan, is_generic_plan)
+    return pg_analyze_performance.format_analysis_output(analysis)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare plan analysis reports with the expected output')
+    parser.add_argument('--update', action='store_true', help='Rewrite the expected files')
+    args = parser.parse_args()
+
+    failed = 0
+    plan_files = sorted(glob.glob(os.path.join(PLAN_DIR, '*.json')))
+    for plan_file in plan_files:
+        expected_file = plan_file[:-len('.json')] + '.expected.txt'
+        report = report_for(plan_file) + '\n'
+        name = os.path.basename(plan_file)
+        if args.update:
+            with open(expected_file, 'w') as f:
+                f.write(report)
+            print(f"updated {os.path.basename(expected_file)}")
+            continue
+
+        expected = open(expected_file).read() if os.path.exists(expected_file) else ''
+        if report == expected:
+            print(f"ok      {name}")
+            continue
+        failed += 1
+        print(f"CHANGED {name}")
+        sys.stdout.writelines(difflib.unified_diff(
+            expected.splitlines(keepends=True), report.splitlines(keepends=True),
+            os.path.basename(expected_file), 'actual'
+        ))
+
+    if failed:
+        print(f"{failed} of {len(plan_files)} reports differ; rerun with --update if the change is intended")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Golden-file check for the statistics snapshot deltas.
+
+Replays every recorded fixture in snapshot_fixtures/ (a list of
+pg_stat_statements and table statistics snapshots) into a temporary
+snapshot store, runs the slow_query and io_analysis actions against it
+without a database, and compares their recent-window sections with the
+matching .expected.txt file. Exits non-zero and prints a diff when a report
+changed; with --update the expected files are rewritten instead.
+
+Usage:
+    python scripts/check_snapshot_deltas.py
+    python scripts/check_snapshot_deltas.py --update
+"""
+
+import argparse
+import difflib
+import glob
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from psycopg2_stand_in import install_if_missing  # noqa: E402
+
+install_if_missing()
+import pgstat_analyse_database  # noqa: E402
+import stat_snapshots  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshot_fixtures')
+
+
+def _no_queries(secret_name, queries):
+    # Only the snapshot sections are compared; the live queries return nothing
+    results = {name: [] for name in queries}
+    results['query_errors'] = {}
+    return results
+
+
+def report_for(fixture_file, tmp):
+    with open(fixture_file) as f:
+        fixture = json.load(f)
+    store = stat_snapshots.SnapshotStore(os.path.join(tmp, os.path.basename(fixture_file) + '.sqlite3'))
+    # Another database with the same query and table ids must not leak into the report
+    for snapshot in fixture['snapshots']:
+        store.save_snapshot(
+            'other-' + fixture['secret_name'],
+            [{**s, 'query': 'SELECT other_database()'} for s in snapshot['statements']],
+            [{**t, 'relname': 'other_' + t['relname']} for t in snapshot['tables']],
+            captured_at=snapshot['captured_at'],
+        )
+    for snapshot in fixture['snapshots']:
+        store.save_snapshot(fixture['secret_name'], snapshot['statements'], snapshot['tables'],
+                            captured_at=snapshot['captured_at'])
+
+    stat_snapshots._store = store
+    # The recorded snapshots are old; never capture a new one while replaying
+    pgstat_analyse_database.SNAPSHOT_MIN_INTERVAL = float('inf')
+    pgstat_analyse_database.run_diagnostic_queries = _no_queries
+    try:
+        slow = pgstat_analyse_database.execute_slow_query(fixture['secret_name'], 1000, fixture['window_minutes'])
+        io = pgstat_analyse_database.execute_io_analysis(fixture['secret_name'], fixture['window_minutes'])
+    finally:
+        store.close()
+        stat_snapshots._store = None
+
+    # The recent-window sections come first, before the cumulative ones
+    reports = [
+        pgstat_analyse_database.format_results_for_slow_query(slow).split("=== TOP 20 SLOW QUERIES ===")[0],
+        pgstat_analyse_database.format_results_for_io_analysis(io).split("=== BUFFER USAGE BY TABLE ===")[0],
+    ]
+    return "".join(reports).rstrip() + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare snapshot delta reports with the expected output')
+    parser.add_argument('--update', action='store_true', help='Rewrite the expected files')
+    args = parser.parse_args()
+
+    failed = 0
+    fixture_files = sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.json')))
+    with tempfile.TemporaryDirectory() as tmp:
+        for fixture_file in fixture_files:
+            expected_file = fixture_file[:-len('.json')] + '.expected.txt'
+            real_stdout = sys.stdout
+            sys.stdout = open(os.devnull, 'w')
+            try:
+                report = report_for(fixture_file, tmp)
+            finally:
+                sys.stdout.close()
+                sys.stdout = real_stdout
+            name = os.path.basename(fixture_file)
+            if args.update:
+                with open(expected_file, 'w') as f:
+                    f.write(report)
+                print(f"updated {os.path.basename(expected_file)}")
+                continue
+
+            expected = open(expected_file).read() if os.path.exists(expected_file) else ''
+            if report == expected:
+                print(f"ok      {name}")
+                continue
+            failed += 1
+            print(f"CHANGED {name}")
+            sys.stdout.writelines(difflib.unified_diff(
+                expected.splitlines(keepends=True), report.splitlines(keepends=True),
+                os.path.basename(expected_file), 'actual'
+            ))
+
+    if failed:
+        print(f"{failed} of {len(fixture_files)} reports differ; rerun with --update if the change is intended")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -24,6 +24,8 @@ fi
 LAMBDA_DIR=$(mktemp -d)
 echo "Creating Lambda package in $LAMBDA_DIR"
 cp "$PG_ANALYZE_PY_FILE" "$LAMBDA_DIR/lambda_function.py"
+# Shared secret cache and connection pool used by both functions
+cp "$SCRIPT_DIR/db_connection.py" "$LAMBDA_DIR/"
 
 # Create a zip file for the Lambda function
 ZIP_FILE=$(mktemp).zip
@@ -156,6 +158,8 @@ fi
 PGSTAT_LAMBDA_DIR=$(mktemp -d)
 echo "Creating PGStat Lambda package in $PGSTAT_LAMBDA_DIR"
 cp "$PGSTAT_PY_FILE" "$PGSTAT_LAMBDA_DIR/lambda_function.py"
+cp "$SCRIPT_DIR/db_connection.py" "$PGSTAT_LAMBDA_DIR/"
+cp "$SCRIPT_DIR/stat_snapshots.py" "$PGSTAT_LAMBDA_DIR/"
 
 # Create a zip file for the Lambda function
 PGSTAT_ZIP_FILE=$(mktemp).zip
@@ -46,7 +46,7 @@ lambda_target_config = {
                     },
                     {
                         'name': 'extract_ddl',
-                        'description': 'Extracts the DDL for a given database object.',
+                        'description': 'Extracts the DDL for a given database object, or for all objects in a schema when object_name is omitted.',
                         'inputSchema': {
                             'type': 'object',
                             'properties': {
@@ -56,7 +56,7 @@ lambda_target_config = {
                                 'object_name': {'type': 'string'},
                                 'object_schema': {'type': 'string'}
                             },
-                            'required': ['environment', 'action_type', 'object_type', 'object_name', 'object_schema']
+                            'required': ['environment', 'action_type', 'object_type', 'object_schema']
                         }
                     },
                     {
@@ -114,7 +114,8 @@ pgstat_target_config = {
                             'type': 'object',
                             'properties': {
                                 'environment': {'type': 'string'},
-                                'action_type': {'type': 'string'}
+                                'action_type': {'type': 'string'},
+                                'window_minutes': {'type': 'integer'}
                             },
                             'required': ['environment', 'action_type']
                         }
@@ -162,7 +163,8 @@ pgstat_target_config = {
                             'type': 'object',
                             'properties': {
                                 'environment': {'type': 'string'},
-                                'action_type': {'type': 'string'}
+                                'action_type': {'type': 'string'},
+                                'window_minutes': {'type': 'integer'}
                             },
                             'required': ['environment', 'action_type']
                         }
@@ -190,6 +192,18 @@ pgstat_target_config = {
                             },
                             'required': ['environment', 'action_type']
                         }
+                    },
+                    {
+                        'name': 'full_report',
+                        'description': 'Runs all PostgreSQL analyses concurrently and returns a combined health report.',
+                        'inputSchema': {
+                            'type': 'object',
+                            'properties': {
+                                'environment': {'type': 'string'},
+                                'action_type': {'type': 'string'}
+                            },
+                            'required': ['environment', 'action_type']
+                        }
                     }
                 ]
             }
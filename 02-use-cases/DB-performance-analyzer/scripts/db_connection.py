@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import boto3
+import psycopg2
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# Seconds a resolved secret or parameter is reused before it is fetched again
+SECRET_CACHE_TTL = int(os.environ.get('SECRET_CACHE_TTL_SECONDS', '300'))
+
+# An idle pooled connection older than this is checked with SELECT 1 before reuse
+HEALTH_CHECK_INTERVAL = int(os.environ.get('DB_HEALTH_CHECK_INTERVAL_SECONDS', '30'))
+
+# Idle connections kept per secret between invocations
+MAX_IDLE_CONNECTIONS = int(os.environ.get('DB_MAX_IDLE_CONNECTIONS', '4'))
+
+CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT_SECONDS', '10'))
+
+# Module level state survives between invocations of a warm Lambda container
+_clients = {}
+_secrets = {}
+_parameters = {}
+_extensions = set()
+_lock = threading.Lock()
+
+
+def _client(service_name):
+    """Return a boto3 client for the service, created once per container"""
+    with _lock:
+        if service_name not in _clients:
+            region_name = os.environ.get('REGION', os.environ.get('AWS_REGION'))
+            _clients[service_name] = boto3.client(service_name, region_name=region_name)
+        return _clients[service_name]
+
+
+def ssm_client():
+    return _client('ssm')
+
+
+def get_secret(secret_name, refresh=False):
+    """Get secret from AWS Secrets Manager, cached for SECRET_CACHE_TTL seconds"""
+    cached = _secrets.get(secret_name)
+    if cached and not refresh and time.monotonic() - cached['fetched_at'] < SECRET_CACHE_TTL:
+        return cached['value']
+
+    try:
+        secret_value = _client('secretsmanager').get_secret_value(SecretId=secret_name)
+    except ClientError as e:
+        raise Exception(f"Failed to get secret: {str(e)}")
+
+    secret = json.loads(secret_value['SecretString'])
+    version = secret_value.get('VersionId')
+    if cached and cached['version'] != version:
+        logger.info(f"Secret {secret_name} was rotated, dropping idle connections")
+        pool.discard(secret_name)
+    _secrets[secret_name] = {'value': secret, 'version': version, 'fetched_at': time.monotonic()}
+    return secret
+
+
+def get_parameter(name):
+    """Get a Parameter Store value, cached for SECRET_CACHE_TTL seconds"""
+    cached = _parameters.get(name)
+    if cached and time.monotonic() - cached['fetched_at'] < SECRET_CACHE_TTL:
+        return cached['value']
+
+    response = ssm_client().get_parameter(Name=name)
+    value = response['Parameter']['Value']
+    _parameters[name] = {'value': value, 'fetched_at': time.monotonic()}
+    return value
+
+
+def _is_auth_error(error):
+    message = str(error).lower()
+    return 'password authentication failed' in message or 'authentication failed' in message
+
+
+class ConnectionPool:
+    """Keeps database connections open between Lambda invocations.
+
+    Connections are keyed by secret name. A checked out connection belongs to
+    the caller until it is released, so nested or concurrent callers each get
+    their own connection. Released connections are reset to the session
+    defaults and kept for the next invocation, up to MAX_IDLE_CONNECTIONS per
+    secret.
+    """
+
+    def __init__(self, connect=psycopg2.connect, max_idle=MAX_IDLE_CONNECTIONS,
+                 health_check_interval=HEALTH_CHECK_INTERVAL):
+        self._connect = connect
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+        self._idle = {}
+        self._owners = {}
+        self._lock = threading.Lock()
+
+    def _open(self, secret_name):
+        secret = get_secret(secret_name)
+        try:
+            return self._connect_with(secret)
+        except psycopg2.OperationalError as e:
+            if not _is_auth_error(e):
+                raise
+            # The password may have been rotated since the secret was cached
+            logger.info(f"Authentication failed for {secret_name}, refreshing secret")
+            return self._connect_with(get_secret(secret_name, refresh=True))
+
+    def _connect_with(self, secret):
+        return self._connect(
+            host=secret['host'],
+            database=secret['dbname'],
+            user=secret['username'],
+            password=secret['password'],
+            port=secret['port'],
+            connect_timeout=CONNECT_TIMEOUT
+        )
+
+    def _is_healthy(self, conn, idle_since):
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def get(self, secret_name):
+        """Check out a healthy connection for the secret, opening one if needed"""
+        while True:
+            with self._lock:
+                idle = self._idle.get(secret_name)
+                conn, idle_since = idle.pop() if idle else (None, None)
+            if conn is None:
+                break
+            if self._is_healthy(conn, idle_since):
+                with self._lock:
+                    self._owners[id(conn)] = secret_name
+                return conn
+            logger.info("Discarding broken pooled database connection")
+            _close_quietly(conn)
+
+        try:
+            conn = self._open(secret_name)
+        except Exception as e:
+            raise Exception(f"Failed to connect to the database: {str(e)}")
+        with self._lock:
+            self._owners[id(conn)] = secret_name
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool, closing it if it cannot be reused"""
+        with self._lock:
+            secret_name = self._owners.pop(id(conn), None)
+        if secret_name is None or conn.closed:
+            _close_quietly(conn)
+            return
+        try:
+            # Roll back and undo SET commands so the next caller starts clean
+            conn.reset()
+        except psycopg2.Error:
+            _close_quietly(conn)
+            return
+        with self._lock:
+            idle = self._idle.setdefault(secret_name, [])
+            if len(idle) < self.max_idle:
+                idle.append((conn, time.monotonic()))
+                return
+        _close_quietly(conn)
+
+    def discard(self, secret_name):
+        """Close the idle connections for a secret"""
+        with self._lock:
+            idle = self._idle.pop(secret_name, [])
+        for conn, _ in idle:
+            _close_quietly(conn)
+        _extensions.difference_update({key for key in _extensions if key[0] == secret_name})
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception as e:
+        logger.warning(f"Error closing database connection: {str(e)}")
+
+
+pool = ConnectionPool()
+
+
+def get_connection(secret_name):
+    return pool.get(secret_name)
+
+
+def release_connection(conn):
+    pool.release(conn)
+
+
+def ensure_extension(secret_name, extension):
+    """Create the extension if it is missing, checking once per container"""
+    key = (secret_name, extension)
+    if key in _extensions:
+        return
+    conn = get_connection(secret_name)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM pg_extension WHERE extname = %s", (extension,))
+            if cur.fetchone() is None:
+                cur.execute(f"CREATE EXTENSION IF NOT EXISTS {extension}")
+        conn.commit()
+    finally:
+        release_connection(conn)
+    _extensions.add(key)
@@ -35,7 +35,7 @@ lambda_target_config = {
                         },
                         {
                         "name": "extract_ddl",
-                        "description": "Extracts the DDL (Data Definition Language) for a database object. Provide the environment (dev/prod), object_type (table, view, function, etc.), object_name, and object_schema to get the creation script. Use action_type default value as extract_ddl.",
+                        "description": "Extracts the DDL (Data Definition Language) for a database object. Provide the environment (dev/prod), object_type (table, view, function, etc., or all), object_name, and object_schema to get the creation script. Omit object_name to get every object of that type in the schema in one call. Use action_type default value as extract_ddl.",
                         "inputSchema": {
                             "type": "object",
                             "properties": {
@@ -56,7 +56,7 @@ lambda_target_config = {
                                     "type": "string"
                                 }
                             },
-                            "required": ["environment","action_type","object_type","object_name","object_schema"]
+                            "required": ["environment","action_type","object_type","object_schema"]
                             }
                         },
                         {
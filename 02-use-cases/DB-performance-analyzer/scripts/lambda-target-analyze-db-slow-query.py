@@ -25,6 +25,10 @@ lambda_target_config = {
                                 "action_type": {
                                     "type": "string",
                                     "description": "The type of action to perform. Use 'slow_query' for this tool."
+                                },
+                                "window_minutes": {
+                                    "type": "integer",
+                                    "description": "Optional. Length in minutes of the recent window to report activity for. Defaults to 15."
                                 }
                             },
                             "required": ["environment","action_type"]
@@ -93,6 +97,10 @@ lambda_target_config = {
                                 "action_type": {
                                     "type": "string",
                                     "description": "The type of action to perform. Use 'io_analysis' for this tool."
+                                },
+                                "window_minutes": {
+                                    "type": "integer",
+                                    "description": "Optional. Length in minutes of the recent window to report activity for. Defaults to 15."
                                 }
                             },
                             "required": ["environment","action_type"]
@@ -131,6 +139,23 @@ lambda_target_config = {
                             },
                             "required": ["environment","action_type"]
                             }
+                        },
+                        {
+                        "name": "full_report",
+                        "description": "Runs every PostgreSQL analysis (slow queries, connections, indexes, autovacuum, I/O, replication and system health) concurrently and returns one combined health report. Provide the environment (dev/prod) to analyze. Use action_type default value as full_report.",
+                        "inputSchema": {
+                            "type": "object",
+                            "properties": {
+                                "environment": {
+                                    "type": "string"
+                                },
+                                "action_type": {
+                                    "type": "string",
+                                    "description": "The type of action to perform. Use 'full_report' for this tool."
+                                }
+                            },
+                            "required": ["environment","action_type"]
+                            }
                         }
                 ]
             }
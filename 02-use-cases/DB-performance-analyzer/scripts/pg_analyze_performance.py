@@ -1,12 +1,14 @@
 import json
-import boto3
 import psycopg2
 import os
 import re
 import time
 import logging
+import threading
 from datetime import datetime
-from botocore.exceptions import ClientError
+
+import db_connection
+from db_connection import release_connection
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -20,12 +22,175 @@ class QueryLimitError(Exception):
     """Custom exception for query limit violations"""
     pass
 
-def analyze_query_complexity(query):
+# Approximate size of the encoded result rows returned per invocation, well
+# under the 6 MB Lambda response limit
+QUERY_RESULT_MAX_BYTES = int(os.environ.get('QUERY_RESULT_MAX_BYTES', '1000000'))
+
+# Rows fetched from a server-side cursor per round trip
+QUERY_FETCH_BATCH_ROWS = int(os.environ.get('QUERY_FETCH_BATCH_ROWS', '100'))
+
+# Longer text and binary values are cut to this many characters
+QUERY_MAX_VALUE_CHARS = int(os.environ.get('QUERY_MAX_VALUE_CHARS', '1000'))
+
+# Plan nodes listed as hotspots in the query performance analysis
+PLAN_HOTSPOT_COUNT = int(os.environ.get('PLAN_HOTSPOT_COUNT', '5'))
+
+# A node's actual rows differing from the estimate by this factor, on at
+# least this many rows, points to stale statistics
+ROW_MISESTIMATE_FACTOR = 10
+ROW_MISESTIMATE_MIN_ROWS = 100
+
+# An index is recommended for a filtered scan that removed at least this many rows
+INDEX_MIN_ROWS_REMOVED = 1000
+INDEX_MAX_COLUMNS = 3
+
+PLAN_BUFFER_FIELDS = {
+    'shared_hit_blocks': 'Shared Hit Blocks',
+    'shared_read_blocks': 'Shared Read Blocks',
+    'shared_dirtied_blocks': 'Shared Dirtied Blocks',
+    'temp_read_blocks': 'Temp Read Blocks',
+    'temp_written_blocks': 'Temp Written Blocks',
+}
+
+# Plan node conditions that name the columns a query filters and joins on
+PLAN_CONDITION_FIELDS = ('Filter', 'Join Filter', 'Hash Cond', 'Merge Cond', 'Index Cond', 'Recheck Cond')
+
+PLAN_COMPARISON_OPERATORS = {
+    '=': 'equality', '<': 'range', '>': 'range', '<=': 'range', '>=': 'range',
+    '<>': 'inequality', '!=': 'inequality', '~~': 'pattern', '~~*': 'pattern',
+}
+
+_PLAN_OPERATOR_CHARS = set('<>=!~*:')
+
+_PLAN_CONDITION_KEYWORDS = {
+    'and', 'or', 'not', 'is', 'null', 'true', 'false', 'any', 'all', 'array',
+    'case', 'when', 'then', 'else', 'end', 'distinct', 'from', 'subplan', 'hashed',
+}
+
+# One token per match; whitespace before a token is skipped. Block comments
+# and dollar-quoted strings only match their opening here, because their end
+# (nested comments, a matching tag) is found by tokenize_sql.
+_SQL_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<line_comment>--[^\n]*)
+      | (?P<block_comment>/\*)
+      | (?P<escape_string>[Ee]'(?:[^'\\]+|\\.|'')*'?)
+      | (?P<string>'(?:[^']+|'')*'?)
+      | (?P<quoted_identifier>"(?:[^"]+|"")*"?)
+      | (?P<parameter>\$\d+)
+      | (?P<dollar_string>\$(?:[^\W\d]\w*)?\$)
+      | (?P<word>[^\W\d][\w$]*)
+      | (?P<number>\d[\w.]*|\.\d[\w]*)
+      | (?P<punct>\S)
+    )""", re.VERBOSE | re.DOTALL)
+
+_SQL_TOKEN_KINDS = {
+    'line_comment': 'comment', 'block_comment': 'comment', 'escape_string': 'string',
+    'dollar_string': 'string', 'string': 'string', 'quoted_identifier': 'quoted_identifier',
+    'parameter': 'parameter', 'word': 'word', 'number': 'number', 'punct': 'punct',
+}
+
+# Token kinds that carry no SQL of their own
+_SQL_TRIVIA = ('comment',)
+_SQL_LITERALS = ('string', 'quoted_identifier')
+
+SQL_AGGREGATES = {'count', 'sum', 'avg', 'max', 'min'}
+
+PROHIBITED_SQL_KEYWORDS = [
+    'insert', 'update', 'delete', 'drop', 'truncate', 'alter', 'create',
+    'grant', 'revoke', 'execute', 'copy'
+]
+
+
+def _scan_block_comment(text, pos):
+    """Return the end of a (possibly nested) block comment opened before pos"""
+    depth = 1
+    while depth:
+        close = text.find('*/', pos)
+        if close == -1:
+            return len(text)
+        opening = text.find('/*', pos, close)
+        if opening == -1:
+            depth -= 1
+            pos = close + 2
+        else:
+            depth += 1
+            pos = opening + 2
+    return pos
+
+
+def tokenize_sql(text):
+    """
+    Split SQL text into tokens in a single pass
+
+    Understands single-quoted, escape (E'...') and dollar-quoted strings,
+    quoted identifiers, and line and nested block comments, so semicolons and
+    keywords inside them are never mistaken for SQL. An unterminated string or
+    comment runs to the end of the text.
+
+    Returns:
+        list: (kind, text, start, end) tuples, where kind is 'word', 'string',
+        'quoted_identifier', 'comment', 'parameter', 'number' or 'punct'
+    """
+    tokens = []
+    append = tokens.append
+    pos = 0
+    while True:
+        for m in _SQL_TOKEN_RE.finditer(text, pos):
+            kind = m.lastgroup
+            start = m.start(kind)
+            end = m.end()
+            if kind == 'block_comment':
+                end = _scan_block_comment(text, end)
+            elif kind == 'dollar_string':
+                tag = m.group(kind)
+                close = text.find(tag, end)
+                end = len(text) if close == -1 else close + len(tag)
+            else:
+                append((_SQL_TOKEN_KINDS[kind], m.group(kind), start, end))
+                continue
+            append((_SQL_TOKEN_KINDS[kind], text[start:end], start, end))
+            # Carry on after the comment or string, which the pattern did not consume
+            pos = end
+            break
+        else:
+            return tokens
+
+
+def split_sql_statements(text):
+    """
+    Split SQL text into statements on top-level semicolons
+
+    Returns:
+        list: (statement_text, tokens) pairs. The text runs from the first to
+        the last token that is not a comment, without the semicolon; its
+        tokens include any comments inside it. Empty statements are dropped.
+    """
+    statements = []
+    current = []
+    for token in tokenize_sql(text):
+        if token[0] == 'punct' and token[1] == ';':
+            _append_statement(text, current, statements)
+            current = []
+        else:
+            current.append(token)
+    _append_statement(text, current, statements)
+    return statements
+
+
+def _append_statement(text, tokens, statements):
+    significant = [t for t in tokens if t[0] not in _SQL_TRIVIA]
+    if significant:
+        statements.append((text[significant[0][2]:significant[-1][3]], tokens))
+
+
+def analyze_query_complexity(query, tokens=None):
     """
     Analyze query complexity and potential resource impact
     
     Args:
         query (str): SQL query to analyze
+        tokens (list, optional): tokenize_sql output for query, if already known
     
     Returns:
         dict: Complexity metrics
@@ -33,42 +198,65 @@ def analyze_query_complexity(query):
     Raises:
         QueryComplexityError: If query is too complex
     """
-    query_lower = query.lower()
+    if tokens is None:
+        tokens = tokenize_sql(query)
+
+    join_count = 0
+    subquery_count = 0
+    agg_count = 0
+    condition_count = 0
+    has_window = False
+    in_where = False
+    previous = None
+
+    # Keywords in strings, identifiers and comments are not counted
+    for kind, text, _, _ in tokens:
+        if kind in _SQL_TRIVIA:
+            continue
+        value = text.lower() if kind == 'word' else text
+        if kind == 'word':
+            if value == 'join':
+                join_count += 1
+            elif value == 'where':
+                in_where = True
+            elif value in ('and', 'or') and in_where:
+                condition_count += 1
+            elif value == 'select' and previous == '(':
+                subquery_count += 1
+            elif value == 'by' and previous == 'partition':
+                has_window = True
+        elif value == '(':
+            if previous in SQL_AGGREGATES:
+                agg_count += 1
+            elif previous == 'over':
+                has_window = True
+        previous = value if kind in ('word', 'punct') else None
+
     complexity_score = 0
     warnings = []
     
     # Check for joins
-    join_count = sum(1 for join_type in ['join', 'inner join', 'left join', 'right join', 'full join'] 
-                    if join_type in query_lower)
     complexity_score += join_count * 2
     if join_count > 3:
         warnings.append(f"Query contains {join_count} joins - consider simplifying")
     
     # Check for subqueries
-    subquery_count = query_lower.count('(select')
     complexity_score += subquery_count * 3
     if subquery_count > 2:
         warnings.append(f"Query contains {subquery_count} subqueries - consider restructuring")
     
     # Check for aggregations
-    agg_functions = ['count(', 'sum(', 'avg(', 'max(', 'min(']
-    agg_count = sum(query_lower.count(func) for func in agg_functions)
     complexity_score += agg_count
     
     # Check for window functions
-    if 'over(' in query_lower or 'partition by' in query_lower:
+    if has_window:
         complexity_score += 3
         warnings.append("Query uses window functions - monitor performance")
     
     # Check for complex WHERE conditions
-    where_pos = query_lower.find('where')
-    if where_pos != -1:
-        where_clause = query_lower[where_pos:]
-        and_count = where_clause.count(' and ')
-        or_count = where_clause.count(' or ')
-        complexity_score += (and_count + or_count)
-        if (and_count + or_count) > 5:
-            warnings.append(f"Complex WHERE clause with {and_count + or_count} conditions")
+    complexity_score += condition_count
+    if condition_count > 5:
+        warnings.append(f"Complex WHERE clause with {condition_count} conditions")
     
     return {
         'complexity_score': complexity_score,
@@ -80,9 +268,13 @@ def analyze_query_complexity(query):
 
 def validate_and_execute_queries(secret_name, query, max_rows=20, 
                                max_statements=5, max_total_rows=1000, 
-                               max_complexity=15):
+                               max_complexity=15, max_total_bytes=QUERY_RESULT_MAX_BYTES):
     """
     Enhanced query validation and execution with additional controls
+
+    Rows are streamed from the database and fetching stops once a statement
+    reaches max_rows, or all statements together reach max_total_rows or
+    roughly max_total_bytes of result data.
     """
     response = {
         'results': [],
@@ -94,10 +286,11 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
     start_time = time.time()
     conn = None
     total_rows = 0
+    total_bytes = 0
     
     try:
         # Validate and split queries
-        statements = validate_query(query)
+        statements = validate_sql_statements(query)
         
         # Check number of statements
         if len(statements) > max_statements:
@@ -115,9 +308,9 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
             cur.execute("SET idle_in_transaction_session_timeout = '60s'")
             
             # Execute each statement
-            for stmt_index, stmt in enumerate(statements, 1):
+            for stmt_index, (stmt, stmt_tokens) in enumerate(statements, 1):
                 # Analyze query complexity
-                complexity_metrics = analyze_query_complexity(stmt)
+                complexity_metrics = analyze_query_complexity(stmt, stmt_tokens)
                 if complexity_metrics['complexity_score'] > max_complexity:
                     raise QueryComplexityError(
                         f"Statement {stmt_index} is too complex (score: {complexity_metrics['complexity_score']})"
@@ -140,11 +333,11 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
                 }
                 
                 stmt_lower = stmt.lower().strip()
+                remaining_rows = max_total_rows - total_rows
+                limit_rows = min(max_rows, remaining_rows)
                 
                 # Only add LIMIT for SELECT queries
                 if stmt_lower.startswith('select') and 'limit' not in stmt_lower:
-                    remaining_rows = max_total_rows - total_rows
-                    limit_rows = min(max_rows, remaining_rows)
                     stmt = f"{stmt} LIMIT {limit_rows + 1}"
                 
                 # Execute with explain plan first for SELECT queries
@@ -153,47 +346,40 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
                     #explain_plan = cur.fetchone()[0]
                     
                     # Analyze plan for potential issues
-                    optimization_suggestions = analyze_query_performance(secret_name, stmt)
+                    analysis = analyze_query_performance(secret_name, stmt)
+                    optimization_suggestions = (
+                        [issue['description'] for issue in analysis['issues']]
+                        + [rec['statement'] for rec in analysis['index_recommendations']]
+                    )
                     if optimization_suggestions:
                         response['optimization_suggestions'].extend(
                             f"Statement {stmt_index}: {suggestion}"
                             for suggestion in optimization_suggestions
                         )
                 
-                # Execute actual query
-                cur.execute(stmt)
-                
-                # Get column names
-                stmt_response['columns'] = [desc[0] for desc in cur.description]
-                
-                # Fetch results
-                rows = cur.fetchall()
-                row_count = len(rows)
-                
-                # Check total row limit
-                total_rows += row_count
-                if total_rows > max_total_rows:
-                    stmt_response['truncated'] = True
-                    excess_rows = total_rows - max_total_rows
-                    rows = rows[:-excess_rows]
-                    stmt_response['message'] = (
-                        f"Results truncated. Maximum total rows ({max_total_rows}) reached"
-                    )
-                    total_rows = max_total_rows
-                
-                # Check individual statement limit
-                elif row_count > max_rows:
-                    stmt_response['truncated'] = True
-                    rows = rows[:max_rows]
-                    stmt_response['message'] = (
-                        f"Results truncated to {max_rows} rows"
-                    )
+                # Execute actual query, streaming SELECT results from a
+                # server-side cursor until a row or size limit is reached
+                columns, rows, result_bytes, limit_hit = fetch_limited_rows(
+                    conn, stmt, limit_rows, max_total_bytes - total_bytes,
+                    cursor_name=f"read_query_{stmt_index}" if stmt_lower.startswith('select') else None
+                )
+                total_rows += len(rows)
+                total_bytes += result_bytes
                 
+                stmt_response['columns'] = columns
+                stmt_response['rows'] = rows
                 stmt_response['row_count'] = len(rows)
-                stmt_response['rows'] = [
-                    dict(zip(stmt_response['columns'], row))
-                    for row in rows
-                ]
+                stmt_response['result_bytes'] = result_bytes
+                if limit_hit:
+                    stmt_response['truncated'] = True
+                    if limit_hit == 'rows' and limit_rows < max_rows:
+                        stmt_response['message'] = (
+                            f"Results truncated. Maximum total rows ({max_total_rows}) reached"
+                        )
+                    else:
+                        stmt_response['message'] = truncation_message(
+                            limit_hit, len(rows), max_rows, max_total_bytes
+                        )
                 
                 response['results'].append(stmt_response)
             
@@ -203,6 +389,7 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
                 'execution_time': total_time,
                 'statements_executed': len(statements),
                 'total_rows': total_rows,
+                'result_bytes': total_bytes,
                 'timestamp': datetime.utcnow().isoformat(),
                 'needs_analysis': total_time > 5,
                 'performance_message': (
@@ -235,36 +422,17 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
     
     finally:
         if conn:
-            conn.close()
-
-def get_secret(secret_name):
-    """Get secret from AWS Secrets Manager """
-    secret_name = secret_name
-    region_name = os.environ['REGION']
-    session = boto3.session.Session()
-    client = session.client(
-        service_name='secretsmanager',
-        region_name=region_name
-    )
-    
-    try:
-        secret_value = client.get_secret_value(SecretId=secret_name)
-        secret = json.loads(secret_value['SecretString'])
-        return secret
-    except ClientError as e:
-        raise Exception(f"Failed to get secret: {str(e)}")
+            release_connection(conn)
 
 def get_env_secret(environment):
-    ssm_client = boto3.client('ssm')
     """Retrieve the secret name for the specified environment"""
+    ssm_client = db_connection.ssm_client()
     if environment == 'prod':
         try:
             # Get the secret name from Parameter Store
-            response = ssm_client.get_parameter(
-                Name=f'/AuroraOps/{environment}'
-            )
-            print(response['Parameter']['Value'])
-            return response['Parameter']['Value']
+            secret_name = db_connection.get_parameter(f'/AuroraOps/{environment}')
+            print(secret_name)
+            return secret_name
         except ssm_client.exceptions.ParameterNotFound:
             error_message = f"Parameter not found: /AuroraOps/{environment}"
             print(error_message)
@@ -272,10 +440,7 @@ def get_env_secret(environment):
     elif environment == 'dev':
         try:
             # Get the secret name from Parameter Store
-            response = ssm_client.get_parameter(
-                Name=f'/AuroraOps/{environment}'
-            )
-            return response['Parameter']['Value']
+            return db_connection.get_parameter(f'/AuroraOps/{environment}')
         except Exception as e:
             raise Exception(f"Failed to get dev secret name from Parameter Store: {str(e)}")
     else:
@@ -283,102 +448,91 @@ def get_env_secret(environment):
         raise ValueError(f"Unknown environment: {environment}")
 
 def connect_to_db(secret_name):
-    """Establish database connection"""
-    cur_secret = secret_name
-    secret = get_secret(cur_secret)
-    try:
-        conn = psycopg2.connect(
-            host=secret['host'],
-            database=secret['dbname'],
-            user=secret['username'],
-            password=secret['password'],
-            port=secret['port']
-        )
-        return conn
-    except Exception as e:
-        raise Exception(f"Failed to connect to the database: {str(e)}")
+    """Check out a pooled database connection; release it with release_connection"""
+    return db_connection.get_connection(secret_name)
 
-# Define the queries dictionary for different object types
+# Define the queries dictionary for different object types. Each query takes
+# a name pattern (ILIKE) and a schema, and returns the object's oid first.
 queries = {
     'table': """
         WITH RECURSIVE columns AS (
-            SELECT 
+            SELECT
+                c.oid,
                 t.schemaname,
                 t.tablename,
                 array_to_string(
                     array_agg(
-                        '    ' || quote_ident(a.attname) || ' ' || 
+                        '    ' || quote_ident(a.attname) || ' ' ||
                         pg_catalog.format_type(a.atttypid, a.atttypmod) ||
                         CASE WHEN a.attnotnull THEN ' NOT NULL' ELSE '' END ||
-                        CASE WHEN ad.adbin IS NOT NULL 
-                            THEN ' DEFAULT ' || pg_get_expr(ad.adbin, ad.adrelid) 
-                            ELSE '' 
+                        CASE WHEN ad.adbin IS NOT NULL
+                            THEN ' DEFAULT ' || pg_get_expr(ad.adbin, ad.adrelid)
+                            ELSE ''
                         END
                         ORDER BY a.attnum
                     ),
                     E',\n'
                 ) as column_definitions
             FROM pg_catalog.pg_tables t
-            JOIN pg_catalog.pg_class c 
-                ON c.relname = t.tablename 
+            JOIN pg_catalog.pg_class c
+                ON c.relname = t.tablename
                 AND c.relnamespace = (
-                    SELECT oid 
-                    FROM pg_catalog.pg_namespace 
+                    SELECT oid
+                    FROM pg_catalog.pg_namespace
                     WHERE nspname = t.schemaname
                 )
-            JOIN pg_catalog.pg_attribute a 
-                ON a.attrelid = c.oid 
-                AND a.attnum > 0 
+            JOIN pg_catalog.pg_attribute a
+                ON a.attrelid = c.oid
+                AND a.attnum > 0
                 AND NOT a.attisdropped
-            LEFT JOIN pg_catalog.pg_attrdef ad 
-                ON ad.adrelid = c.oid 
+            LEFT JOIN pg_catalog.pg_attrdef ad
+                ON ad.adrelid = c.oid
                 AND ad.adnum = a.attnum
             WHERE t.schemaname NOT IN ('pg_catalog', 'information_schema')
-            GROUP BY t.schemaname, t.tablename
+            AND t.tablename ILIKE %s AND t.schemaname = %s
+            GROUP BY c.oid, t.schemaname, t.tablename
         )
-        SELECT 
+        SELECT
+            col.oid,
             col.schemaname || '.' || col.tablename as object_name,
             'TABLE' as object_type,
-            CASE 
+            CASE
                 WHEN col.column_definitions IS NOT NULL THEN
                     format(
-                        'CREATE TABLE %I.%I (\n%s\n);',
+                        'CREATE TABLE %%I.%%I (\n%%s\n);',
                         col.schemaname,
                         col.tablename,
                         col.column_definitions
                     )
                 ELSE 'ERROR: No columns found for this table'
             END as definition,
-            obj_description(
-                (col.schemaname || '.' || col.tablename)::regclass, 
-                'pg_class'
-            ) as description
+            obj_description(col.oid, 'pg_class') as description
         FROM columns col
-        WHERE col.tablename ILIKE %s AND col.schemaname = %s
     """,
 
     'view': """
-        SELECT 
-            schemaname || '.' || viewname as object_name,
+        SELECT
+            c.oid,
+            n.nspname || '.' || c.relname as object_name,
             'VIEW' as object_type,
             format(
-                'CREATE OR REPLACE VIEW %I.%I AS\n%s',
-                schemaname,
-                viewname,
-                pg_get_viewdef(format('%I.%I', schemaname, viewname)::regclass, true)
+                'CREATE OR REPLACE VIEW %%I.%%I AS\n%%s',
+                n.nspname,
+                c.relname,
+                pg_get_viewdef(c.oid, true)
             ) as definition,
-            obj_description(
-                (schemaname || '.' || viewname)::regclass, 
-                'pg_class'
-            ) as description
-        FROM pg_catalog.pg_views
-        WHERE viewname ILIKE %s 
-        AND schemaname = %s
-        AND schemaname NOT IN ('pg_catalog', 'information_schema')
+            obj_description(c.oid, 'pg_class') as description
+        FROM pg_catalog.pg_class c
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind = 'v'
+        AND c.relname ILIKE %s
+        AND n.nspname = %s
+        AND n.nspname NOT IN ('pg_catalog', 'information_schema')
     """,
 
     'function': """
-        SELECT 
+        SELECT
+            p.oid,
             n.nspname || '.' || p.proname as object_name,
             'FUNCTION' as object_type,
             pg_get_functiondef(p.oid) as definition,
@@ -395,7 +549,8 @@ queries = {
     """,
 
     'procedure': """
-        SELECT 
+        SELECT
+            p.oid,
             n.nspname || '.' || p.proname as object_name,
             'PROCEDURE' as object_type,
             pg_get_functiondef(p.oid) as definition,
@@ -409,7 +564,8 @@ queries = {
     """,
 
     'trigger': """
-        SELECT 
+        SELECT
+            t.oid,
             n.nspname || '.' || t.tgname as object_name,
             'TRIGGER' as object_type,
             pg_get_triggerdef(t.oid, true) as definition,
@@ -424,11 +580,12 @@ queries = {
     """,
 
     'sequence': """
-        SELECT 
+        SELECT
+            c.oid,
             n.nspname || '.' || c.relname as object_name,
             'SEQUENCE' as object_type,
             format(
-                'CREATE SEQUENCE %I.%I\n    INCREMENT %s\n    MINVALUE %s\n    MAXVALUE %s\n    START %s\n    CACHE %s%s;',
+                'CREATE SEQUENCE %%I.%%I\n    INCREMENT %%s\n    MINVALUE %%s\n    MAXVALUE %%s\n    START %%s\n    CACHE %%s%%s;',
                 n.nspname,
                 c.relname,
                 s.seqincrement,
@@ -448,7 +605,8 @@ queries = {
     """,
 
     'index': """
-        SELECT 
+        SELECT
+            i.indexrelid as oid,
             n.nspname || '.' || c.relname as object_name,
             'INDEX' as object_type,
             pg_get_indexdef(i.indexrelid) as definition,
@@ -462,29 +620,173 @@ queries = {
     """
 }
 
+# object_type that extracts every type above in one query
+ALL_OBJECT_TYPES = 'all'
+
+# Catalogs whose rows make up the extracted definitions. Any CREATE, ALTER,
+# DROP or COMMENT touching them changes their row count or the sum of their
+# row xmins, which invalidates the cached definitions.
+DDL_CATALOGS = (
+    'pg_class', 'pg_attribute', 'pg_attrdef', 'pg_index', 'pg_rewrite',
+    'pg_proc', 'pg_trigger', 'pg_sequence', 'pg_description',
+)
+
+DDL_CATALOG_VERSION_QUERY = "SELECT " + ",\n       ".join(
+    f"(SELECT count(*) || ':' || coalesce(sum(xmin::text::bigint), 0) FROM pg_catalog.{catalog})"
+    for catalog in DDL_CATALOGS
+)
+
+# Definitions cached per database; a database's cache is emptied when it
+# would grow past this many objects
+DDL_CACHE_MAX_OBJECTS = int(os.environ.get('DDL_CACHE_MAX_OBJECTS', '5000'))
+
+# secret_name -> {'version', 'objects': {(object_type, oid): (name, result)},
+#                 'lookups': {(object_type, schema, pattern): [oid, ...]}}
+_ddl_cache = {}
+_ddl_cache_lock = threading.Lock()
+
+
+def get_catalog_version(cur):
+    """Cheap fingerprint of the catalogs the DDL queries read"""
+    cur.execute(DDL_CATALOG_VERSION_QUERY)
+    return tuple(cur.fetchone())
+
+
+def like_pattern_regex(pattern):
+    """Compile an ILIKE pattern into the equivalent regular expression"""
+    parts = []
+    chars = iter(pattern)
+    for char in chars:
+        if char == '\\':
+            parts.append(re.escape(next(chars, '\\')))
+        elif char == '%':
+            parts.append('.*')
+        elif char == '_':
+            parts.append('.')
+        else:
+            parts.append(re.escape(char))
+    return re.compile(''.join(parts), re.IGNORECASE | re.DOTALL)
+
+
+def build_ddl_query(object_types, object_name, object_schema):
+    """One query returning (object_type, row as JSON) for all the object types"""
+    selects = []
+    params = []
+    for object_type in object_types:
+        selects.append(f"SELECT '{object_type}' AS ddl_object_type, to_json(q) AS info FROM ({queries[object_type]}) q")
+        params.extend([object_name, object_schema])
+    return "\nUNION ALL\n".join(selects), params
+
+
+def get_cached_ddl(secret_name, version, object_types, object_name, object_schema):
+    """Cached results for each object type, and the types that must be queried.
+
+    A name is answered from its own lookup or from a bulk lookup of the whole
+    schema. Nothing is served if the catalog version changed.
+    """
+    cached = {}
+    missing = []
+    with _ddl_cache_lock:
+        entry = _ddl_cache.get(secret_name)
+        if entry is not None and entry['version'] != version:
+            print("Catalog changed since the DDL was cached, dropping the cache")
+            del _ddl_cache[secret_name]
+            entry = None
+
+        for object_type in object_types:
+            if entry is None:
+                missing.append(object_type)
+            elif (object_type, object_schema, object_name) in entry['lookups']:
+                oids = entry['lookups'][(object_type, object_schema, object_name)]
+                cached[object_type] = [dict(entry['objects'][(object_type, oid)][1]) for oid in oids]
+            elif (object_type, object_schema, '%') in entry['lookups']:
+                regex = like_pattern_regex(object_name)
+                oids = entry['lookups'][(object_type, object_schema, '%')]
+                cached[object_type] = [
+                    dict(result) for name, result in (entry['objects'][(object_type, oid)] for oid in oids)
+                    if regex.fullmatch(name)
+                ]
+            else:
+                missing.append(object_type)
+    return cached, missing
+
+
+def cache_ddl(secret_name, version, object_types, object_name, object_schema, rows):
+    """Turn the DDL query rows into results, cache them and return them by type"""
+    fetched = {object_type: [] for object_type in object_types}
+    objects = {}
+    for object_type, info in rows:
+        oid = info.pop('oid')
+        result = dict(info)
+        # Add explanation based on object type
+        if result.get('definition'):
+            if object_type == 'table':
+                result['explanation'] = analyze_table_definition(result['definition'])
+            elif object_type == 'view':
+                result['explanation'] = analyze_view_definition(result['definition'])
+            elif object_type in ('function', 'procedure'):
+                result['explanation'] = analyze_routine_definition(result['definition'])
+            elif object_type == 'trigger':
+                result['explanation'] = analyze_trigger_definition(result['definition'])
+            else:
+                result['explanation'] = f"DDL for {object_type}"
+
+        fetched[object_type].append(result)
+        name = result['object_name'][len(object_schema) + 1:]
+        objects[(object_type, oid)] = (name, dict(result))
+        print(f"\nProcessed {object_type}: {result.get('object_name', 'unknown')}")
+
+    with _ddl_cache_lock:
+        entry = _ddl_cache.get(secret_name)
+        if entry is None or entry['version'] != version:
+            entry = {'version': version, 'objects': {}, 'lookups': {}}
+        if len(entry['objects']) + len(objects) > DDL_CACHE_MAX_OBJECTS:
+            print(f"DDL cache for {secret_name} is full, starting over")
+            entry = {'version': version, 'objects': {}, 'lookups': {}}
+        if len(objects) <= DDL_CACHE_MAX_OBJECTS:
+            entry['objects'].update(objects)
+            for object_type in object_types:
+                entry['lookups'][(object_type, object_schema, object_name)] = [
+                    oid for (cached_type, oid) in objects if cached_type == object_type
+                ]
+        _ddl_cache[secret_name] = entry
+    return fetched
+
+
 def extract_database_object_ddl(secret_name, object_type, object_name=None, object_schema=None):
     """
     Extract DDL and description for database objects
-    
+
+    Definitions are cached per object oid until the catalog version changes,
+    so repeated lookups only cost one cheap catalog query. Without an
+    object_name (or with object_type 'all') every matching object in the
+    schema is extracted in a single query.
+
     Args:
         secret_name (str): The name of the secret containing database credentials
-        object_type (str): Type of database object ('table', 'view', 'function', 'procedure', etc.)
-        object_name (str, optional): Name of the object to search for
-        object_schema (str, optional): Schema name to filter objects
-    
+        object_type (str): Type of database object ('table', 'view', 'function', 'procedure', etc.) or 'all'
+        object_name (str, optional): Name or ILIKE pattern of the objects; all objects in the schema if omitted
+        object_schema (str): Schema name to filter objects
+
     Returns:
         list: List of dictionaries containing object information
         str: Error message if no objects found
     """
+    conn = None
     try:
         # Input validation
-        if not object_name or not object_schema:
-            raise ValueError("Both object_name and object_schema are required")
+        if not object_schema:
+            raise ValueError("object_schema is required")
+        object_name = object_name or '%'
 
         # Validate object_type
-        object_type_lower = object_type.lower()
-        if object_type_lower not in queries:
-            valid_types = ', '.join(queries.keys())
+        object_type_lower = (object_type or '').lower()
+        if object_type_lower == ALL_OBJECT_TYPES:
+            object_types = list(queries)
+        elif object_type_lower in queries:
+            object_types = [object_type_lower]
+        else:
+            valid_types = ', '.join([*queries.keys(), ALL_OBJECT_TYPES])
             raise ValueError(f"Invalid object_type: {object_type}. Valid types are: {valid_types}")
 
         # Connect to database
@@ -492,68 +794,27 @@ def extract_database_object_ddl(secret_name, object_type, object_name=None, obje
         if not conn:
             raise Exception("Failed to establish database connection")
 
-        results = []
         with conn.cursor() as cur:
-            try:
-                # Debug information
-                print(f"\nExecuting query for {object_type_lower}")
-                print(f"Object name: {object_name}")
-                print(f"Schema: {object_schema}")
-
-                # Get query and execute
-                query = queries[object_type_lower]
-                params = [object_name, object_schema]
-                
-                print("\nExecuting query with parameters:")
-                print(f"Query: {query}")
-                print(f"Parameters: {params}")
-
-                cur.execute(query, params)
-                
-                # Fetch results
-                rows = cur.fetchall()
-                if not rows:
-                    print("No rows returned from query")
-                    return "No matching objects found"
+            version = get_catalog_version(cur)
+            found, missing = get_cached_ddl(secret_name, version, object_types, object_name, object_schema)
+            print(f"\nDDL for {object_name} in {object_schema}: "
+                  f"cached {sorted(found) or 'none'}, querying {missing or 'none'}")
 
-                # Get column names
-                columns = [desc[0] for desc in cur.description]
-                print(f"\nColumns returned: {columns}")
+            if missing:
+                query, params = build_ddl_query(missing, object_name, object_schema)
+                try:
+                    cur.execute(query, params)
+                    rows = cur.fetchall()
+                except Exception as e:
+                    print(f"\nError details:")
+                    print(f"Query: {query}")
+                    print(f"Parameters: {params}")
+                    print(f"Error message: Error executing query: {str(e)}")
+                    raise
                 print(f"Number of rows: {len(rows)}")
+                found.update(cache_ddl(secret_name, version, missing, object_name, object_schema, rows))
 
-                # Process results
-                for row in rows:
-                    if not row:
-                        continue
-
-                    # Create result dictionary
-                    result = {}
-                    for i, column in enumerate(columns):
-                        result[column] = row[i] if i < len(row) else None
-
-                    # Add explanation based on object type
-                    if result.get('definition'):
-                        if object_type_lower == 'table':
-                            result['explanation'] = analyze_table_definition(result['definition'])
-                        elif object_type_lower == 'view':
-                            result['explanation'] = analyze_view_definition(result['definition'])
-                        elif object_type_lower in ('function', 'procedure'):
-                            result['explanation'] = analyze_routine_definition(result['definition'])
-                        elif object_type_lower == 'trigger':
-                            result['explanation'] = analyze_trigger_definition(result['definition'])
-                        else:
-                            result['explanation'] = f"DDL for {object_type_lower}"
-
-                    results.append(result)
-                    print(f"\nProcessed {object_type_lower}: {result.get('object_name', 'unknown')}")
-
-            except Exception as e:
-                error_msg = f"Error executing query: {str(e)}"
-                print(f"\nError details:")
-                print(f"Query: {query}")
-                print(f"Parameters: {params}")
-                print(f"Error message: {error_msg}")
-                raise
+        results = [result for object_type in object_types for result in found[object_type]]
 
         # Return results
         if not results:
@@ -570,8 +831,8 @@ def extract_database_object_ddl(secret_name, object_type, object_name=None, obje
     finally:
         if conn:
             try:
-                conn.close()
-                print("\nDatabase connection closed")
+                release_connection(conn)
+                print("\nDatabase connection released")
             except Exception as e:
                 print(f"\nError closing connection: {str(e)}")
 
@@ -757,6 +1018,10 @@ def clean_query_for_explain(query):
 def analyze_query_performance(secret_name, query_or_object_name, parameters=None, object_type=None):
     """
     Analyze query performance and provide optimization recommendations
+
+    The query is explained once; the analyzed plan carries the planner's
+    estimates alongside the actual figures, so no separate estimate-only
+    EXPLAIN is needed.
     
     Parameters:
     - secret_name: Secret containing database credentials
@@ -791,22 +1056,16 @@ def analyze_query_performance(secret_name, query_or_object_name, parameters=None
                 # Use GENERIC_PLAN for parameterized queries
                 cur.execute(f"EXPLAIN (GENERIC_PLAN, BUFFERS, FORMAT JSON) {modified_query}")
                 plan = cur.fetchone()[0]
-
-                cur.execute(f"EXPLAIN (FORMAT JSON) {modified_query}")
-                estimated_plan = cur.fetchone()[0]
                 
                 # Pass True for is_generic_plan
-                analysis = analyze_execution_plan(plan[0], estimated_plan[0], True)
+                analysis = analyze_execution_plan(plan[0], True)
             else:
                 # For non-parameterized queries, use ANALYZE
                 cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query_to_analyze}")
                 plan = cur.fetchone()[0]
                 
-                cur.execute(f"EXPLAIN (FORMAT JSON) {query_to_analyze}")
-                estimated_plan = cur.fetchone()[0]
-                
                 # Pass False for is_generic_plan
-                analysis = analyze_execution_plan(plan[0], estimated_plan[0], False)
+                analysis = analyze_execution_plan(plan[0], False)
 
             return analysis
 
@@ -814,62 +1073,105 @@ def analyze_query_performance(secret_name, query_or_object_name, parameters=None
         raise Exception(f"Failed to analyze query performance: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
 
-def analyze_execution_plan(actual_plan, estimated_plan, is_generic_plan):
+def analyze_execution_plan(plan, is_generic_plan):
     """
     Analyze execution plan and provide detailed explanations and recommendations
+
+    Walks the plan tree once, recording each node's exclusive time, cost and
+    buffers in analysis['nodes'], then ranks the most expensive nodes in
+    analysis['hotspots'] and derives index recommendations from the filter
+    and join columns in analysis['index_recommendations'].
     """
     analysis = {
         'summary': [],
         'issues': [],
         'recommendations': [],
-        'performance_stats': {}
+        'performance_stats': {},
+        'nodes': [],
+        'hotspots': [],
+        'index_recommendations': []
     }
 
     analysis['plan_type'] = 'Generic Plan' if is_generic_plan else 'Analyzed Plan'
 
     # Extract key performance metrics
-    total_cost = actual_plan['Plan'].get('Total Cost')
-    rows = actual_plan['Plan'].get('Plan Rows')  # Use Plan Rows for generic plans
-    estimated_rows = estimated_plan['Plan'].get('Plan Rows')
-    
-    # Initialize performance stats
+    root = plan['Plan']
     performance_stats = {
-        'total_cost': total_cost,
-        'estimated_rows': estimated_rows,
-        'plan_rows': rows
+        'total_cost': root.get('Total Cost'),
+        'estimated_rows': root.get('Plan Rows'),
+        'plan_rows': root.get('Plan Rows')
     }
 
     # Add actual execution metrics only for analyzed plans
     if not is_generic_plan:
-        actual_time = actual_plan['Plan'].get('Actual Total Time')
-        actual_rows = actual_plan['Plan'].get('Actual Rows')
         performance_stats.update({
-            'execution_time_ms': actual_time,
-            'actual_rows': actual_rows
+            'execution_time_ms': plan.get('Execution Time', root.get('Actual Total Time')),
+            'planning_time_ms': plan.get('Planning Time'),
+            'actual_rows': root.get('Actual Rows')
         })
     
     analysis['performance_stats'] = performance_stats
 
-    # Analyze node types and operations
-    analyze_plan_node(actual_plan['Plan'], analysis, is_generic_plan)
-    
-    # Check for common issues
-    identify_performance_issues(actual_plan['Plan'], estimated_plan['Plan'], analysis, is_generic_plan)
+    # Analyze every node, collecting the columns used by filters and joins
+    plan_columns = {'aliases': {}, 'repeated_scans': set(), 'filters': [], 'joins': []}
+    analyze_plan_node(root, analysis, is_generic_plan, plan_columns)
+
+    analysis['hotspots'] = rank_plan_hotspots(analysis['nodes'], is_generic_plan)
+    analysis['index_recommendations'] = recommend_indexes(plan_columns, is_generic_plan)
     
     # Generate recommendations
     generate_recommendations(analysis)
     
     return analysis
 
-def analyze_plan_node(node, analysis, is_generic_plan):
+def _plan_node_label(node):
+    label = node['Node Type']
+    if node.get('Relation Name'):
+        label += f" on {node['Relation Name']}"
+        if node.get('Alias') and node['Alias'] != node['Relation Name']:
+            label += f" {node['Alias']}"
+    elif node.get('CTE Name'):
+        label += f" on {node['CTE Name']}"
+    if node.get('Index Name'):
+        label += f" using {node['Index Name']}"
+    return label
+
+def analyze_plan_node(node, analysis, is_generic_plan, plan_columns, depth=0, parent=None, processes=1):
     """
     Recursively analyze each node in the execution plan
+
+    Times, costs and buffer counts in EXPLAIN output include the node's
+    children, and actual times and rows are averages per loop. Each node's
+    entry in analysis['nodes'] holds its exclusive share: its totals over all
+    loops less those of its children. Below a Gather the loops are spread
+    over the parallel processes, so the time is divided between them.
+
+    Returns:
+        dict: The node's entry in analysis['nodes']
     """
     # Analyze current node
     node_type = node['Node Type']
-    
+    entry = {
+        'id': len(analysis['nodes']) + 1,
+        'depth': depth,
+        'node_type': node_type,
+        'label': _plan_node_label(node),
+        'relation': node.get('Relation Name'),
+        'total_cost': node.get('Total Cost', 0),
+        'plan_rows': node.get('Plan Rows', 0)
+    }
+    analysis['nodes'].append(entry)
+
+    if not is_generic_plan:
+        loops = node.get('Actual Loops', 1)
+        entry['loops'] = loops
+        entry['actual_rows'] = node.get('Actual Rows', 0)
+        entry['inclusive_time_ms'] = node.get('Actual Total Time', 0) * loops / processes
+        entry['rows_removed_by_filter'] = node.get('Rows Removed by Filter', 0) * loops
+        check_row_estimate(entry, analysis)
+
     # Check for expensive operations with appropriate metrics based on plan type
     if node_type == 'Seq Scan':
         analysis['issues'].append({
@@ -903,22 +1205,271 @@ def analyze_plan_node(node, analysis, is_generic_plan):
                 'severity': 'medium'
             })
 
+    # Parallel execution analysis, only known once the plan has run
+    if not is_generic_plan and node.get('Workers Planned', 0) > 0 and node.get('Workers Launched', 0) == 0:
+        analysis['issues'].append({
+            'type': 'parallel_execution_failed',
+            'description': "Parallel execution was planned but not executed",
+            'severity': 'medium'
+        })
+
     # Check for filter conditions
     if 'Filter' in node:
         analyze_filter_condition(node['Filter'], analysis)
 
-    # Recursively analyze child nodes
-    for child in node.get('Plans', []):
-        analyze_plan_node(child, analysis, is_generic_plan)
+    collect_plan_columns(node, entry, parent, plan_columns)
+
+    # Recursively analyze child nodes; the leader takes part in a parallel plan
+    if 'Workers Launched' in node:
+        processes = node['Workers Launched'] + 1
+    children = node.get('Plans', [])
+    child_entries = [
+        analyze_plan_node(child, analysis, is_generic_plan, plan_columns, depth + 1, node, processes)
+        for child in children
+    ]
+
+    entry['exclusive_cost'] = max(
+        entry['total_cost'] - sum(child['total_cost'] for child in child_entries), 0
+    )
+    if not is_generic_plan:
+        entry['exclusive_time_ms'] = max(
+            entry['inclusive_time_ms'] - sum(child['inclusive_time_ms'] for child in child_entries), 0
+        )
+        # Buffer counts are totals over all loops and processes already
+        for key, field in PLAN_BUFFER_FIELDS.items():
+            entry[key] = max(node.get(field, 0) - sum(child.get(field, 0) for child in children), 0)
+
+    return entry
+
+def check_row_estimate(entry, analysis):
+    """
+    Flag a node whose actual rows per loop are far from the planner's estimate
+    """
+    if not entry['loops']:
+        # Never executed
+        return
+    actual, planned = entry['actual_rows'], entry['plan_rows']
+    factor = max(actual, planned) / max(min(actual, planned), 1)
+    entry['misestimate_factor'] = round(factor, 1)
+    if factor >= ROW_MISESTIMATE_FACTOR and max(actual, planned) >= ROW_MISESTIMATE_MIN_ROWS:
+        analysis['issues'].append({
+            'type': 'poor_statistics',
+            'description': (
+                f"Statistics may be outdated - row estimation is off by factor of {factor:.1f} "
+                f"at #{entry['id']} {entry['label']} (estimated {planned}, actual {actual} rows per loop)"
+            ),
+            'severity': 'high'
+        })
+
+def _merge_operator_tokens(tokens):
+    """Join adjacent punctuation (::, >=, ~~*) that the tokenizer splits"""
+    merged = []
+    for token in tokens:
+        if (merged and token[0] == 'punct' and merged[-1][0] == 'punct'
+                and merged[-1][3] == token[2]
+                and token[1] in _PLAN_OPERATOR_CHARS and merged[-1][1][-1] in _PLAN_OPERATOR_CHARS):
+            previous = merged.pop()
+            token = ('punct', previous[1] + token[1], previous[2], token[3])
+        merged.append(token)
+    return merged
+
+def parse_plan_condition(condition):
+    """
+    Find the column comparisons in a plan condition such as
+    ((o.status)::text = 'paid'::text) AND (o.total > '100'::numeric)
+
+    Returns:
+        list: one dict per comparison side that is a column, with the column
+        as a (qualifier or None, name) pair, the operator, the item on the
+        other side of the operator and whether the column is inside a
+        function call
+    """
+    tokens = [t for t in _merge_operator_tokens(tokenize_sql(condition)) if t[0] not in _SQL_TRIVIA]
+    items = []
+    functions = []
+    i = 0
+    while i < len(tokens):
+        kind, text = tokens[i][0], tokens[i][1]
+        following = tokens[i + 1][1] if i + 1 < len(tokens) else None
+        if kind == 'punct' and text == '::':
+            # Skip the type name of a cast, e.g. ::timestamp without time zone[]
+            i += 1
+            while i < len(tokens) and (tokens[i][0] == 'word' or tokens[i][1] in ('[', ']')):
+                i += 1
+            continue
+        if kind == 'punct' and text == '(':
+            functions.append(bool(items) and items[-1][0] == 'function')
+            items.append(('open',))
+        elif kind == 'punct' and text == ')':
+            if functions:
+                functions.pop()
+            items.append(('close',))
+        elif kind == 'punct':
+            items.append(('op', text) if text in PLAN_COMPARISON_OPERATORS else ('other', text))
+        elif kind in ('word', 'quoted_identifier'):
+            name = text if kind == 'word' else text[1:-1].replace('""', '"')
+            if kind == 'word' and text.lower() in _PLAN_CONDITION_KEYWORDS:
+                items.append(('other', text))
+            elif kind == 'word' and following == '(':
+                items.append(('function', text.lower()))
+            elif following == '.' and i + 2 < len(tokens) and tokens[i + 2][0] in ('word', 'quoted_identifier'):
+                qualified = tokens[i + 2]
+                column = qualified[1] if qualified[0] == 'word' else qualified[1][1:-1].replace('""', '"')
+                items.append(('column', (name, column), any(functions)))
+                i += 2
+            else:
+                items.append(('column', (None, name), any(functions)))
+        else:
+            items.append(('value', text))
+        i += 1
+
+    comparisons = []
+    for index, item in enumerate(items):
+        if item[0] != 'op':
+            continue
+        left = index - 1
+        while left >= 0 and items[left][0] == 'close':
+            left -= 1
+        right = index + 1
+        while right < len(items) and items[right][0] == 'open':
+            right += 1
+        left_item = items[left] if left >= 0 else ('other',)
+        right_item = items[right] if right < len(items) else ('other',)
+        for side, other in ((left_item, right_item), (right_item, left_item)):
+            if side[0] == 'column':
+                comparisons.append({
+                    'column': side[1],
+                    'operator': item[1],
+                    'other': other,
+                    'in_function': side[2]
+                })
+    return comparisons
+
+def collect_plan_columns(node, entry, parent, plan_columns):
+    """
+    Record the relations, filter columns and join columns of a plan node for
+    recommend_indexes
+    """
+    relation = node.get('Relation Name')
+    if relation:
+        if node.get('Schema'):
+            relation = f"{node['Schema']}.{relation}"
+        alias = node.get('Alias', relation)
+        plan_columns['aliases'][alias] = relation
+        # A scan repeated for every outer row of a nested loop benefits most
+        # from an index on the join column
+        if (node['Node Type'] == 'Seq Scan' and parent is not None
+                and parent['Node Type'] == 'Nested Loop' and node.get('Parent Relationship') == 'Inner'):
+            plan_columns['repeated_scans'].add(alias)
+
+    for field in PLAN_CONDITION_FIELDS:
+        if field not in node:
+            continue
+        for comparison in parse_plan_condition(node[field]):
+            if comparison['in_function']:
+                continue
+            other = comparison['other']
+            if other[0] == 'column':
+                if comparison['operator'] == '=':
+                    plan_columns['joins'].append((comparison['column'], node.get('Alias'), entry))
+            elif node['Node Type'] == 'Seq Scan' and field == 'Filter':
+                plan_columns['filters'].append((comparison, node.get('Alias', relation), entry, node[field]))
+
+def recommend_indexes(plan_columns, is_generic_plan):
+    """
+    Recommend indexes on the columns that sequential scans filter on and on
+    the join columns of sequential scans repeated by nested loops
+
+    Equality columns come before range columns in a recommended index.
+    """
+    aliases = plan_columns['aliases']
+    candidates = {}
+
+    def add(relation, alias, column_name, operator, entry, reason):
+        key = (relation, entry['id'])
+        candidate = candidates.setdefault(key, {
+            'relation': relation, 'equality': [], 'range': [], 'node_id': entry['id'], 'reason': reason
+        })
+        columns = candidate['equality'] if PLAN_COMPARISON_OPERATORS[operator] == 'equality' else candidate['range']
+        if column_name not in candidate['equality'] + candidate['range']:
+            columns.append(column_name)
+
+    for comparison, alias, entry, condition in plan_columns['filters']:
+        qualifier, column_name = comparison['column']
+        # Only equality and range comparisons can use a plain B-tree index
+        if PLAN_COMPARISON_OPERATORS[comparison['operator']] not in ('equality', 'range') or qualifier not in (None, alias):
+            continue
+        if not is_generic_plan:
+            removed = entry['rows_removed_by_filter']
+            kept = entry['actual_rows'] * entry['loops']
+            # Only worth it when the filter discards most of a sizeable table
+            if removed < INDEX_MIN_ROWS_REMOVED or removed <= kept:
+                continue
+            reason = f"#{entry['id']} {entry['label']} removed {removed} of {removed + kept} rows with Filter: {condition}"
+        else:
+            reason = f"#{entry['id']} {entry['label']} filters on {condition}"
+        add(aliases.get(alias, alias), alias, column_name, comparison['operator'], entry, reason)
+
+    for (qualifier, column_name), node_alias, entry in plan_columns['joins']:
+        alias = qualifier or node_alias
+        if alias not in plan_columns['repeated_scans']:
+            continue
+        relation = aliases.get(alias, alias)
+        add(relation, alias, column_name, '=', entry,
+            f"{relation} is scanned sequentially for every outer row of a nested loop joining on {column_name}")
+
+    recommendations = []
+    seen = set()
+    for candidate in candidates.values():
+        columns = (candidate['equality'] + candidate['range'])[:INDEX_MAX_COLUMNS]
+        key = (candidate['relation'], tuple(columns))
+        if key in seen:
+            continue
+        seen.add(key)
+        recommendations.append({
+            'relation': candidate['relation'],
+            'columns': columns,
+            'node_id': candidate['node_id'],
+            'statement': f"CREATE INDEX ON {candidate['relation']} ({', '.join(columns)});",
+            'reason': candidate['reason']
+        })
+
+    # Drop recommendations covered by a wider index on the same relation
+    return [
+        rec for rec in recommendations
+        if not any(
+            other is not rec and other['relation'] == rec['relation']
+            and len(other['columns']) > len(rec['columns'])
+            and other['columns'][:len(rec['columns'])] == rec['columns']
+            for other in recommendations
+        )
+    ]
+
+def rank_plan_hotspots(nodes, is_generic_plan, count=None):
+    """
+    Rank plan nodes by exclusive time, or by exclusive cost for generic plans
+
+    Returns:
+        list: the top nodes, each with its share of the plan's total
+    """
+    count = PLAN_HOTSPOT_COUNT if count is None else count
+    metric = 'exclusive_cost' if is_generic_plan else 'exclusive_time_ms'
+    total = sum(node[metric] for node in nodes)
+    ranked = sorted(nodes, key=lambda node: node[metric], reverse=True)[:count]
+    return [
+        dict(node, metric=metric, share_percent=(node[metric] / total * 100) if total else 0)
+        for node in ranked
+        if node[metric] > 0
+    ]
 
 def analyze_filter_condition(filter_condition, analysis):
     """
     Analyze filter conditions for potential optimization opportunities
     """
-    filter_lower = filter_condition.lower()
+    comparisons = parse_plan_condition(filter_condition)
     
-    # Check for function calls in WHERE clause
-    if '(' in filter_condition and ')' in filter_condition:
+    # Check for function calls on filtered columns
+    if any(comparison['in_function'] for comparison in comparisons):
         analysis['issues'].append({
             'type': 'function_in_filter',
             'description': "Function call in WHERE clause may prevent index usage",
@@ -926,41 +1477,28 @@ def analyze_filter_condition(filter_condition, analysis):
         })
     
     # Check for LIKE operations
-    if ' like ' in filter_lower and filter_lower.startswith('%'):
+    if any(
+        comparison['operator'] in ('~~', '~~*') and comparison['other'][0] == 'value'
+        and comparison['other'][1].startswith(("'%", "'_"))
+        for comparison in comparisons
+    ):
         analysis['issues'].append({
             'type': 'leading_wildcard',
             'description': "Leading wildcard in LIKE clause prevents index usage",
             'severity': 'medium'
         })
 
-def identify_performance_issues(actual_node, estimated_node, analysis, is_generic_plan):
-    """
-    Identify performance issues by comparing actual vs estimated plans
-    """
-    if not is_generic_plan:
-        # Row estimation analysis only for actual execution plans
-        if estimated_node.get('Plan Rows', 0) > 0:
-            estimation_ratio = actual_node.get('Actual Rows', 0) / estimated_node['Plan Rows']
-            if estimation_ratio > 10 or estimation_ratio < 0.1:
-                analysis['issues'].append({
-                    'type': 'poor_statistics',
-                    'description': f"Statistics may be outdated - row estimation is off by factor of {estimation_ratio:.1f}",
-                    'severity': 'high'
-                })
-
-    # Parallel execution analysis (applies to both plan types)
-    if actual_node.get('Workers Planned', 0) > 0 and actual_node.get('Workers Launched', 0) == 0:
-        analysis['issues'].append({
-            'type': 'parallel_execution_failed',
-            'description': "Parallel execution was planned but not executed",
-            'severity': 'medium'
-        })
-
 def generate_recommendations(analysis):
     """
     Generate specific recommendations based on identified issues
     """
+    recommended = set()
     for issue in analysis['issues']:
+        # One recommendation per kind of issue, however many nodes have it
+        if issue['type'] in recommended:
+            continue
+        recommended.add(issue['type'])
+
         if issue['type'] == 'sequential_scan':
             analysis['recommendations'].append({
                 'issue': 'Sequential Scan Detected',
@@ -1029,6 +1567,16 @@ def format_analysis_output(analysis):
     
     output.append("")
 
+    # Nodes doing the most work of their own
+    if analysis.get('hotspots'):
+        if is_generic_plan:
+            output.append("Plan Hotspots (by exclusive estimated cost):")
+        else:
+            output.append("Plan Hotspots (by exclusive time):")
+        for node in analysis['hotspots']:
+            output.append(f"- {format_plan_hotspot(node, is_generic_plan)}")
+        output.append("")
+
     # Issues
     if analysis['issues']:
         output.append("Identified Issues:")
@@ -1044,8 +1592,38 @@ def format_analysis_output(analysis):
             output.append(f"Solution: {rec['recommendation']}")
             output.append("")
 
+    if analysis.get('index_recommendations'):
+        output.append("Index Recommendations:")
+        for rec in analysis['index_recommendations']:
+            output.append(f"- {rec['statement']}")
+            output.append(f"  Reason: {rec['reason']}")
+        output.append("")
+
     return "\n".join(output)
 
+def format_plan_hotspot(node, is_generic_plan):
+    """Describe one hotspot node on a single line"""
+    if is_generic_plan:
+        return (
+            f"#{node['id']} {node['label']}: cost {node['exclusive_cost']:.2f} "
+            f"({node['share_percent']:.1f}%), {node['plan_rows']} rows estimated"
+        )
+    details = [
+        f"{node['exclusive_time_ms']:.2f} ms ({node['share_percent']:.1f}%)",
+        f"{node['actual_rows']} rows x {node['loops']} loops (estimated {node['plan_rows']})",
+    ]
+    if node.get('misestimate_factor', 1) >= ROW_MISESTIMATE_FACTOR:
+        details.append(f"misestimated {node['misestimate_factor']:g}x")
+    if node['rows_removed_by_filter']:
+        details.append(f"{node['rows_removed_by_filter']} rows removed by filter")
+    buffers = ", ".join(
+        f"{key[:-len('_blocks')].replace('_', ' ')}={node[key]}"
+        for key in PLAN_BUFFER_FIELDS if node.get(key)
+    )
+    if buffers:
+        details.append(f"buffers {buffers}")
+    return f"#{node['id']} {node['label']}: " + "; ".join(details)
+
 def monitor_query_performance(query, start_time, rows_returned):
     """
     Monitor query performance and suggest analysis if needed
@@ -1109,125 +1687,152 @@ def validate_query(query):
     Raises:
         ValueError: If query contains prohibited operations
     """
+    return [stmt for stmt, _ in validate_sql_statements(query)]
+
+def validate_sql_statements(query):
+    """
+    Like validate_query, but return (statement, tokens) pairs so callers can
+    analyze each statement without tokenizing it again
+    """
     if not query or not isinstance(query, str):
         raise ValueError("Query must be a non-empty string")
 
-    def is_within_quotes(text, position):
-        """Check if a position in text is within quotes"""
-        single_quotes = False
-        double_quotes = False
-        for i in range(position):
-            if text[i] == "'" and not double_quotes:
-                single_quotes = not single_quotes
-            elif text[i] == '"' and not single_quotes:
-                double_quotes = not double_quotes
-        return single_quotes or double_quotes
-
-    def split_statements(query_text):
-        """Split query into individual statements, respecting quotes and comments"""
-        statements = []
-        current_stmt = []
-        i = 0
-        comment_block = False
-        line_comment = False
-        
-        while i < len(query_text):
-            char = query_text[i]
-            
-            # Handle comment blocks
-            if query_text[i:i+2] == '/*' and not line_comment:
-                comment_block = True
-                current_stmt.append(char)
-                i += 1
-            elif query_text[i:i+2] == '*/' and comment_block:
-                comment_block = False
-                current_stmt.append(char)
-                i += 1
-            # Handle line comments
-            elif query_text[i:i+2] == '--' and not comment_block:
-                line_comment = True
-                current_stmt.append(char)
-                i += 1
-            elif char == '\n' and line_comment:
-                line_comment = False
-                current_stmt.append(char)
-            # Handle semicolons
-            elif char == ';' and not comment_block and not line_comment and not is_within_quotes(query_text, i):
-                current_stmt.append(char)
-                stmt = ''.join(current_stmt).strip()
-                if stmt:
-                    statements.append(stmt)
-                current_stmt = []
-            else:
-                current_stmt.append(char)
-            i += 1
-        
-        # Add the last statement if exists
-        last_stmt = ''.join(current_stmt).strip()
-        if last_stmt:
-            statements.append(last_stmt)
-        
-        return [stmt for stmt in statements if stmt]
-
-    # Split into statements
-    statements = split_statements(query)
     validated_statements = []
+    for stmt, tokens in split_sql_statements(query):
+        significant = [t for t in tokens if t[0] not in _SQL_TRIVIA]
 
-    # Validate each statement
-    for stmt in statements:
-        stmt = stmt.strip()
-        if stmt.endswith(';'):
-            stmt = stmt[:-1]
-        
-        stmt_lower = stmt.lower().strip()
-        
         # Get the command type
-        first_word = stmt_lower.split()[0] if stmt_lower.split() else ''
-        
-        if first_word not in ['select', 'show']:
+        first_word = significant[0][1].lower()
+        if significant[0][0] != 'word' or first_word not in ['select', 'show']:
             raise ValueError(f"Prohibited operation detected: {first_word}")
         
-        # For SELECT statements, check for dangerous operations
+        # For SELECT statements, check for dangerous operations outside
+        # strings, quoted identifiers and comments
         if first_word == 'select':
-            dangerous_operations = [
-                r'\binsert\b', r'\bupdate\b', r'\bdelete\b', r'\bdrop\b', 
-                r'\btruncate\b', r'\balter\b', r'\bcreate\b', r'\bgrant\b', 
-                r'\brevoke\b', r'\bexecute\b', r'\bcopy\b'
-            ]
-            
-            # Remove content within quotes for checking
-            query_for_check = ''
-            in_quote = False
-            quote_char = None
-            
-            for char in stmt:
-                if char in ["'", '"'] and (not quote_char or char == quote_char):
-                    if not in_quote:
-                        quote_char = char
-                        in_quote = True
-                    else:
-                        quote_char = None
-                        in_quote = False
-                elif not in_quote:
-                    query_for_check += char
-            
-            # Check for dangerous operations
-            for operation in dangerous_operations:
-                if re.search(operation, query_for_check.lower()):
-                    raise ValueError(f"Statement contains prohibited operation: {operation}")
+            words = {text.lower() for kind, text, _, _ in significant if kind == 'word'}
+            for operation in PROHIBITED_SQL_KEYWORDS:
+                if operation in words:
+                    raise ValueError(f"Statement contains prohibited operation: \\b{operation}\\b")
         
-        validated_statements.append(stmt)
+        validated_statements.append((stmt, tokens))
     
     return validated_statements
 
-def execute_read_query(secret_name, query, max_rows=20):
+def _truncate_text(text):
+    if len(text) > QUERY_MAX_VALUE_CHARS:
+        return f"{text[:QUERY_MAX_VALUE_CHARS]}... ({len(text)} characters)"
+    return text
+
+def _encode_value(value):
+    """Encode a value of a type without a specific encoder"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return _encode_bytes(value)
+    return _truncate_text(value if isinstance(value, str) else str(value))
+
+def _encode_bytes(value):
+    if value is None:
+        return None
+    # Only hex encode the part of the value that is kept
+    text = "\\x" + bytes(value[:QUERY_MAX_VALUE_CHARS // 2]).hex()
+    if len(value) * 2 + 2 > QUERY_MAX_VALUE_CHARS:
+        return f"{text}... ({len(value)} bytes)"
+    return text
+
+def _encode_native(value):
+    return value
+
+def _encode_isoformat(value):
+    return None if value is None else value.isoformat()
+
+def _encode_json(value):
+    return None if value is None else _truncate_text(json.dumps(value, default=str))
+
+# Encoders by PostgreSQL type OID, picked once per result column
+_COLUMN_ENCODERS = {
+    16: _encode_native,       # bool
+    20: _encode_native,       # int8
+    21: _encode_native,       # int2
+    23: _encode_native,       # int4
+    26: _encode_native,       # oid
+    700: _encode_native,      # float4
+    701: _encode_native,      # float8
+    17: _encode_bytes,        # bytea
+    1082: _encode_isoformat,  # date
+    1083: _encode_isoformat,  # time
+    1114: _encode_isoformat,  # timestamp
+    1184: _encode_isoformat,  # timestamptz
+    1266: _encode_isoformat,  # timetz
+    114: _encode_json,        # json
+    3802: _encode_json,       # jsonb
+}
+
+def _encoded_size(values):
+    return sum(len(value) if isinstance(value, str) else 8 for value in values)
+
+def fetch_limited_rows(conn, stmt, max_rows, max_bytes, cursor_name=None):
+    """
+    Execute a statement and fetch at most max_rows rows and max_bytes of
+    encoded values, without loading more of the result than that
+
+    With cursor_name the statement runs in a named server-side cursor, so
+    rows are streamed in batches of QUERY_FETCH_BATCH_ROWS and the rest of
+    the result is never sent once a limit is reached. Only SELECT statements
+    can use a server-side cursor.
+
+    Returns:
+        tuple: (columns, rows as dicts of encoded values, encoded size,
+        'rows' or 'bytes' if a limit cut the result short, else None)
+    """
+    cur = conn.cursor(name=cursor_name) if cursor_name else conn.cursor()
+    try:
+        cur.execute(stmt)
+        if cursor_name is None and cur.description is None:
+            return [], [], 0, None
+
+        columns = None
+        rows = []
+        size = 0
+        while True:
+            # One more row than max_rows tells whether the result was cut short
+            wanted = min(QUERY_FETCH_BATCH_ROWS, max_rows + 1 - len(rows))
+            batch = cur.fetchmany(wanted)
+            if columns is None:
+                # Named cursors only describe the result after the first fetch
+                columns = [desc[0] for desc in cur.description]
+                encoders = [_COLUMN_ENCODERS.get(desc[1], _encode_value) for desc in cur.description]
+            for row in batch:
+                if len(rows) == max_rows:
+                    return columns, rows, size, 'rows'
+                values = [encode(value) for encode, value in zip(encoders, row)]
+                row_size = _encoded_size(values)
+                if size + row_size > max_bytes:
+                    return columns, rows, size, 'bytes'
+                size += row_size
+                rows.append(dict(zip(columns, values)))
+            if len(batch) < wanted:
+                return columns, rows, size, None
+    finally:
+        cur.close()
+
+def truncation_message(limit_hit, row_count, max_rows, max_bytes):
+    if limit_hit == 'rows':
+        return f"Results truncated to {max_rows} rows"
+    return (
+        f"Results truncated to {row_count} rows: "
+        f"result size budget of {max_bytes} bytes reached"
+    )
+
+def execute_read_query(secret_name, query, max_rows=20, max_bytes=QUERY_RESULT_MAX_BYTES):
     """
     Execute read-only queries safely and return results with monitoring
     
     Args:
         secret_name (str): Secret containing database credentials
         query (str): SQL query to execute
-        max_rows (int): Maximum number of rows to return (only for SELECT queries)
+        max_rows (int): Maximum number of rows to return per statement
+        max_bytes (int): Approximate size budget for the rows of all statements
     
     Returns:
         dict: Query results and metadata
@@ -1242,10 +1847,11 @@ def execute_read_query(secret_name, query, max_rows=20):
     
     start_time = time.time()
     conn = None
+    remaining_bytes = max_bytes
     
     try:
         # Validate and split queries
-        statements = validate_query(query)
+        statements = validate_sql_statements(query)
         
         # Connect to database
         conn = connect_to_db(secret_name)
@@ -1256,7 +1862,7 @@ def execute_read_query(secret_name, query, max_rows=20):
             cur.execute("SET statement_timeout = '30s'")
             
             # Execute each statement
-            for stmt_index, stmt in enumerate(statements, 1):
+            for stmt_index, (stmt, stmt_tokens) in enumerate(statements, 1):
                 stmt_response = {
                     'columns': [],
                     'rows': [],
@@ -1275,42 +1881,30 @@ def execute_read_query(secret_name, query, max_rows=20):
                 if is_select_query and 'limit' not in stmt_lower:
                     final_query = f"{stmt} LIMIT {max_rows + 1}"
                 
-                # Execute query
+                # Execute query, streaming SELECT results from a server-side
+                # cursor (DECLARE only accepts SELECT, SHOW needs a plain one)
                 try:
-                    cur.execute(final_query)
+                    columns, rows, result_bytes, limit_hit = fetch_limited_rows(
+                        conn, final_query, max_rows, remaining_bytes,
+                        cursor_name=f"read_query_{stmt_index}" if is_select_query else None
+                    )
                 except psycopg2.Error as pe:
                     logger.error(f"Error executing query: {final_query}")
                     logger.error(f"Error details: {str(pe)}")
                     raise
+                remaining_bytes -= result_bytes
                 
-                # Get column names
-                stmt_response['columns'] = [desc[0] for desc in cur.description]
-                
-                # Fetch results
-                rows = cur.fetchall()
-                total_rows = len(rows)
-                
-                # Handle row limiting only for SELECT queries
-                if is_select_query and total_rows > max_rows:
+                stmt_response['columns'] = columns
+                stmt_response['rows'] = rows
+                stmt_response['row_count'] = len(rows)
+                stmt_response['result_bytes'] = result_bytes
+                if limit_hit:
                     stmt_response['truncated'] = True
-                    rows = rows[:max_rows]
-                    stmt_response['message'] = (
-                        f"Results truncated to {max_rows} rows for performance reasons. "
-                        f"Total rows available: {total_rows}"
-                    )
-                    stmt_response['row_count'] = max_rows
-                else:
-                    stmt_response['row_count'] = total_rows
-                
-                # Convert rows to list of dictionaries
-                stmt_response['rows'] = [
-                    dict(zip(stmt_response['columns'], row))
-                    for row in rows
-                ]
+                    stmt_response['message'] = truncation_message(limit_hit, len(rows), max_rows, max_bytes)
                 
                 # Add performance monitoring only for SELECT queries
                 if is_select_query:
-                    complexity_metrics = analyze_query_complexity(stmt)
+                    complexity_metrics = analyze_query_complexity(stmt, stmt_tokens)
                     stmt_response['complexity_metrics'] = complexity_metrics
                     
                     # Add complexity warnings if any
@@ -1329,6 +1923,7 @@ def execute_read_query(secret_name, query, max_rows=20):
             response['performance_metrics'] = {
                 'execution_time': total_time,
                 'statements_executed': len(statements),
+                'result_bytes': max_bytes - remaining_bytes,
                 'timestamp': datetime.utcnow().isoformat(),
                 'needs_analysis': total_time > 5,
                 'performance_message': (
@@ -1355,7 +1950,7 @@ def execute_read_query(secret_name, query, max_rows=20):
     
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
 
 def format_enhanced_results(results):
     """
@@ -1405,7 +2000,7 @@ def format_enhanced_results(results):
             # Calculate column widths
             widths = {
                 col: max(len(str(col)), 
-                        max(len(str(row[col])) for row in result['rows']))
+                        max((len(str(row[col])) for row in result['rows']), default=0))
                 for col in result['columns']
             }
             
@@ -1503,7 +2098,7 @@ def format_multi_query_results(results):
             # Calculate column widths
             widths = {
                 col: max(len(str(col)), 
-                        max(len(str(row[col])) for row in result['rows']))
+                        max((len(str(row[col])) for row in result['rows']), default=0))
                 for col in result['columns']
             }
             
@@ -1,30 +1,219 @@
 
 import json
-import boto3
-import psycopg2
 import os
-from botocore.exceptions import ClientError
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
 
-def get_secret(secret_name):
-    """Get secret from AWS Secrets Manager """
-    #secret_name = os.environ['SECRET_NAME']
-    region_name = os.environ['REGION']
-    
-    session = boto3.session.Session()
-    client = session.client(
-        service_name='secretsmanager',
-        region_name=region_name
-    )
-    
+import db_connection
+import stat_snapshots
+from db_connection import ensure_extension, get_connection, release_connection
+
+# Diagnostic queries run at the same time, each on its own pooled connection
+DIAGNOSTIC_CONCURRENCY = int(os.environ.get('DIAGNOSTIC_CONCURRENCY', '4'))
+
+# statement_timeout applied to each diagnostic query
+DIAGNOSTIC_QUERY_TIMEOUT_MS = int(os.environ.get('DIAGNOSTIC_QUERY_TIMEOUT_MS', '15000'))
+
+# Seconds an analysis waits for its queries before reporting partial results
+DIAGNOSTIC_TIME_BUDGET = int(os.environ.get('DIAGNOSTIC_TIME_BUDGET_SECONDS', '60'))
+
+# slow_query and io_analysis capture a statistics snapshot when the newest
+# one is older than this, so a scheduled capture_snapshot is optional
+SNAPSHOT_MIN_INTERVAL = int(os.environ.get('SNAPSHOT_MIN_INTERVAL_SECONDS', '60'))
+
+# Default length of the recent window reported from snapshot deltas
+SNAPSHOT_WINDOW_MINUTES = int(os.environ.get('SNAPSHOT_WINDOW_MINUTES', '15'))
+
+# Cumulative counters captured into the snapshot store
+SNAPSHOT_QUERIES = {
+    "statements": """
+        SELECT s.queryid, s.userid, s.dbid,
+               COALESCE(r.rolname, 'unknown') as username,
+               COALESCE(d.datname, 'unknown') as database,
+               s.query, s.calls, s.total_exec_time, s.rows,
+               s.shared_blks_hit, s.shared_blks_read, s.shared_blks_dirtied,
+               s.shared_blks_written, s.temp_blks_read, s.temp_blks_written
+        FROM pg_stat_statements s
+        LEFT JOIN pg_roles r ON r.oid = s.userid
+        LEFT JOIN pg_database d ON d.oid = s.dbid
+        WHERE s.queryid IS NOT NULL;
+    """,
+    "tables": """
+        SELECT s.relid, s.schemaname, s.relname,
+               s.seq_scan, s.seq_tup_read,
+               COALESCE(s.idx_scan, 0) as idx_scan,
+               COALESCE(s.idx_tup_fetch, 0) as idx_tup_fetch,
+               s.n_tup_ins, s.n_tup_upd, s.n_tup_del,
+               io.heap_blks_read, io.heap_blks_hit,
+               COALESCE(io.idx_blks_read, 0) as idx_blks_read,
+               COALESCE(io.idx_blks_hit, 0) as idx_blks_hit,
+               COALESCE(io.toast_blks_read, 0) as toast_blks_read,
+               COALESCE(io.toast_blks_hit, 0) as toast_blks_hit
+        FROM pg_stat_user_tables s
+        JOIN pg_statio_user_tables io ON io.relid = s.relid;
+    """
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+_snapshot_lock = threading.Lock()
+
+
+def _diagnostic_executor():
+    """Return the executor shared by all analyses, so that running several at
+    once still uses at most DIAGNOSTIC_CONCURRENCY connections"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DIAGNOSTIC_CONCURRENCY,
+                                           thread_name_prefix='diagnostic')
+        return _executor
+
+
+def _run_diagnostic_query(secret_name, query):
+    conn = connect_to_db(secret_name)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET statement_timeout = %s", (DIAGNOSTIC_QUERY_TIMEOUT_MS,))
+            cur.execute(query)
+            columns = [desc[0] for desc in cur.description]
+            rows = cur.fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+    finally:
+        release_connection(conn)
+
+
+def run_diagnostic_queries(secret_name, queries):
+    """Run independent catalog queries concurrently and collect their rows
+
+    Each query runs on its own connection, so a failing query no longer
+    aborts the ones after it. A query that fails, hits the statement timeout
+    or does not finish within DIAGNOSTIC_TIME_BUDGET seconds returns no rows,
+    and its error is listed under 'query_errors'. Raises if every query failed.
+    """
+    ensure_extension(secret_name, 'pg_stat_statements')
+
+    executor = _diagnostic_executor()
+    futures = {
+        query_name: executor.submit(_run_diagnostic_query, secret_name, query)
+        for query_name, query in queries.items()
+    }
+    wait(futures.values(), timeout=DIAGNOSTIC_TIME_BUDGET)
+
+    results = {}
+    errors = {}
+    for query_name, future in futures.items():
+        if not future.done():
+            started = not future.cancel()
+            errors[query_name] = (
+                f"still running after the {DIAGNOSTIC_TIME_BUDGET}s time budget" if started
+                else f"not started within the {DIAGNOSTIC_TIME_BUDGET}s time budget"
+            )
+            results[query_name] = []
+            continue
+        try:
+            results[query_name] = future.result()
+        except Exception as e:
+            print(f"Error executing {query_name}: {str(e)}")
+            errors[query_name] = str(e).strip()
+            results[query_name] = []
+
+    if queries and len(errors) == len(queries):
+        raise Exception(next(iter(errors.values())))
+    results['query_errors'] = errors
+    return results
+
+
+def format_query_errors(results):
+    """List the queries whose results are missing from a report"""
+    errors = results.get('query_errors')
+    if not errors:
+        return ""
+    output = "\n=== INCOMPLETE RESULTS ===\n"
+    output += f"{len(errors)} diagnostic queries returned no data:\n"
+    for query_name, error in errors.items():
+        output += f"• {query_name}: {error}\n"
+    return output
+
+def capture_stat_snapshot(secret_name, store=None):
+    """Capture the cumulative statement and table statistics into the snapshot store
+
+    Returns:
+        dict: The stored snapshot
+    """
+    store = store or stat_snapshots.get_store()
+    results = run_diagnostic_queries(secret_name, SNAPSHOT_QUERIES)
+    # A snapshot missing one side would turn every counter into a delta later
+    if results['query_errors']:
+        raise Exception(f"Incomplete statistics snapshot: {results['query_errors']}")
+    store.save_snapshot(secret_name, results['statements'], results['tables'])
+    return store.latest(secret_name)
+
+def recent_snapshots(secret_name, window_minutes):
+    """Return the (older, newer) snapshots to compare for the recent window
+
+    A new snapshot is captured first unless the newest one is less than
+    SNAPSHOT_MIN_INTERVAL seconds old. older is None until a second snapshot
+    exists.
+    """
+    store = stat_snapshots.get_store()
+    # Analyses running together in full_report share one capture
+    with _snapshot_lock:
+        newer = store.latest(secret_name)
+        if newer is None or time.time() - newer['captured_at'] >= SNAPSHOT_MIN_INTERVAL:
+            newer = capture_stat_snapshot(secret_name, store)
+    return store.baseline(secret_name, newer, window_minutes * 60), newer
+
+def add_interval_results(results, secret_name, window_minutes, collect):
+    """Add the deltas over the recent window to an analysis' results
+
+    collect(store, older, newer) returns the rows for results['interval_rows'].
+    Failing to capture a snapshot is reported like a failed query.
+    """
+    results['interval_rows'] = []
+    results['snapshot_interval'] = None
     try:
-        secret_value = client.get_secret_value(SecretId=secret_name)
-        secret = json.loads(secret_value['SecretString'])
-        return secret
-    except ClientError as e:
-        raise Exception(f"Failed to get secret: {str(e)}")
+        older, newer = recent_snapshots(secret_name, window_minutes)
+    except Exception as e:
+        print(f"Error capturing statistics snapshot: {str(e)}")
+        results['query_errors']['statistics_snapshot'] = str(e).strip()
+        return results
+    results['snapshot_interval'] = {
+        'window_minutes': window_minutes,
+        'start': older['captured_at'] if older else None,
+        'end': newer['captured_at']
+    }
+    if older:
+        results['interval_rows'] = collect(stat_snapshots.get_store(), older, newer)
+    return results
 
-def execute_slow_query(secret_name, min_exec_time):
-    """Execute multiple performance-related queries"""
+def format_snapshot_interval(results, title):
+    """Heading for the recent window section, or why there is none"""
+    interval = results.get('snapshot_interval')
+    if interval is None:
+        return f"=== {title} ===\nNo statistics snapshot available.\n"
+    output = f"=== {title} IN THE LAST {interval['window_minutes']} MINUTES ===\n"
+    if interval['start'] is None:
+        output += (
+            "First statistics snapshot captured now; recent activity is reported from the next "
+            "run on. The cumulative figures below cover everything since the last statistics reset.\n"
+        )
+        return output
+    minutes = (interval['end'] - interval['start']) / 60
+    start = datetime.fromtimestamp(interval['start'], timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
+    end = datetime.fromtimestamp(interval['end'], timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
+    output += f"Snapshots from {start} to {end} ({minutes:.1f} minutes)\n"
+    return output
+
+def execute_slow_query(secret_name, min_exec_time, window_minutes=SNAPSHOT_WINDOW_MINUTES):
+    """Execute multiple performance-related queries
+
+    Besides the cumulative pg_stat_statements figures, reports the queries
+    that took the most time within the last window_minutes, from the
+    difference between two statistics snapshots.
+    """
     queries = {
         "slow_queries": """
             SELECT 
@@ -109,46 +298,36 @@ def execute_slow_query(secret_name, min_exec_time):
         """
     }
     
-    print("Connecting to the database...")
-    conn = None
     try:
-        conn = connect_to_db(secret_name)
-        print("Connected to the database.")
-    
-        # First, ensure pg_stat_statements is installed
-        print(" I am here 1")
-        with conn.cursor() as cur:
-            print(" I am here 2")
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
-        print(" I am here 3") 
-        # Execute the main query
-        
-        results = {}
-        # Execute each query and collect results
-        for query_name, query in queries.items():
-            print(" I am here 4")
-            with conn.cursor() as cur:
-                print(" I am here 5")
-                cur.execute(query)
-                print(" I am here 6")
-                columns = [desc[0] for desc in cur.description]
-                rows = cur.fetchall()
-                results[query_name] = [dict(zip(columns, row)) for row in rows]
-            print(" I am here 7")
-        return results
-            
+        results = run_diagnostic_queries(secret_name, queries)
     except Exception as e:
         raise Exception(f"Failed to retrieve slow queries: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
+    return add_interval_results(
+        results, secret_name, window_minutes,
+        lambda store, older, newer: store.statement_deltas(older, newer, 'total_exec_time', 10)
+    )
 
 def format_results_for_slow_query(results):
     """Format results in a human-readable string"""
     output = "Database Performance Analysis Report\n\n"
+    # Format the queries that were slow recently
+    output += format_snapshot_interval(results, "TOP QUERIES BY TIME")
+    if results.get("interval_rows"):
+        for idx, query in enumerate(results["interval_rows"], 1):
+            output += f"\nQuery #{idx}:\n"
+            output += f"• Username: {query['username']}\n"
+            output += f"• Database: {query['database']}\n"
+            output += f"• Calls: {int(query['calls'])} ({query['calls_per_sec']:.2f}/sec)\n"
+            output += f"• Total Time: {round(query['total_exec_time'] / 1000, 2)} sec ({query['exec_time_per_sec']:.1f} ms/sec)\n"
+            output += f"• Avg Time: {round(query['mean_exec_time'] / 1000, 4)} sec\n"
+            output += f"• Rows: {int(query['rows'])}\n"
+            output += f"• Shared Blocks Read: {int(query['shared_blks_read'])}\n"
+            output += f"• Temp Blocks Written: {int(query['temp_blks_written'])}\n"
+            output += f"• Query: {query['query']}\n"
+    elif results.get("snapshot_interval") and results["snapshot_interval"]['start'] is not None:
+        output += "No queries ran in this interval.\n"
+    output += "\n"
+
     # Format slow queries
     output += "=== TOP 20 SLOW QUERIES ===\n"
     if results.get("slow_queries"):
@@ -283,44 +462,10 @@ def execute_connect_issues(secret_name, min_exec_time):
         """
     }
     
-    conn = None
     try:
-        conn = connect_to_db(secret_name)
-        # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
-            
-        # Execute the main query
-        
-        results = {}
-        
-        # Execute each query and collect results
-        for query_name, query in queries.items():
-            
-            try:
-                with conn.cursor() as cur:
-                    
-                    cur.execute(query)
-                   
-                    columns = [desc[0] for desc in cur.description]
-                    rows = cur.fetchall()
-                    results[query_name] = [dict(zip(columns, row)) for row in rows]
-                 
-            except Exception as e:
-                print(f"Error executing {query_name}: {str(e)}")
-                results[query_name] = []
-                
-        return results
-            
+        return run_diagnostic_queries(secret_name, queries)
     except Exception as e:
         raise Exception(f"Failed to retrieve connection metrics: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 def format_results_for_conn_issues(results):
     """Format connection management results in a human-readable string"""
@@ -436,39 +581,10 @@ def execute_index_analysis(secret_name):
         """
     }
     
-    conn = None
     try:
-        conn = connect_to_db(secret_name)
-        # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
-            
-        # Execute the main query    
-        results = {}
-        
-        # Execute each query and collect results
-        for query_name, query in queries.items():
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(query)
-                    columns = [desc[0] for desc in cur.description]
-                    rows = cur.fetchall()
-                    results[query_name] = [dict(zip(columns, row)) for row in rows]
-            except Exception as e:
-                print(f"Error executing {query_name}: {str(e)}")
-                results[query_name] = []
-                
-        return results
-            
+        return run_diagnostic_queries(secret_name, queries)
     except Exception as e:
         raise Exception(f"Failed to retrieve index metrics: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
     
 def format_results_for_index_analysis(results):
     """Format index analysis results in a human-readable string"""
@@ -572,39 +688,10 @@ def execute_autovacuum_analysis(secret_name):
         """
     }
     
-    conn = None
     try:
-        conn = connect_to_db(secret_name)
-        # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
-            
-        # Execute the main query    
-        results = {}
-        
-        # Execute each query and collect results
-        for query_name, query in queries.items():
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(query)
-                    columns = [desc[0] for desc in cur.description]
-                    rows = cur.fetchall()
-                    results[query_name] = [dict(zip(columns, row)) for row in rows]
-            except Exception as e:
-                print(f"Error executing {query_name}: {str(e)}")
-                results[query_name] = []
-                
-        return results
-            
+        return run_diagnostic_queries(secret_name, queries)
     except Exception as e:
         raise Exception(f"Failed to retrieve autovacuum metrics: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 def format_results_for_autovacuum_analysis(results):
     """Format autovacuum analysis results in a human-readable string"""
@@ -674,8 +761,12 @@ def format_results_for_autovacuum_analysis(results):
     
     return output
 
-def execute_io_analysis(secret_name):
-    """Execute I/O-related analysis queries"""
+def execute_io_analysis(secret_name, window_minutes=SNAPSHOT_WINDOW_MINUTES):
+    """Execute I/O-related analysis queries
+
+    Also reports the tables with the most disk reads within the last
+    window_minutes, from the difference between two statistics snapshots.
+    """
     queries = {
         "buffer_usage": """
             SELECT relname as table_name, 
@@ -720,42 +811,36 @@ def execute_io_analysis(secret_name):
         """
     }
     
-    conn = connect_to_db(secret_name)
     try:
-        # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
-        
-        results = {}
-        
-        # Execute each query and collect results
-        for query_name, query in queries.items():
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(query)
-                    columns = [desc[0] for desc in cur.description]
-                    rows = cur.fetchall()
-                    results[query_name] = [dict(zip(columns, row)) for row in rows]
-            except Exception as e:
-                print(f"Error executing {query_name}: {str(e)}")
-                results[query_name] = []
-                
-        return results
-            
+        results = run_diagnostic_queries(secret_name, queries)
     except Exception as e:
         raise Exception(f"Failed to retrieve I/O metrics: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
+    return add_interval_results(
+        results, secret_name, window_minutes,
+        lambda store, older, newer: store.table_deltas(older, newer, 10)
+    )
 
 def format_results_for_io_analysis(results):
     """Format I/O analysis results in a human-readable string"""
     output = "Database I/O Analysis Report\n\n"
     
+    # Format the tables read most recently
+    output += format_snapshot_interval(results, "TABLE I/O")
+    if results.get("interval_rows"):
+        for idx, table in enumerate(results["interval_rows"], 1):
+            output += f"\nTable #{idx}:\n"
+            output += f"• Table Name: {table['schemaname']}.{table['relname']}\n"
+            output += f"• Blocks Read from Disk: {int(table['heap_blks_read'] + table['idx_blks_read'])} ({table['blks_read_per_sec']:.1f}/sec)\n"
+            output += f"• Blocks Hit in Buffer: {int(table['heap_blks_hit'] + table['idx_blks_hit'])}\n"
+            if table['hit_percentage'] is not None:
+                output += f"• Buffer Hit Percentage: {table['hit_percentage']:.2f}%\n"
+            output += f"• Sequential Scans: {int(table['seq_scan'])} ({int(table['seq_tup_read'])} rows read)\n"
+            output += f"• Index Scans: {int(table['idx_scan'])}\n"
+            output += f"• Rows Inserted/Updated/Deleted: {int(table['n_tup_ins'])}/{int(table['n_tup_upd'])}/{int(table['n_tup_del'])}\n"
+    elif results.get("snapshot_interval") and results["snapshot_interval"]['start'] is not None:
+        output += "No table activity in this interval.\n"
+    output += "\n"
+
     # Format buffer usage
     output += "=== BUFFER USAGE BY TABLE ===\n"
     if results.get("buffer_usage"):
@@ -861,36 +946,10 @@ def execute_replication_analysis(secret_name):
         """
     }
     
-    conn = connect_to_db(secret_name)
     try:
-        # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
-        results = {}
-        
-        # Execute each query and collect results
-        for query_name, query in queries.items():
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(query)
-                    columns = [desc[0] for desc in cur.description]
-                    rows = cur.fetchall()
-                    results[query_name] = [dict(zip(columns, row)) for row in rows]
-            except Exception as e:
-                print(f"Error executing {query_name}: {str(e)}")
-                results[query_name] = []
-                
-        return results
-            
+        return run_diagnostic_queries(secret_name, queries)
     except Exception as e:
         raise Exception(f"Failed to retrieve replication metrics: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 def format_results_for_replication_analysis(results):
     """Format replication analysis results in a human-readable string"""
@@ -1011,37 +1070,10 @@ def execute_system_health(secret_name):
         """
     }
     
-    conn = connect_to_db(secret_name)
     try:
-        # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
-        
-        results = {}
-        
-        # Execute each query and collect results
-        for query_name, query in queries.items():
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(query)
-                    columns = [desc[0] for desc in cur.description]
-                    rows = cur.fetchall()
-                    results[query_name] = [dict(zip(columns, row)) for row in rows]
-            except Exception as e:
-                print(f"Error executing {query_name}: {str(e)}")
-                results[query_name] = []
-                
-        return results
-            
+        return run_diagnostic_queries(secret_name, queries)
     except Exception as e:
         raise Exception(f"Failed to retrieve system health metrics: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 def format_results_for_system_health(results):
     """Format system health analysis results in a human-readable string"""
@@ -1135,38 +1167,60 @@ def format_results_for_system_health(results):
     
     return output
 
+def execute_full_report(secret_name, min_exec_time):
+    """Run every analysis concurrently and combine their reports
+
+    The analyses share the diagnostic executor, so the sweep takes about as
+    long as its slowest queries rather than the sum of all of them. An
+    analysis that fails is reported in place without failing the others.
+    """
+    analyses = {
+        'slow_query': (lambda: execute_slow_query(secret_name, min_exec_time), format_results_for_slow_query),
+        'connection_management_issues': (lambda: execute_connect_issues(secret_name, min_exec_time), format_results_for_conn_issues),
+        'index_analysis': (lambda: execute_index_analysis(secret_name), format_results_for_index_analysis),
+        'autovacuum_analysis': (lambda: execute_autovacuum_analysis(secret_name), format_results_for_autovacuum_analysis),
+        'io_analysis': (lambda: execute_io_analysis(secret_name), format_results_for_io_analysis),
+        'replication_analysis': (lambda: execute_replication_analysis(secret_name), format_results_for_replication_analysis),
+        'system_health': (lambda: execute_system_health(secret_name), format_results_for_system_health),
+    }
+
+    start_time = time.time()
+    # These threads only wait on the shared diagnostic executor, which bounds
+    # the number of queries actually running
+    with ThreadPoolExecutor(max_workers=len(analyses), thread_name_prefix='analysis') as executor:
+        futures = {name: executor.submit(run) for name, (run, _) in analyses.items()}
+
+    reports = []
+    failed = 0
+    for name, (_, formatter) in analyses.items():
+        try:
+            results = futures[name].result()
+            reports.append(formatter(results) + format_query_errors(results))
+        except Exception as e:
+            failed += 1
+            reports.append(f"=== {name.upper()} ===\nAnalysis failed: {str(e)}\n")
+
+    output = "Full Database Health Report\n"
+    output += f"Ran {len(analyses)} analyses in {time.time() - start_time:.2f} seconds"
+    output += f" ({failed} failed)\n\n" if failed else "\n\n"
+    return output + "\n\n".join(reports)
+
 def connect_to_db(secret_name):
-    """Establish database connection"""
-    cur_secret = secret_name
-    secret = get_secret(cur_secret)
-    print(secret)
-    try:
-        print("in connect_to_db")
-        conn = psycopg2.connect(
-            host=secret['host'],
-            database=secret['dbname'],
-            user=secret['username'],
-            password=secret['password'],
-            port=secret['port']
-        )
-        return conn
-    except Exception as e:
-        raise Exception(f"Failed to connect to the database: {str(e)}")
+    """Check out a pooled database connection; release it with release_connection"""
+    return get_connection(secret_name)
 
 def get_env_secret(environment):
-    ssm_client = boto3.client('ssm')
-    print("in get_env_secret")
     """Retrieve the secret name for the specified environment"""
+    ssm_client = db_connection.ssm_client()
+    print("in get_env_secret")
     if environment == 'prod':
         print("in get_env_secret1")
         try:
             # Get the secret name from Parameter Store
             print("in get_env_secret-try")
-            response = ssm_client.get_parameter(
-                Name=f'/AuroraOps/{environment}'
-            )
-            print(response['Parameter']['Value'])
-            return response['Parameter']['Value']
+            secret_name = db_connection.get_parameter(f'/AuroraOps/{environment}')
+            print(secret_name)
+            return secret_name
         except ssm_client.exceptions.ParameterNotFound:
             error_message = f"Parameter not found: /AuroraOps/{environment}"
             print(error_message)
@@ -1174,10 +1228,7 @@ def get_env_secret(environment):
     elif environment == 'dev':
         try:
             # Get the secret name from Parameter Store
-            response = ssm_client.get_parameter(
-                Name=f'/AuroraOps/{environment}'
-            )
-            return response['Parameter']['Value']
+            return db_connection.get_parameter(f'/AuroraOps/{environment}')
         except Exception as e:
             raise Exception(f"Failed to get dev secret name from Parameter Store: {str(e)}")
     else:
@@ -1192,12 +1243,12 @@ def lambda_handler(event, context):
         if 'arguments' in event:
             # Extract arguments from the nested structure
             args = event['arguments']
-            environment = args.get('environment')
-            action_type = args.get('action_type')
         else:
             # Use the flat structure
-            environment = event.get('environment')
-            action_type = event.get('action_type')
+            args = event
+        environment = args.get('environment')
+        action_type = args.get('action_type')
+        window_minutes = int(args.get('window_minutes') or SNAPSHOT_WINDOW_MINUTES)
         
         if not environment or not action_type:
             return {
@@ -1213,35 +1264,43 @@ def lambda_handler(event, context):
         #if tool_name == 'slow_query':
         if action_type == 'slow_query':
             print("Executing slow query scripts")
-            results = execute_slow_query(secret_name, min_exec_time)
+            results = execute_slow_query(secret_name, min_exec_time, window_minutes)
             # Format results for Bedrock Agent
-            formatted_output = format_results_for_slow_query(results)
+            formatted_output = format_results_for_slow_query(results) + format_query_errors(results)
             print(formatted_output)
         elif action_type == 'connection_management_issues':
             print("Executing connection_management_issues")
             results = execute_connect_issues(secret_name, min_exec_time)
             # Format results for Bedrock Agent
-            formatted_output = format_results_for_conn_issues(results)
+            formatted_output = format_results_for_conn_issues(results) + format_query_errors(results)
         elif action_type == 'index_analysis':
             print("Executing index_analysis")
             results = execute_index_analysis(secret_name)
-            formatted_output = format_results_for_index_analysis(results)
+            formatted_output = format_results_for_index_analysis(results) + format_query_errors(results)
         elif action_type == 'autovacuum_analysis':
             print("Executing autovacuum_analysis")
             results = execute_autovacuum_analysis(secret_name)
-            formatted_output = format_results_for_autovacuum_analysis(results)
+            formatted_output = format_results_for_autovacuum_analysis(results) + format_query_errors(results)
         elif action_type == 'io_analysis':
             print("Executing io_analysis")
-            results = execute_io_analysis(secret_name)
-            formatted_output = format_results_for_io_analysis(results)
+            results = execute_io_analysis(secret_name, window_minutes)
+            formatted_output = format_results_for_io_analysis(results) + format_query_errors(results)
         elif action_type == 'replication_analysis':
             print("Executing replication_analysis")
             results = execute_replication_analysis(secret_name)
-            formatted_output = format_results_for_replication_analysis(results)
+            formatted_output = format_results_for_replication_analysis(results) + format_query_errors(results)
         elif action_type == 'system_health':
             print("Executing system_health")
             results = execute_system_health(secret_name)
-            formatted_output = format_results_for_system_health(results)
+            formatted_output = format_results_for_system_health(results) + format_query_errors(results)
+        elif action_type == 'full_report':
+            print("Executing full_report")
+            formatted_output = execute_full_report(secret_name, min_exec_time)
+        elif action_type == 'capture_snapshot':
+            # For a scheduled invocation that keeps the snapshot history current
+            print("Executing capture_snapshot")
+            snapshot = capture_stat_snapshot(secret_name)
+            formatted_output = f"Captured statistics snapshot {snapshot['id']} at {snapshot['captured_at']:.0f}"
         else:
             return {
                 "functionResponse": {
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+psycopg2 stand-in for the benchmark and check scripts.
+
+The scripts drive the Lambda modules against fake connections, so they only
+need psycopg2's exception classes to import those modules. Call
+install_if_missing() before importing them on a machine without the driver.
+"""
+
+import sys
+import types
+
+
+def install_if_missing():
+    """Register a minimal psycopg2 module unless the real driver is installed"""
+    try:
+        import psycopg2  # noqa: F401
+    except ImportError:
+        stand_in = types.ModuleType('psycopg2')
+        stand_in.Error = type('Error', (Exception,), {})
+        stand_in.OperationalError = type('OperationalError', (stand_in.Error,), {})
+        stand_in.connect = None
+        sys.modules['psycopg2'] = stand_in
@@ -0,0 +1,284 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# SQLite file holding the snapshots. /tmp only lasts as long as the Lambda
+# container; point this at an EFS mount to keep the history between them.
+SNAPSHOT_DB_PATH = os.environ.get('SNAPSHOT_DB_PATH', '/tmp/pgstat_snapshots.sqlite3')
+
+# Snapshots older than this are deleted
+SNAPSHOT_RETENTION_SECONDS = int(os.environ.get('SNAPSHOT_RETENTION_SECONDS', str(24 * 3600)))
+
+# Cumulative pg_stat_statements counters kept per statement
+STATEMENT_COUNTERS = (
+    'calls', 'total_exec_time', 'rows', 'shared_blks_hit', 'shared_blks_read',
+    'shared_blks_dirtied', 'shared_blks_written', 'temp_blks_read', 'temp_blks_written',
+)
+
+# Cumulative pg_stat_user_tables and pg_statio_user_tables counters kept per table
+TABLE_COUNTERS = (
+    'seq_scan', 'seq_tup_read', 'idx_scan', 'idx_tup_fetch', 'n_tup_ins', 'n_tup_upd',
+    'n_tup_del', 'heap_blks_read', 'heap_blks_hit', 'idx_blks_read', 'idx_blks_hit',
+    'toast_blks_read', 'toast_blks_hit',
+)
+
+# Bumped when _SCHEMA changes; an older store is dropped and recreated
+SCHEMA_VERSION = 2
+
+# Statement texts and table names are per database: ids repeat across them
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    secret_name TEXT NOT NULL,
+    captured_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_by_time ON snapshots (secret_name, captured_at);
+CREATE TABLE IF NOT EXISTS statement_stats (
+    snapshot_id INTEGER NOT NULL,
+    queryid INTEGER NOT NULL,
+    userid INTEGER NOT NULL,
+    dbid INTEGER NOT NULL,
+    {', '.join(f'{name} REAL NOT NULL' for name in STATEMENT_COUNTERS)},
+    PRIMARY KEY (snapshot_id, queryid, userid, dbid)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS statement_text (
+    secret_name TEXT NOT NULL,
+    queryid INTEGER NOT NULL,
+    userid INTEGER NOT NULL,
+    dbid INTEGER NOT NULL,
+    username TEXT,
+    database TEXT,
+    query TEXT,
+    PRIMARY KEY (secret_name, queryid, userid, dbid)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS table_stats (
+    snapshot_id INTEGER NOT NULL,
+    relid INTEGER NOT NULL,
+    {', '.join(f'{name} REAL NOT NULL' for name in TABLE_COUNTERS)},
+    PRIMARY KEY (snapshot_id, relid)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS table_names (
+    secret_name TEXT NOT NULL,
+    relid INTEGER NOT NULL,
+    schemaname TEXT,
+    relname TEXT,
+    PRIMARY KEY (secret_name, relid)
+) WITHOUT ROWID;
+"""
+_TABLES = ('snapshots', 'statement_stats', 'statement_text', 'table_stats', 'table_names')
+
+
+def _delta_columns(counters, reset_condition):
+    """SELECT expressions for the change in each counter between snapshots.
+
+    Counters only go down when statistics were reset (or a statement was
+    evicted from pg_stat_statements and came back), in which case the newer
+    value is the whole change.
+    """
+    return ', '.join(
+        f"CASE WHEN {reset_condition} THEN n.{name} ELSE n.{name} - o.{name} END AS {name}"
+        for name in counters
+    )
+
+
+_STATEMENT_RESET = "o.calls IS NULL OR n.calls < o.calls"
+_TABLE_RESET = (
+    "o.relid IS NULL OR n.seq_scan + n.idx_scan < o.seq_scan + o.idx_scan "
+    "OR n.heap_blks_read + n.heap_blks_hit < o.heap_blks_read + o.heap_blks_hit"
+)
+
+
+class SnapshotStore:
+    """Cumulative statistics snapshots in a local SQLite file.
+
+    Each snapshot keeps the raw counters; statement texts and table names
+    are stored once per secret, not per snapshot. Deltas between two snapshots are
+    computed on read.
+    """
+
+    def __init__(self, path=SNAPSHOT_DB_PATH, retention=SNAPSHOT_RETENTION_SECONDS):
+        self.path = path
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                # Snapshots are a rolling history; older layouts are discarded
+                for table in _TABLES:
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.executescript(_SCHEMA)
+
+    def save_snapshot(self, secret_name, statements, tables, captured_at=None):
+        """Store one snapshot of statement and table rows; returns its id"""
+        captured_at = time.time() if captured_at is None else captured_at
+        with self._lock, self._conn:
+            snapshot_id = self._conn.execute(
+                "INSERT INTO snapshots (secret_name, captured_at) VALUES (?, ?)",
+                (secret_name, captured_at)
+            ).lastrowid
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO statement_text VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((secret_name, s['queryid'], s['userid'], s['dbid'], s['username'], s['database'],
+                  s['query'])
+                 for s in statements)
+            )
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO statement_stats VALUES ({', '.join('?' * (4 + len(STATEMENT_COUNTERS)))})",
+                ((snapshot_id, s['queryid'], s['userid'], s['dbid'], *(s[name] or 0 for name in STATEMENT_COUNTERS))
+                 for s in statements)
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO table_names VALUES (?, ?, ?, ?)",
+                ((secret_name, t['relid'], t['schemaname'], t['relname']) for t in tables)
+            )
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO table_stats VALUES ({', '.join('?' * (2 + len(TABLE_COUNTERS)))})",
+                ((snapshot_id, t['relid'], *(t[name] or 0 for name in TABLE_COUNTERS)) for t in tables)
+            )
+            self._prune(captured_at - self.retention)
+        return snapshot_id
+
+    def _prune(self, before):
+        expired = [row[0] for row in self._conn.execute(
+            "SELECT id FROM snapshots WHERE captured_at < ?", (before,)
+        )]
+        if not expired:
+            return
+        placeholders = ', '.join('?' * len(expired))
+        for table in ('statement_stats', 'table_stats'):
+            self._conn.execute(f"DELETE FROM {table} WHERE snapshot_id IN ({placeholders})", expired)
+        self._conn.execute(f"DELETE FROM snapshots WHERE id IN ({placeholders})", expired)
+        self._conn.execute(
+            "DELETE FROM statement_text WHERE NOT EXISTS (SELECT 1 FROM statement_stats s "
+            "JOIN snapshots ON snapshots.id = s.snapshot_id "
+            "WHERE snapshots.secret_name = statement_text.secret_name "
+            "AND s.queryid = statement_text.queryid AND s.userid = statement_text.userid "
+            "AND s.dbid = statement_text.dbid)"
+        )
+        self._conn.execute(
+            "DELETE FROM table_names WHERE NOT EXISTS (SELECT 1 FROM table_stats t "
+            "JOIN snapshots ON snapshots.id = t.snapshot_id "
+            "WHERE snapshots.secret_name = table_names.secret_name "
+            "AND t.relid = table_names.relid)"
+        )
+        logger.info(f"Pruned {len(expired)} expired statistics snapshots")
+
+    def latest(self, secret_name):
+        """The newest snapshot for the secret as a dict, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM snapshots WHERE secret_name = ? ORDER BY captured_at DESC LIMIT 1",
+                (secret_name,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def baseline(self, secret_name, newer, window_seconds):
+        """The snapshot to compare newer with for a window ending at newer.
+
+        That is the newest snapshot at least window_seconds older, or failing
+        that the oldest one available, which covers a shorter interval.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM snapshots WHERE secret_name = ? AND captured_at <= ? "
+                "ORDER BY captured_at DESC LIMIT 1",
+                (secret_name, newer['captured_at'] - window_seconds)
+            ).fetchone()
+            if row is None:
+                row = self._conn.execute(
+                    "SELECT * FROM snapshots WHERE secret_name = ? AND captured_at < ? "
+                    "ORDER BY captured_at ASC LIMIT 1",
+                    (secret_name, newer['captured_at'])
+                ).fetchone()
+        return dict(row) if row else None
+
+    def statement_deltas(self, older, newer, order_by='total_exec_time', limit=10):
+        """Top statements by the change in a counter between two snapshots.
+
+        Rows have the counter deltas plus per second rates, where exec_time_per_sec
+        is milliseconds of execution per second of the interval.
+        """
+        if order_by not in STATEMENT_COUNTERS:
+            raise ValueError(f"Unknown statement counter: {order_by}")
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT * FROM (
+                    SELECT t.username, t.database, t.query, n.queryid,
+                           {_delta_columns(STATEMENT_COUNTERS, _STATEMENT_RESET)}
+                    FROM statement_stats n
+                    LEFT JOIN statement_stats o ON o.snapshot_id = ? AND o.queryid = n.queryid
+                         AND o.userid = n.userid AND o.dbid = n.dbid
+                    LEFT JOIN statement_text t ON t.secret_name = ? AND t.queryid = n.queryid
+                         AND t.userid = n.userid AND t.dbid = n.dbid
+                    WHERE n.snapshot_id = ?
+                )
+                WHERE calls > 0
+                ORDER BY {order_by} DESC
+                LIMIT ?
+                """,
+                (older['id'], newer['secret_name'], newer['id'], limit)
+            ).fetchall()
+        interval = newer['captured_at'] - older['captured_at']
+        deltas = []
+        for row in rows:
+            delta = dict(row)
+            delta['calls_per_sec'] = delta['calls'] / interval
+            delta['exec_time_per_sec'] = delta['total_exec_time'] / interval
+            delta['mean_exec_time'] = delta['total_exec_time'] / delta['calls']
+            deltas.append(delta)
+        return deltas
+
+    def table_deltas(self, older, newer, limit=10):
+        """Top tables by blocks read from disk between two snapshots"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT * FROM (
+                    SELECT names.schemaname, names.relname, n.relid,
+                           {_delta_columns(TABLE_COUNTERS, _TABLE_RESET)}
+                    FROM table_stats n
+                    LEFT JOIN table_stats o ON o.snapshot_id = ? AND o.relid = n.relid
+                    LEFT JOIN table_names names ON names.secret_name = ?
+                         AND names.relid = n.relid
+                    WHERE n.snapshot_id = ?
+                )
+                WHERE seq_scan + idx_scan + heap_blks_read + heap_blks_hit + idx_blks_read + idx_blks_hit > 0
+                ORDER BY heap_blks_read + idx_blks_read + toast_blks_read DESC,
+                         heap_blks_hit + idx_blks_hit DESC
+                LIMIT ?
+                """,
+                (older['id'], newer['secret_name'], newer['id'], limit)
+            ).fetchall()
+        interval = newer['captured_at'] - older['captured_at']
+        deltas = []
+        for row in rows:
+            delta = dict(row)
+            reads = delta['heap_blks_read'] + delta['idx_blks_read']
+            hits = delta['heap_blks_hit'] + delta['idx_blks_hit']
+            delta['blks_read_per_sec'] = reads / interval
+            delta['hit_percentage'] = hits / (reads + hits) * 100 if reads + hits else None
+            deltas.append(delta)
+        return deltas
+
+    def close(self):
+        self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The store at SNAPSHOT_DB_PATH, opened once per container"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SnapshotStore()
+        return _store
@@ -0,0 +1,216 @@
+"""
+Shared, file-change-aware cache for the datasets served by the stub servers.
+
+Each data file is loaded and validated once, then re-used until its mtime,
+inode or size changes. Serialized response bodies are cached per dataset and
+query key, so repeated requests cost a ``stat`` (at most once per check
+interval) and a dictionary lookup instead of a ``json.load`` and a
+``json.dumps``.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+T = TypeVar("T")
+
+# Seconds between file change checks for a dataset
+DEFAULT_CHECK_INTERVAL = 1.0
+
+# Serialized responses kept per dataset (bounds memory for free-text filters)
+DEFAULT_MAX_RESPONSES = 256
+
+_MISSING = object()
+
+
+def load_json(path: Path) -> Any:
+    """Default dataset loader"""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def dumps_json(payload: Any) -> bytes:
+    """Serialize a response payload to compact JSON bytes"""
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def expect_keys(**expected_types: type) -> Callable[[Any], Dict[str, Any]]:
+    """Build a validator checking the top-level keys of a JSON object.
+
+    Missing keys are filled with an empty value of the expected type, matching
+    the ``data.get(key, [])`` access pattern used by the servers.
+    """
+
+    def _validate(raw: Any) -> Dict[str, Any]:
+        if not isinstance(raw, dict):
+            raise ValueError(f"Expected a JSON object, got {type(raw).__name__}")
+        validated = dict(raw)
+        for key, expected_type in expected_types.items():
+            value = validated.setdefault(key, expected_type())
+            if not isinstance(value, expected_type):
+                raise ValueError(
+                    f"Expected '{key}' to be {expected_type.__name__}, "
+                    f"got {type(value).__name__}"
+                )
+        return validated
+
+    return _validate
+
+
+def expect_list(raw: Any) -> list:
+    """Validator for data files whose top level is a JSON array"""
+    if not isinstance(raw, list):
+        raise ValueError(f"Expected a JSON array, got {type(raw).__name__}")
+    return raw
+
+
+class Dataset(Generic[T]):
+    """A single data file, validated once and reloaded when it changes"""
+
+    def __init__(
+        self,
+        path: Path,
+        validator: Optional[Callable[[Any], T]] = None,
+        default: Any = _MISSING,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+        max_responses: int = DEFAULT_MAX_RESPONSES,
+        loader: Callable[[Path], Any] = load_json,
+    ) -> None:
+        self.path = Path(path)
+        self.validator = validator
+        self.loader = loader
+        self.default = default
+        self.check_interval = check_interval
+        self.max_responses = max_responses
+
+        self._lock = threading.Lock()
+        self._value: Any = _MISSING
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._next_check = 0.0
+        self._responses: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self.version = 0
+
+    def _stat_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+
+    def _load(self, signature: Optional[Tuple[int, int, int]]) -> None:
+        if signature is None:
+            if self.default is _MISSING:
+                raise FileNotFoundError(f"Data file not found: {self.path}")
+            raw = self.default
+        else:
+            raw = self.loader(self.path)
+
+        value = self.validator(raw) if self.validator else raw
+        self._value = value
+        self._signature = signature
+        self._responses.clear()
+        self.version += 1
+        logging.info(f"Loaded dataset {self.path.name} (version {self.version})")
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._value is not _MISSING and now < self._next_check:
+            return
+        signature = self._stat_signature()
+        if self._value is _MISSING or signature != self._signature:
+            self._load(signature)
+        self._next_check = now + self.check_interval
+
+    def get(self) -> T:
+        """Return the validated dataset, reloading it if the file changed"""
+        with self._lock:
+            self._refresh()
+            return self._value
+
+    def response_bytes(self, key: Hashable, build: Callable[[T], Any]) -> bytes:
+        """Return the serialized response for key, building it on first use.
+
+        build receives the validated dataset and returns a JSON-serializable
+        payload. Cached bodies are dropped whenever the dataset reloads.
+        """
+        with self._lock:
+            self._refresh()
+            body = self._responses.get(key)
+            if body is not None:
+                self._responses.move_to_end(key)
+                return body
+            value = self._value
+
+        body = dumps_json(build(value))
+
+        with self._lock:
+            # Only cache if the dataset did not reload while building
+            if self._value is value:
+                self._responses[key] = body
+                if len(self._responses) > self.max_responses:
+                    self._responses.popitem(last=False)
+        return body
+
+    def invalidate(self) -> None:
+        """Force a reload on next access"""
+        with self._lock:
+            self._value = _MISSING
+            self._responses.clear()
+
+
+class DatasetCache:
+    """Registry of datasets shared by the endpoints of one server process"""
+
+    def __init__(self, check_interval: float = DEFAULT_CHECK_INTERVAL) -> None:
+        self.check_interval = check_interval
+        self._datasets: Dict[Path, Dataset] = {}
+
+    def register(
+        self,
+        path: Path,
+        validator: Optional[Callable[[Any], Any]] = None,
+        default: Any = _MISSING,
+        loader: Callable[[Path], Any] = load_json,
+    ) -> Dataset:
+        """Register a data file, returning the existing dataset if already known"""
+        path = Path(path)
+        dataset = self._datasets.get(path)
+        if dataset is None:
+            dataset = Dataset(
+                path,
+                validator,
+                default=default,
+                check_interval=self.check_interval,
+                loader=loader,
+            )
+            self._datasets[path] = dataset
+        return dataset
+
+    def preload(self) -> None:
+        """Load every registered dataset that exists on disk"""
+        for dataset in self._datasets.values():
+            try:
+                dataset.get()
+            except FileNotFoundError:
+                logging.warning(f"Skipping preload of missing data file {dataset.path}")
+
+    def invalidate_all(self) -> None:
+        """Force every dataset to reload on next access"""
+        for dataset in self._datasets.values():
+            dataset.invalidate()
+
+
+# Process-wide cache used by all stub servers
+DATASETS = DatasetCache()
@@ -0,0 +1,299 @@
+"""
+Sampled request tracing and Prometheus-style metrics for the stub servers.
+
+Every request is counted and timed. Handlers can break their time down into
+named spans (``with span("load"): ...``) without holding a reference to the
+request. Per-request logging is sampled: a one-line timing summary is logged
+for a ``sample_rate`` fraction of requests.
+
+Response payloads are only dumped when DEBUG logging is enabled or a request
+exceeds the slow-request threshold, so the middleware only copies a body when
+one of those already holds as the body starts streaming: DEBUG is on, or the
+handler alone took longer than the threshold. That copy is at most the first
+``MAX_PAYLOAD_LOG_BYTES`` of the body; every other request costs a counter
+update and a few timestamps. A request that only turns slow while its body is
+streaming is logged without a payload.
+
+Aggregated counters and latency histograms are served at ``/metrics`` in the
+Prometheus text exposition format.
+"""
+
+import bisect
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+# Fraction of requests whose timing summary is logged at INFO
+DEFAULT_SAMPLE_RATE = 0.01
+
+# Requests slower than this are always logged, with their payload
+DEFAULT_SLOW_REQUEST_MS = 1000.0
+
+# Largest payload dump written to the log for a single request
+MAX_PAYLOAD_LOG_BYTES = 64 * 1024
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("request_trace", default=None)
+
+
+class RequestTrace:
+    """Timing record for a single request"""
+
+    __slots__ = ("method", "query", "endpoint", "status", "started", "spans", "payload")
+
+    def __init__(self, method: str, query: str) -> None:
+        self.method = method
+        self.query = query
+        self.endpoint = "unmatched"
+        self.status = 500
+        self.started = time.perf_counter()
+        self.spans: List[Tuple[str, float]] = []
+        self.payload = bytearray()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((name, time.perf_counter() - started))
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block as a named span of the current request, if any"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.span(name):
+        yield
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self) -> None:
+        # One slot per bucket plus +Inf
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+class _TracingMiddleware:
+    """ASGI middleware that opens a trace per HTTP request"""
+
+    def __init__(self, app, tracer: "RequestTracer") -> None:
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope["method"], scope.get("query_string", b"").decode("latin-1"))
+        token = _current_trace.set(trace)
+        capture: Optional[bool] = None
+
+        async def _send(message) -> None:
+            nonlocal capture
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+            elif message["type"] == "http.response.body":
+                if capture is None:
+                    # Decided once, on the first chunk: only a payload that
+                    # will be dumped is worth copying
+                    capture = self.tracer.wants_payload(trace)
+                if capture:
+                    # Keep just enough of the body for a truncated dump
+                    room = MAX_PAYLOAD_LOG_BYTES + 1 - len(trace.payload)
+                    if room > 0:
+                        trace.payload += message.get("body", b"")[:room]
+            await send(message)
+
+        self.tracer.in_flight += 1
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            self.tracer.in_flight -= 1
+            _current_trace.reset(token)
+            # The router stores the matched route on the scope; its path
+            # template keeps label cardinality bounded
+            route = scope.get("route")
+            if route is not None:
+                trace.endpoint = getattr(route, "path", trace.endpoint)
+            self.tracer.finish(trace)
+
+
+class RequestTracer:
+    """Per-server request metrics and sampled trace logging"""
+
+    def __init__(
+        self,
+        service: str,
+        sample_rate: float = DEFAULT_SAMPLE_RATE,
+        slow_request_ms: float = DEFAULT_SLOW_REQUEST_MS,
+    ) -> None:
+        self.service = service
+        self.sample_rate = sample_rate
+        self.slow_request_ms = slow_request_ms
+        self.in_flight = 0
+
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple[str, str, int], int] = {}
+        self._slow_requests: Dict[str, int] = {}
+        self._durations: Dict[str, _Histogram] = {}
+        self._span_durations: Dict[Tuple[str, str], _Histogram] = {}
+
+    def install(self, app: FastAPI, dependencies: Sequence[Any] = ()) -> None:
+        """Trace every request to app and serve the metrics at /metrics"""
+        app.add_middleware(_TracingMiddleware, tracer=self)
+
+        @app.get("/metrics", include_in_schema=False, dependencies=list(dependencies))
+        async def prometheus_metrics():
+            """Prometheus text exposition of request counters and latencies"""
+            return Response(content=self.render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    def wants_payload(self, trace: RequestTrace) -> bool:
+        """Whether trace is already slow or DEBUG logging would dump its payload"""
+        elapsed_ms = (time.perf_counter() - trace.started) * 1000
+        return elapsed_ms >= self.slow_request_ms or logging.getLogger().isEnabledFor(
+            logging.DEBUG
+        )
+
+    def finish(self, trace: RequestTrace) -> None:
+        """Record a completed request and log it if sampled, slow or at DEBUG"""
+        duration = time.perf_counter() - trace.started
+        slow = duration * 1000 >= self.slow_request_ms
+
+        with self._lock:
+            key = (trace.endpoint, trace.method, trace.status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._durations.get(trace.endpoint)
+            if histogram is None:
+                histogram = self._durations[trace.endpoint] = _Histogram()
+            histogram.observe(duration)
+            for name, seconds in trace.spans:
+                span_key = (trace.endpoint, name)
+                histogram = self._span_durations.get(span_key)
+                if histogram is None:
+                    histogram = self._span_durations[span_key] = _Histogram()
+                histogram.observe(seconds)
+            if slow:
+                self._slow_requests[trace.endpoint] = self._slow_requests.get(trace.endpoint, 0) + 1
+
+        if slow:
+            logging.warning(
+                f"Slow request {self._summary(trace, duration)} payload={self._dump(trace.payload)}"
+            )
+        elif logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(
+                f"Request trace {self._summary(trace, duration)} payload={self._dump(trace.payload)}"
+            )
+        elif self.sample_rate > 0 and random.random() < self.sample_rate:
+            logging.info(f"Request trace {self._summary(trace, duration)}")
+
+    def _summary(self, trace: RequestTrace, duration: float) -> str:
+        return json.dumps(
+            {
+                "service": self.service,
+                "method": trace.method,
+                "endpoint": trace.endpoint,
+                "query": trace.query,
+                "status": trace.status,
+                "duration_ms": round(duration * 1000, 3),
+                "spans_ms": {name: round(seconds * 1000, 3) for name, seconds in trace.spans},
+            },
+            separators=(",", ":"),
+        )
+
+    @staticmethod
+    def _dump(payload: bytearray) -> str:
+        if not payload:
+            return "null"
+        text = bytes(payload[: MAX_PAYLOAD_LOG_BYTES + 1]).decode("utf-8", "replace")
+        if len(text) > MAX_PAYLOAD_LOG_BYTES:
+            return f"{text[:MAX_PAYLOAD_LOG_BYTES]}...(truncated)"
+        return text
+
+    def render_metrics(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        service = self.service
+        lines = []
+
+        def _histogram(name: str, histograms: Dict[Any, _Histogram], labels_of) -> None:
+            lines.append(f"# TYPE {name} histogram")
+            for key, histogram in sorted(histograms.items()):
+                labels = labels_of(key)
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(**labels, le=str(bound))} {cumulative}")
+                lines.append(f'{name}_bucket{_labels(**labels, le="+Inf")} {histogram.count}')
+                lines.append(f"{name}_sum{_labels(**labels)} {histogram.total:.6f}")
+                lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+        with self._lock:
+            lines.append("# HELP sre_backend_requests_total HTTP requests handled")
+            lines.append("# TYPE sre_backend_requests_total counter")
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                labels = _labels(service=service, endpoint=endpoint, method=method, status=str(status))
+                lines.append(f"sre_backend_requests_total{labels} {count}")
+
+            lines.append("# HELP sre_backend_slow_requests_total Requests over the slow-request threshold")
+            lines.append("# TYPE sre_backend_slow_requests_total counter")
+            for endpoint, count in sorted(self._slow_requests.items()):
+                lines.append(f"sre_backend_slow_requests_total{_labels(service=service, endpoint=endpoint)} {count}")
+
+            lines.append("# HELP sre_backend_requests_in_flight Requests currently being handled")
+            lines.append("# TYPE sre_backend_requests_in_flight gauge")
+            lines.append(f"sre_backend_requests_in_flight{_labels(service=service)} {self.in_flight}")
+
+            lines.append("# HELP sre_backend_request_duration_seconds Request latency")
+            _histogram(
+                "sre_backend_request_duration_seconds",
+                self._durations,
+                lambda endpoint: {"service": service, "endpoint": endpoint},
+            )
+
+            lines.append("# HELP sre_backend_span_duration_seconds Latency of named spans within requests")
+            _histogram(
+                "sre_backend_span_duration_seconds",
+                self._span_durations,
+                lambda key: {"service": service, "endpoint": key[0], "span": key[1]},
+            )
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Regression benchmark for bounded-memory log reads in the logs server.
+
+For each input size a synthetic ``application.log`` is generated and every
+query mode runs in a fresh subprocess, so peak RSS is measured in isolation:
+
+- ``legacy``    - parse the whole file into a list, then filter and slice
+- ``indexed``   - build the in-memory LogStore, then query it
+- ``streaming`` - early-terminating forward scan / reverse-seeking tail
+- ``mmap``      - streaming readers over an mmap of the file
+
+Note that mmap'd pages are file-backed and shared, but still count towards
+the RSS reported by the kernel.
+
+Usage:
+    python scripts/benchmark_log_streaming.py --sizes-mb 10,1024,5120
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "servers"))
+sys.path.append(str(Path(__file__).parent))
+from benchmark_logs_server import _generate_log, _legacy_recent, _legacy_search  # noqa: E402
+from log_reader import scan_search, tail_recent  # noqa: E402
+from log_store import LogStore  # noqa: E402
+
+MODES = ["legacy", "indexed", "streaming", "mmap"]
+ENDPOINTS = ["search", "recent"]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_worker(path: Path, mode: str, endpoint: str, iterations: int) -> dict:
+    """Run one mode/endpoint combination and report latency and peak RSS"""
+    baseline_rss = _peak_rss_mb()
+    store = LogStore(path) if mode == "indexed" else None
+
+    def query():
+        if endpoint == "search":
+            if mode == "legacy":
+                return _legacy_search(path, "timeout", None, float("-inf"), float("inf"))
+            if mode == "indexed":
+                return store.search(pattern="timeout", limit=100)
+            return scan_search(path, pattern="timeout", limit=100, use_mmap=mode == "mmap")
+        if mode == "legacy":
+            return _legacy_recent(path, 100, None)
+        if mode == "indexed":
+            return store.recent(limit=100)
+        return tail_recent(path, limit=100, use_mmap=mode == "mmap")
+
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        query()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p99_ms": samples[min(len(samples) - 1, int(round(0.99 * (len(samples) - 1))))],
+        "peak_rss_delta_mb": _peak_rss_mb() - baseline_rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bounded-memory log reads")
+    parser.add_argument("--sizes-mb", type=str, default="10,1024,5120", help="Comma-separated input sizes in MB")
+    parser.add_argument("--modes", type=str, default=",".join(MODES), help="Comma-separated modes to run")
+    parser.add_argument("--iterations", type=int, default=5, help="Iterations per mode and endpoint")
+    parser.add_argument("--worker", nargs=3, metavar=("PATH", "MODE", "ENDPOINT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        path, mode, endpoint = args.worker
+        print(json.dumps(_run_worker(Path(path), mode, endpoint, args.iterations)))
+        return
+
+    modes = args.modes.split(",")
+    print(f"{'size':>8} {'mode':<10} {'endpoint':<8}{'p50':>12}{'p99':>12}{'peak RSS':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in (int(s) for s in args.sizes_mb.split(",")):
+            path = Path(tmp) / f"application_{size_mb}mb.log"
+            _generate_log(path, size_mb)
+            for mode in modes:
+                for endpoint in ENDPOINTS:
+                    completed = subprocess.run(
+                        [
+                            sys.executable,
+                            __file__,
+                            "--iterations",
+                            str(args.iterations),
+                            "--worker",
+                            str(path),
+                            mode,
+                            endpoint,
+                        ],
+                        capture_output=True,
+                        text=True,
+                    )
+                    if completed.returncode != 0:
+                        print(f"{size_mb:>6}MB {mode:<10} {endpoint:<8} failed: {completed.stderr.strip()[-200:]}")
+                        continue
+                    result = json.loads(completed.stdout.strip().splitlines()[-1])
+                    print(
+                        f"{size_mb:>6}MB {mode:<10} {endpoint:<8}"
+                        f"{result['p50_ms']:>10.2f}ms{result['p99_ms']:>10.2f}ms"
+                        f"{result['peak_rss_delta_mb']:>12.1f}MB"
+                    )
+            path.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark the logs server query paths against a synthetic application log.
+
+Compares the legacy per-request re-parse of ``application.log`` with the
+indexed ``LogStore`` and reports p50/p99 latency for the ``/logs/search`` and
+``/logs/recent`` query shapes.
+
+Usage:
+    python scripts/benchmark_logs_server.py --size-mb 2048 --iterations 50
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.append(str(Path(__file__).parent.parent / "servers"))
+from log_reader import entry_to_dict, parse_epoch, parse_log_line  # noqa: E402
+from log_store import LogStore  # noqa: E402
+
+SERVICES = [
+    "web-service",
+    "api-service",
+    "database-service",
+    "product-catalog-service",
+    "payment-service",
+]
+LEVELS = ["INFO"] * 14 + ["WARN"] * 3 + ["ERROR"] * 2 + ["DEBUG"]
+MESSAGES = [
+    "Processing request from 192.168.1.{n} - GET /api/users/{n}",
+    "Request completed in {n}ms - Status: 200",
+    "Slow query detected: SELECT * FROM orders WHERE id={n} - Duration: {n}ms",
+    "Database connection timeout after {n}ms",
+    "Cache hit rate: {n}% - excellent performance",
+    "Memory usage at {n}% - consider scaling up",
+    "Circuit breaker activated for downstream dependency {n}",
+    "java.lang.OutOfMemoryError: Java heap space at UserService.load({n})",
+]
+
+
+def _generate_log(path: Path, size_mb: int) -> int:
+    """Write a synthetic log of roughly size_mb megabytes, return line count"""
+    target = size_mb * 1024 * 1024
+    start = datetime(2024, 1, 15, tzinfo=timezone.utc)
+    rng = random.Random(42)
+    written = 0
+    lines = 0
+    with open(path, "w") as f:
+        while written < target:
+            batch = []
+            for _ in range(10000):
+                ts = start + timedelta(milliseconds=lines * 37)
+                message = rng.choice(MESSAGES).format(n=rng.randint(1, 9999))
+                batch.append(
+                    f"{ts.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]}Z "
+                    f"[{rng.choice(LEVELS)}] {rng.choice(SERVICES)} {message}\n"
+                )
+                lines += 1
+            chunk = "".join(batch)
+            f.write(chunk)
+            written += len(chunk)
+    return lines
+
+
+def _legacy_parse(path: Path, pattern: str = None) -> List[Dict[str, str]]:
+    """Equivalent of the previous per-request _parse_log_file"""
+    logs = []
+    with open(path, "r") as f:
+        for line in f:
+            if pattern and pattern.lower() not in line.lower():
+                continue
+            logs.append(entry_to_dict(*parse_log_line(line)))
+    return logs
+
+
+def _legacy_search(path: Path, pattern: str, level: str, start: float, end: float):
+    logs = _legacy_parse(path, pattern)
+    if level:
+        logs = [log for log in logs if log.get("level") == level]
+    filtered = []
+    for log in logs:
+        epoch = parse_epoch(log.get("timestamp", ""))
+        if epoch is not None and (epoch < start or epoch > end):
+            continue
+        filtered.append(log)
+    return filtered[:100]
+
+
+def _legacy_recent(path: Path, limit: int, service: str):
+    logs = _legacy_parse(path)
+    if service:
+        logs = [log for log in logs if service in log.get("service", "")]
+    recent = logs[-limit:]
+    recent.reverse()
+    return recent
+
+
+def _measure(fn: Callable[[], object], iterations: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    p99_index = min(len(samples) - 1, int(round(0.99 * (len(samples) - 1))))
+    return {"p50": statistics.median(samples), "p99": samples[p99_index]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark logs server queries")
+    parser.add_argument("--size-mb", type=int, default=256, help="Synthetic log size in MB")
+    parser.add_argument("--iterations", type=int, default=20, help="Iterations per query")
+    parser.add_argument(
+        "--legacy-iterations",
+        type=int,
+        default=3,
+        help="Iterations for the legacy full re-parse path (slow on large files)",
+    )
+    parser.add_argument("--log-file", type=str, help="Use an existing log file instead")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.log_file:
+            path = Path(args.log_file)
+        else:
+            path = Path(tmp) / "application.log"
+            print(f"Generating ~{args.size_mb} MB synthetic log...")
+            lines = _generate_log(path, args.size_mb)
+            print(f"  {lines:,} lines written to {path}")
+
+        store = LogStore(path)
+        t0 = time.perf_counter()
+        store.refresh()
+        print(f"Initial index build: {time.perf_counter() - t0:.2f}s {store.stats()}")
+
+        day = parse_epoch("2024-01-15T00:00:00Z")
+        window = (day + 3600, day + 7200)
+        queries = {
+            "search pattern=timeout": dict(pattern="timeout", level=None, window=None),
+            "search pattern=database level=ERROR": dict(
+                pattern="database", level="ERROR", window=None
+            ),
+            "search pattern=heap 1h window": dict(pattern="heap", level=None, window=window),
+            "search pattern=no-such-text": dict(pattern="no-such-text", level=None, window=None),
+        }
+
+        print(f"\n{'query':<42}{'legacy p50':>12}{'legacy p99':>12}{'index p50':>12}{'index p99':>12}")
+        for name, q in queries.items():
+            start, end = q["window"] or (float("-inf"), float("inf"))
+            start_epoch, end_epoch = q["window"] or (None, None)
+            legacy = _measure(
+                lambda: _legacy_search(path, q["pattern"], q["level"], start, end),
+                args.legacy_iterations,
+            )
+            indexed = _measure(
+                lambda: store.search(q["pattern"], q["level"], start_epoch, end_epoch),
+                args.iterations,
+            )
+            print(
+                f"{name:<42}{legacy['p50']:>11.1f}ms{legacy['p99']:>11.1f}ms"
+                f"{indexed['p50']:>11.2f}ms{indexed['p99']:>11.2f}ms"
+            )
+
+        for limit, service in [(100, None), (1000, "payment")]:
+            name = f"recent limit={limit} service={service}"
+            legacy = _measure(
+                lambda: _legacy_recent(path, limit, service), args.legacy_iterations
+            )
+            indexed = _measure(lambda: store.recent(limit, service), args.iterations)
+            print(
+                f"{name:<42}{legacy['p50']:>11.1f}ms{legacy['p99']:>11.1f}ms"
+                f"{indexed['p50']:>11.2f}ms{indexed['p99']:>11.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
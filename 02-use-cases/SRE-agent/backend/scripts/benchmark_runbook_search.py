@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark runbook keyword search: BM25F index vs the original linear scan.
+
+Generates a synthetic corpus of playbooks, measures index build time and
+memory, then compares query latency against the per-request substring scan
+the runbooks server used before the index existed.
+
+Usage:
+    python scripts/benchmark_runbook_search.py --documents 50000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.append(str(Path(__file__).parent.parent / "servers"))
+from runbook_index import RunbookIndex  # noqa: E402
+
+INCIDENT_TYPES = ["performance", "availability", "security", "deployment"]
+SEVERITIES = ["low", "medium", "high", "critical"]
+VOCABULARY = (
+    "database connection pool exhaustion memory pressure cpu throttling pod "
+    "crashloop deployment rollback latency spike error rate certificate expiry "
+    "disk full node notready dns resolution timeout queue backlog cache miss "
+    "replica lag failover ingress gateway autoscaler quota oom eviction"
+).split()
+QUERIES = ["database", "memory pressure", "crash", "certificate expiry", "payments-svc-42", "replica lag failover"]
+
+
+def _generate_corpus(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    # Zipf-like term frequencies plus a long tail of service names
+    services = [f"{name}-svc-{i}" for i in range(500) for name in ("payments", "orders", "auth")]
+    terms = VOCABULARY + services
+    weights = [1 / (rank + 1) for rank in range(len(terms))]
+
+    def words(n: int) -> str:
+        return " ".join(rng.choices(terms, weights, k=n))
+
+    return [
+        {
+            "id": f"playbook-{i}",
+            "title": words(4).title(),
+            "incident_type": rng.choice(INCIDENT_TYPES),
+            "severity": rng.choice(SEVERITIES),
+            "description": words(12),
+            "triggers": [words(5) for _ in range(3)],
+            "steps": [f"{n}. {words(10)}" for n in range(1, 8)],
+        }
+        for i in range(count)
+    ]
+
+
+def _linear_search(runbooks: List[Dict[str, Any]], keyword: str) -> List[Dict[str, Any]]:
+    """The substring scan search_runbooks performed before indexing"""
+    keyword = keyword.lower()
+    return [
+        r
+        for r in runbooks
+        if keyword in r.get("title", "").lower()
+        or keyword in r.get("description", "").lower()
+        or any(keyword in step.lower() for step in r.get("steps", []))
+    ]
+
+
+def _measure(fn, iterations: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "p50": statistics.median(samples),
+        "p99": samples[min(len(samples) - 1, int(round(0.99 * (len(samples) - 1))))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark runbook keyword search")
+    parser.add_argument("--documents", type=int, default=50000, help="Synthetic corpus size")
+    parser.add_argument("--iterations", type=int, default=50, help="Iterations per query")
+    parser.add_argument("--limit", type=int, default=20, help="Page size for indexed queries")
+    args = parser.parse_args()
+
+    corpus = _generate_corpus(args.documents)
+
+    t0 = time.perf_counter()
+    index = RunbookIndex()
+    index.sync_source("playbooks", corpus)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    # Rebuild under tracemalloc separately; tracing skews the build timing
+    tracemalloc.start()
+    RunbookIndex().sync_source("playbooks", corpus)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    index.sync_source("playbooks", corpus[:-1] + [dict(corpus[-1], title="Changed")])
+    resync_ms = (time.perf_counter() - t0) * 1000
+
+    print(f"documents={len(index)} build={build_ms:.0f}ms resync(1 changed)={resync_ms:.0f}ms index_peak={peak / 1e6:.0f}MB")
+    print(f"{'query':<22}{'matches':>9}{'linear p50':>13}{'p99':>10}{'index p50':>12}{'p99':>10}")
+    for query in QUERIES:
+        linear = _measure(lambda: _linear_search(corpus, query), args.iterations)
+        indexed = _measure(lambda: index.search(query, limit=args.limit), args.iterations)
+        total, _ = index.search(query, limit=args.limit)
+        print(
+            f"{query:<22}{total:>9}{linear['p50']:>11.2f}ms{linear['p99']:>8.2f}ms"
+            f"{indexed['p50']:>10.2f}ms{indexed['p99']:>8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Closed-loop HTTP load test for the SRE backend stub servers.
+
+Keeps ``--concurrency`` requests in flight against each endpoint for
+``--duration`` seconds and reports throughput and latency percentiles.
+
+Usage:
+    python scripts/load_test_servers.py --base-url https://localhost:8011 \\
+        --api-key $API_KEY --path /pods/status --path "/pods/status?namespace=production"
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+DEFAULT_PATHS = {
+    "k8s": ["/pods/status", "/deployments/status", "/events", "/nodes/status"],
+    "logs": ["/logs/patterns", "/logs/count?event_type=error", "/logs/recent"],
+    "metrics": ["/metrics/errors", "/metrics/availability", "/metrics/performance"],
+    "runbooks": ["/runbooks/escalation", "/runbooks/search?keyword=database"],
+}
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    path: str,
+    deadline: float,
+    latencies: List[float],
+    errors: Dict[str, int],
+) -> None:
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code != 200:
+                errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+                continue
+        except httpx.HTTPError as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            continue
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+    return samples[index]
+
+
+async def _run_path(args: argparse.Namespace, path: str) -> None:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        headers={"X-API-Key": args.api_key},
+        verify=not args.insecure,
+        limits=limits,
+        timeout=30.0,
+    ) as client:
+        # Warm up connections and server-side caches
+        await client.get(path)
+
+        deadline = time.perf_counter() + args.duration
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(_worker(client, path, deadline, latencies, errors) for _ in range(args.concurrency))
+        )
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(
+        f"{path:<45}{len(latencies) / elapsed:>10.0f} req/s"
+        f"{statistics.median(latencies) if latencies else 0:>9.2f}ms"
+        f"{_percentile(latencies, 95):>9.2f}ms{_percentile(latencies, 99):>9.2f}ms"
+        f"  errors={sum(errors.values())} {errors if errors else ''}"
+    )
+
+
+async def _main(args: argparse.Namespace) -> None:
+    paths = args.path or DEFAULT_PATHS[args.service]
+    print(f"{args.base_url}  concurrency={args.concurrency} duration={args.duration}s")
+    print(f"{'path':<45}{'throughput':>14}{'p50':>11}{'p95':>11}{'p99':>11}")
+    for path in paths:
+        await _run_path(args, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the SRE backend stub servers")
+    parser.add_argument("--base-url", type=str, required=True, help="Server URL, e.g. https://localhost:8011")
+    parser.add_argument("--api-key", type=str, default=os.getenv("BACKEND_API_KEY"), help="X-API-Key value (default: $BACKEND_API_KEY)")
+    parser.add_argument("--service", type=str, default="k8s", choices=sorted(DEFAULT_PATHS), help="Default endpoint set when no --path is given")
+    parser.add_argument("--path", action="append", help="Endpoint path to test (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=64, help="Requests kept in flight")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per endpoint")
+    parser.add_argument("--insecure", action="store_true", help="Skip TLS certificate verification")
+    args = parser.parse_args()
+
+    if not args.api_key:
+        parser.error("--api-key or BACKEND_API_KEY is required")
+
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
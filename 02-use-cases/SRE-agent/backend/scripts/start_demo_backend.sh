@@ -11,6 +11,7 @@ PROJECT_ROOT="$(cd "$BACKEND_DIR/.." && pwd)"
 SSL_KEYFILE="${SSL_KEYFILE:-}"
 SSL_CERTFILE="${SSL_CERTFILE:-}"
 HOST="${HOST:-localhost}"
+WORKERS="${WORKERS:-1}"
 
 # Parse command line arguments
 while [[ $# -gt 0 ]]; do
@@ -27,14 +28,20 @@ while [[ $# -gt 0 ]]; do
             HOST="$2"
             shift 2
             ;;
+        --workers)
+            WORKERS="$2"
+            shift 2
+            ;;
         --help|-h)
-            echo "Usage: $0 [--host HOSTNAME] [--ssl-keyfile PATH] [--ssl-certfile PATH]"
+            echo "Usage: $0 [--host HOSTNAME] [--workers N] [--ssl-keyfile PATH] [--ssl-certfile PATH]"
             echo "  --host HOSTNAME       Hostname to bind to (default: localhost)"
+            echo "  --workers N           Worker processes pre-forked per server (default: 1)"
             echo "  --ssl-keyfile PATH    Path to SSL private key file"
             echo "  --ssl-certfile PATH   Path to SSL certificate file"
             echo ""
             echo "Environment variables:"
             echo "  HOST                  Hostname to bind to"
+            echo "  WORKERS               Worker processes per server"
             echo "  SSL_KEYFILE           SSL private key file path"
             echo "  SSL_CERTFILE          SSL certificate file path"
             echo ""
@@ -61,7 +68,7 @@ fi
 mkdir -p "$PROJECT_ROOT/logs"
 
 # Prepare server arguments
-SERVER_ARGS="--host '$HOST'"
+SERVER_ARGS="--host '$HOST' --workers '$WORKERS'"
 if [ -n "$SSL_KEYFILE" ] && [ -n "$SSL_CERTFILE" ]; then
     SERVER_ARGS="$SERVER_ARGS --ssl-keyfile '$SSL_KEYFILE' --ssl-certfile '$SSL_CERTFILE'"
     echo "🔒 Using SSL certificates:"
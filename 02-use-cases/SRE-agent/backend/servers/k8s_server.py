@@ -1,5 +1,5 @@
-import json
 import logging
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional, List
@@ -13,10 +13,15 @@ from fastapi import (
 )
 from pydantic import BaseModel, Field
 from enum import Enum
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from retrieve_api_key import retrieve_api_key
 
+# Add parent directory to path to import shared backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from dataset_cache import DATASETS, expect_keys
+from request_tracing import RequestTracer
+
 # Configure logging with basicConfig
 logging.basicConfig(
     level=logging.INFO,  # Set the log level to INFO
@@ -25,6 +30,7 @@ logging.basicConfig(
 )
 
 app = FastAPI(title="Kubernetes Analysis API", version="1.0.0")
+TRACER = RequestTracer("k8s-api")
 
 # Base path for fake data
 DATA_PATH = Path(__file__).parent.parent / "data" / "k8s_data"
@@ -50,6 +56,9 @@ def _validate_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     return x_api_key
 
 
+TRACER.install(app, dependencies=[Depends(_validate_api_key)])
+
+
 def _parse_timestamp(timestamp_str: str) -> datetime:
     """Parse ISO timestamp string to datetime object"""
     try:
@@ -221,6 +230,23 @@ class ErrorResponse(BaseModel):
     detail: Optional[str] = Field(None, description="Detailed error information")
 
 
+# Cached datasets, validated into the response models once per file change
+PODS_DATASET = DATASETS.register(DATA_PATH / "pods.json", PodStatusResponse.model_validate)
+DEPLOYMENTS_DATASET = DATASETS.register(
+    DATA_PATH / "deployments.json", DeploymentStatusResponse.model_validate
+)
+EVENTS_DATASET = DATASETS.register(DATA_PATH / "events.json", EventsResponse.model_validate)
+RESOURCE_USAGE_DATASET = DATASETS.register(
+    DATA_PATH / "resource_usage.json", expect_keys(resource_usage=dict)
+)
+NODES_DATASET = DATASETS.register(DATA_PATH / "nodes.json", expect_keys(nodes=list))
+
+
+def _json_response(body: bytes) -> Response:
+    """Wrap pre-serialized JSON bytes in a response"""
+    return Response(content=body, media_type="application/json")
+
+
 @app.get("/pods/status", response_model=PodStatusResponse)
 async def get_pod_status(
     namespace: Optional[str] = Query(
@@ -249,20 +275,20 @@ async def get_pod_status(
         HTTPException: 500 if data retrieval fails
     """
     try:
-        with open(DATA_PATH / "pods.json", "r") as f:
-            data = json.load(f)
+        def _build(data: PodStatusResponse) -> dict:
+            pods = data.pods
 
-        pods = data.get("pods", [])
+            # Filter by namespace if provided
+            if namespace:
+                pods = [p for p in pods if p.namespace == namespace]
 
-        # Filter by namespace if provided
-        if namespace:
-            pods = [p for p in pods if p.get("namespace") == namespace]
+            # Filter by pod name if provided
+            if pod_name:
+                pods = [p for p in pods if p.name == pod_name]
 
-        # Filter by pod name if provided
-        if pod_name:
-            pods = [p for p in pods if p.get("name") == pod_name]
+            return PodStatusResponse(pods=pods).model_dump(mode="json")
 
-        return PodStatusResponse(pods=pods)
+        return _json_response(PODS_DATASET.response_bytes((namespace, pod_name), _build))
     except Exception as e:
         logging.error(f"Error retrieving pod status: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -296,18 +322,20 @@ async def get_deployment_status(
         HTTPException: 500 if data retrieval fails
     """
     try:
-        with open(DATA_PATH / "deployments.json", "r") as f:
-            data = json.load(f)
+        def _build(data: DeploymentStatusResponse) -> dict:
+            deployments = data.deployments
 
-        deployments = data.get("deployments", [])
+            if namespace:
+                deployments = [d for d in deployments if d.namespace == namespace]
 
-        if namespace:
-            deployments = [d for d in deployments if d.get("namespace") == namespace]
+            if deployment_name:
+                deployments = [d for d in deployments if d.name == deployment_name]
 
-        if deployment_name:
-            deployments = [d for d in deployments if d.get("name") == deployment_name]
+            return DeploymentStatusResponse(deployments=deployments).model_dump(mode="json")
 
-        return DeploymentStatusResponse(deployments=deployments)
+        return _json_response(
+            DEPLOYMENTS_DATASET.response_bytes((namespace, deployment_name), _build)
+        )
     except Exception as e:
         logging.error(f"Error retrieving deployment status: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -345,18 +373,18 @@ async def get_cluster_events(
         HTTPException: 500 if data retrieval fails
     """
     try:
-        with open(DATA_PATH / "events.json", "r") as f:
-            data = json.load(f)
+        def _build(data: EventsResponse) -> dict:
+            events = data.model_dump(mode="json")["events"]
 
-        events = data.get("events", [])
+            if severity:
+                events = [e for e in events if e.get("type") == severity]
 
-        if severity:
-            events = [e for e in events if e.get("type") == severity]
+            # Filter by since timestamp
+            events = _filter_events_by_time(events, since)
 
-        # Filter by since timestamp
-        events = _filter_events_by_time(events, since)
+            return {"events": events}
 
-        return EventsResponse(events=events)
+        return _json_response(EVENTS_DATASET.response_bytes((since, severity), _build))
     except Exception as e:
         logging.error(f"Error retrieving cluster events: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -390,21 +418,23 @@ async def get_resource_usage(
         HTTPException: 500 if data retrieval fails
     """
     try:
-        with open(DATA_PATH / "resource_usage.json", "r") as f:
-            data = json.load(f)
-
-        resource_usage = data.get("resource_usage", {})
-
-        # Filter by namespace if provided
-        if namespace and "namespace_usage" in resource_usage:
-            namespace_data = resource_usage["namespace_usage"].get(namespace, {})
-            if resource_type:
-                return {
-                    "resource_usage": {resource_type: namespace_data.get(resource_type)}
-                }
-            return {"resource_usage": {"namespace": namespace, "usage": namespace_data}}
-
-        return {"resource_usage": resource_usage}
+        def _build(data: dict) -> dict:
+            resource_usage = data["resource_usage"]
+
+            # Filter by namespace if provided
+            if namespace and "namespace_usage" in resource_usage:
+                namespace_data = resource_usage["namespace_usage"].get(namespace, {})
+                if resource_type:
+                    return {
+                        "resource_usage": {resource_type: namespace_data.get(resource_type)}
+                    }
+                return {"resource_usage": {"namespace": namespace, "usage": namespace_data}}
+
+            return {"resource_usage": resource_usage}
+
+        return _json_response(
+            RESOURCE_USAGE_DATASET.response_bytes((namespace, resource_type), _build)
+        )
     except Exception as e:
         logging.error(f"Error retrieving resource usage: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -434,15 +464,15 @@ async def get_node_status(
         HTTPException: 500 if data retrieval fails
     """
     try:
-        with open(DATA_PATH / "nodes.json", "r") as f:
-            data = json.load(f)
+        def _build(data: dict) -> dict:
+            nodes = data["nodes"]
 
-        nodes = data.get("nodes", [])
+            if node_name:
+                nodes = [n for n in nodes if n.get("name") == node_name]
 
-        if node_name:
-            nodes = [n for n in nodes if n.get("name") == node_name]
+            return {"nodes": nodes}
 
-        return {"nodes": nodes}
+        return _json_response(NODES_DATASET.response_bytes(node_name, _build))
     except Exception as e:
         logging.error(f"Error retrieving node status: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -469,7 +499,6 @@ async def health_check(api_key: str = Depends(_validate_api_key)):
 
 
 if __name__ == "__main__":
-    import uvicorn
     import sys
     import argparse
     from pathlib import Path
@@ -477,6 +506,7 @@ if __name__ == "__main__":
     # Add parent directory to path to import config_utils
     sys.path.append(str(Path(__file__).parent.parent))
     from config_utils import get_server_port
+    from prefork import serve
 
     parser = argparse.ArgumentParser(description="K8s API Server")
     parser.add_argument("--host", type=str, required=True, 
@@ -484,8 +514,17 @@ if __name__ == "__main__":
     parser.add_argument("--ssl-keyfile", type=str, help="Path to SSL private key file")
     parser.add_argument("--ssl-certfile", type=str, help="Path to SSL certificate file")
     parser.add_argument("--port", type=int, help="Port to bind to (overrides config)")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Worker processes pre-forked on a shared socket (default: 1)")
+    parser.add_argument("--trace-sample-rate", type=float, default=TRACER.sample_rate,
+                       help="Fraction of requests whose timing trace is logged")
+    parser.add_argument("--slow-request-ms", type=float, default=TRACER.slow_request_ms,
+                       help="Requests slower than this are logged with their payload")
     
     args = parser.parse_args()
+
+    TRACER.sample_rate = args.trace_sample_rate
+    TRACER.slow_request_ms = args.slow_request_ms
     
     port = args.port if args.port else get_server_port("k8s")
     
@@ -503,4 +542,5 @@ if __name__ == "__main__":
         protocol = "HTTP"
     
     logging.info(f"Starting K8s server on {protocol}://{args.host}:{port}")
-    uvicorn.run(app, host=args.host, port=port, **ssl_config)
+    serve(app, host=args.host, port=port, workers=args.workers,
+          preload=DATASETS.preload, name="K8s server", **ssl_config)
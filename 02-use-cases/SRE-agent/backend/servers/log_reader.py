@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Line parsing and bounded-memory streaming readers for text application logs.
+
+Lines follow the "<timestamp> [<LEVEL>] <service> <message>" layout. The
+streaming helpers never hold more than one read chunk plus ``limit`` parsed
+entries in memory, so their cost does not depend on the size of the file:
+
+- ``scan_search`` walks the file forward and stops once ``limit`` entries match
+- ``tail_recent`` seeks backwards from the end of the file and stops once
+  ``limit`` entries have been collected
+
+Both can read through ``mmap`` instead of buffered file reads.
+"""
+
+import mmap
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_LEVEL = "INFO"
+
+# Block size used when seeking backwards through a file without mmap
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def parse_epoch(timestamp_str: str) -> Optional[float]:
+    """Parse an ISO timestamp string to epoch seconds, or None if unparseable"""
+    try:
+        if timestamp_str.endswith("Z"):
+            dt = datetime.fromisoformat(timestamp_str[:-1] + "+00:00")
+        else:
+            dt = datetime.fromisoformat(timestamp_str)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    except ValueError:
+        return None
+
+
+def parse_log_line(line: str) -> Tuple[str, Optional[Tuple[str, str, str, int]]]:
+    """Split a raw log line into its stripped text and structured fields.
+
+    Returns the stripped line and either ``(timestamp, level, service,
+    message_offset)`` or None when the line is unstructured.
+    """
+    text = line.strip()
+    parts = text.split(" ", 3)
+    if len(parts) < 4:
+        return text, None
+
+    timestamp, level_part, service = parts[0], parts[1], parts[2]
+
+    # Extract log level from [LEVEL] format
+    level = DEFAULT_LEVEL
+    if "[" in level_part and "]" in level_part:
+        level = level_part.strip("[]")
+
+    message_offset = len(timestamp) + len(level_part) + len(service) + 3
+    return text, (timestamp, level, service, message_offset)
+
+
+def entry_to_dict(
+    text: str, fields: Optional[Tuple[str, str, str, int]]
+) -> Dict[str, str]:
+    """Build the API representation of a parsed log line"""
+    if fields is None:
+        return {"message": text}
+    timestamp, level, service, message_offset = fields
+    return {
+        "timestamp": timestamp,
+        "level": level,
+        "service": service,
+        "message": text[message_offset:],
+    }
+
+
+def iter_lines(file_path: Path, use_mmap: bool = False) -> Iterator[str]:
+    """Yield decoded lines from the start of the file"""
+    with open(file_path, "rb") as f:
+        if use_mmap:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for raw in iter(mm.readline, b""):
+                    yield raw.decode("utf-8", errors="replace")
+        else:
+            for raw in f:
+                yield raw.decode("utf-8", errors="replace")
+
+
+def iter_lines_reverse(
+    file_path: Path, use_mmap: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[str]:
+    """Yield decoded lines from the end of the file towards the start"""
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+
+        if use_mmap:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = size - 1 if mm[size - 1 : size] == b"\n" else size
+                while True:
+                    start = mm.rfind(b"\n", 0, end) + 1
+                    yield mm[start:end].decode("utf-8", errors="replace")
+                    if start == 0:
+                        break
+                    end = start - 1
+        else:
+            # Skip the final newline so both readers yield the same lines
+            f.seek(size - 1)
+            position = size - 1 if f.read(1) == b"\n" else size
+            remainder = b""
+            while position > 0:
+                read_size = min(chunk_size, position)
+                position -= read_size
+                f.seek(position)
+                block = f.read(read_size) + remainder
+                lines = block.split(b"\n")
+                # The first piece may be the tail of a line that starts in an
+                # earlier block; carry it over to the next read
+                remainder = lines[0]
+                for raw in reversed(lines[1:]):
+                    yield raw.decode("utf-8", errors="replace")
+            yield remainder.decode("utf-8", errors="replace")
+
+
+def scan_search(
+    file_path: Path,
+    pattern: Optional[str] = None,
+    log_level: Optional[str] = None,
+    start_epoch: Optional[float] = None,
+    end_epoch: Optional[float] = None,
+    limit: int = 100,
+    use_mmap: bool = False,
+) -> List[Dict[str, str]]:
+    """Forward scan returning up to limit matching entries in file order"""
+    pattern_lower = pattern.lower() if pattern else None
+    time_filtered = start_epoch is not None or end_epoch is not None
+
+    results: List[Dict[str, str]] = []
+    for line in iter_lines(file_path, use_mmap=use_mmap):
+        if pattern_lower and pattern_lower not in line.lower():
+            continue
+        text, fields = parse_log_line(line)
+        if not text:
+            continue
+        if log_level and (fields is None or fields[1] != log_level):
+            continue
+        if time_filtered:
+            if fields is None:
+                continue
+            epoch = parse_epoch(fields[0])
+            # Entries with unparseable timestamps are kept in time-filtered results
+            if epoch is not None and (
+                (start_epoch is not None and epoch < start_epoch)
+                or (end_epoch is not None and epoch > end_epoch)
+            ):
+                continue
+        results.append(entry_to_dict(text, fields))
+        if len(results) >= limit:
+            break
+    return results
+
+
+def tail_recent(
+    file_path: Path,
+    limit: int = 100,
+    service: Optional[str] = None,
+    use_mmap: bool = False,
+) -> List[Dict[str, str]]:
+    """Reverse scan returning the last limit entries, most recent first"""
+    results: List[Dict[str, str]] = []
+    for line in iter_lines_reverse(file_path, use_mmap=use_mmap):
+        text, fields = parse_log_line(line)
+        if not text:
+            continue
+        if service and (fields is None or service not in fields[2]):
+            continue
+        results.append(entry_to_dict(text, fields))
+        if len(results) >= limit:
+            break
+    return results
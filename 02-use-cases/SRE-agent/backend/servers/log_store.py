@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Indexed, memory-resident store for text application logs.
+
+The logs server used to re-open and re-parse ``application.log`` on every
+request. This module loads the file once, tails it for appended lines, and
+keeps the entries in a compact columnar layout:
+
+- one raw line string per entry plus small integer offsets for its fields
+- pre-parsed epoch timestamps with a sorted time index for bisect range queries
+- per-level and per-service posting lists
+- a token inverted index used to narrow ``pattern`` searches
+"""
+
+import bisect
+import heapq
+import logging
+import math
+import os
+import re
+import threading
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from log_reader import parse_epoch, parse_log_line
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+
+# Level/service id used for lines that do not follow the
+# "<timestamp> [<LEVEL>] <service> <message>" layout
+UNSTRUCTURED_ID = 0
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> Set[str]:
+    """Return the set of lowercase alphanumeric tokens in text"""
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+
+def _unique(rows: Iterable[int]) -> Iterator[int]:
+    """Drop consecutive duplicates from a sorted row iterator"""
+    previous = -1
+    for row in rows:
+        if row != previous:
+            previous = row
+            yield row
+
+
+class LogStore:
+    """Columnar, indexed view over a single append-only text log file"""
+
+    def __init__(self, file_path: Path) -> None:
+        self.file_path = Path(file_path)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        # Per-entry columns
+        self._lines: List[str] = []
+        self._timestamp_ends = array("I")
+        self._message_offsets = array("I")
+        self._level_ids = array("H")
+        self._service_ids = array("I")
+        self._epochs = array("d")
+
+        # Interned dimension tables; id 0 is reserved for unstructured lines
+        self._level_names: List[str] = [""]
+        self._level_lookup: Dict[str, int] = {}
+        self._service_names: List[str] = [""]
+        self._service_lookup: Dict[str, int] = {}
+
+        # Indexes
+        self._level_postings: Dict[int, array] = {}
+        self._service_postings: Dict[int, array] = {}
+        self._token_postings: Dict[str, array] = {}
+        self._sorted_epochs = array("d")
+        self._sorted_rows = array("I")
+        self._untimed_rows = array("I")
+        self._time_index_dirty = False
+        self._expansion_cache: Dict[str, Tuple[str, ...]] = {}
+
+        # Tail position
+        self._offset = 0
+        self._inode: Optional[int] = None
+
+    def clear(self) -> None:
+        """Drop all indexed entries; the next query reloads the file"""
+        with self._lock:
+            self._reset()
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    # ------------------------------------------------------------------
+    # Loading and tailing
+    # ------------------------------------------------------------------
+
+    def refresh(self) -> None:
+        """Pick up lines appended since the last load, reloading on truncation
+        or file replacement."""
+        with self._lock:
+            try:
+                stat = os.stat(self.file_path)
+            except FileNotFoundError:
+                if self._lines:
+                    logging.warning(f"Log file {self.file_path} disappeared, clearing store")
+                    self._reset()
+                return
+
+            if self._inode is not None and (
+                stat.st_ino != self._inode or stat.st_size < self._offset
+            ):
+                logging.info(f"Log file {self.file_path} was rotated or truncated, reloading")
+                self._reset()
+
+            if stat.st_size == self._offset:
+                return
+
+            self._inode = stat.st_ino
+            added = self._read_from_offset()
+            if added:
+                self._expansion_cache.clear()
+                logging.info(
+                    f"Indexed {added} new log lines from {self.file_path} "
+                    f"({len(self._lines)} total)"
+                )
+
+    def _read_from_offset(self) -> int:
+        """Read complete lines after the current offset into the store"""
+        added = 0
+        with open(self.file_path, "rb") as f:
+            f.seek(self._offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # Partial line still being written; pick it up on next refresh
+                    break
+                self._offset += len(raw)
+                line = raw.decode("utf-8", errors="replace")
+                if not line.strip():
+                    continue
+                self._append(line)
+                added += 1
+        return added
+
+    def _intern(self, value: str, names: List[str], lookup: Dict[str, int]) -> int:
+        value_id = lookup.get(value)
+        if value_id is None:
+            value_id = len(names)
+            names.append(value)
+            lookup[value] = value_id
+        return value_id
+
+    def _append(self, line: str) -> None:
+        row = len(self._lines)
+        text, fields = parse_log_line(line)
+        self._lines.append(text)
+
+        if fields is None:
+            level_id = service_id = UNSTRUCTURED_ID
+            timestamp_end = message_offset = 0
+            epoch = math.nan
+        else:
+            timestamp, level, service, message_offset = fields
+            level_id = self._intern(level, self._level_names, self._level_lookup)
+            service_id = self._intern(
+                service, self._service_names, self._service_lookup
+            )
+            timestamp_end = len(timestamp)
+            parsed = parse_epoch(timestamp)
+            epoch = math.nan if parsed is None else parsed
+
+        self._timestamp_ends.append(timestamp_end)
+        self._message_offsets.append(message_offset)
+        self._level_ids.append(level_id)
+        self._service_ids.append(service_id)
+        self._epochs.append(epoch)
+
+        self._level_postings.setdefault(level_id, array("I")).append(row)
+        self._service_postings.setdefault(service_id, array("I")).append(row)
+        for token in tokenize(text):
+            self._token_postings.setdefault(token, array("I")).append(row)
+
+        if fields is None:
+            return
+        if math.isnan(epoch):
+            self._untimed_rows.append(row)
+        elif self._sorted_epochs and epoch < self._sorted_epochs[-1]:
+            # Out-of-order timestamp; rebuild the time index lazily
+            self._sorted_epochs.append(epoch)
+            self._sorted_rows.append(row)
+            self._time_index_dirty = True
+        else:
+            self._sorted_epochs.append(epoch)
+            self._sorted_rows.append(row)
+
+    def _ensure_time_index(self) -> None:
+        if not self._time_index_dirty:
+            return
+        order = sorted(range(len(self._sorted_rows)), key=self._sorted_epochs.__getitem__)
+        self._sorted_epochs = array("d", (self._sorted_epochs[i] for i in order))
+        self._sorted_rows = array("I", (self._sorted_rows[i] for i in order))
+        self._time_index_dirty = False
+
+    # ------------------------------------------------------------------
+    # Query helpers
+    # ------------------------------------------------------------------
+
+    def _entry(self, row: int) -> Dict[str, str]:
+        text = self._lines[row]
+        level_id = self._level_ids[row]
+        if level_id == UNSTRUCTURED_ID:
+            return {"message": text}
+        return {
+            "timestamp": text[: self._timestamp_ends[row]],
+            "level": self._level_names[level_id],
+            "service": self._service_names[self._service_ids[row]],
+            "message": text[self._message_offsets[row] :],
+        }
+
+    def _expand_token(self, token: str) -> Tuple[str, ...]:
+        """Return every indexed token that contains token as a substring.
+
+        Pattern search keeps the original substring semantics, so a query
+        token such as "timeout" must also match indexed tokens like
+        "timeouts". The vocabulary is far smaller than the entry count, and
+        expansions are cached until new lines are indexed.
+        """
+        matches = self._expansion_cache.get(token)
+        if matches is None:
+            matches = tuple(t for t in self._token_postings if token in t)
+            self._expansion_cache[token] = matches
+        return matches
+
+    def _pattern_postings(self, pattern: str) -> Optional[List[array]]:
+        """Posting lists whose union covers every row that may contain pattern.
+
+        Returns the postings of the rarest pattern token, or None when the
+        pattern has no indexable tokens and a full scan is required.
+        """
+        tokens = set(TOKEN_PATTERN.findall(pattern))
+        if not tokens:
+            return None
+
+        best: Optional[List[array]] = None
+        best_size = 0
+        for token in tokens:
+            postings = [self._token_postings[t] for t in self._expand_token(token)]
+            size = sum(len(p) for p in postings)
+            if best is None or size < best_size:
+                best, best_size = postings, size
+        return best
+
+    def _time_range_rows(
+        self, start_epoch: Optional[float], end_epoch: Optional[float]
+    ) -> List[int]:
+        """Rows in the time range, plus rows with unparseable timestamps"""
+        self._ensure_time_index()
+        lo = 0 if start_epoch is None else bisect.bisect_left(self._sorted_epochs, start_epoch)
+        hi = (
+            len(self._sorted_epochs)
+            if end_epoch is None
+            else bisect.bisect_right(self._sorted_epochs, end_epoch)
+        )
+        rows = list(self._sorted_rows[lo:hi])
+        rows.extend(self._untimed_rows)
+        rows.sort()
+        return rows
+
+    def _service_ids_matching(self, service: str) -> Set[int]:
+        return {
+            service_id
+            for service_id, name in enumerate(self._service_names)
+            if service_id != UNSTRUCTURED_ID and service in name
+        }
+
+    # ------------------------------------------------------------------
+    # Public queries
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        pattern: Optional[str] = None,
+        log_level: Optional[str] = None,
+        start_epoch: Optional[float] = None,
+        end_epoch: Optional[float] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, str]]:
+        """Return up to limit entries in file order matching all filters.
+
+        The most selective index (token, level or time range) drives the scan
+        in row order; the remaining filters are checked per row, and the scan
+        stops as soon as limit entries have matched.
+        """
+        self.refresh()
+        with self._lock:
+            pattern_lower = pattern.lower() if pattern else None
+            time_filtered = start_epoch is not None or end_epoch is not None
+            lo = -math.inf if start_epoch is None else start_epoch
+            hi = math.inf if end_epoch is None else end_epoch
+
+            level_id = None
+            drivers: List[Tuple[int, Callable[[], Iterable[int]]]] = []
+            if log_level:
+                level_id = self._level_lookup.get(log_level)
+                if level_id is None:
+                    return []
+                level_rows = self._level_postings[level_id]
+                drivers.append((len(level_rows), lambda: level_rows))
+
+            if pattern_lower:
+                postings = self._pattern_postings(pattern_lower)
+                if postings is not None:
+                    size = sum(len(p) for p in postings)
+                    drivers.append((size, lambda: _unique(heapq.merge(*postings))))
+
+            if time_filtered and self._sorted_epochs:
+                self._ensure_time_index()
+                size = (
+                    bisect.bisect_right(self._sorted_epochs, hi)
+                    - bisect.bisect_left(self._sorted_epochs, lo)
+                    + len(self._untimed_rows)
+                )
+                drivers.append((size, lambda: self._time_range_rows(start_epoch, end_epoch)))
+
+            if drivers:
+                rows = min(drivers, key=lambda driver: driver[0])[1]()
+            else:
+                rows = range(len(self._lines))
+
+            results = []
+            for row in rows:
+                if level_id is not None and self._level_ids[row] != level_id:
+                    continue
+                if time_filtered:
+                    if self._level_ids[row] == UNSTRUCTURED_ID:
+                        continue
+                    epoch = self._epochs[row]
+                    if not math.isnan(epoch) and (epoch < lo or epoch > hi):
+                        continue
+                if pattern_lower and pattern_lower not in self._lines[row].lower():
+                    continue
+                results.append(self._entry(row))
+                if len(results) >= limit:
+                    break
+            return results
+
+    def recent(self, limit: int = 100, service: Optional[str] = None) -> List[Dict[str, str]]:
+        """Return the last limit entries, most recent first"""
+        self.refresh()
+        with self._lock:
+            if not service:
+                start = max(len(self._lines) - limit, 0)
+                return [self._entry(row) for row in range(len(self._lines) - 1, start - 1, -1)]
+
+            rows: List[int] = []
+            for service_id in self._service_ids_matching(service):
+                rows.extend(self._service_postings[service_id][-limit:])
+            rows.sort(reverse=True)
+            return [self._entry(row) for row in rows[:limit]]
+
+    def stats(self) -> Dict[str, int]:
+        """Return index sizes for diagnostics"""
+        with self._lock:
+            return {
+                "entries": len(self._lines),
+                "levels": len(self._level_names) - 1,
+                "services": len(self._service_names) - 1,
+                "tokens": len(self._token_postings),
+                "bytes_indexed": self._offset,
+            }
@@ -1,5 +1,5 @@
-import json
 import logging
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
@@ -11,10 +11,17 @@ from fastapi import (
     HTTPException,
     Depends,
 )
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
+from log_reader import scan_search, tail_recent
+from log_store import LogStore
 from retrieve_api_key import retrieve_api_key
 
+# Add parent directory to path to import shared backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from dataset_cache import DATASETS, expect_keys, expect_list
+from request_tracing import RequestTracer
+
 # Configure logging with basicConfig
 logging.basicConfig(
     level=logging.INFO,  # Set the log level to INFO
@@ -23,9 +30,34 @@ logging.basicConfig(
 )
 
 app = FastAPI(title="Application Logs API", version="1.0.0")
+TRACER = RequestTracer("logs-api")
 
 DATA_PATH = Path(__file__).parent.parent / "data" / "logs_data"
 
+APPLICATION_LOG_PATH = DATA_PATH / "application.log"
+
+# Cached JSON datasets; missing pattern/count files report empty results
+ERROR_LOG_DATASET = DATASETS.register(DATA_PATH / "error.log", expect_list)
+LOG_PATTERNS_DATASET = DATASETS.register(
+    DATA_PATH / "log_patterns.json", expect_keys(patterns=list), default={}
+)
+LOG_COUNTS_DATASET = DATASETS.register(
+    DATA_PATH / "log_counts.json",
+    expect_keys(error_counts=dict, all_counts=dict),
+    default={},
+)
+
+# Loaded once on first use and tailed for appended lines afterwards
+APPLICATION_LOG_STORE = LogStore(APPLICATION_LOG_PATH)
+
+# How application.log is queried (overridable from the command line):
+#   "indexed"   - always serve from the in-memory LogStore
+#   "streaming" - always scan the file with bounded memory (O(limit))
+#   "auto"      - index files up to LOG_INDEX_MAX_BYTES, stream larger ones
+LOG_QUERY_MODE = "auto"
+LOG_INDEX_MAX_BYTES = 256 * 1024 * 1024
+LOG_USE_MMAP = False
+
 # API Key for authentication
 CREDENTIAL_PROVIDER_NAME = "sre-agent-api-key-credential-provider"
 
@@ -47,6 +79,9 @@ def _validate_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     return x_api_key
 
 
+TRACER.install(app, dependencies=[Depends(_validate_api_key)])
+
+
 def _parse_timestamp(timestamp_str: str) -> datetime:
     """Parse ISO timestamp string to datetime object"""
     try:
@@ -94,53 +129,33 @@ def _filter_by_time(
     return filtered_logs
 
 
-def _parse_log_file(file_path: Path, pattern: Optional[str] = None):
-    """Parse log file and filter by pattern"""
-    logs = []
-
-    if file_path.suffix == ".json":
-        with open(file_path, "r") as f:
-            data = json.load(f)
-            # Handle both array and object with array
-            if isinstance(data, list):
-                logs = data
-            elif isinstance(data, dict):
-                # Get the first array value in the dict
-                for key, value in data.items():
-                    if isinstance(value, list):
-                        logs = value
-                        break
-    else:
-        # Parse text log files
-        with open(file_path, "r") as f:
-            for line in f:
-                if pattern and pattern.lower() not in line.lower():
-                    continue
-                # Parse log line to extract timestamp, level, and message
-                parts = line.strip().split(" ", 3)
-                if len(parts) >= 4:
-                    timestamp = parts[0]
-                    level_part = parts[1]
-                    service = parts[2]
-                    message = parts[3] if len(parts) > 3 else ""
-
-                    # Extract log level from [LEVEL] format
-                    level = "INFO"
-                    if "[" in level_part and "]" in level_part:
-                        level = level_part.strip("[]")
-
-                    logs.append(
-                        {
-                            "timestamp": timestamp,
-                            "level": level,
-                            "service": service,
-                            "message": message,
-                        }
-                    )
-                else:
-                    logs.append({"message": line.strip()})
+def _json_response(body: bytes) -> Response:
+    """Wrap pre-serialized JSON bytes in a response"""
+    return Response(content=body, media_type="application/json")
+
+
+def _preload() -> None:
+    """Load the datasets and, if it will be used, the application log index"""
+    DATASETS.preload()
+    if _use_log_index():
+        APPLICATION_LOG_STORE.refresh()
+
+
+def _use_log_index() -> bool:
+    """Decide whether application.log queries are served from the index"""
+    if LOG_QUERY_MODE == "indexed":
+        return True
+    if LOG_QUERY_MODE == "auto":
+        try:
+            if APPLICATION_LOG_PATH.stat().st_size <= LOG_INDEX_MAX_BYTES:
+                return True
+        except FileNotFoundError:
+            return True
 
-    return logs
+    if len(APPLICATION_LOG_STORE):
+        logging.info("Application log exceeds index limit, switching to streaming reads")
+        APPLICATION_LOG_STORE.clear()
+    return False
 
 
 @app.get("/logs/search")
@@ -155,18 +170,29 @@ async def search_logs(
 ):
     """Search logs by pattern/timeframe"""
     try:
-        application_logs = _parse_log_file(DATA_PATH / "application.log", pattern)
-
-        # Filter by log level if provided
-        if log_level:
-            application_logs = [
-                log for log in application_logs if log.get("level") == log_level
-            ]
-
-        # Filter by time range
-        application_logs = _filter_by_time(application_logs, start_time, end_time)
-
-        return {"logs": application_logs[:100]}  # Limit results
+        start_epoch = _parse_timestamp(start_time).timestamp() if start_time else None
+        end_epoch = _parse_timestamp(end_time).timestamp() if end_time else None
+
+        if _use_log_index():
+            application_logs = APPLICATION_LOG_STORE.search(
+                pattern=pattern,
+                log_level=log_level,
+                start_epoch=start_epoch,
+                end_epoch=end_epoch,
+                limit=100,  # Limit results
+            )
+        else:
+            application_logs = scan_search(
+                APPLICATION_LOG_PATH,
+                pattern=pattern,
+                log_level=log_level,
+                start_epoch=start_epoch,
+                end_epoch=end_epoch,
+                limit=100,  # Limit results
+                use_mmap=LOG_USE_MMAP,
+            )
+
+        return {"logs": application_logs}
     except Exception as e:
         logging.error(f"Error searching logs: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -180,17 +206,17 @@ async def get_error_logs(
 ):
     """Retrieve error-specific entries"""
     try:
-        with open(DATA_PATH / "error.log", "r") as f:
-            error_logs = json.load(f)
+        def _build(error_logs: list) -> dict:
+            if service:
+                error_logs = [log for log in error_logs if log.get("service") == service]
 
-        if service:
-            error_logs = [log for log in error_logs if log.get("service") == service]
+            # Filter by since timestamp
+            if since:
+                error_logs = _filter_by_time(error_logs, start_time=since)
 
-        # Filter by since timestamp
-        if since:
-            error_logs = _filter_by_time(error_logs, start_time=since)
+            return {"errors": error_logs}
 
-        return {"errors": error_logs}
+        return _json_response(ERROR_LOG_DATASET.response_bytes((since, service), _build))
     except Exception as e:
         logging.error(f"Error retrieving error logs: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -210,20 +236,13 @@ async def analyze_log_patterns(
 ):
     """Identify recurring issues"""
     try:
-        # Read patterns from actual data file
-        patterns_file = DATA_PATH / "log_patterns.json"
-        if not patterns_file.exists():
-            return {"patterns": []}
-        
-        with open(patterns_file, "r") as f:
-            data = json.load(f)
-        
-        patterns = data.get("patterns", [])
-        
-        # Filter by min_occurrences
-        patterns = [p for p in patterns if p["count"] >= min_occurrences]
-
-        return {"patterns": patterns}
+        def _build(data: dict) -> dict:
+            # Filter by min_occurrences
+            patterns = [p for p in data["patterns"] if p["count"] >= min_occurrences]
+
+            return {"patterns": patterns}
+
+        return _json_response(LOG_PATTERNS_DATASET.response_bytes(min_occurrences, _build))
     except Exception as e:
         logging.error(f"Error analyzing log patterns: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -239,14 +258,13 @@ async def get_recent_logs(
 ):
     """Fetch latest log entries"""
     try:
-        all_logs = _parse_log_file(DATA_PATH / "application.log")
-
-        if service:
-            all_logs = [log for log in all_logs if service in log.get("service", "")]
-
-        # Return the most recent logs (last N entries)
-        recent_logs = all_logs[-limit:] if len(all_logs) > limit else all_logs
-        recent_logs.reverse()  # Most recent first
+        # Most recent first
+        if _use_log_index():
+            recent_logs = APPLICATION_LOG_STORE.recent(limit=limit, service=service)
+        else:
+            recent_logs = tail_recent(
+                APPLICATION_LOG_PATH, limit=limit, service=service, use_mmap=LOG_USE_MMAP
+            )
 
         return {"logs": recent_logs}
     except Exception as e:
@@ -269,30 +287,29 @@ async def count_log_events(
 ):
     """Count occurrences of specific events"""
     try:
-        # Read counts from actual data file
-        counts_file = DATA_PATH / "log_counts.json"
-        if not counts_file.exists():
-            return {"total_count": 0, "counts": []}
-        
-        with open(counts_file, "r") as f:
-            data = json.load(f)
-        
-        if event_type.lower() == "error":
-            error_data = data.get("error_counts", {})
-            total_count = error_data.get("total_count", 0)
-            
-            if group_by == "service":
-                counts = error_data.get("by_service", [])
-            elif group_by == "level":
-                counts = error_data.get("by_level", [])
+        is_error = event_type.lower() == "error"
+
+        def _build(data: dict) -> dict:
+            if is_error:
+                error_data = data["error_counts"]
+                total_count = error_data.get("total_count", 0)
+
+                if group_by == "service":
+                    counts = error_data.get("by_service", [])
+                elif group_by == "level":
+                    counts = error_data.get("by_level", [])
+                else:
+                    counts = []
             else:
-                counts = []
-        else:
-            all_data = data.get("all_counts", {})
-            total_count = all_data.get("total_count", 0)
-            counts = all_data.get("by_level", [])
+                all_data = data["all_counts"]
+                total_count = all_data.get("total_count", 0)
+                counts = all_data.get("by_level", [])
+
+            return {"total_count": total_count, "counts": counts}
 
-        return {"total_count": total_count, "counts": counts}
+        # Non-error event types all share the same response
+        key = (is_error, group_by if is_error else None)
+        return _json_response(LOG_COUNTS_DATASET.response_bytes(key, _build))
     except Exception as e:
         logging.error(f"Error counting log events: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -305,7 +322,6 @@ async def health_check(api_key: str = Depends(_validate_api_key)):
 
 
 if __name__ == "__main__":
-    import uvicorn
     import sys
     import argparse
     from pathlib import Path
@@ -313,6 +329,7 @@ if __name__ == "__main__":
     # Add parent directory to path to import config_utils
     sys.path.append(str(Path(__file__).parent.parent))
     from config_utils import get_server_port
+    from prefork import serve
 
     parser = argparse.ArgumentParser(description="Logs API Server")
     parser.add_argument("--host", type=str, required=True, 
@@ -320,8 +337,26 @@ if __name__ == "__main__":
     parser.add_argument("--ssl-keyfile", type=str, help="Path to SSL private key file")
     parser.add_argument("--ssl-certfile", type=str, help="Path to SSL certificate file")
     parser.add_argument("--port", type=int, help="Port to bind to (overrides config)")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Worker processes pre-forked on a shared socket (default: 1)")
+    parser.add_argument("--log-query-mode", type=str, choices=["auto", "indexed", "streaming"],
+                       default=LOG_QUERY_MODE, help="How application.log is queried (default: auto)")
+    parser.add_argument("--log-index-max-mb", type=int, default=LOG_INDEX_MAX_BYTES // (1024 * 1024),
+                       help="Largest application.log kept in the in-memory index in auto mode")
+    parser.add_argument("--log-mmap", action="store_true", help="Read application.log through mmap when streaming")
+    parser.add_argument("--trace-sample-rate", type=float, default=TRACER.sample_rate,
+                       help="Fraction of requests whose timing trace is logged")
+    parser.add_argument("--slow-request-ms", type=float, default=TRACER.slow_request_ms,
+                       help="Requests slower than this are logged with their payload")
     
     args = parser.parse_args()
+
+    TRACER.sample_rate = args.trace_sample_rate
+    TRACER.slow_request_ms = args.slow_request_ms
+
+    LOG_QUERY_MODE = args.log_query_mode
+    LOG_INDEX_MAX_BYTES = args.log_index_max_mb * 1024 * 1024
+    LOG_USE_MMAP = args.log_mmap
     
     port = args.port if args.port else get_server_port("logs")
     
@@ -339,4 +374,5 @@ if __name__ == "__main__":
         protocol = "HTTP"
     
     logging.info(f"Starting Logs server on {protocol}://{args.host}:{port}")
-    uvicorn.run(app, host=args.host, port=port, **ssl_config)
+    serve(app, host=args.host, port=port, workers=args.workers,
+          preload=_preload, name="Logs server", **ssl_config)
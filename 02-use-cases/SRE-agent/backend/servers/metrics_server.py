@@ -1,5 +1,5 @@
-import json
 import logging
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
@@ -11,10 +11,15 @@ from fastapi import (
     HTTPException,
     Depends,
 )
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from retrieve_api_key import retrieve_api_key
 
+# Add parent directory to path to import shared backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from dataset_cache import DATASETS, expect_keys
+from request_tracing import RequestTracer
+
 # Configure logging with basicConfig
 logging.basicConfig(
     level=logging.INFO,  # Set the log level to INFO
@@ -23,9 +28,27 @@ logging.basicConfig(
 )
 
 app = FastAPI(title="Application Metrics API", version="1.0.0")
+TRACER = RequestTracer("metrics-api")
 
 DATA_PATH = Path(__file__).parent.parent / "data" / "metrics_data"
 
+# Cached datasets, loaded once and reloaded when the data files change
+RESPONSE_TIMES_DATASET = DATASETS.register(
+    DATA_PATH / "response_times.json", expect_keys(metrics=list)
+)
+THROUGHPUT_DATASET = DATASETS.register(DATA_PATH / "throughput.json", expect_keys(metrics=list))
+RESOURCE_USAGE_DATASET = DATASETS.register(
+    DATA_PATH / "resource_usage.json", expect_keys(metrics=list)
+)
+ERROR_RATES_DATASET = DATASETS.register(
+    DATA_PATH / "error_rates.json", expect_keys(error_rates=list)
+)
+AVAILABILITY_DATASET = DATASETS.register(
+    DATA_PATH / "availability.json", expect_keys(availability_metrics=list)
+)
+# A missing trends file reports "no_data" rather than failing
+TRENDS_DATASET = DATASETS.register(DATA_PATH / "trends.json", expect_keys(), default={})
+
 # API Key for authentication
 CREDENTIAL_PROVIDER_NAME = "sre-agent-api-key-credential-provider"
 
@@ -47,6 +70,9 @@ def _validate_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     return x_api_key
 
 
+TRACER.install(app, dependencies=[Depends(_validate_api_key)])
+
+
 def _parse_timestamp(timestamp_str: str) -> datetime:
     """Parse ISO timestamp string to datetime object"""
     try:
@@ -62,6 +88,11 @@ def _parse_timestamp(timestamp_str: str) -> datetime:
         return datetime.now(timezone.utc)
 
 
+def _json_response(body: bytes) -> Response:
+    """Wrap pre-serialized JSON bytes in a response"""
+    return Response(content=body, media_type="application/json")
+
+
 def _filter_metrics_by_time(
     metrics: list, start_time: Optional[str] = None, end_time: Optional[str] = None
 ) -> list:
@@ -108,25 +139,23 @@ async def get_performance_metrics(
 ):
     """Retrieve performance data"""
     try:
-        metrics = []
-
         if metric_type == "response_time":
-            with open(DATA_PATH / "response_times.json", "r") as f:
-                data = json.load(f)
-                metrics = data.get("metrics", [])
+            dataset = RESPONSE_TIMES_DATASET
         elif metric_type == "throughput":
-            with open(DATA_PATH / "throughput.json", "r") as f:
-                data = json.load(f)
-                metrics = data.get("metrics", [])
-        elif metric_type in ["cpu_usage", "memory_usage"]:
-            with open(DATA_PATH / "resource_usage.json", "r") as f:
-                data = json.load(f)
-                raw_metrics = data.get("metrics", [])
+            dataset = THROUGHPUT_DATASET
+        else:
+            # cpu_usage/memory_usage, or combined metrics for demo
+            dataset = RESOURCE_USAGE_DATASET
+
+        def _build(data: dict) -> dict:
+            metrics = data["metrics"]
+
+            if metric_type in ["cpu_usage", "memory_usage"]:
                 # Transform resource metrics to match expected format
-                metrics = []
-                for m in raw_metrics:
+                transformed = []
+                for m in metrics:
                     if metric_type == "cpu_usage":
-                        metrics.append(
+                        transformed.append(
                             {
                                 "timestamp": m["timestamp"],
                                 "service": m["service"],
@@ -135,7 +164,7 @@ async def get_performance_metrics(
                             }
                         )
                     else:  # memory_usage
-                        metrics.append(
+                        transformed.append(
                             {
                                 "timestamp": m["timestamp"],
                                 "service": m["service"],
@@ -143,19 +172,19 @@ async def get_performance_metrics(
                                 "unit": "MB",
                             }
                         )
-        else:
-            # Return combined metrics for demo
-            with open(DATA_PATH / "resource_usage.json", "r") as f:
-                data = json.load(f)
-                metrics = data.get("metrics", [])
+                metrics = transformed
 
-        if service:
-            metrics = [m for m in metrics if m.get("service") == service]
+            if service:
+                metrics = [m for m in metrics if m.get("service") == service]
 
-        # Filter by time range
-        metrics = _filter_metrics_by_time(metrics, start_time, end_time)
+            # Filter by time range
+            metrics = _filter_metrics_by_time(metrics, start_time, end_time)
 
-        return {"metrics": metrics}
+            return {"metrics": metrics}
+
+        return _json_response(
+            dataset.response_bytes((metric_type, start_time, end_time, service), _build)
+        )
     except Exception as e:
         logging.error(f"Error retrieving performance metrics: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -171,17 +200,17 @@ async def get_error_rates(
 ):
     """Fetch error rate statistics"""
     try:
-        with open(DATA_PATH / "error_rates.json", "r") as f:
-            data = json.load(f)
+        def _build(data: dict) -> dict:
+            error_rates = data["error_rates"]
 
-        error_rates = data.get("error_rates", [])
+            if service:
+                error_rates = [e for e in error_rates if e.get("service") == service]
 
-        if service:
-            error_rates = [e for e in error_rates if e.get("service") == service]
+            # TODO: In real implementation, would filter by time window
 
-        # TODO: In real implementation, would filter by time window
+            return {"error_rates": error_rates}
 
-        return {"error_rates": error_rates}
+        return _json_response(ERROR_RATES_DATASET.response_bytes(service, _build))
     except Exception as e:
         logging.error(f"Error retrieving error rates: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -202,34 +231,36 @@ async def get_resource_metrics(
 ):
     """Monitor resource utilization"""
     try:
-        with open(DATA_PATH / "resource_usage.json", "r") as f:
-            data = json.load(f)
-
-        metrics = data.get("metrics", [])
-
-        if service:
-            metrics = [m for m in metrics if m.get("service") == service]
-
-        # Filter by resource type if specified
-        if resource_type:
-            filtered_metrics = []
-            for m in metrics:
-                filtered = {"timestamp": m["timestamp"], "service": m["service"]}
-                if resource_type == "cpu":
-                    filtered["cpu_usage_percent"] = m.get("cpu_usage_percent")
-                elif resource_type == "memory":
-                    filtered["memory_usage_mb"] = m.get("memory_usage_mb")
-                    filtered["memory_usage_percent"] = m.get("memory_usage_percent")
-                elif resource_type == "disk":
-                    filtered["disk_io_read_mb"] = m.get("disk_io_read_mb")
-                    filtered["disk_io_write_mb"] = m.get("disk_io_write_mb")
-                elif resource_type == "network":
-                    filtered["network_in_mb"] = m.get("network_in_mb")
-                    filtered["network_out_mb"] = m.get("network_out_mb")
-                filtered_metrics.append(filtered)
-            metrics = filtered_metrics
-
-        return {"metrics": metrics}
+        def _build(data: dict) -> dict:
+            metrics = data["metrics"]
+
+            if service:
+                metrics = [m for m in metrics if m.get("service") == service]
+
+            # Filter by resource type if specified
+            if resource_type:
+                filtered_metrics = []
+                for m in metrics:
+                    filtered = {"timestamp": m["timestamp"], "service": m["service"]}
+                    if resource_type == "cpu":
+                        filtered["cpu_usage_percent"] = m.get("cpu_usage_percent")
+                    elif resource_type == "memory":
+                        filtered["memory_usage_mb"] = m.get("memory_usage_mb")
+                        filtered["memory_usage_percent"] = m.get("memory_usage_percent")
+                    elif resource_type == "disk":
+                        filtered["disk_io_read_mb"] = m.get("disk_io_read_mb")
+                        filtered["disk_io_write_mb"] = m.get("disk_io_write_mb")
+                    elif resource_type == "network":
+                        filtered["network_in_mb"] = m.get("network_in_mb")
+                        filtered["network_out_mb"] = m.get("network_out_mb")
+                    filtered_metrics.append(filtered)
+                metrics = filtered_metrics
+
+            return {"metrics": metrics}
+
+        return _json_response(
+            RESOURCE_USAGE_DATASET.response_bytes(("resources", resource_type, service), _build)
+        )
     except Exception as e:
         logging.error(f"Error retrieving resource metrics: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -247,19 +278,19 @@ async def get_availability_metrics(
 ):
     """Check service availability"""
     try:
-        with open(DATA_PATH / "availability.json", "r") as f:
-            data = json.load(f)
+        def _build(data: dict) -> dict:
+            availability_metrics = data["availability_metrics"]
 
-        availability_metrics = data.get("availability_metrics", [])
+            if service:
+                availability_metrics = [
+                    a for a in availability_metrics if a.get("service") == service
+                ]
 
-        if service:
-            availability_metrics = [
-                a for a in availability_metrics if a.get("service") == service
-            ]
+            # TODO: In real implementation, would calculate based on time window
 
-        # TODO: In real implementation, would calculate based on time window
+            return {"availability_metrics": availability_metrics}
 
-        return {"availability_metrics": availability_metrics}
+        return _json_response(AVAILABILITY_DATASET.response_bytes(service, _build))
     except Exception as e:
         logging.error(f"Error retrieving availability metrics: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -281,43 +312,35 @@ async def analyze_trends(
 ):
     """Identify metric trends and anomalies"""
     try:
-        # Read trends from actual data file
-        trends_file = DATA_PATH / "trends.json"
-        if not trends_file.exists():
-            return {
-                "trend": "no_data",
-                "average_value": 0,
-                "standard_deviation": 0,
-                "anomalies": [],
-            }
-        
-        with open(trends_file, "r") as f:
-            data = json.load(f)
-        
         # Determine which trend data to use based on metric name
         if "response" in metric_name.lower():
-            trend_data = data.get("response_time_trends", {})
+            trend_key = "response_time_trends"
         elif "error" in metric_name.lower():
-            trend_data = data.get("error_rate_trends", {})
+            trend_key = "error_rate_trends"
         elif "cpu" in metric_name.lower():
-            trend_data = data.get("cpu_trends", {})
+            trend_key = "cpu_trends"
         elif "memory" in metric_name.lower():
-            trend_data = data.get("memory_trends", {})
+            trend_key = "memory_trends"
         else:
-            trend_data = {}
-
-        # Default values if no data found
-        trend = trend_data.get("trend", "no_data")
-        average_value = trend_data.get("average_value", 0)
-        standard_deviation = trend_data.get("standard_deviation", 0)
-        anomalies = trend_data.get("anomalies", [])
-
-        return {
-            "trend": trend,
-            "average_value": average_value,
-            "standard_deviation": standard_deviation,
-            "anomalies": anomalies,
-        }
+            trend_key = None
+
+        def _build(data: dict) -> dict:
+            trend_data = data.get(trend_key, {}) if trend_key else {}
+
+            # Default values if no data found
+            trend = trend_data.get("trend", "no_data")
+            average_value = trend_data.get("average_value", 0)
+            standard_deviation = trend_data.get("standard_deviation", 0)
+            anomalies = trend_data.get("anomalies", [])
+
+            return {
+                "trend": trend,
+                "average_value": average_value,
+                "standard_deviation": standard_deviation,
+                "anomalies": anomalies,
+            }
+
+        return _json_response(TRENDS_DATASET.response_bytes(trend_key, _build))
     except Exception as e:
         logging.error(f"Error analyzing trends: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -330,7 +353,6 @@ async def health_check(api_key: str = Depends(_validate_api_key)):
 
 
 if __name__ == "__main__":
-    import uvicorn
     import sys
     import argparse
     from pathlib import Path
@@ -338,6 +360,7 @@ if __name__ == "__main__":
     # Add parent directory to path to import config_utils
     sys.path.append(str(Path(__file__).parent.parent))
     from config_utils import get_server_port
+    from prefork import serve
 
     parser = argparse.ArgumentParser(description="Metrics API Server")
     parser.add_argument("--host", type=str, required=True, 
@@ -345,8 +368,17 @@ if __name__ == "__main__":
     parser.add_argument("--ssl-keyfile", type=str, help="Path to SSL private key file")
     parser.add_argument("--ssl-certfile", type=str, help="Path to SSL certificate file")
     parser.add_argument("--port", type=int, help="Port to bind to (overrides config)")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Worker processes pre-forked on a shared socket (default: 1)")
+    parser.add_argument("--trace-sample-rate", type=float, default=TRACER.sample_rate,
+                       help="Fraction of requests whose timing trace is logged")
+    parser.add_argument("--slow-request-ms", type=float, default=TRACER.slow_request_ms,
+                       help="Requests slower than this are logged with their payload")
     
     args = parser.parse_args()
+
+    TRACER.sample_rate = args.trace_sample_rate
+    TRACER.slow_request_ms = args.slow_request_ms
     
     port = args.port if args.port else get_server_port("metrics")
     
@@ -364,4 +396,5 @@ if __name__ == "__main__":
         protocol = "HTTP"
     
     logging.info(f"Starting Metrics server on {protocol}://{args.host}:{port}")
-    uvicorn.run(app, host=args.host, port=port, **ssl_config)
+    serve(app, host=args.host, port=port, workers=args.workers,
+          preload=DATASETS.preload, name="Metrics server", **ssl_config)
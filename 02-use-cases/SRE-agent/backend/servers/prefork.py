@@ -0,0 +1,173 @@
+"""
+Pre-forked multi-worker serving for the stub servers.
+
+The parent process loads the app and its datasets, binds the listening
+socket and then forks the workers, so every worker accepts connections on
+the same socket and shares the loaded data with the parent copy-on-write.
+The parent stays as a supervisor that restarts workers which exit
+unexpectedly and shuts them all down on SIGINT or SIGTERM.
+"""
+
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Callable, Dict, Optional
+
+import uvicorn
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+# A worker exiting sooner than this after it started counts as a crash loop
+MIN_WORKER_UPTIME = 5.0
+
+# Longest delay before restarting a worker that keeps crashing
+MAX_RESTART_DELAY = 30.0
+
+# Seconds workers get to finish in-flight requests on shutdown
+SHUTDOWN_TIMEOUT = 10.0
+
+
+class PreforkSupervisor:
+    """Forks and supervises the worker processes for one server"""
+
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, workers: int, name: str) -> None:
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.name = name
+
+        self._children: Dict[int, float] = {}
+        self._restart_delay = 0.0
+        self._should_exit = False
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            # Worker: uvicorn installs its own handlers for these
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, signal.SIG_DFL)
+            exit_code = 0
+            try:
+                uvicorn.Server(self.config).run(sockets=[self.sock])
+            except BaseException:
+                logging.exception(f"{self.name} worker {os.getpid()} failed")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self._children[pid] = time.monotonic()
+
+    def _handle_exit(self, sig: int, frame) -> None:
+        self._should_exit = True
+
+    def _reap(self) -> None:
+        """Collect exited workers and start replacements"""
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self._children.pop(pid, None)
+            if started is None or self._should_exit:
+                continue
+
+            uptime = time.monotonic() - started
+            logging.error(
+                f"{self.name} worker {pid} exited with status {os.waitstatus_to_exitcode(status)} "
+                f"after {uptime:.1f}s, restarting"
+            )
+            if uptime < MIN_WORKER_UPTIME:
+                self._restart_delay = min(MAX_RESTART_DELAY, max(1.0, self._restart_delay * 2))
+                logging.warning(f"{self.name} workers are crash looping, waiting {self._restart_delay:.0f}s")
+                self._sleep(self._restart_delay)
+            else:
+                self._restart_delay = 0.0
+            if not self._should_exit:
+                self._spawn()
+
+    def _sleep(self, seconds: float) -> None:
+        deadline = time.monotonic() + seconds
+        while not self._should_exit and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+    def _stop_workers(self) -> None:
+        for pid in self._children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        while self._children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+
+        for pid in self._children:
+            logging.warning(f"Force killing {self.name} worker {pid}")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self._children.clear()
+
+    def run(self) -> None:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self._handle_exit)
+
+        for _ in range(self.workers):
+            self._spawn()
+        logging.info(f"{self.name} running {self.workers} workers (supervisor pid {os.getpid()})")
+
+        while not self._should_exit:
+            self._reap()
+            time.sleep(0.2)
+
+        logging.info(f"Stopping {self.name} workers...")
+        self._stop_workers()
+        self.sock.close()
+
+
+def serve(
+    app,
+    host: str,
+    port: int,
+    workers: int = 1,
+    preload: Optional[Callable[[], None]] = None,
+    name: str = "Server",
+    **uvicorn_kwargs,
+) -> None:
+    """Serve app with uvicorn, pre-forking workers when workers > 1.
+
+    preload is called in the parent before forking so the data it loads is
+    shared by all workers instead of being loaded by each of them.
+    """
+    if workers <= 1 or not hasattr(os, "fork"):
+        if workers > 1:
+            logging.warning("Pre-forked workers need os.fork, running a single process")
+        uvicorn.run(app, host=host, port=port, **uvicorn_kwargs)
+        return
+
+    config = uvicorn.Config(app, host=host, port=port, workers=workers, **uvicorn_kwargs)
+    config.load()
+    if preload is not None:
+        preload()
+
+    sock = config.bind_socket()
+
+    # Move everything loaded so far out of the collector's reach, so that
+    # garbage collection in the workers does not write to (and copy) the
+    # pages shared with the parent
+    gc.collect()
+    gc.freeze()
+
+    PreforkSupervisor(config, sock, workers, name).run()
@@ -1,3 +1,4 @@
+import argparse
 import logging
 import subprocess
 import sys
@@ -27,7 +28,7 @@ def _stream_output(process, name):
             print(f"[{name} ERROR] {line.decode().rstrip()}", file=sys.stderr)
 
 
-def _run_servers():
+def _run_servers(args: argparse.Namespace):
     """Run all stub servers concurrently"""
     # Get ports from OpenAPI specifications
     ports = get_server_ports()
@@ -54,10 +55,14 @@ def _run_servers():
     # Change to the project directory
     project_dir = Path(__file__).parent
 
+    server_args = ["--host", args.host, "--workers", str(args.workers)]
+    if args.ssl_keyfile and args.ssl_certfile:
+        server_args += ["--ssl-keyfile", args.ssl_keyfile, "--ssl-certfile", args.ssl_certfile]
+
     for name, script, port in servers:
-        logging.info(f"Starting {name} on port {port}...")
+        logging.info(f"Starting {name} on port {port} with {args.workers} worker(s)...")
         process = subprocess.Popen(
-            [sys.executable, script],
+            [sys.executable, script, *server_args],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             cwd=project_dir,
@@ -116,8 +121,16 @@ def _run_servers():
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Run all SRE backend stub servers")
+    parser.add_argument("--host", type=str, default="localhost", help="Host to bind to (default: localhost)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes pre-forked per server on a shared socket (default: 1)")
+    parser.add_argument("--ssl-keyfile", type=str, help="Path to SSL private key file")
+    parser.add_argument("--ssl-certfile", type=str, help="Path to SSL certificate file")
+    args = parser.parse_args()
+
     try:
-        _run_servers()
+        _run_servers(args)
     except Exception as e:
         logging.error(f"Error running servers: {str(e)}")
         sys.exit(1)
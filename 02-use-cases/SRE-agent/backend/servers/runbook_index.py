@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Full-text search index for runbooks.
+
+Documents are indexed per field (title, description, triggers, steps and
+free-form markdown content) and ranked with BM25F: per-field term frequencies
+are length-normalized, weighted by a field boost and combined before BM25
+saturation. Query terms also match indexed terms they are a prefix of, at a
+reduced weight, so "data" still finds "database".
+
+The index is updated incrementally: each source (the playbooks JSON file, each
+markdown file) is synced by document fingerprint, so only added, changed or
+removed documents touch the postings.
+
+Runbooks that contain the keyword as a case-insensitive substring, the match
+used before the index existed, are always returned too: unscored, after the
+ranked hits. Term matching cannot find a keyword inside a word ("start" in
+"restart"), so without this a query could return fewer runbooks than it used
+to. The substring scan still walks every document, but its result is cached
+per keyword until the next sync.
+"""
+
+import bisect
+import hashlib
+import heapq
+import json
+import logging
+import math
+import re
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+FIELD_BOOSTS = {
+    "title": 3.0,
+    "description": 2.0,
+    "triggers": 1.5,
+    "steps": 1.0,
+    "content": 1.0,
+}
+FIELDS = list(FIELD_BOOSTS)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Weight applied to indexed terms matched by prefix rather than exactly
+PREFIX_WEIGHT = 0.5
+MIN_PREFIX_LENGTH = 2
+
+# Scored query terms kept between syncs (repeat searches skip BM25 math)
+MAX_CACHED_TERMS = 256
+# Substring scan results kept between syncs
+MAX_CACHED_SUBSTRINGS = 256
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {"a", "an", "and", "are", "for", "if", "in", "is", "of", "on", "or", "the", "to", "with"}
+
+# Markdown runbook sections: "## Title" followed by "**Some ID:** `value`" lines
+MARKDOWN_SECTION = re.compile(r"^## (.+)$", re.MULTILINE)
+MARKDOWN_ID = re.compile(r"^\*\*[\w ]*ID:\*\*\s*`([^`]+)`", re.MULTILINE)
+MARKDOWN_FIELD = re.compile(
+    r"^\*\*(Incident Type|Severity|Estimated Resolution Time):\*\*\s*(.+?)\s*$", re.MULTILINE
+)
+MARKDOWN_SUBSECTION = re.compile(r"^### (.+)$", re.MULTILINE)
+MARKDOWN_LIST_ITEM = re.compile(r"^\s*(?:[-*]|\d+\.)\s+(.+?)\s*$", re.MULTILINE)
+MARKDOWN_ESCALATION = re.compile(r"^\*\*([\w ]+):\*\*\s*(.+)$")
+# "### " headings whose list items map onto playbook fields
+TRIGGER_SECTIONS = {"triggers", "trigger conditions", "symptoms"}
+STEP_SECTION = re.compile(r"steps|fixes|solutions|commands", re.IGNORECASE)
+
+# Fields the fallback substring scan looks at
+SUBSTRING_FIELDS = ("title", "description", "steps", "content")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens with stopwords removed"""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _field_text(value: Any) -> str:
+    if isinstance(value, list):
+        return " ".join(str(item) for item in value)
+    return str(value) if value else ""
+
+
+def _fingerprint(document: Dict[str, Any]) -> str:
+    encoded = json.dumps(document, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded, usedforsecurity=False).hexdigest()
+
+
+def _markdown_subsections(body: str) -> Dict[str, str]:
+    """Text of each "### " subsection of a markdown runbook, by lowercased heading"""
+    matches = list(MARKDOWN_SUBSECTION.finditer(body))
+    return {
+        match.group(1).strip().lower(): body[
+            match.end() : matches[i + 1].start() if i + 1 < len(matches) else len(body)
+        ].strip()
+        for i, match in enumerate(matches)
+    }
+
+
+def _list_items(text: str) -> List[str]:
+    """List item texts with inline code and bold markers removed"""
+    return [
+        item.replace("`", "").replace("**", "") for item in MARKDOWN_LIST_ITEM.findall(text)
+    ]
+
+
+def parse_markdown_runbooks(path: Path) -> List[Dict[str, Any]]:
+    """Split a runbook markdown file into one playbook-shaped document per "## " section.
+
+    Documents carry the same fields as the JSON playbooks, filled from the
+    section's "**Field:**" lines and "### " subsections where present, plus
+    the raw section text as "content" and the file as "source".
+    """
+    text = path.read_text()
+    matches = list(MARKDOWN_SECTION.finditer(text))
+    documents = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.end() : end].strip().rstrip("-").strip()
+        title = match.group(1).strip()
+        fields = {
+            field_match.group(1).lower().replace(" ", "_"): field_match.group(2)
+            for field_match in MARKDOWN_FIELD.finditer(body)
+        }
+        subsections = _markdown_subsections(body)
+
+        escalation = {}
+        for item in MARKDOWN_LIST_ITEM.findall(subsections.get("escalation", "")):
+            escalation_match = MARKDOWN_ESCALATION.match(item)
+            if escalation_match:
+                escalation[escalation_match.group(1).lower()] = escalation_match.group(2)
+
+        id_match = MARKDOWN_ID.search(body)
+        slug = "-".join(TOKEN_PATTERN.findall(title.lower()))
+        documents.append(
+            {
+                "id": id_match.group(1) if id_match else f"{path.stem}:{slug}",
+                "title": title,
+                "incident_type": fields["incident_type"].lower() if "incident_type" in fields else None,
+                "severity": fields["severity"].lower() if "severity" in fields else None,
+                "description": subsections.get("description", ""),
+                "triggers": [
+                    item
+                    for heading, section in subsections.items()
+                    if heading in TRIGGER_SECTIONS
+                    for item in _list_items(section)
+                ],
+                "steps": [
+                    item
+                    for heading, section in subsections.items()
+                    if STEP_SECTION.search(heading)
+                    for item in _list_items(section)
+                ],
+                "escalation": escalation,
+                "estimated_resolution_time": fields.get("estimated_resolution_time"),
+                "related_runbooks": _list_items(subsections.get("related runbooks", "")),
+                "source": f"markdown/{path.name}",
+                "content": body,
+            }
+        )
+    return documents
+
+
+class RunbookIndex:
+    """Incrementally maintained BM25F index over runbook documents"""
+
+    def __init__(self) -> None:
+        # Internal integer keys keep postings compact
+        self._next_key = 0
+        self._documents: Dict[int, Dict[str, Any]] = {}
+        self._doc_keys: Dict[Tuple[str, str], int] = {}
+        self._fingerprints: Dict[int, str] = {}
+        self._sources: Dict[str, Set[int]] = {}
+        self._source_order: Dict[str, List[str]] = {}
+
+        self._postings: Dict[str, Dict[int, List[int]]] = {}
+        self._field_lengths: Dict[int, List[int]] = {}
+        self._total_field_lengths = [0] * len(FIELDS)
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._term_scores: "OrderedDict[str, Dict[int, float]]" = OrderedDict()
+        self._substring_hits: "OrderedDict[str, List[int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def _add(self, source: str, document: Dict[str, Any], fingerprint: str) -> None:
+        key = self._next_key
+        self._next_key += 1
+        self._documents[key] = document
+        self._doc_keys[(source, document.get("id", ""))] = key
+        self._fingerprints[key] = fingerprint
+        self._sources.setdefault(source, set()).add(key)
+
+        postings = self._postings
+        lengths = [0] * len(FIELDS)
+        for field_index, field in enumerate(FIELDS):
+            tokens = tokenize(_field_text(document.get(field)))
+            lengths[field_index] = len(tokens)
+            for token, count in Counter(tokens).items():
+                doc_postings = postings.get(token)
+                if doc_postings is None:
+                    doc_postings = postings[token] = {}
+                    self._vocabulary_dirty = True
+                frequencies = doc_postings.get(key)
+                if frequencies is None:
+                    frequencies = doc_postings[key] = [0] * len(FIELDS)
+                frequencies[field_index] = count
+        self._field_lengths[key] = lengths
+        for field_index, length in enumerate(lengths):
+            self._total_field_lengths[field_index] += length
+
+    def _remove(self, source: str, key: int) -> None:
+        document = self._documents.pop(key)
+        del self._doc_keys[(source, document.get("id", ""))]
+        del self._fingerprints[key]
+        self._sources[source].discard(key)
+
+        for field in FIELDS:
+            for token in set(tokenize(_field_text(document.get(field)))):
+                doc_postings = self._postings.get(token)
+                if doc_postings is None:
+                    continue
+                doc_postings.pop(key, None)
+                if not doc_postings:
+                    del self._postings[token]
+                    self._vocabulary_dirty = True
+        for field_index, length in enumerate(self._field_lengths.pop(key)):
+            self._total_field_lengths[field_index] -= length
+
+    def sync_source(self, source: str, documents: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        """Make the indexed documents of source match documents.
+
+        Unchanged documents (same id and fingerprint) are left alone. Returns
+        the number of documents (re)indexed and removed.
+        """
+        wanted: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        for document in documents:
+            wanted.setdefault(document.get("id", ""), (document, _fingerprint(document)))
+        self._source_order[source] = list(wanted)
+
+        removed = 0
+        for key in list(self._sources.get(source, ())):
+            doc_id = self._documents[key].get("id", "")
+            entry = wanted.get(doc_id)
+            if entry is not None and entry[1] == self._fingerprints[key]:
+                del wanted[doc_id]
+                continue
+            self._remove(source, key)
+            removed += 1
+
+        for document, fingerprint in wanted.values():
+            self._add(source, document, fingerprint)
+
+        if wanted or removed:
+            # Scores depend on corpus-wide statistics, so any change voids them
+            self._term_scores.clear()
+            self._substring_hits.clear()
+            logging.info(
+                f"Runbook index synced {source}: {len(wanted)} indexed, {removed} removed, "
+                f"{len(self._documents)} total"
+            )
+        return len(wanted), removed
+
+    def _substring_matches(self, keyword: str) -> List[int]:
+        """Keys of documents containing keyword, as the pre-index search matched"""
+        needle = keyword.lower()
+        cached = self._substring_hits.get(needle)
+        if cached is not None:
+            self._substring_hits.move_to_end(needle)
+            return cached
+
+        keys = [
+            key
+            for key in self._ordered_keys()
+            if any(
+                needle in _field_text(self._documents[key].get(field)).lower()
+                for field in SUBSTRING_FIELDS
+            )
+        ]
+        self._substring_hits[needle] = keys
+        if len(self._substring_hits) > MAX_CACHED_SUBSTRINGS:
+            self._substring_hits.popitem(last=False)
+        return keys
+
+    def _ordered_keys(self) -> Iterable[int]:
+        """Document keys in source registration order, then source order"""
+        for source, doc_ids in self._source_order.items():
+            for doc_id in doc_ids:
+                key = self._doc_keys.get((source, doc_id))
+                if key is not None:
+                    yield key
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Indexed terms matching a query term, with their match weight"""
+        expansions = []
+        if term in self._postings:
+            expansions.append((term, 1.0))
+        if len(term) < MIN_PREFIX_LENGTH:
+            return expansions
+
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        start = bisect.bisect_left(self._vocabulary, term)
+        for candidate in self._vocabulary[start:]:
+            if not candidate.startswith(term):
+                break
+            if candidate != term:
+                expansions.append((candidate, PREFIX_WEIGHT))
+        return expansions
+
+    def _score_term(self, term: str) -> Dict[int, float]:
+        """BM25F scores of one query term (with prefix expansions) per document"""
+        cached = self._term_scores.get(term)
+        if cached is not None:
+            self._term_scores.move_to_end(term)
+            return cached
+
+        document_count = len(self._documents)
+        average_lengths = [
+            (total / document_count) if document_count and total else 1.0
+            for total in self._total_field_lengths
+        ]
+        boosts = [FIELD_BOOSTS[field] for field in FIELDS]
+
+        term_scores: Dict[int, float] = {}
+        for indexed_term, weight in self._expand(term):
+            doc_postings = self._postings[indexed_term]
+            df = len(doc_postings)
+            idf = math.log(1 + (document_count - df + 0.5) / (df + 0.5))
+            for key, frequencies in doc_postings.items():
+                lengths = self._field_lengths[key]
+                tf = 0.0
+                for i, frequency in enumerate(frequencies):
+                    if frequency:
+                        norm = 1 - B + B * lengths[i] / average_lengths[i]
+                        tf += boosts[i] * frequency / norm
+                score = weight * idf * tf * (K1 + 1) / (tf + K1)
+                if score > term_scores.get(key, 0.0):
+                    term_scores[key] = score
+
+        self._term_scores[term] = term_scores
+        if len(self._term_scores) > MAX_CACHED_TERMS:
+            self._term_scores.popitem(last=False)
+        return term_scores
+
+    def _score_terms(self, terms: List[str]) -> Dict[int, float]:
+        """BM25F scores for documents matching every query term"""
+        scores: Optional[Dict[int, float]] = None
+        # Intersect starting from the rarest term to keep dicts small
+        for term_scores in sorted((self._score_term(t) for t in set(terms)), key=len):
+            if scores is None:
+                scores = term_scores
+            else:
+                # Every query term must match
+                scores = {
+                    key: score + term_scores[key]
+                    for key, score in scores.items()
+                    if key in term_scores
+                }
+            if not scores:
+                return {}
+        return scores or {}
+
+    def search(
+        self,
+        keyword: Optional[str] = None,
+        filters: Optional[Dict[str, str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Tuple[int, List[Tuple[Dict[str, Any], Optional[float]]]]:
+        """Search documents, returning the total match count and one page.
+
+        Documents matching every keyword term are ranked by score. Documents
+        that only contain the keyword as a substring follow them, and without
+        a keyword all documents are returned; both come in index order with no
+        score. Filters are exact matches on document fields.
+        """
+        filters = {k: v for k, v in (filters or {}).items() if v}
+
+        def _passes(document: Dict[str, Any]) -> bool:
+            return all(document.get(field) == value for field, value in filters.items())
+
+        if not keyword:
+            keys = [key for key in self._ordered_keys() if _passes(self._documents[key])]
+            end = None if limit is None else offset + limit
+            return len(keys), [(self._documents[key], None) for key in keys[offset:end]]
+
+        terms = tokenize(keyword)
+        scores = self._score_terms(terms) if terms else {}
+        matches = [
+            (key, score) for key, score in scores.items() if _passes(self._documents[key])
+        ]
+        # Baseline recall: substring hits the terms missed ("start" in "restart")
+        unscored = [
+            key
+            for key in self._substring_matches(keyword)
+            if key not in scores and _passes(self._documents[key])
+        ]
+        total = len(matches) + len(unscored)
+
+        rank_key = lambda item: (-item[1], item[0])  # noqa: E731
+        if limit is None:
+            ranked = sorted(matches, key=rank_key)[offset:]
+        else:
+            # Only the requested page needs to be ordered
+            ranked = heapq.nsmallest(offset + limit, matches, key=rank_key)[offset:]
+        hits: List[Tuple[Dict[str, Any], Optional[float]]] = [
+            (self._documents[key], score) for key, score in ranked
+        ]
+        start = max(offset - len(matches), 0)
+        end = None if limit is None else start + limit - len(hits)
+        hits.extend((self._documents[key], None) for key in unscored[start:end])
+        return total, hits
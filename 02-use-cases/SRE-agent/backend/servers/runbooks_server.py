@@ -1,5 +1,5 @@
-import json
 import logging
+import sys
 from pathlib import Path
 from typing import Optional
 
@@ -11,9 +11,15 @@ from fastapi import (
     HTTPException,
     Depends,
 )
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from retrieve_api_key import retrieve_api_key
+from runbook_index import RunbookIndex, parse_markdown_runbooks
+
+# Add parent directory to path to import shared backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from dataset_cache import DATASETS, dumps_json, expect_keys
+from request_tracing import RequestTracer, span
 
 # Configure logging with basicConfig
 logging.basicConfig(
@@ -23,9 +29,73 @@ logging.basicConfig(
 )
 
 app = FastAPI(title="DevOps Runbooks API", version="1.0.0")
+TRACER = RequestTracer("runbooks-api")
 
 DATA_PATH = Path(__file__).parent.parent / "data" / "runbooks_data"
 
+
+def _validate_playbooks(raw: dict) -> dict:
+    """Validate incident playbooks and index them by id (first match wins)"""
+    data = expect_keys(playbooks=list)(raw)
+    by_id = {}
+    for playbook in data["playbooks"]:
+        by_id.setdefault(playbook.get("id"), playbook)
+    data["by_id"] = by_id
+    return data
+
+
+# Cached datasets, loaded once and reloaded when the data files change
+PLAYBOOKS_DATASET = DATASETS.register(
+    DATA_PATH / "incident_playbooks.json", _validate_playbooks
+)
+GUIDES_DATASET = DATASETS.register(
+    DATA_PATH / "troubleshooting_guides.json", expect_keys(guides=list)
+)
+ESCALATION_DATASET = DATASETS.register(
+    DATA_PATH / "escalation_procedures.json", expect_keys(escalation_procedures=list)
+)
+RESOLUTIONS_DATASET = DATASETS.register(
+    DATA_PATH / "common_resolutions.json", expect_keys(resolutions=list)
+)
+# Markdown runbooks are discovered at startup; new files need a restart
+MARKDOWN_DATASETS = [
+    DATASETS.register(md_path, loader=parse_markdown_runbooks)
+    for md_path in sorted((DATA_PATH / "markdown").glob("*.md"))
+]
+
+# Full-text index over playbooks and markdown runbooks, synced on file change
+RUNBOOK_INDEX = RunbookIndex()
+_indexed_versions: dict = {}
+
+
+def _refresh_runbook_index() -> None:
+    """Incrementally re-index any runbook source whose file changed"""
+    playbooks = PLAYBOOKS_DATASET.get()
+    playbooks_changed = _indexed_versions.get("playbooks") != PLAYBOOKS_DATASET.version
+    if playbooks_changed:
+        RUNBOOK_INDEX.sync_source("playbooks", playbooks["playbooks"])
+        _indexed_versions["playbooks"] = PLAYBOOKS_DATASET.version
+
+    for dataset in MARKDOWN_DATASETS:
+        source = f"markdown/{dataset.path.name}"
+        try:
+            documents = dataset.get()
+        except FileNotFoundError:
+            documents = []
+        if not playbooks_changed and _indexed_versions.get(source) == dataset.version:
+            continue
+        # Markdown renders of JSON playbooks are already indexed from the JSON
+        RUNBOOK_INDEX.sync_source(
+            source, [d for d in documents if d["id"] not in playbooks["by_id"]]
+        )
+        _indexed_versions[source] = dataset.version
+
+
+try:
+    _refresh_runbook_index()
+except Exception as e:
+    logging.warning(f"Runbook index not built at startup, will retry on first search: {e}")
+
 # API Key for authentication
 CREDENTIAL_PROVIDER_NAME = "sre-agent-api-key-credential-provider"
 
@@ -47,6 +117,16 @@ def _validate_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     return x_api_key
 
 
+TRACER.install(app, dependencies=[Depends(_validate_api_key)])
+
+
+def _json_response(payload) -> Response:
+    """Serialize a response payload, timed as the "serialize" span"""
+    with span("serialize"):
+        body = dumps_json(payload)
+    return Response(content=body, media_type="application/json")
+
+
 @app.get("/runbooks/search")
 async def search_runbooks(
     incident_type: Optional[str] = Query(
@@ -62,65 +142,31 @@ async def search_runbooks(
         enum=["low", "medium", "high", "critical"],
         description="Incident severity level",
     ),
+    limit: Optional[int] = Query(
+        None, ge=1, le=1000, description="Maximum number of runbooks to return"
+    ),
+    offset: int = Query(0, ge=0, description="Number of ranked runbooks to skip"),
     api_key: str = Depends(_validate_api_key),
 ):
-    """Search runbooks by incident type/keyword"""
+    """Search runbooks by incident type/keyword, ranked by relevance"""
     try:
-        logging.info(
-            f"🔍 RUNBOOKS API: search_runbooks called - incident_type={incident_type}, keyword={keyword}, severity={severity}"
-        )
-
-        with open(DATA_PATH / "incident_playbooks.json", "r") as f:
-            data = json.load(f)
-
-        runbooks = data.get("playbooks", [])
-        original_count = len(runbooks)
-
-        if incident_type:
-            runbooks = [r for r in runbooks if r.get("incident_type") == incident_type]
-            logging.info(
-                f"📋 RUNBOOKS API: Filtered by incident_type '{incident_type}': {len(runbooks)} runbooks"
+        with span("load"):
+            _refresh_runbook_index()
+        with span("filter"):
+            total, hits = RUNBOOK_INDEX.search(
+                keyword=keyword,
+                filters={"incident_type": incident_type, "severity": severity},
+                limit=limit,
+                offset=offset,
             )
-
-        if severity:
-            runbooks = [r for r in runbooks if r.get("severity") == severity]
-            logging.info(
-                f"📋 RUNBOOKS API: Filtered by severity '{severity}': {len(runbooks)} runbooks"
-            )
-
-        if keyword:
             runbooks = [
-                r
-                for r in runbooks
-                if keyword.lower() in r.get("title", "").lower()
-                or keyword.lower() in r.get("description", "").lower()
-                or any(keyword.lower() in step.lower() for step in r.get("steps", []))
+                runbook if score is None else {**runbook, "relevance_score": round(score, 4)}
+                for runbook, score in hits
             ]
-            logging.info(
-                f"📋 RUNBOOKS API: Filtered by keyword '{keyword}': {len(runbooks)} runbooks"
-            )
 
-        response_data = {"runbooks": runbooks}
-
-        # Log detailed response
-        logging.info(
-            f"📤 RUNBOOKS API: Returning {len(runbooks)} runbooks out of {original_count} total"
-        )
-        for i, runbook in enumerate(runbooks):
-            logging.info(
-                f"  📖 Runbook {i+1}: {runbook.get('title', 'No title')} (ID: {runbook.get('id', 'No ID')})"
-            )
-            steps = runbook.get("steps", [])
-            logging.info(f"     Steps count: {len(steps)}")
-            for j, step in enumerate(steps[:3]):  # Show first 3 steps for brevity
-                logging.info(f"     Step {j+1}: {step}")
-            if len(steps) > 3:
-                logging.info(f"     ... and {len(steps) - 3} more steps")
-
-        logging.info(
-            f"📋 RUNBOOKS API: Full response data: {json.dumps(response_data, indent=2)}"
+        return _json_response(
+            {"runbooks": runbooks, "total": total, "offset": offset, "limit": limit}
         )
-        return response_data
     except Exception as e:
         logging.error(f"❌ Error searching runbooks: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -133,29 +179,11 @@ async def get_incident_playbook(
 ):
     """Retrieve specific incident playbooks"""
     try:
-        logging.info(
-            f"🔍 RUNBOOKS API: get_incident_playbook called for playbook_id='{playbook_id}'"
-        )
-
-        with open(DATA_PATH / "incident_playbooks.json", "r") as f:
-            data = json.load(f)
-
-        playbooks = data.get("playbooks", [])
-
-        for playbook in playbooks:
-            if playbook.get("id") == playbook_id:
-                logging.info(
-                    f"📖 RUNBOOKS API: Found playbook '{playbook.get('title', 'No title')}'"
-                )
-                steps = playbook.get("steps", [])
-                logging.info(f"📝 RUNBOOKS API: Playbook has {len(steps)} steps:")
-                for i, step in enumerate(steps):
-                    logging.info(f"   Step {i+1}: {step}")
+        with span("load"):
+            playbook = PLAYBOOKS_DATASET.get()["by_id"].get(playbook_id)
 
-                logging.info(
-                    f"📤 RUNBOOKS API: Returning complete playbook data: {json.dumps(playbook, indent=2)}"
-                )
-                return playbook
+        if playbook is not None:
+            return _json_response(playbook)
 
         logging.warning(f"❌ RUNBOOKS API: Playbook '{playbook_id}' not found")
         return JSONResponse(status_code=404, content={"error": "Playbook not found"})
@@ -176,54 +204,22 @@ async def get_troubleshooting_guide(
 ):
     """Fetch step-by-step troubleshooting guides"""
     try:
-        logging.info(
-            f"🔍 RUNBOOKS API: get_troubleshooting_guide called - category={category}, issue_type={issue_type}"
-        )
-
-        with open(DATA_PATH / "troubleshooting_guides.json", "r") as f:
-            data = json.load(f)
-
-        guides = data.get("guides", [])
-        original_count = len(guides)
-
-        if category:
-            guides = [g for g in guides if g.get("category") == category]
-            logging.info(
-                f"📋 RUNBOOKS API: Filtered by category '{category}': {len(guides)} guides"
-            )
-
-        if issue_type:
-            guides = [
-                g
-                for g in guides
-                if issue_type.lower() in g.get("title", "").lower()
-                or issue_type.lower() in g.get("id", "").lower()
-            ]
-            logging.info(
-                f"📋 RUNBOOKS API: Filtered by issue_type '{issue_type}': {len(guides)} guides"
-            )
-
-        response_data = {"guides": guides}
-
-        # Log detailed response
-        logging.info(
-            f"📤 RUNBOOKS API: Returning {len(guides)} guides out of {original_count} total"
-        )
-        for i, guide in enumerate(guides):
-            logging.info(
-                f"  📖 Guide {i+1}: {guide.get('title', 'No title')} (ID: {guide.get('id', 'No ID')})"
-            )
-            steps = guide.get("steps", [])
-            logging.info(f"     Steps count: {len(steps)}")
-            for j, step in enumerate(steps[:3]):  # Show first 3 steps for brevity
-                logging.info(f"     Step {j+1}: {step}")
-            if len(steps) > 3:
-                logging.info(f"     ... and {len(steps) - 3} more steps")
-
-        logging.info(
-            f"📋 RUNBOOKS API: Full response data: {json.dumps(response_data, indent=2)}"
-        )
-        return response_data
+        with span("load"):
+            guides = GUIDES_DATASET.get()["guides"]
+
+        with span("filter"):
+            if category:
+                guides = [g for g in guides if g.get("category") == category]
+
+            if issue_type:
+                guides = [
+                    g
+                    for g in guides
+                    if issue_type.lower() in g.get("title", "").lower()
+                    or issue_type.lower() in g.get("id", "").lower()
+                ]
+
+        return _json_response({"guides": guides})
     except Exception as e:
         logging.error(f"❌ Error retrieving troubleshooting guides: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -241,26 +237,28 @@ async def get_escalation_procedures(
 ):
     """Retrieve escalation procedures"""
     try:
-        with open(DATA_PATH / "escalation_procedures.json", "r") as f:
-            data = json.load(f)
-
-        procedures = data.get("escalation_procedures", [])
-
-        if severity:
-            procedures = [p for p in procedures if p.get("severity") == severity]
-
-        if incident_type:
-            procedures = [
-                p
-                for p in procedures
-                if incident_type.lower() in p.get("title", "").lower()
-                or any(
-                    incident_type.lower() in condition.lower()
-                    for condition in p.get("trigger_conditions", [])
-                )
-            ]
-
-        return {"escalation_procedures": procedures}
+        def _build(data: dict) -> dict:
+            procedures = data["escalation_procedures"]
+
+            if severity:
+                procedures = [p for p in procedures if p.get("severity") == severity]
+
+            if incident_type:
+                procedures = [
+                    p
+                    for p in procedures
+                    if incident_type.lower() in p.get("title", "").lower()
+                    or any(
+                        incident_type.lower() in condition.lower()
+                        for condition in p.get("trigger_conditions", [])
+                    )
+                ]
+
+            return {"escalation_procedures": procedures}
+
+        with span("serialize"):
+            body = ESCALATION_DATASET.response_bytes((severity, incident_type), _build)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logging.error(f"Error retrieving escalation procedures: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -274,61 +272,24 @@ async def get_common_resolutions(
 ):
     """Fetch common resolution steps"""
     try:
-        logging.info(
-            f"🔍 RUNBOOKS API: get_common_resolutions called - issue='{issue}', service={service}"
-        )
-
-        with open(DATA_PATH / "common_resolutions.json", "r") as f:
-            data = json.load(f)
-
-        resolutions = data.get("resolutions", [])
-        original_count = len(resolutions)
-
-        # Filter by issue
-        matching_resolutions = []
-        for resolution in resolutions:
-            if (
-                issue.lower() in resolution.get("issue", "").lower()
-                or issue.lower() in resolution.get("id", "").lower()
+        with span("load"):
+            resolutions = RESOLUTIONS_DATASET.get()["resolutions"]
+
+        # Filter by issue; service is accepted but not yet used for ranking
+        with span("filter"):
+            issue_lower = issue.lower()
+            matching_resolutions = [
+                resolution
+                for resolution in resolutions
+                if issue_lower in resolution.get("issue", "").lower()
+                or issue_lower in resolution.get("id", "").lower()
                 or any(
-                    issue.lower() in symptom.lower()
+                    issue_lower in symptom.lower()
                     for symptom in resolution.get("symptoms", [])
                 )
-            ):
-                matching_resolutions.append(resolution)
-
-        logging.info(
-            f"📋 RUNBOOKS API: Found {len(matching_resolutions)} matching resolutions for issue '{issue}'"
-        )
-
-        # If service specified, prioritize resolutions that mention the service
-        if service and matching_resolutions:
-            # This is a simple implementation - in real world might have service-specific resolutions
-            logging.info(
-                f"📋 RUNBOOKS API: Service filter '{service}' applied (basic implementation)"
-            )
-
-        response_data = {"resolutions": matching_resolutions}
+            ]
 
-        # Log detailed response
-        logging.info(
-            f"📤 RUNBOOKS API: Returning {len(matching_resolutions)} resolutions out of {original_count} total"
-        )
-        for i, resolution in enumerate(matching_resolutions):
-            logging.info(
-                f"  📖 Resolution {i+1}: {resolution.get('issue', 'No issue title')} (ID: {resolution.get('id', 'No ID')})"
-            )
-            steps = resolution.get("steps", [])
-            logging.info(f"     Steps count: {len(steps)}")
-            for j, step in enumerate(steps[:3]):  # Show first 3 steps for brevity
-                logging.info(f"     Step {j+1}: {step}")
-            if len(steps) > 3:
-                logging.info(f"     ... and {len(steps) - 3} more steps")
-
-        logging.info(
-            f"📋 RUNBOOKS API: Full response data: {json.dumps(response_data, indent=2)}"
-        )
-        return response_data
+        return _json_response({"resolutions": matching_resolutions})
     except Exception as e:
         logging.error(f"❌ Error retrieving common resolutions: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -341,7 +302,6 @@ async def health_check(api_key: str = Depends(_validate_api_key)):
 
 
 if __name__ == "__main__":
-    import uvicorn
     import sys
     import argparse
     from pathlib import Path
@@ -349,6 +309,7 @@ if __name__ == "__main__":
     # Add parent directory to path to import config_utils
     sys.path.append(str(Path(__file__).parent.parent))
     from config_utils import get_server_port
+    from prefork import serve
 
     parser = argparse.ArgumentParser(description="Runbooks API Server")
     parser.add_argument("--host", type=str, required=True, 
@@ -356,8 +317,17 @@ if __name__ == "__main__":
     parser.add_argument("--ssl-keyfile", type=str, help="Path to SSL private key file")
     parser.add_argument("--ssl-certfile", type=str, help="Path to SSL certificate file")
     parser.add_argument("--port", type=int, help="Port to bind to (overrides config)")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Worker processes pre-forked on a shared socket (default: 1)")
+    parser.add_argument("--trace-sample-rate", type=float, default=TRACER.sample_rate,
+                       help="Fraction of requests whose timing trace is logged")
+    parser.add_argument("--slow-request-ms", type=float, default=TRACER.slow_request_ms,
+                       help="Requests slower than this are logged with their payload")
     
     args = parser.parse_args()
+
+    TRACER.sample_rate = args.trace_sample_rate
+    TRACER.slow_request_ms = args.slow_request_ms
     
     port = args.port if args.port else get_server_port("runbooks")
     
@@ -375,4 +345,5 @@ if __name__ == "__main__":
         protocol = "HTTP"
     
     logging.info(f"Starting Runbooks server on {protocol}://{args.host}:{port}")
-    uvicorn.run(app, host=args.host, port=port, **ssl_config)
+    serve(app, host=args.host, port=port, workers=args.workers,
+          preload=DATASETS.preload, name="Runbooks server", **ssl_config)
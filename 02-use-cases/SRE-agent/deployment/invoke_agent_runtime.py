@@ -6,6 +6,7 @@ import json
 import logging
 import time
 from pathlib import Path
+from typing import Iterable
 
 # Configure logging with basicConfig
 logging.basicConfig(
@@ -15,6 +16,62 @@ logging.basicConfig(
 )
 
 
+def _print_event(event: dict):
+    """Print one streamed progress event"""
+    kind = event.get("event")
+    if kind == "routing":
+        if event.get("plan"):
+            print(f"\n📋 {event['plan']}")
+        print(f"🧭 Routing to {', '.join(event.get('next', []))}")
+    elif kind == "tool_call":
+        print(f"   📞 {event.get('agent')}: calling {event.get('tool')}")
+    elif kind == "tool_result":
+        print(f"   ✅ {event.get('agent')}: {event.get('tool')} returned")
+    elif kind == "agent_result":
+        print(f"\n🔧 {event.get('agent')}:\n{event.get('result')}\n")
+    elif kind == "summary_token":
+        print(event.get("text", ""), end="", flush=True)
+    elif kind == "final":
+        print("\nMessage:")
+        print(event.get("output", {}).get("message", ""))
+    elif kind == "error":
+        logging.error(f"Agent error: {event.get('detail')}")
+
+
+def _read_event_stream(lines: Iterable[bytes]):
+    """Parse server-sent events from the runtime and print them as they arrive"""
+    data = []
+    for raw_line in lines:
+        line = raw_line.decode("utf-8") if isinstance(raw_line, bytes) else raw_line
+        if line.startswith("data:"):
+            data.append(line[5:].strip())
+        elif not line.strip() and data:
+            # A blank line ends the event
+            _print_event(json.loads("\n".join(data)))
+            data = []
+
+
+def _invoke_local(url: str, payload: str, stream: bool):
+    """Invoke a runtime container running locally, e.g. via docker run"""
+    import requests
+
+    response = requests.post(
+        f"{url.rstrip('/')}/invocations",
+        data=payload,
+        headers={"Content-Type": "application/json"},
+        stream=stream,
+        timeout=900,
+    )
+    response.raise_for_status()
+    if stream:
+        _read_event_stream(response.iter_lines())
+    else:
+        response_data = response.json()
+        print(json.dumps(response_data, indent=2))
+        print("\nMessage:")
+        print(response_data.get("output", {}).get("message", ""))
+
+
 def main():
     parser = argparse.ArgumentParser(description="Invoke SRE Agent Runtime via AgentCore")
     parser.add_argument(
@@ -35,8 +92,26 @@ def main():
         "--session-id",
         help="Runtime session ID (generates one if not provided)"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream routing decisions, tool calls and agent results as they happen"
+    )
+    parser.add_argument(
+        "--local-url",
+        help="Invoke a locally running container instead, e.g. http://localhost:8080"
+    )
     
     args = parser.parse_args()
+
+    # Prepare payload
+    payload = json.dumps({
+        "input": {"prompt": args.prompt, "stream": args.stream}
+    })
+
+    if args.local_url:
+        _invoke_local(args.local_url, payload, args.stream)
+        return
     
     # Get runtime ARN from file if not provided
     runtime_arn = args.runtime_arn
@@ -78,11 +153,6 @@ def main():
     # Create AgentCore client
     agent_core_client = boto3.client('bedrock-agentcore', region_name=args.region)
     
-    # Prepare payload
-    payload = json.dumps({
-        "input": {"prompt": args.prompt}
-    })
-    
     logging.info(f"Invoking agent runtime: {runtime_arn}")
     logging.info(f"Session ID: {session_id}")
     logging.info(f"Prompt: {args.prompt}")
@@ -95,6 +165,11 @@ def main():
             qualifier="DEFAULT"
         )
         
+        if "text/event-stream" in response.get("contentType", ""):
+            # Small chunks so events are printed as soon as they arrive
+            _read_event_stream(response['response'].iter_lines(chunk_size=64))
+            return
+
         response_body = response['response'].read()
         response_data = json.loads(response_body)
         
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Wall-clock benchmark for the multi-agent graph with fake LLMs and tools.
+
+Every LLM call and tool call sleeps for a fixed delay instead of reaching
+Amazon Bedrock, Anthropic or the MCP gateway, so the measured time reflects
+how the graph schedules agents. The same investigation plan is run in three
+modes: one agent at a time through the supervisor, parallel agent stages
+through the supervisor, and parallel stages walked by the plan executor.
+LLM calls and supervisor passes are counted per query.
+
+Usage:
+    uv run python scripts/benchmark_agent_graph.py \\
+        --agents kubernetes,logs,metrics,runbooks --llm-delay 0.5 --tool-delay 0.5
+
+    # Make the logs agent request a new plan to exercise replanning
+    uv run python scripts/benchmark_agent_graph.py --replan-agent "Application Logs Agent"
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.tools import StructuredTool
+
+sys.path.append(str(Path(__file__).parent.parent))
+from sre_agent import agent_nodes  # noqa: E402
+from sre_agent.constants import SREConstants  # noqa: E402
+from sre_agent.graph_builder import build_multi_agent_graph  # noqa: E402
+from sre_agent.llm_call_counter import LLMCallCounter  # noqa: E402
+from sre_agent.output_formatter import SREOutputFormatter  # noqa: E402
+from sre_agent.supervisor import InvestigationPlan, SupervisorAgent  # noqa: E402
+from sre_agent.tool_cache import tool_cache  # noqa: E402
+
+MODES = {
+    "supervisor loop": {"parallel_agents": False, "plan_execution": False},
+    "parallel": {"parallel_agents": True, "plan_execution": False},
+    "parallel + executor": {"parallel_agents": True, "plan_execution": True},
+}
+
+AGENT_TOOLS = {
+    "kubernetes": "get_pod_status",
+    "logs": "search_logs",
+    "metrics": "get_performance_metrics",
+    "runbooks": "search_runbooks",
+}
+
+
+class DelayedFakeLLM(BaseChatModel):
+    """Chat model that sleeps, calls its first bound tool once, then answers."""
+
+    delay: float = 0.5
+    tool_names: List[str] = []
+    plan: Optional[InvestigationPlan] = None
+    replan_agent: str = ""
+
+    @property
+    def _llm_type(self) -> str:
+        return "delayed-fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "DelayedFakeLLM":
+        return self.model_copy(update={"tool_names": [t.name for t in tools]})
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        async def _plan(messages: Any, config: RunnableConfig) -> InvestigationPlan:
+            # Go through the chat model so callbacks see the planning call
+            await self.model_copy(update={"tool_names": []}).ainvoke(messages, config=config)
+            return self.plan
+
+        return RunnableLambda(_plan)
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        if self.tool_names and not isinstance(messages[-1], ToolMessage):
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": self.tool_names[0], "args": {}, "id": f"call_{uuid.uuid4().hex[:8]}"}
+                ],
+            )
+        else:
+            content = "Findings: no anomalies detected."
+            if self.replan_agent and self.replan_agent in str(messages[0].content):
+                content += "\nREPLAN: runbooks needed for the error spike"
+            message = AIMessage(content=content)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.delay)
+        return self._respond(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.delay)
+        return self._respond(messages)
+
+
+def _make_tools(delay: float) -> List[StructuredTool]:
+    def _make(name: str) -> StructuredTool:
+        async def _call() -> str:
+            await asyncio.sleep(delay)
+            return '{"status": "ok"}'
+
+        return StructuredTool.from_function(coroutine=_call, name=name, description=f"Fake {name}")
+
+    return [_make(name) for name in AGENT_TOOLS.values()]
+
+
+async def _run_once(args: argparse.Namespace, agents: List[str], mode: str) -> Dict[str, Any]:
+    for key, value in MODES[mode].items():
+        setattr(SREConstants.execution, key, value)
+    llm = DelayedFakeLLM(
+        delay=args.llm_delay,
+        replan_agent=args.replan_agent,
+        plan=InvestigationPlan(
+            steps=[f"Investigate with {agent}" for agent in agents],
+            agents_sequence=agents,
+            complexity="simple",
+            auto_execute=True,
+            reasoning="Benchmark plan",
+        ),
+    )
+
+    # Route every LLM the graph creates to the fake
+    agent_nodes._create_llm = lambda provider="bedrock", **kwargs: llm
+    SupervisorAgent._create_llm = lambda self, **kwargs: llm
+    SREOutputFormatter._create_llm = lambda self, **kwargs: llm
+
+    # Tool results are cached per process; start every run cold
+    tool_cache.clear()
+    graph = build_multi_agent_graph(_make_tools(args.tool_delay))
+    query = "Why are the payment-service pods crash looping?"
+    state = {
+        "messages": [HumanMessage(content=query)],
+        "next": "supervisor",
+        "agent_results": {},
+        "current_query": query,
+        "metadata": {},
+        "requires_collaboration": False,
+        "agents_invoked": [],
+        "final_response": None,
+        "auto_approve_plan": True,
+    }
+
+    counter = LLMCallCounter()
+    node_visits: Counter = Counter()
+    started = time.perf_counter()
+    async for update in graph.astream(state, config={"callbacks": [counter]}):
+        node_visits.update(update.keys())
+    elapsed = time.perf_counter() - started
+
+    if not node_visits["aggregate"]:
+        raise RuntimeError(f"Investigation did not complete: {dict(node_visits)}")
+    return {
+        "seconds": elapsed,
+        "llm_calls": counter.total,
+        "supervisor_passes": node_visits["supervisor"],
+        "agent_runs": sum(count for node, count in node_visits.items() if node.endswith("_agent")),
+    }
+
+
+async def _main(args: argparse.Namespace) -> None:
+    agents = args.agents.split(",")
+    print(f"plan={agents} llm_delay={args.llm_delay}s tool_delay={args.tool_delay}s")
+    print(f"{'mode':<22}{'wall':>8}{'LLM calls':>11}{'supervisor':>12}{'agent runs':>12}")
+    for mode in MODES:
+        runs = [await _run_once(args, agents, mode) for _ in range(args.iterations)]
+        best = min(runs, key=lambda run: run["seconds"])
+        print(
+            f"{mode:<22}{best['seconds']:>7.2f}s{best['llm_calls']:>11}"
+            f"{best['supervisor_passes']:>12}{best['agent_runs']:>12}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-agent graph scheduling with fake LLMs")
+    parser.add_argument("--agents", type=str, default="kubernetes,logs,metrics,runbooks", help="Comma-separated plan agents_sequence")
+    parser.add_argument("--llm-delay", type=float, default=0.5, help="Seconds per fake LLM call")
+    parser.add_argument("--tool-delay", type=float, default=0.5, help="Seconds per fake tool call")
+    parser.add_argument("--iterations", type=int, default=3, help="Runs per mode (best is reported)")
+    parser.add_argument("--replan-agent", type=str, default="", help="Agent name whose fake answers request replanning")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
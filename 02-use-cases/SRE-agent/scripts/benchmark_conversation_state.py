@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Per-turn save latency benchmark for interactive session state.
+
+Simulates a long interactive session, saving after every turn as the CLI
+does, and reports save latency at points through the session, the total
+bytes written, and the time to resume from the saved file. Compares:
+
+  - rewriting the whole conversation as one pretty-printed JSON document
+    (how _save_conversation_state worked before)
+  - the append-only conversation journal
+
+Usage:
+    uv run python scripts/benchmark_conversation_state.py --turns 1000 --response-kb 4
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+sys.path.append(str(Path(__file__).parent.parent))
+from sre_agent import multi_agent_langgraph  # noqa: E402
+
+CHECKPOINTS = [1, 10, 100, 250, 500, 750, 1000]
+
+
+def _save_json_snapshot(messages: list, state: Dict[str, Any], filename: str) -> None:
+    """The previous _save_conversation_state: rewrite everything each turn."""
+    with open(filename, "w") as f:
+        json.dump(
+            {
+                "messages": [msg.model_dump() for msg in messages],
+                "state": state,
+                "timestamp": datetime.now().isoformat(),
+            },
+            f,
+            indent=2,
+        )
+
+
+def _load_json_snapshot(filename: str) -> list:
+    with open(filename, "r") as f:
+        return json.load(f)["messages"]
+
+
+def _run(
+    save: Callable[[list, Dict[str, Any], str], None],
+    load: Callable[[str], Any],
+    filename: str,
+    rewrites: bool,
+    turns: int,
+    response_kb: float,
+) -> Dict[str, Any]:
+    messages: List[Any] = []
+    latencies: List[float] = []
+    written = 0
+    response = "x" * int(response_kb * 1024)
+    for turn in range(turns):
+        messages.append(HumanMessage(content=f"Question {turn}: why is payment-service slow?"))
+        messages.append(AIMessage(content=f"# Investigation Results {turn}\n{response}"))
+        size_before = os.path.getsize(filename) if os.path.exists(filename) else 0
+        started = time.perf_counter()
+        save(messages, {}, filename)
+        latencies.append((time.perf_counter() - started) * 1000)
+        size_after = os.path.getsize(filename)
+        # A rewrite writes the whole file; an append writes the difference
+        written += size_after if rewrites else size_after - size_before
+
+    started = time.perf_counter()
+    load(filename)
+    resume_ms = (time.perf_counter() - started) * 1000
+    return {"latencies": latencies, "written_mb": written / 1e6, "file_mb": os.path.getsize(filename) / 1e6, "resume_ms": resume_ms}
+
+
+def _load_journal(filename: str) -> Any:
+    # A new process resuming the session starts with no journal in memory
+    multi_agent_langgraph._journals.clear()
+    return multi_agent_langgraph._load_conversation_state(filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-turn conversation state save latency")
+    parser.add_argument("--turns", type=int, default=1000, help="Turns in the simulated session")
+    parser.add_argument("--response-kb", type=float, default=4, help="Size of each assistant response in KB")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    checkpoints = [c for c in CHECKPOINTS if c <= args.turns]
+    print(f"turns={args.turns} response={args.response_kb}KB, save latency (ms, median of the 10 turns before each point)")
+    print(f"{'mode':<16}" + "".join(f"{'@' + str(c):>9}" for c in checkpoints) + f"{'written':>11}{'file':>9}{'resume':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        modes = {
+            "JSON snapshot": (_save_json_snapshot, _load_json_snapshot, str(Path(tmp) / "state.json"), True),
+            "journal": (multi_agent_langgraph._save_conversation_state, _load_journal, str(Path(tmp) / "journal.jsonl"), False),
+        }
+        for mode, (save, load, filename, rewrites) in modes.items():
+            result = _run(save, load, filename, rewrites, args.turns, args.response_kb)
+            latencies = result["latencies"]
+            # Median over a window ending at each checkpoint, to smooth out noise
+            row = "".join(
+                f"{statistics.median(latencies[max(0, c - 10):c]):>9.2f}" for c in checkpoints
+            )
+            print(
+                f"{mode:<16}{row}{result['written_mb']:>9.1f}MB{result['file_mb']:>7.1f}MB"
+                f"{result['resume_ms']:>8.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for MCP gateway tool discovery and tool calls.
+
+Starts a local stub MCP server (streamable HTTP) exposing the SRE agent's
+tools, with a fixed delay added to every HTTP request to stand in for the
+network round trip to the AgentCore gateway. Compares:
+
+  - MultiServerMCPClient.get_tools() with a new session per tool call
+    (how the agent loaded and called tools before)
+  - MCPGateway with an empty tool schema cache
+  - MCPGateway with a warm on-disk cache, as in a runtime container whose
+    image was built with the cache
+
+Usage:
+    uv run python scripts/benchmark_mcp_startup.py --rtt-ms 50 --calls 10
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import uvicorn
+import yaml
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from mcp.server.fastmcp import FastMCP
+
+sys.path.append(str(Path(__file__).parent.parent))
+from sre_agent.mcp_gateway import MCPGateway  # noqa: E402
+
+
+def _tool_names() -> List[str]:
+    config_path = Path(__file__).parent.parent / "sre_agent" / "config" / "agent_config.yaml"
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+    return [
+        f"stub___{tool}"
+        for agent in config["agents"].values()
+        for tool in agent["tools"]
+    ]
+
+
+def _make_stub_server(tool_names: List[str]) -> FastMCP:
+    server = FastMCP("sre-stub-gateway", log_level="WARNING")
+
+    def _make(name: str):
+        def _tool(namespace: str = "production", service: str = "", limit: int = 10) -> str:
+            return json.dumps({"tool": name, "namespace": namespace, "service": service, "items": []})
+
+        return _tool
+
+    for name in tool_names:
+        server.add_tool(_make(name), name=name, description=f"Stub for {name}")
+    return server
+
+
+class _Latency:
+    """ASGI wrapper delaying every HTTP request by a fixed round trip"""
+
+    def __init__(self, app, seconds: float):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            await asyncio.sleep(self.seconds)
+        await self.app(scope, receive, send)
+
+
+def _start_server(server: FastMCP, rtt_ms: float) -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    app = _Latency(server.streamable_http_app(), rtt_ms / 1000)
+    uvicorn_server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=uvicorn_server.run, daemon=True).start()
+    while not uvicorn_server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/mcp"
+
+
+async def _call_tools(tools: List[Any], calls: int) -> List[float]:
+    tool = next(t for t in tools if t.name.endswith("get_pod_status"))
+    samples = []
+    for i in range(calls):
+        started = time.perf_counter()
+        await tool.ainvoke({"namespace": "production", "service": f"svc-{i}"})
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def _measure_baseline(url: str, calls: int) -> Dict[str, float]:
+    client = MultiServerMCPClient({"gateway": {"url": url, "transport": "streamable_http"}})
+    started = time.perf_counter()
+    tools = await client.get_tools()
+    discovery = (time.perf_counter() - started) * 1000
+    samples = await _call_tools(tools, calls)
+    return {"tools": len(tools), "discovery_ms": discovery, "first_ms": samples[0], "median_ms": statistics.median(samples[1:] or samples)}
+
+
+async def _measure_gateway(url: str, cache_path: Path, calls: int) -> Dict[str, float]:
+    gateway = MCPGateway(url, {}, cache_path=cache_path)
+    started = time.perf_counter()
+    tools = await gateway.get_tools()
+    discovery = (time.perf_counter() - started) * 1000
+    samples = await _call_tools(tools, calls)
+    if gateway._revalidation is not None:
+        await gateway._revalidation
+    await gateway.session.close()
+    return {"tools": len(tools), "discovery_ms": discovery, "first_ms": samples[0], "median_ms": statistics.median(samples[1:] or samples)}
+
+
+async def _main(args: argparse.Namespace) -> None:
+    url = _start_server(_make_stub_server(_tool_names()), args.rtt_ms)
+    print(f"stub gateway={url} rtt={args.rtt_ms}ms calls={args.calls}")
+    print(f"{'mode':<24}{'tools':>6}{'discovery':>12}{'first call':>12}{'median call':>13}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = Path(tmp) / "mcp_tool_schemas.json"
+        results = {
+            "new session per call": await _measure_baseline(url, args.calls),
+            "gateway, cold cache": await _measure_gateway(url, cache_path, args.calls),
+            "gateway, warm cache": await _measure_gateway(url, cache_path, args.calls),
+        }
+    for mode, result in results.items():
+        print(
+            f"{mode:<24}{result['tools']:>6}{result['discovery_ms']:>10.1f}ms"
+            f"{result['first_ms']:>10.1f}ms{result['median_ms']:>11.1f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCP tool discovery and tool call latency")
+    parser.add_argument("--rtt-ms", type=float, default=50, help="Delay added to every HTTP request to the stub")
+    parser.add_argument("--calls", type=int, default=10, help="Sequential tool calls to time")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Event-loop stall benchmark for executive summary generation.
+
+Formats an investigation response while a heartbeat task ticks on the same
+event loop, and reports how long the loop was blocked. The summary LLM is a
+fake that takes ``--llm-delay`` seconds: its sync path sleeps in the calling
+thread, like a blocking HTTP client, and its async path streams
+``--chunks`` tokens over the same time. Each client construction also builds
+the real ``--provider`` client, so the cost of creating a client per
+summary is included. Compares:
+
+  - sync format_investigation_response with a new client per summary
+    (how the aggregate node formatted responses before)
+  - aformat_investigation_response with the formatter's shared client
+  - the same, streaming summary tokens
+
+Usage:
+    uv run python scripts/benchmark_output_formatter.py --llm-delay 1.0 --iterations 5
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+sys.path.append(str(Path(__file__).parent.parent))
+from sre_agent.output_formatter import SREOutputFormatter  # noqa: E402
+
+SUMMARY = "## 📋 Executive Summary\n\n### 🎯 Key Insights\n- **Root Cause**: Memory limit too low"
+
+AGENT_RESULTS = {
+    "kubernetes_agent": "Pod payment-service-7d9f is in CrashLoopBackOff (OOMKilled, 12 restarts).",
+    "logs_agent": "java.lang.OutOfMemoryError: Java heap space, 340 occurrences in the last hour.",
+    "metrics_agent": "Memory usage at 98% of the 512Mi limit before every restart.",
+    "runbooks_agent": "1. Raise the memory limit\n2. Roll out the deployment\n3. Watch restarts",
+}
+
+
+class SlowSummaryLLM(BaseChatModel):
+    """Fake summary model taking a fixed time, blocking on the sync path."""
+
+    delay: float = 1.0
+    chunks: int = 20
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-summary-fake"
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=SUMMARY))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=SUMMARY))])
+
+    async def _astream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        size = max(1, len(SUMMARY) // self.chunks)
+        for start in range(0, len(SUMMARY), size):
+            await asyncio.sleep(self.delay / self.chunks)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=SUMMARY[start : start + size]))
+
+
+class _Heartbeat:
+    """Ticks on the event loop and records how late each tick ran."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lags: List[float] = []
+
+    async def run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def _measure(formatter: SREOutputFormatter, mode: str, interval: float) -> Dict[str, float]:
+    heartbeat = _Heartbeat(interval)
+    ticker = asyncio.create_task(heartbeat.run())
+    await asyncio.sleep(interval * 2)
+
+    first_token: List[float] = []
+    started = time.perf_counter()
+    kwargs: Dict[str, Any] = dict(query="Why is payment-service crash looping?", agent_results=AGENT_RESULTS, metadata={})
+    if mode == "sync, client per call":
+        formatter._llm = None
+        formatter.format_investigation_response(**kwargs)
+    elif mode == "async, shared client":
+        await formatter.aformat_investigation_response(**kwargs)
+    else:
+        def on_token(text: str) -> None:
+            if not first_token:
+                first_token.append(time.perf_counter() - started)
+
+        await formatter.aformat_investigation_response(**kwargs, on_summary_token=on_token)
+    elapsed = time.perf_counter() - started
+
+    await asyncio.sleep(interval * 2)
+    ticker.cancel()
+    return {
+        "seconds": elapsed,
+        "max_stall_ms": max(heartbeat.lags, default=0) * 1000,
+        "first_token_s": first_token[0] if first_token else elapsed,
+    }
+
+
+async def _main(args: argparse.Namespace) -> None:
+    llm = SlowSummaryLLM(delay=args.llm_delay, chunks=args.chunks)
+    create_real = SREOutputFormatter._create_llm
+
+    def _create_llm(self, **kwargs):
+        if args.provider != "none":
+            create_real(self, **kwargs)
+        return llm
+
+    SREOutputFormatter._create_llm = _create_llm
+    formatter = SREOutputFormatter(llm_provider=args.provider)
+    if args.provider != "none":
+        # The first client also loads the provider SDK; leave that out
+        formatter._create_llm()
+
+    print(f"provider={args.provider} llm_delay={args.llm_delay}s chunks={args.chunks} iterations={args.iterations}")
+    print(f"{'mode':<26}{'wall':>8}{'max loop stall':>16}{'first token':>13}")
+    for mode in ("sync, client per call", "async, shared client", "async, streamed"):
+        runs = [await _measure(formatter, mode, args.interval) for _ in range(args.iterations)]
+        print(
+            f"{mode:<26}{statistics.median(r['seconds'] for r in runs):>7.2f}s"
+            f"{statistics.median(r['max_stall_ms'] for r in runs):>14.1f}ms"
+            f"{statistics.median(r['first_token_s'] for r in runs):>12.2f}s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event-loop stalls during executive summary generation")
+    parser.add_argument("--llm-delay", type=float, default=1.0, help="Seconds per fake summary LLM call")
+    parser.add_argument("--chunks", type=int, default=20, help="Tokens the fake streams the summary in")
+    parser.add_argument("--provider", type=str, default="bedrock", choices=["bedrock", "anthropic", "none"], help="Real client built on each client construction")
+    parser.add_argument("--interval", type=float, default=0.005, help="Heartbeat interval in seconds")
+    parser.add_argument("--iterations", type=int, default=5, help="Runs per mode (median is reported)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for agent traces kept in graph state vs a trace sink.
+
+Runs a multi-step investigation through the real graph with fake LLMs and
+tools (see benchmark_agent_graph.py) whose tool results carry a fixed-size
+payload. Each run is measured with traces copied into state metadata (the
+previous behaviour, ``SREConstants.traces.keep_in_state``) and with only
+trace IDs in state. Runs use an in-memory checkpointer so the per-step
+state copies are counted too.
+
+Usage:
+    uv run python scripts/benchmark_trace_memory.py --steps 20 --payload-kb 32
+"""
+
+import argparse
+import asyncio
+import logging
+import pickle
+import sys
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import StructuredTool
+from langgraph.checkpoint.memory import InMemorySaver
+
+sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmark_agent_graph import AGENT_TOOLS, DelayedFakeLLM  # noqa: E402
+
+from sre_agent import agent_nodes  # noqa: E402
+from sre_agent.constants import SREConstants  # noqa: E402
+from sre_agent.graph_builder import build_multi_agent_graph  # noqa: E402
+from sre_agent.output_formatter import SREOutputFormatter  # noqa: E402
+from sre_agent.supervisor import InvestigationPlan, SupervisorAgent  # noqa: E402
+from sre_agent.tool_cache import tool_cache  # noqa: E402
+
+AGENTS = list(AGENT_TOOLS)
+
+
+def _make_tools(payload_kb: int) -> List[StructuredTool]:
+    def _make(name: str) -> StructuredTool:
+        async def _call() -> str:
+            # Unique per call so every step adds new trace content
+            return f'{{"id": "{uuid.uuid4().hex}", "data": "{"x" * payload_kb * 1024}"}}'
+
+        return StructuredTool.from_function(coroutine=_call, name=name, description=f"Fake {name}")
+
+    return [_make(name) for name in AGENT_TOOLS.values()]
+
+
+def _stored_bytes(value: Any) -> int:
+    """Total size of the serialized blobs held by the checkpointer."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_stored_bytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_stored_bytes(v) for v in value)
+    return 0
+
+
+async def _run_once(steps: int, payload_kb: int, keep_in_state: bool) -> Dict[str, float]:
+    SREConstants.traces.keep_in_state = keep_in_state
+    SREConstants.execution.parallel_agents = False
+    tool_cache.clear()
+
+    sequence = [AGENTS[i % len(AGENTS)] for i in range(steps)]
+    llm = DelayedFakeLLM(
+        delay=0,
+        plan=InvestigationPlan(
+            steps=[f"Investigate with {agent}" for agent in sequence],
+            agents_sequence=sequence,
+            complexity="complex",
+            auto_execute=True,
+            reasoning="Benchmark plan",
+        ),
+    )
+    agent_nodes._create_llm = lambda provider="bedrock", **kwargs: llm
+    SupervisorAgent._create_llm = lambda self, **kwargs: llm
+    SREOutputFormatter._create_llm = lambda self, **kwargs: llm
+
+    checkpointer = InMemorySaver()
+    graph = build_multi_agent_graph(_make_tools(payload_kb), checkpointer=checkpointer)
+    query = "Why are the payment-service pods crash looping?"
+    state = {
+        "messages": [HumanMessage(content=query)],
+        "next": "supervisor",
+        "agent_results": {},
+        "current_query": query,
+        "metadata": {},
+        "requires_collaboration": False,
+        "agents_invoked": [],
+        "final_response": None,
+        "auto_approve_plan": True,
+    }
+    config = {"configurable": {"thread_id": uuid.uuid4().hex}, "recursion_limit": 4 * steps + 20}
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    await graph.ainvoke(state, config=config)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    final_state = (await graph.aget_state(config)).values
+    return {
+        "seconds": elapsed,
+        "peak_mb": peak / 1e6,
+        "checkpoint_mb": _stored_bytes([checkpointer.storage, checkpointer.blobs]) / 1e6,
+        "state_mb": len(pickle.dumps(final_state)) / 1e6,
+    }
+
+
+async def _main(args: argparse.Namespace) -> None:
+    print(f"steps={args.steps} payload={args.payload_kb}KB per tool call")
+    print(f"{'traces':<16}{'wall':>8}{'peak heap':>12}{'checkpoints':>13}{'final state':>13}")
+    for keep_in_state in (True, False):
+        result = await _run_once(args.steps, args.payload_kb, keep_in_state)
+        label = "in state" if keep_in_state else "trace sink"
+        print(
+            f"{label:<16}{result['seconds']:>7.2f}s{result['peak_mb']:>10.1f}MB"
+            f"{result['checkpoint_mb']:>11.1f}MB{result['state_mb']:>11.2f}MB"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory used by agent traces")
+    parser.add_argument("--steps", type=int, default=20, help="Agent steps in the investigation plan")
+    parser.add_argument("--payload-kb", type=int, default=32, help="Size of each fake tool result in KB")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Load test for the agent runtime's admission control, with fake backends.
+
+Serves the real /invocations endpoint in-process, with the graph's LLMs and
+tools replaced by the fakes from benchmark_agent_graph.py. The fake LLM
+provider serves at most ``--backend-capacity`` calls at once, standing in
+for model throughput limits, so investigations slow down as more of them
+run concurrently. Closed-loop clients then keep ``--clients`` requests in
+flight for ``--duration`` seconds, a share of them at high priority, first
+without admission control and then with it. Reports throughput of
+completed investigations, tail latency and how many requests were shed
+(429) or ran past their deadline (504).
+
+Usage:
+    uv run python scripts/load_test_agent_runtime.py --clients 48 --duration 20 \\
+        --max-concurrent 8 --max-queued 16 --deadline 10
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+
+sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmark_agent_graph import DelayedFakeLLM, _make_tools  # noqa: E402
+
+from sre_agent import agent_nodes, agent_runtime  # noqa: E402
+from sre_agent.admission import AdmissionController  # noqa: E402
+from sre_agent.constants import SREConstants  # noqa: E402
+from sre_agent.graph_builder import build_multi_agent_graph  # noqa: E402
+from sre_agent.output_formatter import SREOutputFormatter  # noqa: E402
+from sre_agent.supervisor import InvestigationPlan, SupervisorAgent  # noqa: E402
+
+AGENTS = ["kubernetes", "logs", "metrics"]
+
+# Calls the fake LLM provider serves at once, created in the server's loop
+_backend: Optional[asyncio.Semaphore] = None
+_backend_capacity = 8
+
+
+class CapacityLimitedLLM(DelayedFakeLLM):
+    """Fake LLM whose calls queue for a fixed number of provider slots."""
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        global _backend
+        if _backend is None:
+            _backend = asyncio.Semaphore(_backend_capacity)
+        async with _backend:
+            return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+
+def _install_fake_graph(args: argparse.Namespace) -> None:
+    global _backend_capacity
+    _backend_capacity = args.backend_capacity
+    llm = CapacityLimitedLLM(
+        delay=args.llm_delay,
+        plan=InvestigationPlan(
+            steps=[f"Investigate with {agent}" for agent in AGENTS],
+            agents_sequence=AGENTS,
+            complexity="simple",
+            auto_execute=True,
+            reasoning="Load test plan",
+        ),
+    )
+    agent_nodes._create_llm = lambda provider="bedrock", **kwargs: llm
+    SupervisorAgent._create_llm = lambda self, **kwargs: llm
+    SREOutputFormatter._create_llm = lambda self, **kwargs: llm
+
+    # Identical fake tool calls would all be served from the cache
+    SREConstants.tool_cache.enabled = False
+    agent_runtime.agent_graph = build_multi_agent_graph(_make_tools(args.tool_delay))
+
+
+def _start_server() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(agent_runtime.app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+    return samples[index]
+
+
+async def _client(
+    client: httpx.AsyncClient,
+    args: argparse.Namespace,
+    stop_at: float,
+    latencies: Dict[str, List[float]],
+    statuses: Dict[str, int],
+) -> None:
+    while time.perf_counter() < stop_at:
+        high = random.random() < args.high_priority_share
+        payload = {
+            "input": {
+                "prompt": "Why are the payment-service pods crash looping?",
+                "priority": 10 if high else 0,
+                "deadline_seconds": args.deadline,
+            }
+        }
+        started = time.perf_counter()
+        try:
+            response = await client.post("/invocations", json=payload)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        elapsed = time.perf_counter() - started
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == "200":
+            latencies["high" if high else "normal"].append(elapsed)
+        elif status == "429":
+            # Back off as a well-behaved client would, without waiting the
+            # whole Retry-After so the runtime stays saturated
+            await asyncio.sleep(min(1.0, float(response.headers.get("Retry-After", 1))))
+
+
+async def _run(base_url: str, args: argparse.Namespace, label: str) -> None:
+    latencies: Dict[str, List[float]] = {"high": [], "normal": []}
+    statuses: Dict[str, int] = {}
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.deadline + 60) as client:
+        started = time.perf_counter()
+        stop_at = started + args.duration
+        await asyncio.gather(
+            *(_client(client, args, stop_at, latencies, statuses) for _ in range(args.clients))
+        )
+        elapsed = time.perf_counter() - started
+
+    completed = sorted(latencies["high"] + latencies["normal"])
+    high = sorted(latencies["high"])
+    print(
+        f"{label:<20}{len(completed) / elapsed:>8.2f}/s"
+        f"{statistics.median(completed) if completed else 0:>8.2f}s"
+        f"{_percentile(completed, 95):>8.2f}s{_percentile(completed, 99):>8.2f}s"
+        f"{_percentile(high, 95):>10.2f}s"
+        f"{statuses.get('200', 0):>7}{statuses.get('429', 0):>7}{statuses.get('504', 0):>7}"
+        f"  {dict(sorted(statuses.items())) if set(statuses) - {'200', '429', '504'} else ''}"
+    )
+
+
+async def _main(args: argparse.Namespace) -> None:
+    _install_fake_graph(args)
+    base_url = _start_server()
+    print(
+        f"clients={args.clients} duration={args.duration}s deadline={args.deadline}s "
+        f"backend_capacity={args.backend_capacity} llm_delay={args.llm_delay}s tool_delay={args.tool_delay}s"
+    )
+    print(
+        f"{'admission':<20}{'throughput':>10}{'p50':>9}{'p95':>9}{'p99':>9}"
+        f"{'p95 high':>10}{'200':>7}{'429':>7}{'504':>7}"
+    )
+
+    scenarios = {
+        "unlimited": AdmissionController(max_concurrent=10**6, max_queued=0),
+        f"{args.max_concurrent} running/{args.max_queued} queued": AdmissionController(
+            max_concurrent=args.max_concurrent, max_queued=args.max_queued
+        ),
+    }
+    for label, controller in scenarios.items():
+        agent_runtime.admission = controller
+        await _run(base_url, args, label)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test agent runtime admission control with fake backends")
+    parser.add_argument("--clients", type=int, default=48, help="Requests kept in flight")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per scenario")
+    parser.add_argument("--max-concurrent", type=int, default=8, help="Investigations admitted at once")
+    parser.add_argument("--max-queued", type=int, default=16, help="Requests queued before shedding with 429")
+    parser.add_argument("--deadline", type=float, default=10.0, help="deadline_seconds sent with every request")
+    parser.add_argument("--high-priority-share", type=float, default=0.2, help="Share of requests sent with priority 10")
+    parser.add_argument("--backend-capacity", type=int, default=8, help="Fake LLM calls served at once")
+    parser.add_argument("--llm-delay", type=float, default=0.2, help="Seconds per fake LLM call")
+    parser.add_argument("--tool-delay", type=float, default=0.2, help="Seconds per fake tool call")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    # Every shed request logs a warning
+    logging.getLogger("sre_agent.agent_runtime").setLevel(logging.ERROR)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Logging will be configured by the main entry point
+logger = logging.getLogger(__name__)
+
+# Weight of the latest investigation in the moving average of run time
+_RUN_TIME_SMOOTHING = 0.2
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request is shed instead of being admitted."""
+
+    def __init__(self, reason: str, retry_after_seconds: int):
+        super().__init__(reason)
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionSlot:
+    """Capacity held by one admitted investigation.
+
+    Releasing is idempotent, so every path that can end an investigation
+    (normal completion, cancellation, a dropped streaming response) can
+    release the slot without double counting.
+    """
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(time.monotonic() - self._started)
+
+
+class AdmissionController:
+    """Limits concurrent investigations and queues the overflow by priority.
+
+    Up to ``max_concurrent`` investigations run at once. Further requests
+    wait in a bounded queue, highest priority first and first come first
+    served within a priority. When the queue is full, or a request has
+    waited ``max_wait_seconds`` without a free slot, it is rejected so the
+    caller can retry later instead of piling onto an overloaded runtime.
+    """
+
+    def __init__(self, max_concurrent: int, max_queued: int, initial_run_seconds: float = 30.0):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+
+        self._active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._average_run_seconds = initial_run_seconds
+        self._counts = {"admitted": 0, "waited": 0, "rejected": 0, "expired": 0}
+
+    def retry_after_seconds(self) -> int:
+        """Estimated wait until a new request could be admitted."""
+        backlog = len(self._waiters) + 1
+        waves = math.ceil(backlog / self.max_concurrent)
+        return max(1, math.ceil(waves * self._average_run_seconds))
+
+    async def acquire(self, priority: int = 0, max_wait_seconds: Optional[float] = None) -> AdmissionSlot:
+        """Wait for a free slot, or raise AdmissionRejectedError."""
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            self._counts["admitted"] += 1
+            return AdmissionSlot(self)
+
+        if len(self._waiters) >= self.max_queued:
+            self._counts["rejected"] += 1
+            raise AdmissionRejectedError(
+                f"Too many investigations in progress ({self._active} running, "
+                f"{len(self._waiters)} queued)",
+                self.retry_after_seconds(),
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (-priority, next(self._sequence), future)
+        heapq.heappush(self._waiters, entry)
+        self._counts["waited"] += 1
+        try:
+            await asyncio.wait_for(future, max_wait_seconds)
+        except asyncio.TimeoutError:
+            self._abandon(entry)
+            self._counts["expired"] += 1
+            raise AdmissionRejectedError(
+                f"Timed out after {max_wait_seconds:g}s waiting for a free slot",
+                self.retry_after_seconds(),
+            )
+        except asyncio.CancelledError:
+            self._abandon(entry)
+            raise
+
+        self._counts["admitted"] += 1
+        return AdmissionSlot(self)
+
+    def _abandon(self, entry: Tuple[int, int, asyncio.Future]) -> None:
+        """Forget a waiter that gave up, passing on a slot it was just handed."""
+        future = entry[2]
+        if future.done() and not future.cancelled():
+            self._release(None)
+            return
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+
+    def _release(self, run_seconds: Optional[float]) -> None:
+        if run_seconds is not None:
+            self._average_run_seconds += _RUN_TIME_SMOOTHING * (
+                run_seconds - self._average_run_seconds
+            )
+        # Hand the slot straight to the next waiter so it cannot be taken
+        # by a request arriving in between
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "active": self._active,
+            "queued": len(self._waiters),
+            **self._counts,
+            "average_run_seconds": round(self._average_run_seconds, 2),
+        }
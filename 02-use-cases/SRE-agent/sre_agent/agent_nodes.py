@@ -2,24 +2,45 @@
 
 import asyncio
 import logging
+import re
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 import yaml
 from langchain_anthropic import ChatAnthropic
 from langchain_aws import ChatBedrock
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.tools import BaseTool
+from langgraph.config import get_stream_writer
 from langgraph.prebuilt import create_react_agent
 
 from .agent_state import AgentState
 from .constants import SREConstants
+from .context_window import (
+    compact_model_input,
+    estimate_tokens,
+    select_agent_context,
+    start_context_stats,
+)
 from .prompt_loader import prompt_loader
+from .trace_sink import get_trace_sink
 
 # Logging will be configured by the main entry point
 logger = logging.getLogger(__name__)
 
+# Final line an agent adds when its findings warrant a new investigation plan
+_REPLAN_PATTERN = re.compile(r"^\s*REPLAN:\s*(.+?)\s*$", re.MULTILINE)
+
+
+def _extract_replan_request(response: str) -> Tuple[str, str]:
+    """Split a REPLAN line off an agent response, returning (response, reason)."""
+    matches = list(_REPLAN_PATTERN.finditer(response))
+    if not matches:
+        return response, ""
+    reason = matches[-1].group(1)
+    return _REPLAN_PATTERN.sub("", response).rstrip(), reason
+
 
 @lru_cache(maxsize=1)
 def _load_agent_config() -> Dict[str, Any]:
@@ -100,8 +121,12 @@ class BaseAgentNode:
         logger.info(f"Initializing {name} with LLM provider: {llm_provider}")
         self.llm = _create_llm(llm_provider, **llm_kwargs)
 
-        # Create the react agent
-        self.agent = create_react_agent(self.llm, self.tools)
+        self._tool_names = {getattr(tool, "name", "") for tool in tools}
+
+        # Create the react agent; every LLM call gets a compacted context
+        self.agent = create_react_agent(
+            self.llm, self.tools, pre_model_hook=compact_model_input
+        )
 
     def _get_system_prompt(self) -> str:
         """Get system prompt for this agent using prompt loader."""
@@ -136,6 +161,23 @@ class BaseAgentNode:
             logger.warning(f"Unknown agent type for agent: {self.name}")
             return "unknown"
 
+    @staticmethod
+    def _context_usage(
+        stats: Dict[str, int], history_tokens_saved: int, all_messages: List[Any]
+    ) -> Dict[str, int]:
+        """Estimated prompt tokens over the agent's LLM calls, before and after compaction."""
+        reported = sum(
+            (getattr(msg, "usage_metadata", None) or {}).get("input_tokens", 0)
+            for msg in all_messages
+        )
+        return {
+            "llm_calls": stats["llm_calls"],
+            "prompt_tokens_before": stats["tokens_before"]
+            + history_tokens_saved * stats["llm_calls"],
+            "prompt_tokens_after": stats["tokens_after"],
+            "reported_input_tokens": reported,
+        }
+
     async def __call__(self, state: AgentState) -> Dict[str, Any]:
         """Process the current state and return updated state."""
         try:
@@ -154,11 +196,22 @@ class BaseAgentNode:
             # We'll collect all messages and the final response
             all_messages = []
             agent_response = ""
+            replan_reason = ""
 
             # Add system prompt and user prompt
             system_message = SystemMessage(content=self._get_system_prompt())
             user_message = HumanMessage(content=agent_prompt)
 
+            # Only pass the shared history relevant to this agent
+            context_messages = select_agent_context(messages, self._tool_names)
+            history_tokens_saved = estimate_tokens(messages) - estimate_tokens(
+                context_messages
+            )
+            context_stats = start_context_stats()
+
+            # Tool progress for callers streaming with stream_mode="custom"
+            write_event = get_stream_writer()
+
             # Stream the agent execution to capture tool calls with timeout
             logger.info(f"{self.name} - Starting agent execution")
 
@@ -170,7 +223,11 @@ class BaseAgentNode:
                     nonlocal agent_response  # Fix scope issue - allow access to outer variable
                     chunk_count = 0
                     async for chunk in self.agent.astream(
-                        {"messages": [system_message] + messages + [user_message]}
+                        {
+                            "messages": [system_message]
+                            + context_messages
+                            + [user_message]
+                        }
                     ):
                         chunk_count += 1
                         logger.info(
@@ -197,6 +254,14 @@ class BaseAgentNode:
                                             logger.debug(
                                                 f"{self.name} - Tool args: {tool_args}"
                                             )
+                                            write_event(
+                                                {
+                                                    "event": "tool_call",
+                                                    "agent": self.name,
+                                                    "tool": tool_name,
+                                                    "id": tool_id,
+                                                }
+                                            )
                                     # Always capture the latest content from AIMessages
                                     if (
                                         hasattr(msg, "content")
@@ -230,6 +295,15 @@ class BaseAgentNode:
                                         logger.info(
                                             f"{self.name} - Tool response received: {tool_name} (id: {tool_call_id}), content: {content_preview}..."
                                         )
+                                        write_event(
+                                            {
+                                                "event": "tool_result",
+                                                "agent": self.name,
+                                                "tool": tool_name,
+                                                "id": tool_call_id,
+                                                "preview": content_preview,
+                                            }
+                                        )
                                         logger.debug(
                                             f"{self.name} - Full tool response: {msg.content if hasattr(msg, 'content') else 'No content'}"
                                         )
@@ -245,11 +319,13 @@ class BaseAgentNode:
                     f"{self.name} - Agent execution timed out after {timeout_seconds} seconds"
                 )
                 agent_response = f"Agent execution timed out after {timeout_seconds} seconds. The agent may be stuck on a tool call or LLM response."
+                replan_reason = f"{self.name} timed out"
 
             except Exception as e:
                 logger.error(f"{self.name} - Agent execution failed: {e}")
                 logger.exception("Full exception details:")
                 agent_response = f"Agent execution failed: {str(e)}"
+                replan_reason = f"{self.name} failed: {str(e)}"
 
             # Debug: Check what we captured
             logger.info(
@@ -258,28 +334,50 @@ class BaseAgentNode:
             if agent_response:
                 logger.info(f"{self.name} - Full response: {str(agent_response)}")
 
-            # Update state with streaming info
-            return {
-                "agent_results": {
-                    **state.get("agent_results", {}),
-                    self.name: agent_response,
-                },
-                "agents_invoked": state.get("agents_invoked", []) + [self.name],
-                "messages": messages + all_messages,
-                "metadata": {
-                    **state.get("metadata", {}),
-                    f"{self.name.replace(' ', '_')}_trace": all_messages,
-                },
+            context_usage = self._context_usage(
+                context_stats, history_tokens_saved, all_messages
+            )
+            logger.info(f"{self.name} - Context usage: {context_usage}")
+
+            if isinstance(agent_response, str) and not replan_reason:
+                agent_response, replan_reason = _extract_replan_request(agent_response)
+                if replan_reason:
+                    logger.info(f"{self.name} - Requested replanning: {replan_reason}")
+
+            # The trace goes to the sink; state only keeps its ID
+            agent_key = self.name.replace(" ", "_")
+            metadata = {
+                f"{agent_key}_trace_id": get_trace_sink().write(self.name, all_messages),
+                f"{agent_key}_context": context_usage,
+            }
+            if SREConstants.traces.keep_in_state:
+                metadata[f"{agent_key}_trace"] = all_messages
+
+            # Update state with streaming info. Reducers merge these into the
+            # existing results and metadata. Tool exchanges stay in the trace;
+            # only the agent's findings join the shared history
+            update = {
+                "agent_results": {self.name: agent_response},
+                "agents_invoked": [self.name],
+                "messages": (
+                    [AIMessage(content=agent_response, name=f"{self._get_agent_type()}_agent")]
+                    if agent_response
+                    else []
+                ),
+                "metadata": metadata,
             }
+            if replan_reason:
+                update["replan_requests"] = {self._get_agent_type(): replan_reason}
+            return update
 
         except Exception as e:
             logger.error(f"Error in {self.name}: {e}")
             return {
-                "agent_results": {
-                    **state.get("agent_results", {}),
-                    self.name: f"Error: {str(e)}",
+                "agent_results": {self.name: f"Error: {str(e)}"},
+                "agents_invoked": [self.name],
+                "replan_requests": {
+                    self._get_agent_type(): f"{self.name} failed: {str(e)}"
                 },
-                "agents_invoked": state.get("agents_invoked", []) + [self.name],
             }
 
 
@@ -1,19 +1,26 @@
 #!/usr/bin/env python3
 
 import asyncio
+import json
 import logging
 import os
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import BaseTool
 
+from .admission import AdmissionController, AdmissionRejectedError, AdmissionSlot
 from .multi_agent_langgraph import create_multi_agent_system
 from .agent_state import AgentState
 from .constants import SREConstants
+from .llm_call_counter import LLMCallCounter
+from .tool_cache import tool_cache
 
 # Import logging config
 from .logging_config import configure_logging
@@ -46,6 +53,22 @@ class InvocationResponse(BaseModel):
 # Global variables for agent state
 agent_graph = None
 tools: list[BaseTool] = []
+_init_lock = asyncio.Lock()
+
+# Bounds how many investigations share the LLM provider and gateway at once
+admission = AdmissionController(
+    max_concurrent=SREConstants.runtime.max_concurrent_investigations,
+    max_queued=SREConstants.runtime.max_queued_investigations,
+)
+
+
+def _on_tools_changed(new_tools: list[BaseTool]) -> None:
+    """Rebuild the agent on the next request once the gateway's tools change."""
+    global agent_graph
+    logger.warning(
+        f"Gateway tools changed ({len(new_tools)} tools), reinitializing agent on next request"
+    )
+    agent_graph = None
 
 
 async def initialize_agent():
@@ -55,6 +78,15 @@ async def initialize_agent():
     if agent_graph is not None:
         return  # Already initialized
 
+    async with _init_lock:
+        # Requests that waited on the lock find the graph already built
+        if agent_graph is None:
+            await _build_agent()
+
+
+async def _build_agent():
+    global agent_graph, tools
+
     try:
         logger.info("Initializing SRE Agent system...")
 
@@ -71,7 +103,9 @@ async def initialize_agent():
         logger.info(f"Calling create_multi_agent_system with provider: {provider}")
 
         # Create multi-agent system using the same function as CLI
-        agent_graph, tools = await create_multi_agent_system(provider)
+        agent_graph, tools = await create_multi_agent_system(
+            provider, on_tools_changed=_on_tools_changed
+        )
 
         logger.info(
             f"SRE Agent system initialized successfully with {len(tools)} tools"
@@ -88,58 +122,72 @@ async def startup_event():
     await initialize_agent()
 
 
-@app.post("/invocations", response_model=InvocationResponse)
-async def invoke_agent(request: InvocationRequest):
-    """Main agent invocation endpoint."""
-    global agent_graph, tools
+def _initial_state(user_prompt: str) -> AgentState:
+    """Create initial state exactly like the CLI does."""
+    return {
+        "messages": [HumanMessage(content=user_prompt)],
+        "next": "supervisor",
+        "agent_results": {},
+        "current_query": user_prompt,
+        "metadata": {},
+        "requires_collaboration": False,
+        "agents_invoked": [],
+        "next_agents": None,
+        "replan_requests": {},
+        "final_response": None,
+        "auto_approve_plan": True,  # Always auto-approve plans in runtime mode
+    }
+
+
+async def _investigation_events(graph, user_prompt: str) -> AsyncIterator[Dict[str, Any]]:
+    """Run one investigation, yielding progress events as they happen.
+
+    Events are routing decisions, tool calls and results, per-agent results
+    and, last, the final output in the same format as the JSON response.
+    """
+    final_response = ""
+    plan_sent = ""
 
-    logger.info("Received invocation request")
+    logger.info("Starting agent graph execution")
 
+    llm_calls = LLMCallCounter()
     try:
-        # Ensure agent is initialized
-        await initialize_agent()
-
-        # Extract user prompt
-        user_prompt = request.input.get("prompt", "")
-        if not user_prompt:
-            raise HTTPException(
-                status_code=400,
-                detail="No prompt found in input. Please provide a 'prompt' key in the input.",
-            )
-
-        logger.info(f"Processing query: {user_prompt}")
-
-        # Create initial state exactly like the CLI does
-        initial_state: AgentState = {
-            "messages": [HumanMessage(content=user_prompt)],
-            "next": "supervisor",
-            "agent_results": {},
-            "current_query": user_prompt,
-            "metadata": {},
-            "requires_collaboration": False,
-            "agents_invoked": [],
-            "final_response": None,
-            "auto_approve_plan": True,  # Always auto-approve plans in runtime mode
-        }
-
-        # Process through the agent graph exactly like the CLI
-        final_response = ""
-
-        logger.info("Starting agent graph execution")
-
-        async for event in agent_graph.astream(initial_state):
-            for node_name, node_output in event.items():
+        async for mode, chunk in graph.astream(
+            _initial_state(user_prompt),
+            config={"callbacks": [llm_calls]},
+            stream_mode=["updates", "custom"],
+        ):
+            # Tool progress written by the agent nodes
+            if mode == "custom":
+                yield chunk
+                continue
+
+            for node_name, node_output in chunk.items():
                 logger.info(f"Processing node: {node_name}")
+                node_output = node_output or {}
 
                 # Log key events from each node
-                if node_name == "supervisor":
-                    next_agent = node_output.get("next", "")
+                if node_name in ("supervisor", "executor"):
+                    next_agents = node_output.get("next_agents") or [
+                        node_output.get("next", "")
+                    ]
                     metadata = node_output.get("metadata", {})
-                    logger.info(f"Supervisor routing to: {next_agent}")
+                    logger.info(f"Supervisor routing to: {', '.join(next_agents)}")
                     if metadata.get("routing_reasoning"):
                         logger.info(
                             f"Routing reasoning: {metadata['routing_reasoning']}"
                         )
+                    event = {
+                        "event": "routing",
+                        "node": node_name,
+                        "next": next_agents,
+                        "reasoning": metadata.get("routing_reasoning", ""),
+                    }
+                    # Send the plan once, and again only if it was replanned
+                    plan_text = metadata.get("plan_text", "")
+                    if metadata.get("show_plan") and plan_text != plan_sent:
+                        event["plan"] = plan_sent = plan_text
+                    yield event
 
                 elif node_name in [
                     "kubernetes_agent",
@@ -149,26 +197,202 @@ async def invoke_agent(request: InvocationRequest):
                 ]:
                     agent_results = node_output.get("agent_results", {})
                     logger.info(f"{node_name} completed with results")
+                    for agent, result in agent_results.items():
+                        yield {"event": "agent_result", "agent": agent, "result": result}
 
                 # Capture final response from aggregate node
                 elif node_name == "aggregate":
                     final_response = node_output.get("final_response", "")
                     logger.info("Aggregate node completed, final response captured")
+    finally:
+        logger.info(f"LLM calls for query: {llm_calls.summary()}")
+        logger.info(f"Tool cache: {tool_cache.stats()}")
+        logger.info(f"Admission: {admission.stats()}")
+
+    if not final_response:
+        logger.warning("No final response received from agent graph")
+        final_response = (
+            "I encountered an issue processing your request. Please try again."
+        )
+    else:
+        logger.info(f"Final response length: {len(final_response)} characters")
 
-        if not final_response:
-            logger.warning("No final response received from agent graph")
-            final_response = (
-                "I encountered an issue processing your request. Please try again."
-            )
-        else:
-            logger.info(f"Final response length: {len(final_response)} characters")
-
-        # Simple response format
-        response_data = {
+    # Simple response format
+    yield {
+        "event": "final",
+        "output": {
             "message": final_response,
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "model": SREConstants.app.agent_model_name,
-        }
+        },
+    }
+
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def _stream_investigation(
+    graph, user_prompt: str, slot: AdmissionSlot, remaining_seconds: float
+) -> AsyncIterator[str]:
+    """Relay investigation events to the client as server-sent events.
+
+    The graph runs in a producer task feeding a bounded queue. A slow client
+    fills the queue and the producer waits, pausing the investigation rather
+    than buffering its output; if the client disconnects or the request's
+    deadline passes, the producer and its in-flight agent nodes are
+    cancelled. Comment lines are sent while idle to keep proxies from
+    closing the connection.
+    """
+    config = SREConstants.runtime
+    queue: asyncio.Queue = asyncio.Queue(maxsize=config.stream_queue_size)
+    finished = object()
+
+    async def produce() -> None:
+        try:
+            async with asyncio.timeout(remaining_seconds):
+                async for event in _investigation_events(graph, user_prompt):
+                    await queue.put(event)
+        except asyncio.TimeoutError:
+            logger.warning("Investigation exceeded its deadline, cancelled")
+            await queue.put(
+                {"event": "error", "detail": "Investigation exceeded its deadline"}
+            )
+        except Exception as e:
+            logger.error(f"Agent processing failed: {e}")
+            logger.exception("Full exception details:")
+            await queue.put(
+                {"event": "error", "detail": f"Agent processing failed: {str(e)}"}
+            )
+        finally:
+            slot.release()
+        await queue.put(finished)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=config.stream_heartbeat_seconds
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is finished:
+                break
+            yield _format_sse(event)
+        logger.info("Successfully streamed agent response")
+    finally:
+        if not producer.done():
+            logger.warning("Client disconnected, cancelling investigation")
+            producer.cancel()
+
+
+def _request_limits(invocation: InvocationRequest) -> Tuple[int, float]:
+    """Priority and deadline in seconds requested in the payload.
+
+    Higher priorities are admitted first. The deadline defaults to, and is
+    capped at, the graph execution timeout.
+    """
+    priority = invocation.input.get("priority", 0)
+    if not isinstance(priority, int) or isinstance(priority, bool):
+        raise HTTPException(status_code=400, detail="'priority' must be an integer.")
+
+    max_deadline = SREConstants.timeouts.graph_execution_timeout_seconds
+    deadline = invocation.input.get("deadline_seconds", max_deadline)
+    if not isinstance(deadline, (int, float)) or isinstance(deadline, bool) or deadline <= 0:
+        raise HTTPException(
+            status_code=400, detail="'deadline_seconds' must be a positive number."
+        )
+    return priority, min(float(deadline), max_deadline)
+
+
+async def _admit(priority: int, max_wait_seconds: float) -> AdmissionSlot:
+    """Wait for capacity to run an investigation, shedding load with 429."""
+    try:
+        return await admission.acquire(
+            priority,
+            min(max_wait_seconds, SREConstants.runtime.max_queue_wait_seconds),
+        )
+    except AdmissionRejectedError as e:
+        logger.warning(f"Rejecting request: {e} (admission: {admission.stats()})")
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after_seconds)},
+        )
+
+
+def _wants_stream(request: Request, invocation: InvocationRequest) -> bool:
+    """Stream when asked for in the payload or via the Accept header."""
+    return bool(invocation.input.get("stream")) or (
+        "text/event-stream" in request.headers.get("accept", "")
+    )
+
+
+@app.post("/invocations", response_model=InvocationResponse)
+async def invoke_agent(invocation: InvocationRequest, request: Request):
+    """Main agent invocation endpoint.
+
+    Returns a single JSON response, or a text/event-stream of progress
+    events ending with the final output when the payload sets
+    ``"stream": true`` or the client accepts text/event-stream.
+
+    The payload may also set ``"priority"`` (higher is admitted first when
+    requests are queued) and ``"deadline_seconds"``, after which the
+    investigation is cancelled. Requests that cannot be admitted get a 429
+    with a Retry-After header.
+    """
+    logger.info("Received invocation request")
+    received = time.monotonic()
+    slot: Optional[AdmissionSlot] = None
+
+    try:
+        # Ensure agent is initialized
+        await initialize_agent()
+        graph = agent_graph
+
+        # Extract user prompt
+        user_prompt = invocation.input.get("prompt", "")
+        if not user_prompt:
+            raise HTTPException(
+                status_code=400,
+                detail="No prompt found in input. Please provide a 'prompt' key in the input.",
+            )
+
+        priority, deadline_seconds = _request_limits(invocation)
+        slot = await _admit(priority, deadline_seconds - (time.monotonic() - received))
+        remaining_seconds = deadline_seconds - (time.monotonic() - received)
+
+        logger.info(f"Processing query: {user_prompt}")
+
+        if _wants_stream(request, invocation):
+            logger.info("Streaming invocation response")
+            response = StreamingResponse(
+                _stream_investigation(graph, user_prompt, slot, remaining_seconds),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                # Frees the slot even if the stream never starts
+                background=BackgroundTask(slot.release),
+            )
+            slot = None  # Released by the stream
+            return response
+
+        # Process through the agent graph exactly like the CLI
+        response_data: Dict[str, Any] = {}
+        try:
+            async with asyncio.timeout(remaining_seconds):
+                async for event in _investigation_events(graph, user_prompt):
+                    if event["event"] == "final":
+                        response_data = event["output"]
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Investigation exceeded its deadline of {deadline_seconds:.0f}s, cancelled"
+            )
+            raise HTTPException(
+                status_code=504,
+                detail=f"Investigation exceeded its deadline of {deadline_seconds:.0f}s",
+            )
 
         logger.info("Successfully processed agent request")
         logger.info("Returning invocation response")
@@ -182,6 +406,9 @@ async def invoke_agent(request: InvocationRequest):
         raise HTTPException(
             status_code=500, detail=f"Agent processing failed: {str(e)}"
         )
+    finally:
+        if slot is not None:
+            slot.release()
 
 
 @app.get("/ping")
@@ -214,15 +441,22 @@ async def invoke_sre_agent_async(prompt: str, provider: str = "anthropic") -> st
             "metadata": {},
             "requires_collaboration": False,
             "agents_invoked": [],
+            "next_agents": None,
+            "replan_requests": {},
             "final_response": None,
         }
 
         # Execute and get final response
         final_response = ""
-        async for event in graph.astream(initial_state):
+        llm_calls = LLMCallCounter()
+        async for event in graph.astream(
+            initial_state, config={"callbacks": [llm_calls]}
+        ):
             for node_name, node_output in event.items():
                 if node_name == "aggregate":
                     final_response = node_output.get("final_response", "")
+        logger.info(f"LLM calls for query: {llm_calls.summary()}")
+        logger.info(f"Tool cache: {tool_cache.stats()}")
 
         return final_response or "I encountered an issue processing your request."
 
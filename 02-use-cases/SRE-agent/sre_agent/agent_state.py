@@ -16,6 +16,27 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Update value that empties a merged field instead of merging into it. An
+# empty dict or list cannot do this: merging it is a no-op.
+RESET = None
+
+
+def _merge_dicts(
+    left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Reducer merging dict updates from agents that ran in the same step."""
+    if right is RESET:
+        return {}
+    return {**(left or {}), **right}
+
+
+def _merge_unique(left: Optional[List[str]], right: Optional[List[str]]) -> List[str]:
+    """Reducer taking the ordered union of list updates."""
+    if right is RESET:
+        return []
+    return list(dict.fromkeys((left or []) + right))
+
+
 class AgentState(TypedDict):
     """State shared across all agents in the multi-agent system.
 
@@ -26,23 +47,30 @@ class AgentState(TypedDict):
     # Conversation messages using LangGraph's message annotation
     messages: Annotated[List[BaseMessage], add_messages]
 
-    # Which agent should act next (set by supervisor)
-    next: Literal["kubernetes", "logs", "metrics", "runbooks", "FINISH"]
+    # Which agent should act next (set by supervisor); "supervisor" when the
+    # plan executor hands control back to it for replanning
+    next: Literal["supervisor", "kubernetes", "logs", "metrics", "runbooks", "FINISH"]
 
-    # Intermediate results from each agent
-    agent_results: Dict[str, Any]
+    # Agents to run concurrently in the next step (set by supervisor)
+    next_agents: Optional[List[str]]
+
+    # Intermediate results from each agent, merged across parallel agents
+    agent_results: Annotated[Dict[str, Any], _merge_dicts]
 
     # Current query being processed
     current_query: Optional[str]
 
     # Metadata about the conversation
-    metadata: Dict[str, Any]
+    metadata: Annotated[Dict[str, Any], _merge_dicts]
 
     # Flag to indicate if we need multiple agents
     requires_collaboration: bool
 
     # List of agents that have already responded
-    agents_invoked: List[str]
+    agents_invoked: Annotated[List[str], _merge_unique]
+
+    # Agent types that failed or found evidence warranting a new plan, with reasons
+    replan_requests: Annotated[Dict[str, str], _merge_dicts]
 
     # Final aggregated response (set by supervisor)
     final_response: Optional[str]
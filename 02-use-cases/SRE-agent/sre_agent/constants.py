@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 import logging
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, Field
 
 # Configure logging with basicConfig
@@ -86,6 +86,202 @@ class TimeoutConfig(BaseModel):
     )
 
 
+class GatewayConfig(BaseModel):
+    """MCP gateway connection configuration constants."""
+
+    tool_schema_cache_enabled: bool = Field(
+        default=True,
+        description="Serve gateway tool schemas from an on-disk cache at startup",
+    )
+
+    tool_schema_cache_file: str = Field(
+        default=".cache/mcp_tool_schemas.json",
+        description="Tool schema cache file, relative to the sre_agent package (MCP_TOOL_SCHEMA_CACHE overrides)",
+    )
+
+    revalidate_in_background: bool = Field(
+        default=True,
+        description="Refresh cached tool schemas from the gateway after startup",
+    )
+
+
+class ExecutionConfig(BaseModel):
+    """Graph execution configuration constants."""
+
+    parallel_agents: bool = Field(
+        default=True,
+        description="Run independent agents from the same plan stage concurrently",
+    )
+
+    independent_agents: list[str] = Field(
+        default=["kubernetes", "logs", "metrics"],
+        description="Evidence-gathering agents that do not depend on each other's findings",
+    )
+
+    plan_execution: bool = Field(
+        default=True,
+        description="Walk the investigation plan with a deterministic executor instead of returning to the supervisor after each stage",
+    )
+
+    max_replans: int = Field(
+        default=1,
+        ge=0,
+        le=5,
+        description="Maximum supervisor replanning rounds per query after agent failures or new evidence",
+    )
+
+
+class ContextConfig(BaseModel):
+    """Agent context window configuration constants."""
+
+    max_context_tokens: int = Field(
+        default=16000,
+        ge=1000,
+        le=200000,
+        description="Approximate token budget for the messages sent on each agent LLM call",
+    )
+
+    max_tool_output_chars: int = Field(
+        default=4000,
+        ge=200,
+        description="Older tool outputs are truncated to this many characters",
+    )
+
+    keep_recent_tool_outputs: int = Field(
+        default=2,
+        ge=0,
+        description="Number of most recent tool outputs always sent in full",
+    )
+
+    max_shared_message_chars: int = Field(
+        default=2000,
+        ge=200,
+        description="Conversation messages and other agents' findings are truncated to this many characters",
+    )
+
+
+class TraceConfig(BaseModel):
+    """Agent trace sink configuration constants."""
+
+    sink: Literal["memory", "jsonl", "otel"] = Field(
+        default="memory",
+        description="Where agent message traces are written: in-memory ring buffer, JSONL file or OpenTelemetry spans",
+    )
+
+    max_traces: int = Field(
+        default=200,
+        ge=1,
+        le=10000,
+        description="Number of recent traces kept in memory for display",
+    )
+
+    jsonl_path: str = Field(
+        default="./traces/agent_traces.jsonl",
+        description="File that the jsonl sink appends traces to",
+    )
+
+    keep_in_state: bool = Field(
+        default=False,
+        description="Also copy full traces into graph state metadata (previous behaviour; state grows with tool-call volume)",
+    )
+
+
+class ToolCacheConfig(BaseModel):
+    """MCP tool result cache configuration constants."""
+
+    enabled: bool = Field(
+        default=True,
+        description="Cache tool results shared by all agents and consecutive queries",
+    )
+
+    max_entries: int = Field(
+        default=512,
+        ge=1,
+        le=10000,
+        description="Maximum number of cached tool results (least recently used are evicted)",
+    )
+
+    default_ttl_seconds: float = Field(
+        default=0.0,
+        ge=0,
+        description="Time-to-live for cached results of tools without a specific TTL (0: not cached)",
+    )
+
+    tool_ttl_seconds: dict[str, float] = Field(
+        default={
+            # Live cluster state changes quickly
+            "get_pod_status": 30.0,
+            "get_deployment_status": 30.0,
+            "get_node_status": 30.0,
+            "get_cluster_events": 15.0,
+            "get_resource_usage": 15.0,
+            # Logs and metrics are time-sensitive; cache only long enough to
+            # share identical calls between agents of one investigation
+            "get_recent_logs": 15.0,
+            "search_logs": 15.0,
+            "get_error_logs": 15.0,
+            "count_log_events": 15.0,
+            "analyze_log_patterns": 30.0,
+            "get_performance_metrics": 15.0,
+            "get_error_rates": 15.0,
+            "get_resource_metrics": 15.0,
+            "get_availability_metrics": 30.0,
+            "analyze_trends": 30.0,
+            # Operational procedures rarely change during an investigation
+            "search_runbooks": 600.0,
+            "get_incident_playbook": 600.0,
+            "get_troubleshooting_guide": 600.0,
+            "get_escalation_procedures": 600.0,
+            "get_common_resolutions": 600.0,
+            # Free-form search is not cached
+            "x-amz-bedrock-agentcore-search": 0.0,
+        },
+        description="Per-tool TTL overrides in seconds; 0 disables caching for that tool",
+    )
+
+
+class RuntimeConfig(BaseModel):
+    """Agent runtime HTTP server configuration constants."""
+
+    stream_queue_size: int = Field(
+        default=64,
+        ge=1,
+        le=10000,
+        description="Events buffered per streaming response before the investigation waits for the client",
+    )
+
+    stream_heartbeat_seconds: float = Field(
+        default=15.0,
+        gt=0,
+        description="Idle interval after which a keep-alive comment is sent on streaming responses",
+    )
+
+    stream_executive_summary: bool = Field(
+        default=True,
+        description="Stream executive summary tokens as summary_token events on streaming responses",
+    )
+
+    max_concurrent_investigations: int = Field(
+        default=8,
+        ge=1,
+        le=1000,
+        description="Investigations run at once; further requests are queued",
+    )
+
+    max_queued_investigations: int = Field(
+        default=32,
+        ge=0,
+        le=10000,
+        description="Requests waiting for a free slot before new ones are rejected with 429",
+    )
+
+    max_queue_wait_seconds: float = Field(
+        default=30.0,
+        gt=0,
+        description="Longest a request waits for a free slot before it is rejected with 429",
+    )
+
+
 class PromptConfig(BaseModel):
     """Prompt configuration constants."""
 
@@ -151,8 +347,14 @@ class ApplicationConfig(BaseModel):
     )
 
     conversation_state_file: str = Field(
-        default=".multi_agent_conversation_state.json",
-        description="Filename for saving conversation state",
+        default=".multi_agent_conversation_journal.jsonl",
+        description="Filename for saving conversation state (append-only JSONL journal)",
+    )
+
+    conversation_journal_compact_min_records: int = Field(
+        default=1000,
+        ge=1,
+        description="Obsolete journal records tolerated before the journal is rewritten",
     )
 
     spinner_chars: list[str] = Field(
@@ -181,6 +383,18 @@ class SREConstants:
         # Access timeout configuration
         timeout = SREConstants.timeouts.graph_execution_timeout_seconds
 
+        # Access graph execution configuration
+        parallel = SREConstants.execution.parallel_agents
+
+        # Access agent context window configuration
+        budget = SREConstants.context.max_context_tokens
+
+        # Access agent trace sink configuration
+        sink = SREConstants.traces.sink
+
+        # Access tool result cache configuration
+        ttl = SREConstants.tool_cache.default_ttl_seconds
+
         # Access prompt configuration
         prompts_dir = SREConstants.prompts.prompts_directory
         agent_files = SREConstants.prompts.agent_prompt_files
@@ -192,6 +406,12 @@ class SREConstants:
     model: ModelConfig = ModelConfig()
     aws: AWSConfig = AWSConfig()
     timeouts: TimeoutConfig = TimeoutConfig()
+    gateway: GatewayConfig = GatewayConfig()
+    execution: ExecutionConfig = ExecutionConfig()
+    context: ContextConfig = ContextConfig()
+    traces: TraceConfig = TraceConfig()
+    tool_cache: ToolCacheConfig = ToolCacheConfig()
+    runtime: RuntimeConfig = RuntimeConfig()
     prompts: PromptConfig = PromptConfig()
     app: ApplicationConfig = ApplicationConfig()
 
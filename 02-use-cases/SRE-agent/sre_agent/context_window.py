@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Set
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+
+from .constants import SREConstants
+
+# Logging will be configured by the main entry point
+logger = logging.getLogger(__name__)
+
+# Token accounting for the agent call in progress, shared with its model hook
+_context_stats: ContextVar[Optional[Dict[str, int]]] = ContextVar(
+    "agent_context_stats", default=None
+)
+
+
+def estimate_tokens(messages: List[BaseMessage]) -> int:
+    """Approximate prompt token count for a list of messages."""
+    return count_tokens_approximately(messages)
+
+
+def _truncate(message: BaseMessage, max_chars: int) -> BaseMessage:
+    """Return a copy of message with string content cut to max_chars."""
+    content = message.content
+    if not isinstance(content, str) or len(content) <= max_chars:
+        return message
+    omitted = len(content) - max_chars
+    return message.model_copy(
+        update={"content": f"{content[:max_chars]}\n...[truncated {omitted} chars]"}
+    )
+
+
+def _is_tool_request(message: BaseMessage) -> bool:
+    return isinstance(message, AIMessage) and bool(message.tool_calls)
+
+
+def _group_exchanges(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """Group each tool-calling AI message with the tool results answering it."""
+    groups: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, ToolMessage) and groups and _is_tool_request(groups[-1][0]):
+            groups[-1].append(message)
+        else:
+            groups.append([message])
+    return groups
+
+
+def _group_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """Split messages into turns, each starting at a human message."""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def select_agent_context(
+    messages: List[BaseMessage], tool_names: Set[str]
+) -> List[BaseMessage]:
+    """Pick the shared history relevant to one specialist agent.
+
+    Conversation turns and other agents' findings are kept, cut to
+    ``max_shared_message_chars``; tool exchanges are only kept when every
+    call in them is to one of this agent's own tools.
+    """
+    max_chars = SREConstants.context.max_shared_message_chars
+    selected: List[BaseMessage] = []
+    for group in _group_exchanges(messages):
+        head = group[0]
+        if isinstance(head, AIMessage) and head.tool_calls:
+            if all(call["name"] in tool_names for call in head.tool_calls):
+                selected.extend(group)
+        elif not isinstance(head, ToolMessage):
+            selected.append(_truncate(head, max_chars))
+    return selected
+
+
+def compact_messages(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """Fit an agent's model input into the configured token budget.
+
+    Tool outputs older than the most recent ``keep_recent_tool_outputs`` are
+    truncated first. If the input is still over ``max_context_tokens``, the
+    oldest conversation turns before the current question are dropped,
+    then the oldest tool exchanges after it. System messages, the current
+    question and the latest tool exchange are always kept.
+    """
+    config = SREConstants.context
+
+    tool_positions = [
+        i for i, message in enumerate(messages) if isinstance(message, ToolMessage)
+    ]
+    keep = config.keep_recent_tool_outputs
+    older = set(tool_positions[:-keep] if keep else tool_positions)
+    compacted = [
+        _truncate(message, config.max_tool_output_chars) if i in older else message
+        for i, message in enumerate(messages)
+    ]
+
+    tokens = estimate_tokens(compacted)
+    if tokens <= config.max_context_tokens:
+        return compacted
+
+    system = [m for m in compacted if isinstance(m, SystemMessage)]
+    rest = [m for m in compacted if not isinstance(m, SystemMessage)]
+    last_question = max(
+        (i for i, m in enumerate(rest) if isinstance(m, HumanMessage)), default=0
+    )
+    history = _group_turns(rest[:last_question])
+    question = rest[last_question : last_question + 1]
+    exchanges = _group_exchanges(rest[last_question + 1 :])
+
+    while tokens > config.max_context_tokens and history:
+        tokens -= estimate_tokens(history.pop(0))
+    while tokens > config.max_context_tokens and len(exchanges) > 1:
+        tokens -= estimate_tokens(exchanges.pop(0))
+
+    return (
+        system
+        + [m for turn in history for m in turn]
+        + question
+        + [m for group in exchanges for m in group]
+    )
+
+
+def compact_model_input(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Pre-model hook for react agents: compact the input of every LLM call.
+
+    The agent's own message state is left intact; only what is sent to the
+    model is compacted.
+    """
+    messages = state["messages"]
+    compacted = compact_messages(messages)
+
+    stats = _context_stats.get()
+    if stats is not None:
+        stats["llm_calls"] += 1
+        stats["tokens_before"] += estimate_tokens(messages)
+        stats["tokens_after"] += estimate_tokens(compacted)
+
+    return {"llm_input_messages": compacted}
+
+
+def start_context_stats() -> Dict[str, int]:
+    """Begin token accounting for the current agent call."""
+    stats = {"llm_calls": 0, "tokens_before": 0, "tokens_after": 0}
+    _context_stats.set(stats)
+    return stats
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Logging will be configured by the main entry point
+logger = logging.getLogger(__name__)
+
+# Message types kept in the journal, and the roles they are stored under
+_ROLES = {"human": "user", "ai": "assistant"}
+
+
+def _message_record(message: Any) -> Optional[Dict[str, Any]]:
+    role = _ROLES.get(getattr(message, "type", ""))
+    if role is None:
+        return None
+    return {"op": "message", "role": role, "content": message.content}
+
+
+class ConversationJournal:
+    """Append-only JSONL journal of an interactive session.
+
+    Each save appends only the messages added since the previous save, so
+    the cost of a turn does not grow with the length of the session.
+    Clearing the conversation appends a marker rather than rewriting the
+    file. Records made obsolete by a marker or by a newer state snapshot are
+    dropped by compaction, which rewrites the file once they outnumber the
+    live records.
+
+    A journal that saves without having loaded the file first (a session
+    started without restoring the previous one) replaces the file on its
+    first save instead of appending to an unrelated conversation.
+    """
+
+    def __init__(self, path: str, compact_min_records: int = 1000):
+        self.path = Path(path)
+        self.compact_min_records = compact_min_records
+
+        self._saved_messages = 0
+        self._saved_state: Dict[str, Any] = {}
+        self._live_records = 0
+        self._dead_records = 0
+        # Whether the counters above describe the file's contents
+        self._synced = False
+
+    def _records(self) -> Iterator[Dict[str, Any]]:
+        """Read the journal one line at a time, skipping damaged lines."""
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Most likely a write cut short by a crash
+                    logger.warning(
+                        f"Skipping unreadable record {line_number} in {self.path}"
+                    )
+
+    def load(self) -> Tuple[Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]]:
+        """Return the messages and state since the last clear, or (None, None)."""
+        self._synced = True
+        if not self.path.exists():
+            return None, None
+
+        messages: List[Dict[str, Any]] = []
+        state: Dict[str, Any] = {}
+        total = 0
+        for record in self._records():
+            total += 1
+            op = record.get("op")
+            if op == "message":
+                messages.append({"role": record["role"], "content": record["content"]})
+            elif op == "state":
+                state = record.get("state", {})
+            elif op == "clear":
+                messages, state = [], {}
+
+        self._saved_messages = len(messages)
+        self._saved_state = state
+        self._live_records = len(messages) + (1 if state else 0)
+        self._dead_records = total - self._live_records
+        self._compact_if_needed(messages, state)
+        return messages, state
+
+    def save(self, messages: List[Any], state: Optional[Dict[str, Any]] = None) -> None:
+        """Append the messages added since the last save, and state if it changed."""
+        if len(messages) < self._saved_messages:
+            # The conversation was cleared without telling the journal
+            self.clear()
+        records = []
+        for message in messages[self._saved_messages :]:
+            record = _message_record(message)
+            if record is not None:
+                records.append(record)
+        state = state or {}
+        if state != self._saved_state:
+            records.append({"op": "state", "state": state})
+            if self._saved_state:
+                self._dead_records += 1
+            else:
+                self._live_records += 1
+
+        if self._synced:
+            self._append(records)
+        else:
+            # The file holds an earlier session this journal never loaded
+            self._rewrite(records)
+            self._synced = True
+        self._saved_messages = len(messages)
+        self._saved_state = state
+        self._live_records += sum(1 for r in records if r["op"] == "message")
+
+    def clear(self) -> None:
+        """Mark everything saved so far as cleared."""
+        if self._saved_messages or self._saved_state:
+            self._append([{"op": "clear"}])
+            self._dead_records += self._live_records + 1
+            self._live_records = 0
+        self._saved_messages = 0
+        self._saved_state = {}
+        self._compact_if_needed([], {})
+
+    @staticmethod
+    def _lines(records: List[Dict[str, Any]]) -> str:
+        timestamp = datetime.now().isoformat()
+        return "".join(
+            json.dumps({**record, "timestamp": timestamp}) + "\n" for record in records
+        )
+
+    def _rewrite(self, records: List[Dict[str, Any]]) -> None:
+        """Replace the whole file with records."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a crash never leaves a partial journal
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self._lines(records))
+        os.replace(tmp_path, self.path)
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        lines = self._lines(records)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab+") as f:
+            # Start on a new line if a previous write was cut short
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    lines = "\n" + lines
+            f.write(lines.encode("utf-8"))
+
+    def _compact_if_needed(
+        self, messages: List[Dict[str, Any]], state: Dict[str, Any]
+    ) -> None:
+        if self._dead_records < max(self.compact_min_records, self._live_records):
+            return
+        records = [{"op": "message", **message} for message in messages]
+        if state:
+            records.append({"op": "state", "state": state})
+        try:
+            self._rewrite(records)
+        except OSError as e:
+            logger.warning(f"Failed to compact conversation journal {self.path}: {e}")
+            return
+        logger.info(
+            f"Compacted conversation journal {self.path}: dropped {self._dead_records} records"
+        )
+        self._dead_records = 0
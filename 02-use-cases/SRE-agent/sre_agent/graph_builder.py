@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 import logging
-from typing import Any, Dict, List, Literal
+from typing import Any, Dict, List, Literal, Union
 
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import BaseTool
@@ -13,8 +13,10 @@ from .agent_nodes import (
     create_metrics_agent,
     create_runbooks_agent,
 )
-from .agent_state import AgentState
+from .agent_state import RESET, AgentState
+from .constants import SREConstants
 from .supervisor import SupervisorAgent
+from .tool_cache import tool_cache, wrap_tools_with_cache
 
 # Configure logging with basicConfig
 logging.basicConfig(
@@ -42,22 +44,40 @@ def _should_continue(state: AgentState) -> Literal["supervisor", "FINISH"]:
     return "supervisor"
 
 
-def _route_supervisor(state: AgentState) -> str:
-    """Route from supervisor to the appropriate agent or finish."""
+# Map agent names used in plans to graph node names
+AGENT_NODES = {
+    "kubernetes": "kubernetes_agent",
+    "logs": "logs_agent",
+    "metrics": "metrics_agent",
+    "runbooks": "runbooks_agent",
+}
+
+
+def _route_supervisor(state: AgentState) -> Union[str, List[str]]:
+    """Route from supervisor to the appropriate agent(s) or finish.
+
+    When the supervisor schedules several agents for the same plan stage,
+    a list of nodes is returned and LangGraph runs them concurrently before
+    returning to the supervisor once all of them have finished.
+    """
     next_agent = state.get("next", "FINISH")
 
     if next_agent == "FINISH":
         return "aggregate"
 
-    # Map to actual node names
-    agent_map = {
-        "kubernetes": "kubernetes_agent",
-        "logs": "logs_agent",
-        "metrics": "metrics_agent",
-        "runbooks": "runbooks_agent",
-    }
+    agents = state.get("next_agents") or [next_agent]
+    nodes = list(dict.fromkeys(AGENT_NODES[a] for a in agents if a in AGENT_NODES))
 
-    return agent_map.get(next_agent, "aggregate")
+    if not nodes:
+        return "aggregate"
+    return nodes[0] if len(nodes) == 1 else nodes
+
+
+def _route_plan_executor(state: AgentState) -> Union[str, List[str]]:
+    """Route from the plan executor to the next stage, replanning or finish."""
+    if state.get("next") == "supervisor":
+        return "supervisor"
+    return _route_supervisor(state)
 
 
 async def _prepare_initial_state(state: AgentState) -> Dict[str, Any]:
@@ -71,23 +91,29 @@ async def _prepare_initial_state(state: AgentState) -> Dict[str, Any]:
             current_query = msg.content
             break
 
+    # Merged fields keep values from the previous query unless reset
     return {
         "current_query": current_query,
-        "agent_results": {},
-        "agents_invoked": [],
+        "agent_results": RESET,
+        "agents_invoked": RESET,
         "requires_collaboration": False,
-        "metadata": {},
+        "metadata": RESET,
+        "replan_requests": RESET,
     }
 
 
 def build_multi_agent_graph(
-    tools: List[BaseTool], llm_provider: str = "bedrock", **llm_kwargs
+    tools: List[BaseTool],
+    llm_provider: str = "bedrock",
+    checkpointer=None,
+    **llm_kwargs,
 ) -> StateGraph:
     """Build the multi-agent collaboration graph.
 
     Args:
         tools: List of all available tools
         llm_provider: LLM provider to use
+        checkpointer: Optional LangGraph checkpointer to persist graph state
         **llm_kwargs: Additional arguments for LLM
 
     Returns:
@@ -101,6 +127,10 @@ def build_multi_agent_graph(
     # Create supervisor
     supervisor = SupervisorAgent(llm_provider=llm_provider, **llm_kwargs)
 
+    if SREConstants.tool_cache.enabled:
+        # Identical tool calls from different agents share cached results
+        tools = wrap_tools_with_cache(tools, tool_cache)
+
     # Create agent nodes with filtered tools
     kubernetes_agent = create_kubernetes_agent(
         tools, llm_provider=llm_provider, **llm_kwargs
@@ -120,6 +150,11 @@ def build_multi_agent_graph(
     workflow.add_node("runbooks_agent", runbooks_agent)
     workflow.add_node("aggregate", supervisor.aggregate_responses)
 
+    plan_execution = SREConstants.execution.plan_execution
+    if plan_execution:
+        # Deterministic plan executor; only goes back to the supervisor to replan
+        workflow.add_node("executor", supervisor.execute_plan)
+
     # Set entry point
     workflow.set_entry_point("prepare")
 
@@ -139,17 +174,32 @@ def build_multi_agent_graph(
         },
     )
 
-    # Add edges from agents back to supervisor
-    workflow.add_edge("kubernetes_agent", "supervisor")
-    workflow.add_edge("logs_agent", "supervisor")
-    workflow.add_edge("metrics_agent", "supervisor")
-    workflow.add_edge("runbooks_agent", "supervisor")
+    # Add edges from agents to the plan executor, or back to supervisor
+    after_agent = "executor" if plan_execution else "supervisor"
+    workflow.add_edge("kubernetes_agent", after_agent)
+    workflow.add_edge("logs_agent", after_agent)
+    workflow.add_edge("metrics_agent", after_agent)
+    workflow.add_edge("runbooks_agent", after_agent)
+
+    if plan_execution:
+        workflow.add_conditional_edges(
+            "executor",
+            _route_plan_executor,
+            {
+                "kubernetes_agent": "kubernetes_agent",
+                "logs_agent": "logs_agent",
+                "metrics_agent": "metrics_agent",
+                "runbooks_agent": "runbooks_agent",
+                "supervisor": "supervisor",
+                "aggregate": "aggregate",
+            },
+        )
 
     # Add edge from aggregate to END
     workflow.add_edge("aggregate", END)
 
     # Compile the graph
-    compiled_graph = workflow.compile()
+    compiled_graph = workflow.compile(checkpointer=checkpointer)
 
     logger.info("Multi-agent collaboration graph built successfully")
     return compiled_graph
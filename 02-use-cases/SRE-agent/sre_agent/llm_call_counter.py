@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Logging will be configured by the main entry point
+logger = logging.getLogger(__name__)
+
+
+class LLMCallCounter(BaseCallbackHandler):
+    """Counts the LLM calls made while answering a single query.
+
+    Pass an instance in the graph config (``{"callbacks": [counter]}``); the
+    callbacks propagate to every chat model invoked by the supervisor, the
+    agents and the output formatter. Calls are attributed to the top-level
+    graph node they were made from.
+    """
+
+    # Counting is cheap; avoid dispatching to a thread pool
+    run_inline = True
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.by_node: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _node_name(metadata: Optional[Dict[str, Any]]) -> str:
+        metadata = metadata or {}
+        # Nested graphs (the react agents) report their own node names;
+        # the first checkpoint namespace segment is the top-level node
+        namespace = metadata.get("checkpoint_ns") or ""
+        if namespace:
+            return namespace.split("|")[0].split(":")[0]
+        return metadata.get("langgraph_node", "unknown")
+
+    def _record(self, metadata: Optional[Dict[str, Any]]) -> None:
+        node = self._node_name(metadata)
+        with self._lock:
+            self.total += 1
+            self.by_node[node] += 1
+
+    def on_chat_model_start(self, serialized, messages, *, metadata=None, **kwargs) -> None:
+        self._record(metadata)
+
+    def on_llm_start(self, serialized, prompts, *, metadata=None, **kwargs) -> None:
+        self._record(metadata)
+
+    def summary(self) -> Dict[str, Any]:
+        """LLM call totals for the query, overall and per graph node."""
+        with self._lock:
+            return {"llm_calls": self.total, "llm_calls_by_node": dict(self.by_node)}
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.sessions import StreamableHttpConnection, create_session
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import Tool as MCPTool
+
+from .constants import SREConstants
+
+# Logging will be configured by the main entry point
+logger = logging.getLogger(__name__)
+
+
+class PooledMCPSession:
+    """One long-lived MCP session shared by every tool call.
+
+    Tools built from MultiServerMCPClient open a new streamable HTTP
+    connection and repeat the MCP initialize handshake on every call. This
+    session is opened once, on first use, and kept alive; concurrent tool
+    calls are multiplexed over it. If the connection drops, the next call
+    reconnects and is retried once, which is safe because the gateway tools
+    are read-only.
+
+    The session is owned by a background task, because the underlying
+    transport must be entered and exited from the same task.
+    """
+
+    def __init__(self, connection: StreamableHttpConnection):
+        self.connection = connection
+        self.server_version = ""
+
+        self._session: Optional[ClientSession] = None
+        self._owner: Optional[asyncio.Task] = None
+        # Replaced for every new session and event loop
+        self._closing = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _hold_session(
+        self, ready: asyncio.Future, closing: asyncio.Event
+    ) -> None:
+        try:
+            async with create_session(self.connection) as session:
+                result = await session.initialize()
+                self.server_version = getattr(result.serverInfo, "version", "") or ""
+                ready.set_result(session)
+                await closing.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning(f"MCP gateway session closed: {e}")
+
+    async def _get_session(self) -> ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A previous event loop (e.g. an earlier asyncio.run) owned the
+            # old session; it cannot be reused or closed from this loop
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._session = None
+            self._owner = None
+
+        async with self._lock:
+            if self._session is None or self._owner is None or self._owner.done():
+                started = time.perf_counter()
+                ready = loop.create_future()
+                self._closing = asyncio.Event()
+                self._owner = asyncio.create_task(
+                    self._hold_session(ready, self._closing)
+                )
+                self._session = await ready
+                logger.info(
+                    f"Opened MCP gateway session in {(time.perf_counter() - started) * 1000:.0f}ms"
+                )
+            return self._session
+
+    async def _reset(self, session: ClientSession) -> None:
+        """Drop session if it is still the current one."""
+        async with self._lock:
+            if self._session is session:
+                self._session = None
+                self._closing.set()
+
+    def set_headers(self, headers: Dict[str, str]) -> None:
+        """Use new request headers, reconnecting on the next call.
+
+        The current session, opened with the old headers, is closed if its
+        event loop is the running one; otherwise it is abandoned, as on any
+        event loop change.
+        """
+        self.connection = {**self.connection, "headers": headers}
+        self._session = None
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if self._loop is not None and self._loop is running:
+            self._closing.set()
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None, **kwargs):
+        session = await self._get_session()
+        try:
+            return await session.call_tool(name, arguments, **kwargs)
+        except McpError:
+            # The server answered; the session itself is healthy
+            raise
+        except Exception as e:
+            logger.warning(f"MCP gateway call to {name} failed ({e}), reconnecting")
+            await self._reset(session)
+            session = await self._get_session()
+            return await session.call_tool(name, arguments, **kwargs)
+
+    async def list_tools(self) -> List[MCPTool]:
+        """List every tool the gateway exposes, following pagination."""
+        session = await self._get_session()
+        tools: List[MCPTool] = []
+        cursor = None
+        while True:
+            page = await session.list_tools(cursor=cursor)
+            tools.extend(page.tools)
+            cursor = page.nextCursor
+            if not cursor:
+                return tools
+
+    async def close(self) -> None:
+        """Close the session; the next call opens a new one."""
+        self._closing.set()
+        if self._owner is not None and self._loop is asyncio.get_running_loop():
+            await self._owner
+        self._session = None
+        self._owner = None
+
+
+def _schema_version(server_version: str, tools: List[MCPTool]) -> str:
+    """Version tag for a tool listing: server version plus a schema hash."""
+    listing = json.dumps(
+        [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+        sort_keys=True,
+    )
+    digest = hashlib.sha256(listing.encode("utf-8")).hexdigest()[:16]
+    return f"{server_version}:{digest}" if server_version else digest
+
+
+class ToolSchemaCache:
+    """On-disk cache of gateway tool listings, keyed by gateway URL."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def _read_all(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries: Dict[str, Any] = json.load(f)
+                return entries
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable tool schema cache {self.path}: {e}")
+            return {}
+
+    def load(self, url: str) -> Optional[Tuple[List[MCPTool], str]]:
+        """Return (tools, version) cached for url, if any."""
+        entry = self._read_all().get(url)
+        if not entry:
+            return None
+        try:
+            tools = [MCPTool.model_validate(tool) for tool in entry["tools"]]
+        except Exception as e:
+            logger.warning(f"Ignoring invalid tool schema cache entry for {url}: {e}")
+            return None
+        return tools, entry.get("version", "")
+
+    def save(self, url: str, tools: List[MCPTool], version: str) -> None:
+        entries = self._read_all()
+        entries[url] = {
+            "version": version,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to write tool schema cache {self.path}: {e}")
+
+
+class MCPGateway:
+    """Tool discovery and invocation for the AgentCore gateway.
+
+    Tool schemas are served from the on-disk cache when available, so
+    startup does not wait for the gateway; the listing is then revalidated
+    in the background over the pooled session, which also warms it up for
+    the first tool call.
+    """
+
+    def __init__(self, url: str, headers: Dict[str, str], cache_path: Optional[Path] = None):
+        self.url = url
+        self.headers = headers
+        self.session = PooledMCPSession(
+            {"url": url, "transport": "streamable_http", "headers": headers}
+        )
+        self.cache = ToolSchemaCache(cache_path) if cache_path else None
+        self._revalidation: Optional[asyncio.Task] = None
+
+    def set_headers(self, headers: Dict[str, str]) -> None:
+        """Send new headers (e.g. a refreshed access token) on later calls."""
+        if headers == self.headers:
+            return
+        self.headers = headers
+        self.session.set_headers(headers)
+        logger.info("Gateway request headers changed; the MCP session will reconnect")
+
+    def _to_langchain_tools(self, tools: List[MCPTool]) -> List[BaseTool]:
+        # The converted tools only call session.call_tool, which the pooled
+        # session provides with ClientSession's signature
+        session = cast(ClientSession, self.session)
+        return [convert_mcp_tool_to_langchain_tool(session, tool) for tool in tools]
+
+    async def _fetch(self) -> Tuple[List[MCPTool], str]:
+        tools = await self.session.list_tools()
+        version = _schema_version(self.session.server_version, tools)
+        if self.cache is not None:
+            self.cache.save(self.url, tools, version)
+        return tools, version
+
+    async def _revalidate(
+        self,
+        cached_version: str,
+        on_change: Optional[Callable[[List[BaseTool]], None]],
+    ) -> None:
+        try:
+            tools, version = await self._fetch()
+        except Exception as e:
+            logger.warning(f"Background tool schema revalidation failed: {e}")
+            return
+        if version == cached_version:
+            logger.info("Cached MCP tool schemas are up to date")
+            return
+        logger.warning(
+            f"MCP tool schemas changed on the gateway ({cached_version} -> {version}); cache updated"
+        )
+        if on_change is not None:
+            on_change(self._to_langchain_tools(tools))
+
+    async def get_tools(
+        self, on_change: Optional[Callable[[List[BaseTool]], None]] = None
+    ) -> List[BaseTool]:
+        """Return the gateway tools, from the cache if possible.
+
+        on_change is called with the new tools if background revalidation
+        finds that the gateway's tool schemas differ from the cached ones.
+        """
+        cached = self.cache.load(self.url) if self.cache is not None else None
+        if cached is not None:
+            tools, version = cached
+            logger.info(f"Loaded {len(tools)} MCP tool schemas from cache ({version})")
+            if SREConstants.gateway.revalidate_in_background:
+                self._revalidation = asyncio.create_task(
+                    self._revalidate(version, on_change)
+                )
+            return self._to_langchain_tools(tools)
+
+        tools, version = await self._fetch()
+        logger.info(f"Fetched {len(tools)} MCP tool schemas from gateway ({version})")
+        return self._to_langchain_tools(tools)
+
+
+_gateways: Dict[str, MCPGateway] = {}
+
+
+def get_gateway(gateway_uri: str, access_token: str) -> MCPGateway:
+    """Process-wide gateway client, so every graph shares one pooled session.
+
+    A changed access_token for a known gateway is swapped into the existing
+    client, which reconnects its session with the new token.
+    """
+    headers = {"Authorization": f"Bearer {access_token}"}
+    gateway = _gateways.get(gateway_uri)
+    if gateway is not None:
+        gateway.set_headers(headers)
+    else:
+        config = SREConstants.gateway
+        cache_path = None
+        if config.tool_schema_cache_enabled:
+            cache_path = Path(
+                os.getenv("MCP_TOOL_SCHEMA_CACHE", "")
+                or Path(__file__).parent / config.tool_schema_cache_file
+            )
+        gateway = _gateways[gateway_uri] = MCPGateway(
+            f"{gateway_uri}/mcp", headers, cache_path=cache_path
+        )
+    return gateway
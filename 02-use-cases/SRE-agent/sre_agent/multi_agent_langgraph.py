@@ -16,13 +16,17 @@ import yaml
 from dotenv import load_dotenv
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.tools import tool
-from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.errors import GraphRecursionError
 
 from .agent_state import AgentState
 from .constants import SREConstants
+from .conversation_journal import ConversationJournal
 from .graph_builder import build_multi_agent_graph
+from .llm_call_counter import LLMCallCounter
 from .logging_config import configure_logging, should_show_debug_traces
+from .mcp_gateway import get_gateway
+from .tool_cache import tool_cache
+from .trace_sink import get_trace_sink
 
 # Configure logging if not already configured (e.g., when imported by agent_runtime)
 if not logging.getLogger().handlers:
@@ -210,41 +214,29 @@ def _read_gateway_config() -> tuple[str, str]:
         raise
 
 
-def create_mcp_client() -> MultiServerMCPClient:
-    """Create and return MultiServerMCPClient with gateway configuration."""
-    gateway_uri, access_token = _read_gateway_config()
-
-    # Configure MCP server connection
-    client = MultiServerMCPClient(
-        {
-            "gateway": {
-                "url": f"{gateway_uri}/mcp",
-                "transport": "streamable_http",
-                "headers": {"Authorization": f"Bearer {access_token}"},
-            }
-        }
-    )
-
-    return client
-
-
 async def create_multi_agent_system(
-    provider: str = "bedrock", checkpointer=None, **llm_kwargs
+    provider: str = "bedrock", checkpointer=None, on_tools_changed=None, **llm_kwargs
 ):
-    """Create multi-agent system with MCP tools."""
+    """Create multi-agent system with MCP tools.
+
+    Gateway tool schemas come from the on-disk cache when available and are
+    revalidated in the background; on_tools_changed is called with the new
+    MCP tools if they differ from the cached ones.
+    """
     logger.info(f"Creating multi-agent system with provider: {provider}")
 
     # Get Anthropic API key if needed
     if provider == "anthropic" and not llm_kwargs.get("api_key"):
         llm_kwargs["api_key"] = _get_anthropic_api_key()
 
-    # Create MCP client and get tools
+    # Get tools from the gateway; tool calls share one pooled MCP session
     mcp_tools = []
     try:
-        client = create_mcp_client()
+        gateway = get_gateway(*_read_gateway_config())
         # Add timeout for MCP tool loading to prevent hanging
         all_mcp_tools = await asyncio.wait_for(
-            client.get_tools(), timeout=SREConstants.timeouts.mcp_tools_timeout_seconds
+            gateway.get_tools(on_change=on_tools_changed),
+            timeout=SREConstants.timeouts.mcp_tools_timeout_seconds,
         )
 
         # Don't filter out x-amz-agentcore-search as it's a global tool
@@ -288,70 +280,58 @@ async def create_multi_agent_system(
 
     # Build the multi-agent graph
     graph = build_multi_agent_graph(
-        tools=all_tools, llm_provider=provider, **llm_kwargs
+        tools=all_tools, llm_provider=provider, checkpointer=checkpointer, **llm_kwargs
     )
 
     return graph, all_tools
 
 
+_journals: Dict[str, ConversationJournal] = {}
+
+
+def _get_conversation_journal(filename: str) -> ConversationJournal:
+    """Journal for filename, shared by every save and load in the process."""
+    journal = _journals.get(filename)
+    if journal is None:
+        journal = _journals[filename] = ConversationJournal(
+            filename,
+            compact_min_records=SREConstants.app.conversation_journal_compact_min_records,
+        )
+    return journal
+
+
 def _save_conversation_state(
     messages: list,
     state: Dict[str, Any],
     filename: str = SREConstants.app.conversation_state_file,
 ):
-    """Save conversation state to a file."""
+    """Append messages added since the last save to the conversation journal."""
     try:
-        # Convert messages to serializable format
-        serializable_messages = []
-        for msg in messages:
-            if hasattr(msg, "model_dump"):
-                serializable_messages.append(msg.model_dump())
-            elif hasattr(msg, "dict"):
-                serializable_messages.append(msg.dict())
-            elif hasattr(msg, "content"):
-                serializable_messages.append(
-                    {"role": getattr(msg, "role", "unknown"), "content": msg.content}
-                )
-            else:
-                serializable_messages.append(str(msg))
-
-        # Convert state to serializable format
-        serializable_state = {}
-        if isinstance(state, dict):
-            # Filter out non-serializable items
-            for k, v in state.items():
-                if k == "messages":
-                    continue  # Already handled above
-                elif isinstance(v, (str, int, float, bool, list, dict, type(None))):
-                    serializable_state[k] = v
-                else:
-                    serializable_state[k] = str(v)
-
-        with open(filename, "w") as f:
-            json.dump(
-                {
-                    "messages": serializable_messages,
-                    "state": serializable_state,
-                    "timestamp": datetime.now().isoformat(),
-                },
-                f,
-                indent=2,
-            )
+        _get_conversation_journal(filename).save(messages, state)
         logger.debug(f"Saved conversation state to {filename}")
     except Exception as e:
         logger.error(f"Failed to save conversation state: {e}")
 
 
+def _clear_conversation_state(
+    filename: str = SREConstants.app.conversation_state_file,
+):
+    """Record in the conversation journal that the history was cleared."""
+    try:
+        _get_conversation_journal(filename).clear()
+    except Exception as e:
+        logger.error(f"Failed to clear conversation state: {e}")
+
+
 def _load_conversation_state(
     filename: str = SREConstants.app.conversation_state_file,
 ) -> tuple[Optional[list], Optional[Dict[str, Any]]]:
-    """Load conversation state from a file."""
+    """Load conversation state from the conversation journal."""
     try:
-        if Path(filename).exists():
-            with open(filename, "r") as f:
-                data = json.load(f)
-                logger.info(f"Loaded conversation state from {filename}")
-                return data.get("messages", []), data.get("state", {})
+        messages, state = _get_conversation_journal(filename).load()
+        if messages is not None:
+            logger.info(f"Loaded conversation state from {filename}")
+        return messages, state
     except Exception as e:
         logger.error(f"Failed to load conversation state: {e}")
     return None, None
@@ -419,6 +399,8 @@ async def _run_interactive_session(
 
             elif user_input.lower() == "/clear":
                 messages = []
+                if save_state:
+                    _clear_conversation_state()
                 last_query = None
                 last_response = None
                 original_query = None
@@ -550,11 +532,14 @@ async def _run_interactive_session(
                 "metadata": {},
                 "requires_collaboration": False,
                 "agents_invoked": [],
+                "next_agents": None,
+                "replan_requests": {},
                 "final_response": None,
                 "auto_approve_plan": False,  # Default to False for interactive mode
             }
 
             # Stream the graph execution
+            llm_calls = LLMCallCounter()
             try:
                 # Start initial spinner for supervisor
                 spinner = Spinner("🧭 Supervisor analyzing query")
@@ -564,7 +549,9 @@ async def _run_interactive_session(
                 timeout_seconds = SREConstants.timeouts.graph_execution_timeout_seconds
                 start_time = asyncio.get_event_loop().time()
 
-                async for event in graph.astream(initial_state):
+                async for event in graph.astream(
+                    initial_state, config={"callbacks": [llm_calls]}
+                ):
                     # Check for timeout
                     elapsed = asyncio.get_event_loop().time() - start_time
                     if elapsed > timeout_seconds:
@@ -578,8 +565,11 @@ async def _run_interactive_session(
 
                     # Print progress updates
                     for node_name, node_output in event.items():
-                        if node_name == "supervisor":
-                            next_agent = node_output.get("next", "unknown")
+                        if node_name in ("supervisor", "executor"):
+                            next_agent = ", ".join(
+                                node_output.get("next_agents")
+                                or [node_output.get("next", "unknown")]
+                            )
                             metadata = node_output.get("metadata", {})
                             reasoning = metadata.get("routing_reasoning", "")
 
@@ -624,11 +614,11 @@ async def _run_interactive_session(
 
                             # Extract and display tool traces from metadata
                             metadata = node_output.get("metadata", {})
-                            # Look for traces using various possible key formats
+                            # Traces are kept in the trace sink, referenced by ID
                             agent_messages = []
                             for key, value in metadata.items():
-                                if "_trace" in key and isinstance(value, list):
-                                    agent_messages = value
+                                if key.endswith("_trace_id"):
+                                    agent_messages = get_trace_sink().read(value) or []
                                     break
 
                             # Show debug info about trace messages found (only in debug mode)
@@ -773,6 +763,8 @@ async def _run_interactive_session(
                 # Always clean up spinner
                 if spinner:
                     spinner.stop()
+                logger.info(f"LLM calls for query: {llm_calls.summary()}")
+                logger.info(f"Tool cache: {tool_cache.stats()}")
 
             # Auto-save after each turn if enabled
             if save_state:
@@ -863,12 +855,15 @@ async def main():
                 "metadata": {},
                 "requires_collaboration": False,
                 "agents_invoked": [],
+                "next_agents": None,
+                "replan_requests": {},
                 "final_response": None,
             }
 
             print("🤖 Multi-Agent System:\n")
 
             # Execute the graph
+            llm_calls = LLMCallCounter()
             # Start initial spinner for supervisor
             spinner = Spinner("🧭 Supervisor analyzing query")
             spinner.start()
@@ -878,7 +873,9 @@ async def main():
                 timeout_seconds = SREConstants.timeouts.graph_execution_timeout_seconds
                 start_time = asyncio.get_event_loop().time()
 
-                async for event in graph.astream(initial_state):
+                async for event in graph.astream(
+                    initial_state, config={"callbacks": [llm_calls]}
+                ):
                     # Check for timeout
                     elapsed = asyncio.get_event_loop().time() - start_time
                     if elapsed > timeout_seconds:
@@ -891,8 +888,11 @@ async def main():
                         spinner = None
 
                     for node_name, node_output in event.items():
-                        if node_name == "supervisor":
-                            next_agent = node_output.get("next", "unknown")
+                        if node_name in ("supervisor", "executor"):
+                            next_agent = ", ".join(
+                                node_output.get("next_agents")
+                                or [node_output.get("next", "unknown")]
+                            )
                             metadata = node_output.get("metadata", {})
                             reasoning = metadata.get("routing_reasoning", "")
 
@@ -937,11 +937,11 @@ async def main():
 
                             # Extract and display tool traces from metadata
                             metadata = node_output.get("metadata", {})
-                            # Look for traces using various possible key formats
+                            # Traces are kept in the trace sink, referenced by ID
                             agent_messages = []
                             for key, value in metadata.items():
-                                if "_trace" in key and isinstance(value, list):
-                                    agent_messages = value
+                                if key.endswith("_trace_id"):
+                                    agent_messages = get_trace_sink().read(value) or []
                                     break
 
                             # Show debug info about trace messages found (only in debug mode)
@@ -1071,6 +1071,8 @@ async def main():
                 # Always clean up spinner
                 if spinner:
                     spinner.stop()
+                logger.info(f"LLM calls for query: {llm_calls.summary()}")
+                logger.info(f"Tool cache: {tool_cache.stats()}")
 
     except Exception as e:
         logger.error(f"Error in multi-agent system: {e}")
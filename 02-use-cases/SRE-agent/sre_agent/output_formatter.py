@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 
+import asyncio
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 
 from .constants import SREConstants
 from .prompt_loader import prompt_loader
@@ -17,6 +20,16 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _chunk_text(content: Any) -> str:
+    """Text of a streamed message chunk, whose content may be a list of blocks."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content
+    )
+
+
 class SREOutputFormatter:
     """Simple markdown output formatter for SRE multi-agent responses."""
 
@@ -26,6 +39,13 @@ class SREOutputFormatter:
         logger.info(
             f"SREOutputFormatter initialized with LLM provider: {self.llm_provider}"
         )
+        self._llm = None
+
+    def _get_llm(self):
+        """LLM client shared by every summary this formatter generates."""
+        if self._llm is None:
+            self._llm = self._create_llm()
+        return self._llm
 
     def _create_llm(self, **kwargs):
         """Create LLM instance based on configured provider."""
@@ -85,32 +105,80 @@ class SREOutputFormatter:
         plan: Optional[Dict[str, Any]] = None,
     ) -> str:
         """Format a complete investigation response in clean markdown."""
+        executive_summary = self._generate_executive_summary(
+            query, agent_results, metadata
+        )
+        sections = self._render_sections(query, agent_results, metadata, plan)
+        return self._join_sections(sections, executive_summary)
+
+    async def aformat_investigation_response(
+        self,
+        query: str,
+        agent_results: Dict[str, Any],
+        metadata: Dict[str, Any],
+        plan: Optional[Dict[str, Any]] = None,
+        on_summary_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Async version of format_investigation_response.
+
+        The executive summary is generated without blocking the event loop
+        while the per-agent sections are rendered. If on_summary_token is
+        given, the summary is streamed and each piece of text is passed to
+        it as it arrives.
+        """
+        summary_task = asyncio.create_task(
+            self._agenerate_executive_summary(
+                query, agent_results, metadata, on_token=on_summary_token
+            )
+        )
+        try:
+            # Let the summary request go out before rendering the rest
+            await asyncio.sleep(0)
+            sections = self._render_sections(query, agent_results, metadata, plan)
+        except BaseException:
+            summary_task.cancel()
+            raise
+        return self._join_sections(sections, await summary_task)
+
+    def _join_sections(
+        self, sections: Dict[str, List[str]], executive_summary: str
+    ) -> str:
+        """Put the executive summary between the header and the details."""
+        output = list(sections["header"])
+        if executive_summary:
+            output.append(executive_summary)
+            output.append("")
+        output.extend(sections["details"])
+        return "\n".join(output)
+
+    def _render_sections(
+        self,
+        query: str,
+        agent_results: Dict[str, Any],
+        metadata: Dict[str, Any],
+        plan: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, List[str]]:
+        """Render the header and the detail sections that follow the summary."""
 
         # Extract key information
         plan_info = plan or metadata.get("investigation_plan", {})
         current_step = metadata.get("plan_step", 0) + 1
         total_steps = len(plan_info.get("steps", []))
 
-        output = []
+        header = []
 
         # Header
-        output.append("# 🔍 Investigation Results")
-        output.append("")
-        output.append(f"**Query:** {query}")
+        header.append("# 🔍 Investigation Results")
+        header.append("")
+        header.append(f"**Query:** {query}")
         # Only show step progress if we have valid step data
         if total_steps > 0 and current_step <= total_steps:
-            output.append(f"**Status:** Step {current_step} of {total_steps} Complete")
+            header.append(f"**Status:** Step {current_step} of {total_steps} Complete")
         else:
-            output.append("**Status:** Investigation Complete")
-        output.append("")
+            header.append("**Status:** Investigation Complete")
+        header.append("")
 
-        # Executive Summary Section
-        executive_summary = self._generate_executive_summary(
-            query, agent_results, metadata
-        )
-        if executive_summary:
-            output.append(executive_summary)
-            output.append("")
+        output = []
 
         # Key Findings Section
         if agent_results:
@@ -168,7 +236,27 @@ class SREOutputFormatter:
             output.append("All planned investigation steps have been executed.")
             output.append("")
 
-        return "\n".join(output)
+        return {"header": header, "details": output}
+
+    def _executive_summary_messages(
+        self, query: str, agent_results: Dict[str, Any]
+    ) -> List[BaseMessage]:
+        """Build the summary prompt from the agents' results."""
+        formatted_results = []
+        for agent_name, result in agent_results.items():
+            if result and result != "No response provided":
+                formatted_results.append(f"**{agent_name}:**\n{result}\n")
+
+        results_text = "\n".join(formatted_results)
+
+        # Get prompts from prompt loader
+        system_prompt, user_prompt = prompt_loader.get_executive_summary_prompts(
+            query=query, results_text=results_text
+        )
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt),
+        ]
 
     def _generate_executive_summary(
         self, query: str, agent_results: Dict[str, Any], metadata: Dict[str, Any]
@@ -178,32 +266,40 @@ class SREOutputFormatter:
             return ""
 
         try:
-            from langchain_core.messages import HumanMessage, SystemMessage
-
-            # Create LLM instance using configured provider
-            llm = self._create_llm()
-
-            # Prepare agent results for analysis
-            formatted_results = []
-            for agent_name, result in agent_results.items():
-                if result and result != "No response provided":
-                    formatted_results.append(f"**{agent_name}:**\n{result}\n")
-
-            results_text = "\n".join(formatted_results)
+            messages = self._executive_summary_messages(query, agent_results)
+            response = self._get_llm().invoke(messages)
+            return str(response.content).strip()
 
-            # Get prompts from prompt loader
-            system_prompt, user_prompt = prompt_loader.get_executive_summary_prompts(
-                query=query, results_text=results_text
-            )
+        except Exception as e:
+            logger.error(f"Error generating executive summary with LLM: {e}")
+            # Fallback to simple summary if LLM fails
+            return self._generate_fallback_summary(query, agent_results)
 
-            # Generate executive summary
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt),
-            ]
+    async def _agenerate_executive_summary(
+        self,
+        query: str,
+        agent_results: Dict[str, Any],
+        metadata: Dict[str, Any],
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Async version of _generate_executive_summary, optionally streamed."""
+        if not agent_results:
+            return ""
 
-            response = llm.invoke(messages)
-            return str(response.content).strip()
+        try:
+            messages = self._executive_summary_messages(query, agent_results)
+            llm = self._get_llm()
+            if on_token is None:
+                response = await llm.ainvoke(messages)
+                return str(response.content).strip()
+
+            parts = []
+            async for chunk in llm.astream(messages):
+                text = _chunk_text(chunk.content)
+                if text:
+                    parts.append(text)
+                    on_token(text)
+            return "".join(parts).strip()
 
         except Exception as e:
             logger.error(f"Error generating executive summary with LLM: {e}")
@@ -3,11 +3,12 @@
 import json
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Literal
+from typing import Any, Callable, Dict, List, Literal, Optional
 
 from langchain_anthropic import ChatAnthropic
 from langchain_aws import ChatBedrock
 from langchain_core.messages import HumanMessage, SystemMessage
+from langgraph.config import get_stream_writer
 from pydantic import BaseModel, Field
 
 from .agent_state import AgentState
@@ -64,6 +65,46 @@ class RouteDecision(BaseModel):
     )
 
 
+def plan_stages(agents_sequence: List[str]) -> List[List[str]]:
+    """Group a plan's agent sequence into stages that can run concurrently.
+
+    Consecutive independent (evidence-gathering) agents share a stage. Any
+    other agent, such as runbooks, gets a stage of its own so it runs after,
+    and can see, the findings gathered before it.
+    """
+    execution = SREConstants.execution
+    independent = set(execution.independent_agents)
+
+    stages: List[List[str]] = []
+    for agent in agents_sequence:
+        if (
+            execution.parallel_agents
+            and stages
+            and agent in independent
+            and agent not in stages[-1]
+            and all(member in independent for member in stages[-1])
+        ):
+            stages[-1].append(agent)
+        else:
+            stages.append([agent])
+    return stages
+
+
+def _describe_stage(plan: InvestigationPlan, first_step: int, agents: List[str]) -> str:
+    """Routing reasoning for a plan stage starting at first_step."""
+    if len(agents) == 1:
+        step_description = (
+            plan.steps[first_step]
+            if first_step < len(plan.steps)
+            else f"Execute {agents[0]}"
+        )
+        return f"Executing plan step {first_step + 1}: {step_description}"
+    return (
+        f"Executing plan steps {first_step + 1}-{first_step + len(agents)} "
+        f"in parallel: {', '.join(agents)}"
+    )
+
+
 def _read_supervisor_prompt() -> str:
     """Read supervisor system prompt from file."""
     try:
@@ -137,8 +178,14 @@ class SupervisorAgent:
         else:
             raise ValueError(f"Unsupported provider: {self.llm_provider}")
 
-    async def create_investigation_plan(self, state: AgentState) -> InvestigationPlan:
-        """Create an investigation plan for the user's query."""
+    async def create_investigation_plan(
+        self, state: AgentState, replan_reason: Optional[str] = None
+    ) -> InvestigationPlan:
+        """Create an investigation plan for the user's query.
+
+        When replan_reason is given, the plan covers only the work remaining
+        after the agents that already ran.
+        """
         current_query = state.get("current_query", "No query provided")
 
         planning_prompt = f"""{self.system_prompt}
@@ -153,6 +200,19 @@ Create a simple, focused investigation plan with 2-3 steps maximum. Consider:
 
 Return a structured plan."""
 
+        if replan_reason:
+            findings = "\n".join(
+                f"- {agent}: {str(result)[:500]}"
+                for agent, result in state.get("agent_results", {}).items()
+            )
+            planning_prompt += f"""
+
+The previous investigation plan was interrupted: {replan_reason}
+Findings so far:
+{findings}
+
+Plan only the remaining work needed to answer the query. Do not repeat agents whose findings are already sufficient."""
+
         structured_llm = self.llm.with_structured_output(InvestigationPlan)
 
         plan = await structured_llm.ainvoke(
@@ -192,8 +252,6 @@ Return a structured plan."""
 
     async def route(self, state: AgentState) -> Dict[str, Any]:
         """Determine which agent should handle the query next."""
-        agents_invoked = state.get("agents_invoked", [])
-
         # Check if we have an existing plan
         existing_plan = state.get("metadata", {}).get("investigation_plan")
 
@@ -219,59 +277,141 @@ Return a structured plan."""
                 }
             else:
                 # Simple plan - start execution
-                next_agent = (
-                    plan.agents_sequence[0] if plan.agents_sequence else "FINISH"
+                return self._start_plan(
+                    state,
+                    plan,
+                    {"plan_text": self._format_plan_markdown(plan), "show_plan": True},
                 )
-                plan_text = self._format_plan_markdown(plan)
-                return {
-                    "next": next_agent,
-                    "metadata": {
-                        **state.get("metadata", {}),
-                        "investigation_plan": plan.model_dump(),
-                        "routing_reasoning": f"Executing plan step 1: {plan.steps[0] if plan.steps else 'Start'}",
-                        "plan_step": 0,
-                        "plan_text": plan_text,
-                        "show_plan": True,
-                    },
-                }
+        elif state.get("metadata", {}).get("replan_reason"):
+            return await self._replan(state)
         else:
-            # Continue executing existing plan
-            plan = InvestigationPlan(**existing_plan)
-            current_step = state.get("metadata", {}).get("plan_step", 0)
+            return self._advance_plan(state)
+
+    def _start_plan(
+        self, state: AgentState, plan: InvestigationPlan, extra_metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Dispatch the first stage of a plan."""
+        stages = plan_stages(plan.agents_sequence)
+        first_stage = stages[0] if stages else []
+        return {
+            "next": first_stage[0] if first_stage else "FINISH",
+            "next_agents": first_stage,
+            "metadata": {
+                **state.get("metadata", {}),
+                "investigation_plan": plan.model_dump(),
+                "routing_reasoning": (
+                    _describe_stage(plan, 0, first_stage) if first_stage else "Start"
+                ),
+                "plan_step": 0,
+                "plan_stage": 0,
+                **extra_metadata,
+            },
+        }
+
+    def _advance_plan(self, state: AgentState) -> Dict[str, Any]:
+        """Move an existing plan on to its next stage, or finish."""
+        agents_invoked = state.get("agents_invoked", [])
+        plan = InvestigationPlan(**state["metadata"]["investigation_plan"])
+        stages = plan_stages(plan.agents_sequence)
+        current_stage = state.get("metadata", {}).get("plan_stage", 0)
 
-            # Check if plan is complete
-            if current_step >= len(plan.agents_sequence) or not agents_invoked:
-                next_step = current_step
-            else:
-                next_step = current_step + 1
+        # Check if plan is complete
+        if current_stage >= len(stages) or not agents_invoked:
+            next_stage = current_stage
+        else:
+            next_stage = current_stage + 1
+
+        if next_stage >= len(stages):
+            # Plan complete
+            return {
+                "next": "FINISH",
+                "next_agents": [],
+                "metadata": {
+                    **state.get("metadata", {}),
+                    "routing_reasoning": "Investigation plan completed. Presenting results.",
+                    "plan_step": len(plan.agents_sequence),
+                    "plan_stage": next_stage,
+                },
+            }
+
+        # Continue with the next stage in plan
+        agents = stages[next_stage]
+        next_step = sum(len(stage) for stage in stages[:next_stage])
+        return {
+            "next": agents[0],
+            "next_agents": agents,
+            "metadata": {
+                **state.get("metadata", {}),
+                "routing_reasoning": _describe_stage(plan, next_step, agents),
+                "plan_step": next_step,
+                "plan_stage": next_stage,
+            },
+        }
+
+    def _pending_replan_reason(self, state: AgentState) -> str:
+        """Reasons for replanning reported by agents since the last replan."""
+        handled = state.get("metadata", {}).get("handled_replan_requests", {})
+        return "; ".join(
+            reason
+            for agent, reason in state.get("replan_requests", {}).items()
+            if handled.get(agent) != reason
+        )
 
-            if next_step >= len(plan.agents_sequence):
-                # Plan complete
-                return {
-                    "next": "FINISH",
-                    "metadata": {
-                        **state.get("metadata", {}),
-                        "routing_reasoning": "Investigation plan completed. Presenting results.",
-                        "plan_step": next_step,
-                    },
-                }
-            else:
-                # Continue with next agent in plan
-                next_agent = plan.agents_sequence[next_step]
-                step_description = (
-                    plan.steps[next_step]
-                    if next_step < len(plan.steps)
-                    else f"Execute {next_agent}"
-                )
+    async def execute_plan(self, state: AgentState) -> Dict[str, Any]:
+        """Walk the investigation plan without calling the LLM.
 
-                return {
-                    "next": next_agent,
-                    "metadata": {
-                        **state.get("metadata", {}),
-                        "routing_reasoning": f"Executing plan step {next_step + 1}: {step_description}",
-                        "plan_step": next_step,
-                    },
-                }
+        Control only returns to the supervisor LLM when an agent failed or
+        reported evidence that warrants a new plan, at most max_replans
+        times per query.
+        """
+        metadata = state.get("metadata", {})
+        replan_reason = self._pending_replan_reason(state)
+
+        if replan_reason and (
+            metadata.get("replan_count", 0) < SREConstants.execution.max_replans
+        ):
+            logger.info(f"Plan executor requesting replan: {replan_reason}")
+            return {
+                "next": "supervisor",
+                "next_agents": [],
+                "metadata": {
+                    **metadata,
+                    "replan_reason": replan_reason,
+                    "routing_reasoning": f"Replanning: {replan_reason}",
+                },
+            }
+
+        return self._advance_plan(state)
+
+    async def _replan(self, state: AgentState) -> Dict[str, Any]:
+        """Create a new plan for the remaining work and dispatch its first stage."""
+        metadata = state.get("metadata", {})
+        replan_reason = metadata["replan_reason"]
+        plan = await self.create_investigation_plan(state, replan_reason=replan_reason)
+
+        replan_count = metadata.get("replan_count", 0) + 1
+        logger.info(
+            f"Replanned investigation ({replan_count}): {plan.agents_sequence}"
+        )
+        return self._start_plan(
+            state,
+            plan,
+            {
+                "replan_reason": None,
+                "replan_count": replan_count,
+                "handled_replan_requests": dict(state.get("replan_requests", {})),
+                "plan_text": self._format_plan_markdown(plan),
+                "show_plan": True,
+                "plan_shown": False,
+            },
+        )
+
+    def _summary_token_writer(self) -> Optional[Callable[[str], None]]:
+        """Forward executive summary tokens to callers streaming custom events."""
+        if not SREConstants.runtime.stream_executive_summary:
+            return None
+        write_event = get_stream_writer()
+        return lambda text: write_event({"event": "summary_token", "text": text})
 
     async def aggregate_responses(self, state: AgentState) -> Dict[str, Any]:
         """Aggregate responses from multiple agents into a final response."""
@@ -318,8 +458,12 @@ You can:
 
         try:
             # Try enhanced formatting first
-            final_response = self.formatter.format_investigation_response(
-                query=query, agent_results=agent_results, metadata=metadata, plan=plan
+            final_response = await self.formatter.aformat_investigation_response(
+                query=query,
+                agent_results=agent_results,
+                metadata=metadata,
+                plan=plan,
+                on_summary_token=self._summary_token_writer(),
             )
         except Exception as e:
             logger.warning(
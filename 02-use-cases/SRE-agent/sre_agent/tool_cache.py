@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.tools import BaseTool
+
+from .constants import SREConstants
+
+# Logging will be configured by the main entry point
+logger = logging.getLogger(__name__)
+
+
+def _base_tool_name(tool_name: str) -> str:
+    """Strip the gateway target prefix (``target___tool``) from a tool name."""
+    return tool_name.split("___")[-1] if "___" in tool_name else tool_name
+
+
+def _normalize_args(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop unset arguments so calls relying on defaults share a cache entry."""
+    return {key: value for key, value in args.items() if value is not None}
+
+
+def _cache_key(tool_name: str, args: Dict[str, Any]) -> str:
+    """Key on the tool name and its normalized arguments, ignoring order."""
+    return f"{tool_name}:{json.dumps(args, sort_keys=True, default=str)}"
+
+
+def _retrieve_exception(task: "asyncio.Future[Any]") -> None:
+    """Mark a failure retrieved so a call nobody awaits does not log a warning."""
+    if not task.cancelled():
+        task.exception()
+
+
+class ToolResultCache:
+    """LRU cache of tool results with per-tool TTLs and single-flight calls.
+
+    Concurrent identical calls (for example from agents running in parallel)
+    share one in-flight request, which finishes (and is cached) even if the
+    caller that started it is cancelled. Failed calls are never cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        default_ttl_seconds: float = 0.0,
+        tool_ttl_seconds: Optional[Dict[str, float]] = None,
+    ):
+        self.max_entries = max_entries
+        self.default_ttl_seconds = default_ttl_seconds
+        self.tool_ttl_seconds = tool_ttl_seconds or {}
+
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, "asyncio.Future[Any]"] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "shared": 0, "evictions": 0}
+
+    def ttl_for(self, tool_name: str) -> float:
+        """TTL in seconds for a tool; 0 means its results are not cached."""
+        return self.tool_ttl_seconds.get(
+            _base_tool_name(tool_name), self.default_ttl_seconds
+        )
+
+    def _lookup(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return True, result
+                del self._entries[key]
+            return False, None
+
+    def _store(self, key: str, result: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    async def get_or_call(
+        self,
+        tool_name: str,
+        args: Dict[str, Any],
+        call: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return a fresh cached result or await call(), sharing in-flight calls.
+
+        args must already be normalized; they only form the cache key.
+        """
+        ttl = self.ttl_for(tool_name)
+        if ttl <= 0:
+            return await call()
+
+        key = _cache_key(tool_name, args)
+        found, result = self._lookup(key)
+        if found:
+            logger.debug(f"Tool cache hit: {key}")
+            return result
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            with self._lock:
+                self._stats["shared"] += 1
+            logger.debug(f"Tool cache joining in-flight call: {key}")
+        else:
+            with self._lock:
+                self._stats["misses"] += 1
+            # The call runs as a task owned by the cache, so cancelling one
+            # caller (a deadline, a disconnect) never cancels the others
+            pending = asyncio.ensure_future(self._call_and_store(key, call, ttl))
+            pending.add_done_callback(_retrieve_exception)
+            self._in_flight[key] = pending
+        return await asyncio.shield(pending)
+
+    async def _call_and_store(
+        self, key: str, call: Callable[[], Awaitable[Any]], ttl: float
+    ) -> Any:
+        try:
+            result = await call()
+            self._store(key, result, ttl)
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+
+    def get_or_call_sync(
+        self, tool_name: str, args: Dict[str, Any], call: Callable[[], Any]
+    ) -> Any:
+        """Synchronous variant of get_or_call, without in-flight sharing."""
+        ttl = self.ttl_for(tool_name)
+        if ttl <= 0:
+            return call()
+
+        key = _cache_key(tool_name, args)
+        found, result = self._lookup(key)
+        if found:
+            return result
+        with self._lock:
+            self._stats["misses"] += 1
+        result = call()
+        self._store(key, result, ttl)
+        return result
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss, shared in-flight call and eviction counts."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"] + self._stats["shared"]
+            hit_rate = (
+                (self._stats["hits"] + self._stats["shared"]) / lookups if lookups else 0.0
+            )
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": round(hit_rate, 3),
+            }
+
+
+class CachedTool(BaseTool):
+    """Tool wrapper that serves repeated identical calls from a ToolResultCache."""
+
+    tool: BaseTool
+    cache: ToolResultCache
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def _run(self, **kwargs: Any) -> Any:
+        args = _normalize_args(kwargs)
+        return self.cache.get_or_call_sync(
+            self.name, args, lambda: self.tool.invoke(args)
+        )
+
+    async def _arun(self, **kwargs: Any) -> Any:
+        args = _normalize_args(kwargs)
+        return await self.cache.get_or_call(
+            self.name, args, lambda: self.tool.ainvoke(args)
+        )
+
+
+def wrap_tools_with_cache(
+    tools: List[BaseTool], cache: ToolResultCache
+) -> List[BaseTool]:
+    """Wrap each tool so its results are cached; names and schemas are kept."""
+    return [
+        CachedTool(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            tool=tool,
+            cache=cache,
+        )
+        for tool in tools
+    ]
+
+
+# Shared by every agent graph in the process, so results carry over between
+# agents in one investigation and between consecutive questions
+tool_cache = ToolResultCache(
+    max_entries=SREConstants.tool_cache.max_entries,
+    default_ttl_seconds=SREConstants.tool_cache.default_ttl_seconds,
+    tool_ttl_seconds=SREConstants.tool_cache.tool_ttl_seconds,
+)
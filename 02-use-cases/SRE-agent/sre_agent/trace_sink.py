@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage, messages_to_dict
+
+from .constants import SREConstants
+
+# Logging will be configured by the main entry point
+logger = logging.getLogger(__name__)
+
+# Longest message content attached to an OpenTelemetry span event
+_MAX_EVENT_CONTENT_CHARS = 4096
+
+
+class TraceSink(ABC):
+    """Destination for agent message traces.
+
+    Agent nodes write their traces here and keep only the returned trace ID
+    in graph state, so LangGraph never copies or checkpoints the messages.
+    """
+
+    @abstractmethod
+    def write(self, agent_name: str, messages: List[BaseMessage]) -> str:
+        """Store a trace and return its ID."""
+
+    @abstractmethod
+    def read(self, trace_id: str) -> Optional[List[BaseMessage]]:
+        """Return a stored trace, or None if it is unknown or was evicted."""
+
+
+class MemoryTraceSink(TraceSink):
+    """Keeps the most recent traces in an in-memory ring buffer."""
+
+    def __init__(self, max_traces: int = 200):
+        self.max_traces = max_traces
+        self._traces: "OrderedDict[str, List[BaseMessage]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def write(self, agent_name: str, messages: List[BaseMessage]) -> str:
+        trace_id = f"{agent_name.replace(' ', '_')}-{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self._traces[trace_id] = list(messages)
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+        self._export(trace_id, agent_name, messages)
+        return trace_id
+
+    def read(self, trace_id: str) -> Optional[List[BaseMessage]]:
+        with self._lock:
+            return self._traces.get(trace_id)
+
+    def _export(
+        self, trace_id: str, agent_name: str, messages: List[BaseMessage]
+    ) -> None:
+        """Hook for subclasses that also persist or export traces."""
+
+
+class JsonlTraceSink(MemoryTraceSink):
+    """Appends every trace to a JSONL file and keeps recent ones in memory."""
+
+    def __init__(self, path: str, max_traces: int = 200):
+        super().__init__(max_traces)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file_lock = threading.Lock()
+
+    def _export(
+        self, trace_id: str, agent_name: str, messages: List[BaseMessage]
+    ) -> None:
+        record = {
+            "trace_id": trace_id,
+            "agent": agent_name,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "messages": messages_to_dict(messages),
+        }
+        line = json.dumps(record, default=str) + "\n"
+        try:
+            with self._file_lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError as e:
+            logger.warning(f"Failed to write trace {trace_id} to {self.path}: {e}")
+
+
+class OpenTelemetryTraceSink(MemoryTraceSink):
+    """Exports every trace as an OpenTelemetry span with one event per message.
+
+    Spans go to whatever tracer provider is configured for the process, such
+    as the AWS OpenTelemetry distro used when running on AgentCore Runtime.
+    """
+
+    def __init__(self, max_traces: int = 200):
+        super().__init__(max_traces)
+        from opentelemetry import trace
+
+        self._tracer = trace.get_tracer(__name__)
+
+    def _export(
+        self, trace_id: str, agent_name: str, messages: List[BaseMessage]
+    ) -> None:
+        with self._tracer.start_as_current_span(
+            "sre_agent.agent_trace",
+            attributes={
+                "sre_agent.trace_id": trace_id,
+                "sre_agent.agent": agent_name,
+                "sre_agent.message_count": len(messages),
+            },
+        ) as span:
+            for msg in messages:
+                attributes: Dict[str, Any] = {
+                    "message.type": type(msg).__name__,
+                    "message.content": str(msg.content)[:_MAX_EVENT_CONTENT_CHARS],
+                }
+                tool_calls = getattr(msg, "tool_calls", None)
+                if tool_calls:
+                    attributes["message.tool_calls"] = [
+                        tc.get("name", "unknown") for tc in tool_calls
+                    ]
+                tool_call_id = getattr(msg, "tool_call_id", None)
+                if tool_call_id:
+                    attributes["message.tool_call_id"] = tool_call_id
+                span.add_event("message", attributes=attributes)
+
+
+def create_trace_sink() -> TraceSink:
+    """Create the trace sink selected by SREConstants.traces."""
+    config = SREConstants.traces
+    if config.sink == "jsonl":
+        return JsonlTraceSink(config.jsonl_path, max_traces=config.max_traces)
+    if config.sink == "otel":
+        try:
+            return OpenTelemetryTraceSink(max_traces=config.max_traces)
+        except ImportError:
+            logger.warning(
+                "opentelemetry is not installed, keeping agent traces in memory only"
+            )
+    return MemoryTraceSink(max_traces=config.max_traces)
+
+
+_trace_sink: Optional[TraceSink] = None
+
+
+def get_trace_sink() -> TraceSink:
+    """Process-wide trace sink, created on first use."""
+    global _trace_sink
+    if _trace_sink is None:
+        _trace_sink = create_trace_sink()
+    return _trace_sink
@@ -0,0 +1,33 @@
+"""Tests for the AgentState reducers."""
+
+from sre_agent.agent_state import RESET, _merge_dicts, _merge_unique
+
+
+def test_merge_dicts_combines_parallel_updates():
+    merged = _merge_dicts({"kubernetes": "pods ok"}, {"logs": "no errors"})
+    assert merged == {"kubernetes": "pods ok", "logs": "no errors"}
+
+
+def test_merge_dicts_right_wins_on_conflict():
+    assert _merge_dicts({"plan_stage": 0}, {"plan_stage": 1}) == {"plan_stage": 1}
+
+
+def test_merge_dicts_empty_update_keeps_existing_values():
+    assert _merge_dicts({"kubernetes": "pods ok"}, {}) == {"kubernetes": "pods ok"}
+
+
+def test_merge_dicts_reset_empties_field():
+    assert _merge_dicts({"kubernetes": "pods ok"}, RESET) == {}
+
+
+def test_merge_unique_keeps_first_seen_order():
+    assert _merge_unique(["logs", "metrics"], ["kubernetes", "logs"]) == [
+        "logs",
+        "metrics",
+        "kubernetes",
+    ]
+
+
+def test_merge_unique_reset_empties_field():
+    assert _merge_unique(["logs"], RESET) == []
+    assert _merge_unique(RESET, ["logs"]) == ["logs"]
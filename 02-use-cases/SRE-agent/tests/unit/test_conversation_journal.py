@@ -0,0 +1,64 @@
+"""Tests for the append-only conversation journal."""
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from sre_agent.conversation_journal import ConversationJournal
+
+
+def _contents(messages):
+    return [message["content"] for message in messages]
+
+
+def test_save_appends_only_new_messages(tmp_path):
+    path = tmp_path / "conversation.json"
+    journal = ConversationJournal(str(path))
+    conversation = [HumanMessage(content="a"), AIMessage(content="b")]
+    journal.save(conversation)
+    conversation.append(HumanMessage(content="c"))
+    journal.save(conversation, {"plan": 1})
+
+    assert len(path.read_text().splitlines()) == 4
+    messages, state = ConversationJournal(str(path)).load()
+    assert _contents(messages) == ["a", "b", "c"]
+    assert state == {"plan": 1}
+
+
+def test_first_save_without_load_replaces_previous_session(tmp_path):
+    """A session that did not restore the file (--no-save, then /save) overwrites it."""
+    path = tmp_path / "conversation.json"
+    ConversationJournal(str(path)).save([HumanMessage(content="a"), AIMessage(content="b")])
+
+    fresh = ConversationJournal(str(path))
+    fresh.save([HumanMessage(content="x"), AIMessage(content="y")], {"plan": 2})
+    fresh.save([HumanMessage(content="x"), AIMessage(content="y"), HumanMessage(content="z")])
+
+    messages, state = ConversationJournal(str(path)).load()
+    assert _contents(messages) == ["x", "y", "z"]
+    assert state == {}
+
+
+def test_save_after_load_continues_restored_session(tmp_path):
+    path = tmp_path / "conversation.json"
+    ConversationJournal(str(path)).save([HumanMessage(content="a"), AIMessage(content="b")])
+
+    restored = ConversationJournal(str(path))
+    messages, _ = restored.load()
+    conversation = [HumanMessage(content=m["content"]) for m in messages]
+    conversation.append(HumanMessage(content="c"))
+    restored.save(conversation)
+
+    messages, _ = ConversationJournal(str(path)).load()
+    assert _contents(messages) == ["a", "b", "c"]
+
+
+def test_clear_and_compaction(tmp_path):
+    path = tmp_path / "conversation.json"
+    journal = ConversationJournal(str(path), compact_min_records=4)
+    journal.save([HumanMessage(content="a"), AIMessage(content="b")])
+    journal.clear()
+    assert ConversationJournal(str(path)).load() == ([], {})
+
+    journal.save([HumanMessage(content="c")])
+    journal.clear()
+    # Two cleared messages, one more and two markers: compacted away
+    assert path.read_text() == ""
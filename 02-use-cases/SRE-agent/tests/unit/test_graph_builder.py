@@ -0,0 +1,77 @@
+"""Tests for plan staging and per-query state handling in the agent graph."""
+
+import asyncio
+
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph
+
+from sre_agent.agent_state import AgentState
+from sre_agent.constants import SREConstants
+from sre_agent.graph_builder import _prepare_initial_state, _route_supervisor
+from sre_agent.supervisor import plan_stages
+
+
+def test_plan_stages_groups_consecutive_independent_agents():
+    assert plan_stages(["kubernetes", "logs", "metrics", "runbooks"]) == [
+        ["kubernetes", "logs", "metrics"],
+        ["runbooks"],
+    ]
+
+
+def test_plan_stages_keeps_dependent_agents_alone():
+    assert plan_stages(["logs", "runbooks", "metrics", "kubernetes"]) == [
+        ["logs"],
+        ["runbooks"],
+        ["metrics", "kubernetes"],
+    ]
+
+
+def test_plan_stages_repeated_agent_starts_new_stage():
+    assert plan_stages(["logs", "logs"]) == [["logs"], ["logs"]]
+
+
+def test_plan_stages_sequential_when_parallel_disabled(monkeypatch):
+    monkeypatch.setattr(SREConstants.execution, "parallel_agents", False)
+    assert plan_stages(["kubernetes", "logs"]) == [["kubernetes"], ["logs"]]
+
+
+def test_route_supervisor_fans_out_stage():
+    state = {"next": "kubernetes", "next_agents": ["kubernetes", "logs"]}
+    assert _route_supervisor(state) == ["kubernetes_agent", "logs_agent"]
+    assert _route_supervisor({"next": "FINISH"}) == "aggregate"
+
+
+def _record_turn(state: AgentState):
+    """Stand-in for the agents: record one result per query."""
+    query = state["current_query"]
+    return {
+        "agent_results": {query: "done"},
+        "agents_invoked": [query],
+        "metadata": {"plan_stage": 1},
+        "replan_requests": {query: "retry"},
+    }
+
+
+def test_prepare_initial_state_resets_previous_query():
+    """A checkpointed thread starts each query without the last one's results."""
+    workflow = StateGraph(AgentState)
+    workflow.add_node("prepare", _prepare_initial_state)
+    workflow.add_node("agents", _record_turn)
+    workflow.set_entry_point("prepare")
+    workflow.add_edge("prepare", "agents")
+    workflow.add_edge("agents", END)
+    graph = workflow.compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "session"}}
+
+    async def _ask(query: str):
+        return await graph.ainvoke({"messages": [HumanMessage(content=query)]}, config)
+
+    asyncio.run(_ask("first"))
+    state = asyncio.run(_ask("second"))
+
+    assert state["agent_results"] == {"second": "done"}
+    assert state["agents_invoked"] == ["second"]
+    assert state["replan_requests"] == {"second": "retry"}
+    assert state["current_query"] == "second"
+    assert len(state["messages"]) == 2
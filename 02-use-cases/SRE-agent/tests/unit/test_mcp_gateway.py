@@ -0,0 +1,56 @@
+"""Tests for the pooled MCP gateway session."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from sre_agent import mcp_gateway
+
+
+class _FakeSession:
+    def __init__(self, headers):
+        self.headers = headers
+        self.closed = False
+
+    async def initialize(self):
+        return SimpleNamespace(serverInfo=SimpleNamespace(version="1.0"))
+
+    async def call_tool(self, name, arguments=None, **kwargs):
+        return self.headers["Authorization"]
+
+
+def _fake_create_session(opened):
+    @asynccontextmanager
+    async def create_session(connection):
+        session = _FakeSession(connection["headers"])
+        opened.append(session)
+        try:
+            yield session
+        finally:
+            session.closed = True
+
+    return create_session
+
+
+def test_token_refresh_reuses_gateway_and_reconnects(monkeypatch):
+    opened = []
+    monkeypatch.setattr(mcp_gateway, "create_session", _fake_create_session(opened))
+    monkeypatch.setattr(mcp_gateway, "_gateways", {})
+
+    async def _run():
+        gateway = mcp_gateway.get_gateway("https://gateway", "token-1")
+        first = await gateway.session.call_tool("get_pod_status")
+        same = mcp_gateway.get_gateway("https://gateway", "token-1")
+        reused = await same.session.call_tool("get_pod_status")
+
+        refreshed = mcp_gateway.get_gateway("https://gateway", "token-2")
+        second = await refreshed.session.call_tool("get_pod_status")
+        await refreshed.session.close()
+        return gateway, same, refreshed, first, reused, second
+
+    gateway, same, refreshed, first, reused, second = asyncio.run(_run())
+
+    assert gateway is same is refreshed
+    assert (first, reused, second) == ("Bearer token-1", "Bearer token-1", "Bearer token-2")
+    assert len(opened) == 2
+    assert all(session.closed for session in opened)
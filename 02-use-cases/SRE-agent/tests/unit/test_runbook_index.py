@@ -0,0 +1,80 @@
+"""Tests for the runbook search index."""
+
+import json
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND / "servers"))
+
+from runbook_index import RunbookIndex, _field_text  # noqa: E402
+
+PLAYBOOKS = BACKEND / "data" / "runbooks_data" / "incident_playbooks.json"
+
+
+def _playbook(playbook_id, title, steps=()):
+    return {"id": playbook_id, "title": title, "description": "", "steps": list(steps)}
+
+
+def _index(*documents):
+    index = RunbookIndex()
+    index.sync_source("playbooks", documents)
+    return index
+
+
+def _ids(hits):
+    return [document["id"] for document, _ in hits]
+
+
+def test_mid_word_keyword_still_finds_runbooks():
+    index = _index(
+        _playbook("a", "Restart crashed pods"),
+        _playbook("b", "Start the canary"),
+        _playbook("c", "Scale the database"),
+    )
+    total, hits = index.search(keyword="start")
+    assert total == 2
+    # The whole-word match is ranked; the mid-word one follows unscored
+    assert _ids(hits) == ["b", "a"]
+    assert hits[0][1] is not None and hits[1][1] is None
+
+
+def test_search_keeps_substring_recall_on_bundled_playbooks():
+    index = _index(*json.loads(PLAYBOOKS.read_text())["playbooks"])
+    for keyword in ("start", "restart", "using", "source"):
+        needle = keyword.lower()
+        expected = {
+            document["id"]
+            for document in index._documents.values()
+            if any(
+                needle in _field_text(document.get(field)).lower()
+                for field in ("title", "description", "steps")
+            )
+        }
+        total, hits = index.search(keyword=keyword)
+        assert set(_ids(hits)) >= expected
+        assert total == len(hits)
+    # The two restart playbooks only contain "start" mid-word
+    assert index.search(keyword="start")[0] == 4
+
+
+def test_prefix_matches_are_not_capped():
+    index = _index(*(_playbook(f"p{i}", f"Check node{i:03d}") for i in range(100)))
+    total, hits = index.search(keyword="node")
+    assert total == 100
+    assert all(score is not None for _, score in hits)
+
+
+def test_paging_spans_scored_and_unscored_hits():
+    index = _index(
+        _playbook("a", "Restart pods"),
+        _playbook("b", "Start the canary"),
+        _playbook("c", "Restart nodes"),
+    )
+    _, everything = index.search(keyword="start")
+    pages = [index.search(keyword="start", limit=1, offset=i)[1] for i in range(4)]
+    assert [_ids(page) for page in pages] == [
+        [doc_id] for doc_id in _ids(everything)
+    ] + [[]]
+    total, page = index.search(keyword="start", limit=5, offset=1)
+    assert total == 3 and _ids(page) == _ids(everything)[1:]
@@ -0,0 +1,59 @@
+"""Tests for the shared tool result cache."""
+
+import asyncio
+
+import pytest
+
+from sre_agent.tool_cache import ToolResultCache
+
+
+def _cache():
+    return ToolResultCache(default_ttl_seconds=60.0)
+
+
+def test_cancelling_first_caller_does_not_cancel_waiters():
+    cache = _cache()
+    calls = []
+
+    async def _call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "pods ok"
+
+    async def _run():
+        first = asyncio.create_task(cache.get_or_call("get_pods", {}, _call))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_call("get_pods", {}, _call))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(_run()) == "pods ok"
+    assert len(calls) == 1
+    assert cache.stats()["shared"] == 1
+
+
+def test_failed_call_is_shared_and_not_cached():
+    cache = _cache()
+    calls = []
+
+    async def _call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("gateway down")
+
+    async def _run():
+        results = await asyncio.gather(
+            cache.get_or_call("get_pods", {}, _call),
+            cache.get_or_call("get_pods", {}, _call),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError):
+            await cache.get_or_call("get_pods", {}, _call)
+
+    asyncio.run(_run())
+    assert len(calls) == 2
+    assert cache.stats()["entries"] == 0
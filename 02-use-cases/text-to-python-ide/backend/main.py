@@ -10,7 +10,11 @@ from dotenv import load_dotenv
 import boto3
 from botocore.exceptions import NoCredentialsError, ProfileNotFound
 from botocore.config import Config
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import threading
 import time
 from functools import lru_cache
 
@@ -120,7 +124,7 @@ except ImportError:
         raise
 
 # Import AgentCore for code interpreter
-from bedrock_agentcore.tools.code_interpreter_client import code_session
+from bedrock_agentcore.tools.code_interpreter_client import code_session, CodeInterpreter
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -128,9 +132,12 @@ async def lifespan(app: FastAPI):
     global aws_session, aws_region
     aws_session, aws_region = setup_aws_credentials()
     initialize_agents()
+    eviction_task = asyncio.create_task(evict_idle_interpreters_periodically())
     yield
-    # Shutdown (if needed)
-    pass
+    # Shutdown: stop the warm interpreter sessions and the worker threads
+    eviction_task.cancel()
+    agent_executor.shutdown(wait=False, cancel_futures=True)
+    get_interpreter_pool().close_all()
 
 app = FastAPI(
     title="AgentCore Code Interpreter", 
@@ -177,12 +184,240 @@ class CodeInterpreterSession:
         self.execution_results = []
         self.interactive_sessions = {}  # Track interactive execution sessions
         self.uploaded_csv = None  # Store uploaded CSV file data
+        # Warm AgentCore interpreter bound to this session, managed by InterpreterPool
+        self.interpreter = None
+        self.interpreter_started = None
+        self.interpreter_last_used = None
+        self.interpreter_lock = threading.Lock()  # One execution at a time per interpreter
+        self.uploaded_files = {}  # Sandbox path -> sha256 of the content uploaded to the interpreter
+        self.agents = None  # (code generator, code executor) agents of this session
+        self.execution_lock = asyncio.Lock()  # One agent or execution call at a time per session
+        self.cancelled = threading.Event()  # Set when the client of the running call went away
+
+# Interpreter pool settings
+INTERPRETER_POOL_SIZE = int(os.getenv('INTERPRETER_POOL_SIZE', '10'))  # Warm interpreters across all sessions
+INTERPRETER_IDLE_TIMEOUT = int(os.getenv('INTERPRETER_IDLE_TIMEOUT', '600'))  # Stop after 10 minutes unused
+INTERPRETER_SESSION_TIMEOUT = int(os.getenv('AGENTCORE_SESSION_TIMEOUT', '1800'))  # AgentCore session lifetime
+INTERPRETER_EXPIRY_MARGIN = 60  # Retire interpreters this long before AgentCore stops them
+INTERPRETER_EVICTION_INTERVAL = 60
+
+# Worker threads for the blocking agent and AgentCore calls, so an execution never blocks the event loop
+AGENT_WORKER_THREADS = int(os.getenv('AGENT_WORKER_THREADS', '16'))
+agent_executor = ThreadPoolExecutor(max_workers=AGENT_WORKER_THREADS, thread_name_prefix='agent-worker')
+
+class InterpreterPool:
+    """Warm AgentCore interpreter sessions, at most one per IDE session.
+
+    Interpreters stay started between executions, so variables and uploaded
+    files carry over and only the first execution pays for the session start.
+    An interpreter is stopped when it has been idle for idle_timeout seconds,
+    shortly before AgentCore's own session timeout, or when another IDE
+    session needs its place in a full pool.
+    """
+
+    def __init__(self, region: str, max_size: int = INTERPRETER_POOL_SIZE,
+                 idle_timeout: int = INTERPRETER_IDLE_TIMEOUT,
+                 session_timeout: int = INTERPRETER_SESSION_TIMEOUT, client_factory=None):
+        self.region = region
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.session_timeout = session_timeout
+        self.client_factory = client_factory or (lambda: CodeInterpreter(region))
+        self._sessions = OrderedDict()  # session_id -> session with an interpreter, least recently used first
+        self._lock = threading.Lock()
+        self.started = 0
+        self.reused = 0
+
+    def _start(self):
+        client = self.client_factory()
+        client.start(session_timeout_seconds=self.session_timeout)
+        self.started += 1
+        return client
+
+    def _stop(self, client):
+        try:
+            client.stop()
+        except Exception as e:
+            print(f"⚠️  Failed to stop interpreter session: {e}")
+
+    def _detach(self, session):
+        """Take the interpreter off a session; the caller holds the session's lock and stops it"""
+        with self._lock:
+            self._sessions.pop(session.session_id, None)
+        client = session.interpreter
+        session.interpreter = None
+        session.interpreter_started = None
+        session.uploaded_files = {}
+        return client
+
+    def _expired(self, session, now):
+        return now - session.interpreter_started > self.session_timeout - INTERPRETER_EXPIRY_MARGIN
+
+    def _make_room(self, session):
+        """Free a pool slot for session by evicting the least recently used idle interpreter"""
+        with self._lock:
+            if len(self._sessions) < self.max_size:
+                return True
+            for other in list(self._sessions.values()):
+                if other is session or not other.interpreter_lock.acquire(blocking=False):
+                    continue
+                try:
+                    self._sessions.pop(other.session_id, None)
+                    client = other.interpreter
+                    other.interpreter = None
+                    other.interpreter_started = None
+                    other.uploaded_files = {}
+                finally:
+                    other.interpreter_lock.release()
+                break
+            else:
+                return False
+        print(f"♻️  Interpreter pool full, stopping the interpreter of session {other.session_id}")
+        self._stop(client)
+        return True
+
+    @contextmanager
+    def acquire(self, session: Optional[CodeInterpreterSession] = None):
+        """Yield an interpreter for session, reusing its warm one when it has one.
+
+        Executions in the same session are serialized. Without a session, or
+        when every pooled interpreter is busy, a one-off interpreter is used
+        and stopped afterwards.
+        """
+        if session is None:
+            client = self._start()
+            try:
+                yield client
+            finally:
+                self._stop(client)
+            return
+
+        with session.interpreter_lock:
+            now = time.time()
+            if session.interpreter is not None and self._expired(session, now):
+                print(f"♻️  Interpreter of session {session.session_id} is about to expire, starting a new one")
+                self._stop(self._detach(session))
+
+            if session.interpreter is not None:
+                self.reused += 1
+            elif self._make_room(session):
+                session.interpreter = self._start()
+                session.interpreter_started = now
+                session.uploaded_files = {}
+                print(f"🚀 Started interpreter for session {session.session_id}")
+            else:
+                print(f"⚠️  All {self.max_size} pooled interpreters are busy, using a one-off interpreter")
+                client = self._start()
+                try:
+                    yield client
+                finally:
+                    self._stop(client)
+                return
+
+            with self._lock:
+                self._sessions[session.session_id] = session
+                self._sessions.move_to_end(session.session_id)
+
+            client = session.interpreter
+            try:
+                yield client
+            except Exception:
+                # The interpreter may be broken or expired; start fresh next time
+                self._stop(self._detach(session))
+                raise
+            finally:
+                session.interpreter_last_used = time.time()
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Stop interpreters idle for longer than idle_timeout or close to expiry"""
+        now = time.time() if now is None else now
+        clients = []
+        with self._lock:
+            candidates = list(self._sessions.values())
+        for session in candidates:
+            if not session.interpreter_lock.acquire(blocking=False):
+                continue  # Executing right now
+            try:
+                if session.interpreter is None:
+                    continue
+                idle = now - (session.interpreter_last_used or session.interpreter_started)
+                if idle > self.idle_timeout or self._expired(session, now):
+                    clients.append(self._detach(session))
+            finally:
+                session.interpreter_lock.release()
+        for client in clients:
+            self._stop(client)
+        if clients:
+            print(f"🧹 Stopped {len(clients)} idle interpreter sessions")
+        return len(clients)
+
+    def close_all(self):
+        """Stop every pooled interpreter"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            with session.interpreter_lock:
+                if session.interpreter is not None:
+                    self._stop(self._detach(session))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
 
 # Global variables for agents
 code_generator_agent = None
 code_executor_agent = None
 executor_type = "unknown"  # Track which executor type we're using
 active_sessions = {}
+interpreter_pool = None
+
+def get_interpreter_pool() -> InterpreterPool:
+    """The interpreter pool for aws_region, created on first use"""
+    global interpreter_pool
+    if interpreter_pool is None:
+        interpreter_pool = InterpreterPool(aws_region)
+    return interpreter_pool
+
+async def evict_idle_interpreters_periodically():
+    """Stop idle interpreters in the background so they do not run until AgentCore times them out"""
+    while True:
+        await asyncio.sleep(INTERPRETER_EVICTION_INTERVAL)
+        try:
+            await asyncio.to_thread(get_interpreter_pool().evict_idle)
+        except Exception as e:
+            print(f"⚠️  Interpreter eviction failed: {e}")
+
+def upload_session_files(code_client, files_data: list, session: Optional[CodeInterpreterSession] = None) -> Optional[str]:
+    """Upload files with writeFiles, skipping files the session's interpreter already has.
+
+    Returns the error text if the upload failed, otherwise None.
+    """
+    hashes = {f['path']: hashlib.sha256(f['text'].encode('utf-8')).hexdigest() for f in files_data}
+    # Only a session's own warm interpreter keeps files between executions
+    uploaded = session.uploaded_files if session is not None and code_client is session.interpreter else None
+    pending = [f for f in files_data if uploaded is None or uploaded.get(f['path']) != hashes[f['path']]]
+    if not pending:
+        print(f"📁 {len(files_data)} files already in the sandbox, skipping upload")
+        return None
+
+    print(f"📁 Uploading {len(pending)} files to sandbox...")
+    upload_response = code_client.invoke("writeFiles", {"content": pending})
+    for event in upload_response["stream"]:
+        result = event.get("result", {})
+        if result.get("isError", False):
+            error_content = result.get("content", [{}])
+            error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
+            print(f"❌ File upload error: {error_text}")
+            return error_text
+        else:
+            content = result.get("content", [])
+            for item in content:
+                if item.get("type") == "text":
+                    print(f"✅ File upload: {item.get('text', '')}")
+
+    if uploaded is not None:
+        uploaded.update({f['path']: hashes[f['path']] for f in pending})
+    return None
 
 def clean_output_for_display(output: str) -> str:
     """Clean output for display by removing image binary data while preserving analysis text"""
@@ -309,7 +544,8 @@ def upload_files_to_agentcore_sandbox(files_data: list, aws_region: str) -> bool
         print(f"❌ File upload failed: {str(e)}")
         return False
 
-def execute_chart_code_direct(code: str, session_files: list = None) -> tuple[str, list]:
+def execute_chart_code_direct(code: str, session_files: list = None,
+                              session: Optional[CodeInterpreterSession] = None) -> tuple[str, list]:
     """Execute chart code directly with AgentCore to preserve full base64 output"""
     try:
         print(f"\n🎨 Direct AgentCore chart execution")
@@ -319,10 +555,9 @@ def execute_chart_code_direct(code: str, session_files: list = None) -> tuple[st
         clean_code = extract_python_code_from_prompt(code)
         print(f"🔧 Clean code length: {len(clean_code)} characters")
         
-        with code_session(aws_region) as code_client:
+        with get_interpreter_pool().acquire(session) as code_client:
             # Upload files to sandbox if provided
             if session_files:
-                print(f"📁 Uploading {len(session_files)} files to sandbox...")
                 files_data = []
                 for file_info in session_files:
                     files_data.append({
@@ -331,19 +566,9 @@ def execute_chart_code_direct(code: str, session_files: list = None) -> tuple[st
                     })
                 
                 # Upload files using writeFiles tool
-                upload_response = code_client.invoke("writeFiles", {"content": files_data})
-                for event in upload_response["stream"]:
-                    result = event.get("result", {})
-                    if result.get("isError", False):
-                        error_content = result.get("content", [{}])
-                        error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
-                        print(f"❌ File upload error: {error_text}")
-                        return f"File upload failed: {error_text}", []
-                    else:
-                        content = result.get("content", [])
-                        for item in content:
-                            if item.get("type") == "text":
-                                print(f"✅ File upload: {item.get('text', '')}")
+                error_text = upload_session_files(code_client, files_data, session)
+                if error_text:
+                    return f"File upload failed: {error_text}", []
             
             # Execute the cleaned code
             response = code_client.invoke("executeCode", {
@@ -351,12 +576,14 @@ def execute_chart_code_direct(code: str, session_files: list = None) -> tuple[st
                 "language": "python",
                 "clearContext": False
             })
+            # Read the whole stream before the interpreter is handed to the next execution
+            events = list(response["stream"])
         
         # Process response directly without Strands-Agents truncation
         output_parts = []
         full_stdout = ""
         
-        for event in response["stream"]:
+        for event in events:
             result = event.get("result", {})
             
             if result.get("isError", False):
@@ -651,9 +878,9 @@ def extract_python_code_from_prompt(input_text: str) -> str:
     print(f"🔧 Using input as-is (no markdown formatting detected)")
     return input_text.strip()
 
-@tool
-def execute_python_code(code: str, description: str = "", files: list = None) -> str:
-    """Execute Python code using AgentCore CodeInterpreter - reliable execution with proper output capture and file support"""
+def run_python_code(code: str, description: str = "", files: list = None,
+                    session: Optional[CodeInterpreterSession] = None) -> str:
+    """Run code for the execute_python_code tool in the session's interpreter (a one-off one without a session)"""
     
     # Extract clean Python code from markdown-formatted input
     clean_code = extract_python_code_from_prompt(code)
@@ -666,11 +893,14 @@ def execute_python_code(code: str, description: str = "", files: list = None) ->
     print(f"🔧 Files provided: {len(files) if files else 0}")
     print(f"🔧 Clean code preview: {clean_code[:200]}...")
     
+    if session is not None and session.cancelled.is_set():
+        print("🛑 Execution cancelled, skipping tool call")
+        return "Execution cancelled: the client disconnected"
+    
     try:
-        with code_session(aws_region) as code_client:
+        with get_interpreter_pool().acquire(session) as code_client:
             # Upload files to sandbox if provided
             if files:
-                print(f"📁 Uploading {len(files)} files to sandbox...")
                 files_data = []
                 for file_info in files:
                     files_data.append({
@@ -679,19 +909,9 @@ def execute_python_code(code: str, description: str = "", files: list = None) ->
                     })
                 
                 # Upload files using writeFiles tool
-                upload_response = code_client.invoke("writeFiles", {"content": files_data})
-                for event in upload_response["stream"]:
-                    result = event.get("result", {})
-                    if result.get("isError", False):
-                        error_content = result.get("content", [{}])
-                        error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
-                        print(f"❌ File upload error: {error_text}")
-                        return f"File upload failed: {error_text}"
-                    else:
-                        content = result.get("content", [])
-                        for item in content:
-                            if item.get("type") == "text":
-                                print(f"✅ File upload: {item.get('text', '')}")
+                error_text = upload_session_files(code_client, files_data, session)
+                if error_text:
+                    return f"File upload failed: {error_text}"
             
             # Execute the code
             response = code_client.invoke("executeCode", {
@@ -699,11 +919,13 @@ def execute_python_code(code: str, description: str = "", files: list = None) ->
                 "language": "python",
                 "clearContext": False
             })
+            # Read the whole stream before the interpreter is handed to the next execution
+            events = list(response["stream"])
         
         # Process the response stream to capture all output
         output_parts = []
         
-        for event in response["stream"]:
+        for event in events:
             result = event.get("result", {})
             
             if result.get("isError", False):
@@ -736,6 +958,24 @@ def execute_python_code(code: str, description: str = "", files: list = None) ->
         print(f"📋 Full traceback: {traceback.format_exc()}")
         return f"Execution failed: {str(e)}"
 
+@tool
+def execute_python_code(code: str, description: str = "", files: list = None) -> str:
+    """Execute Python code using AgentCore CodeInterpreter - reliable execution with proper output capture and file support"""
+    return run_python_code(code, description, files)
+
+def create_session_code_tool(session: CodeInterpreterSession):
+    """execute_python_code bound to one IDE session's interpreter
+    
+    The session is captured here rather than looked up per call, because Strands
+    may run tools on its own threads without the request's context.
+    """
+    @tool
+    def execute_python_code(code: str, description: str = "", files: list = None) -> str:
+        """Execute Python code using AgentCore CodeInterpreter - reliable execution with proper output capture and file support"""
+        return run_python_code(code, description, files, session)
+    
+    return execute_python_code
+
 @lru_cache(maxsize=1)
 def get_extended_botocore_config():
     """Get BotocoreConfig with extended timeouts for long-running code execution
@@ -853,9 +1093,7 @@ def initialize_agents():
         print(f"🎯 Using model: {model_id}")
         
         # Initialize Code Generator Agent using strands-agents
-        code_generator_agent = Agent(
-            model=bedrock_model,
-            system_prompt=f"""You are a Python code generator specialist powered by {model_id}. Your role is to:
+        GENERATOR_PROMPT = f"""You are a Python code generator specialist powered by {model_id}. Your role is to:
             1. Generate clean, well-commented Python code based on user requirements
             2. Follow Python best practices and PEP 8 style guidelines
             3. Include appropriate error handling where needed
@@ -865,6 +1103,9 @@ def initialize_agents():
             
             Focus on creating practical, efficient code that solves the user's specific problem.
             Return ONLY the Python code, no explanations, no markdown, no additional text."""
+        code_generator_agent = Agent(
+            model=bedrock_model,
+            system_prompt=GENERATOR_PROMPT
         )
         
         # Test AgentCore availability
@@ -916,6 +1157,10 @@ RESPONSE FORMAT: The execute_python_code tool returns execution results includin
         _agents_cache['code_executor_agent'] = code_executor_agent
         _agents_cache['current_model_id'] = current_model_id
         _agents_cache['executor_type'] = executor_type
+        # Used to create each session's own agents
+        _agents_cache['bedrock_model'] = bedrock_model
+        _agents_cache['generator_prompt'] = GENERATOR_PROMPT
+        _agents_cache['executor_prompt'] = SYSTEM_PROMPT
         
     except Exception as e:
         print(f"❌ Error initializing agents: {str(e)}")
@@ -934,6 +1179,48 @@ def get_or_create_session(session_id: Optional[str] = None) -> CodeInterpreterSe
     
     return active_sessions[session_id]
 
+def get_session_agents(session: CodeInterpreterSession):
+    """The session's own code generator and executor agents
+    
+    Strands agents keep a conversation and handle one request at a time, so each
+    session gets its own pair on the shared model and sessions can run in parallel.
+    """
+    if session.agents is None:
+        if 'bedrock_model' not in _agents_cache:
+            return code_generator_agent, code_executor_agent
+        bedrock_model = _agents_cache['bedrock_model']
+        session.agents = (
+            Agent(model=bedrock_model, system_prompt=_agents_cache['generator_prompt']),
+            Agent(model=bedrock_model, tools=[create_session_code_tool(session)],
+                  system_prompt=_agents_cache['executor_prompt'])
+        )
+    return session.agents
+
+def _run_for_session(session: CodeInterpreterSession, func, args):
+    session.cancelled.clear()
+    return func(*args)
+
+async def run_in_session(session: CodeInterpreterSession, func, *args):
+    """Run a blocking agent or AgentCore call on the worker pool, one at a time per session
+    
+    If the request is cancelled, a call that has not started is dropped. A running
+    call is told to skip its remaining tool calls, and the session stays locked
+    until it returns.
+    """
+    async with session.execution_lock:
+        future = agent_executor.submit(_run_for_session, session, func, args)
+        waiter = asyncio.wrap_future(future)
+        try:
+            return await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            if not future.cancel():
+                print(f"🛑 Cancelling execution for session {session.session_id}")
+                session.cancelled.set()
+                await asyncio.wait([waiter])
+                if not waiter.cancelled():
+                    waiter.exception()  # Retrieved so it is not logged as unhandled
+            raise
+
 # Utility functions for code analysis
 def detect_chart_code(code: str) -> bool:
     """Detect if code contains chart/visualization generation"""
@@ -1056,7 +1343,8 @@ This ensures your charts are properly displayed in the web interface.
             enhanced_prompt += chart_instructions
         
         # Use the strands-agents agent for code generation
-        agent_result = code_generator_agent(enhanced_prompt)
+        generator_agent, _ = get_session_agents(session)
+        agent_result = await run_in_session(session, generator_agent, enhanced_prompt)
         
         # Extract string content from AgentResult
         generated_code = str(agent_result) if agent_result is not None else ""
@@ -1087,6 +1375,7 @@ This ensures your charts are properly displayed in the web interface.
 async def analyze_code(request: CodeExecutionRequest):
     """Analyze code to detect interactive elements and suggest inputs - OPTIMIZED"""
     try:
+        session = get_or_create_session(request.session_id)
         is_interactive = detect_interactive_code(request.code)
         
         if is_interactive:
@@ -1104,7 +1393,8 @@ Provide:
 
 Keep response short and practical."""
             
-            analysis_result = code_generator_agent(analysis_prompt)
+            generator_agent, _ = get_session_agents(session)
+            analysis_result = await run_in_session(session, generator_agent, analysis_prompt)
             
             return {
                 "success": True,
@@ -1187,7 +1477,9 @@ async def execute_code(request: CodeExecutionRequest):
             print(f"🎨 Chart code detected - using direct AgentCore execution")
             
             # Use direct AgentCore execution to preserve full base64 output
-            execution_result_str, images = execute_chart_code_direct(prepared_code, session_files)
+            execution_result_str, images = await run_in_session(
+                session, execute_chart_code_direct, prepared_code, session_files, session
+            )
             agent_used = "direct_agentcore_charts"
             
         else:
@@ -1197,7 +1489,9 @@ async def execute_code(request: CodeExecutionRequest):
             # since Strands-Agents tools can't easily access session files
             if session_files:
                 print(f"📁 Files detected - switching to direct AgentCore for file access")
-                execution_result_str, images = execute_chart_code_direct(prepared_code, session_files)
+                execution_result_str, images = await run_in_session(
+                    session, execute_chart_code_direct, prepared_code, session_files, session
+                )
                 agent_used = "direct_agentcore_with_files"
             else:
                 # Use strands-agents with AgentCore tool for regular code without files
@@ -1209,7 +1503,8 @@ async def execute_code(request: CodeExecutionRequest):
 
 Use the tool to run the code and return the complete output."""
                 
-                execution_result = code_executor_agent(execution_prompt)
+                _, executor_agent = get_session_agents(session)
+                execution_result = await run_in_session(session, executor_agent, execution_prompt)
                 
                 # Debug the AgentResult structure
                 print(f"🔍 AgentResult type: {type(execution_result)}")
@@ -1417,66 +1712,80 @@ async def get_agents_status():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get agents status: {str(e)}")
 
+async def handle_websocket_message(websocket: WebSocket, session: CodeInterpreterSession, message: dict):
+    """Answer one WebSocket message, running the agent on the worker pool"""
+    generator_agent, executor_agent = get_session_agents(session)
+    
+    if message["type"] == "generate_code":
+        # Handle code generation via WebSocket
+        try:
+            agent_result = await run_in_session(session, generator_agent, message["prompt"])
+            
+            # Extract string content from AgentResult
+            generated_code = str(agent_result) if agent_result is not None else ""
+            
+            await websocket.send_text(json.dumps({
+                "type": "code_generated",
+                "success": True,
+                "code": generated_code,
+                "session_id": session.session_id
+            }))
+        except Exception as e:
+            await websocket.send_text(json.dumps({
+                "type": "error",
+                "success": False,
+                "error": str(e)
+            }))
+    
+    elif message["type"] == "execute_code":
+        # Handle code execution via WebSocket
+        try:
+            if executor_type == "agentcore":
+                execution_result = await run_in_session(session, executor_agent, f"Execute this code: {message['code']}")
+            else:
+                execution_result = await run_in_session(session, executor_agent, f"Simulate execution of: {message['code']}")
+            
+            await websocket.send_text(json.dumps({
+                "type": "execution_result",
+                "success": True,
+                "result": execution_result,
+                "session_id": session.session_id
+            }))
+        except Exception as e:
+            await websocket.send_text(json.dumps({
+                "type": "error",
+                "success": False,
+                "error": str(e)
+            }))
+
 # WebSocket endpoint for real-time communication
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     await websocket.accept()
     print(f"WebSocket connected for session {session_id}")
+    session = get_or_create_session(session_id)
     
+    # Messages are answered in the background so a disconnect is noticed while
+    # they run; the session's execution lock keeps them in order
+    pending = set()
     try:
         while True:
             data = await websocket.receive_text()
             message = json.loads(data)
-            
-            if message["type"] == "generate_code":
-                # Handle code generation via WebSocket
-                try:
-                    agent_result = code_generator_agent(message["prompt"])
-                    
-                    # Extract string content from AgentResult
-                    generated_code = str(agent_result) if agent_result is not None else ""
-                    
-                    await websocket.send_text(json.dumps({
-                        "type": "code_generated",
-                        "success": True,
-                        "code": generated_code,
-                        "session_id": session_id
-                    }))
-                except Exception as e:
-                    await websocket.send_text(json.dumps({
-                        "type": "error",
-                        "success": False,
-                        "error": str(e)
-                    }))
-            
-            elif message["type"] == "execute_code":
-                # Handle code execution via WebSocket
-                try:
-                    if executor_type == "agentcore":
-                        execution_result = code_executor_agent(f"Execute this code: {message['code']}")
-                    else:
-                        execution_result = code_executor_agent(f"Simulate execution of: {message['code']}")
-                    
-                    await websocket.send_text(json.dumps({
-                        "type": "execution_result",
-                        "success": True,
-                        "result": execution_result,
-                        "session_id": session_id
-                    }))
-                except Exception as e:
-                    await websocket.send_text(json.dumps({
-                        "type": "error",
-                        "success": False,
-                        "error": str(e)
-                    }))
+            task = asyncio.create_task(handle_websocket_message(websocket, session, message))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
                     
     except WebSocketDisconnect:
         print(f"WebSocket disconnected for session {session_id}")
+        for task in list(pending):
+            task.cancel()
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     current_model = globals().get('current_model_id', 'Unknown')
+    pool = get_interpreter_pool()
     
     return {
         "status": "healthy", 
@@ -1486,6 +1795,12 @@ async def health_check():
         "current_model": current_model,
         "aws_region": aws_region,
         "authentication": "AWS Profile" if os.getenv('AWS_PROFILE') else "Access Keys",
+        "interpreter_pool": {
+            "warm_sessions": len(pool),
+            "max_size": pool.max_size,
+            "sessions_started": pool.started,
+            "executions_reused": pool.reused
+        },
         "architecture": {
             "code_generation": f"Strands-Agents Agent ({current_model})",
             "code_execution": f"{executor_type.title().replace('_', ' ')} Agent ({current_model})"
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the code execution endpoint in backend/main.py
+
+Simulates N users, each sending --requests execute-code requests one after
+another, all users at the same time. Every request goes through a fake
+Strands agent that spends --model-ms per model turn (two turns around one
+tool call) and runs the code on the fake AgentCore interpreter from
+test_interpreter_pool.py. No AWS access is needed.
+
+Compares:
+  - blocking: the agent is called directly from the async endpoint, as
+    before, so one request holds up the event loop for everyone
+  - worker pool: the agent runs on the worker threads via run_in_session
+
+Also checks that cancelling a request (as on a WebSocket disconnect) stops
+the agent's remaining tool calls.
+
+Usage:
+    python tests/benchmark_concurrent_sessions.py --users 1 4 8 16
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_interpreter_pool import FakeInterpreter, main  # noqa: E402
+
+MODEL_LATENCY = 0.3
+
+class FakeAgent:
+    """Stand-in for a Strands agent: a model turn, each tool once, another model turn
+
+    Tools run on the agent's own thread, which does not share the request's
+    context, as Strands may do.
+    """
+
+    def __init__(self, model=None, tools=None, system_prompt=None):
+        self.tools = tools or []
+        self.busy = False
+        self.tool_thread = ThreadPoolExecutor(max_workers=1)
+
+    def __call__(self, prompt):
+        if self.busy:
+            raise RuntimeError("Agent is already processing a request")
+        self.busy = True
+        try:
+            time.sleep(MODEL_LATENCY)
+            output = ""
+            for tool in self.tools:
+                output = self.tool_thread.submit(tool, prompt).result()
+            time.sleep(MODEL_LATENCY)
+            return output or "print('generated')"
+        finally:
+            self.busy = False
+
+def reset_backend():
+    main.Agent = FakeAgent
+    main._agents_cache.update(bedrock_model=object(), generator_prompt="", executor_prompt="")
+    main.executor_type = "agentcore"
+    main.interpreter_pool = main.InterpreterPool('us-east-1', client_factory=FakeInterpreter, max_size=64)
+    main.active_sessions.clear()
+
+async def run_inline(session, func, *args):
+    """How the endpoints behaved before: the blocking call runs on the event loop"""
+    return main._run_for_session(session, func, args)
+
+async def simulate_users(users, requests_per_user):
+    async def user(i):
+        for _ in range(requests_per_user):
+            response = await main.execute_code(main.CodeExecutionRequest(code="print(1)", session_id=f"user-{i}"))
+            assert response["success"] and "run" in response["result"], response
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(users)))
+    return time.perf_counter() - started
+
+def measure(users, requests_per_user, blocking):
+    reset_backend()
+    real_run_in_session = main.run_in_session
+    if blocking:
+        main.run_in_session = run_inline
+    try:
+        return asyncio.run(simulate_users(users, requests_per_user))
+    finally:
+        main.run_in_session = real_run_in_session
+
+async def check_cancellation():
+    """Cancel an agent call between its two tool calls; the second must be skipped"""
+    reset_backend()
+    session = main.get_or_create_session("cancel")
+    _, executor_agent = main.get_session_agents(session)
+    execute_python_code = executor_agent.tools[0]
+    first_tool_done = threading.Event()
+
+    def two_tool_calls(prompt):
+        # Both tool calls run on the agent's tool thread
+        first = executor_agent.tool_thread.submit(execute_python_code, "print(1)").result()
+        first_tool_done.set()
+        time.sleep(MODEL_LATENCY)
+        return first, executor_agent.tool_thread.submit(execute_python_code, "print(2)").result()
+
+    task = asyncio.create_task(main.run_in_session(session, two_tool_calls, "prompt"))
+    await asyncio.to_thread(first_tool_done.wait)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    # The session is free again and the next call runs normally
+    output = await main.run_in_session(session, execute_python_code, "print(3)")
+    return session.interpreter.executed, output
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent users of the execute-code endpoint')
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 4, 8, 16], help='Simultaneous users')
+    parser.add_argument('--requests', type=int, default=3, help='Requests sent by each user')
+    parser.add_argument('--model-ms', type=float, default=300, help='Simulated latency per model turn')
+    args = parser.parse_args()
+
+    global MODEL_LATENCY
+    MODEL_LATENCY = args.model_ms / 1000
+
+    real_stdout = sys.stdout
+    print(f"requests per user={args.requests} model turn={args.model_ms:g}ms "
+          f"worker threads={main.AGENT_WORKER_THREADS}")
+    print(f"{'users':>5}{'blocking':>12}{'worker pool':>14}{'throughput':>13}{'speedup':>10}")
+    baseline = None
+    for users in args.users:
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            blocking = measure(users, args.requests, blocking=True)
+            pooled = measure(users, args.requests, blocking=False)
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        throughput = users * args.requests / pooled
+        baseline = baseline or throughput
+        print(f"{users:>5}{blocking:>11.2f}s{pooled:>13.2f}s{throughput:>9.1f} r/s{throughput / baseline:>9.1f}x")
+
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        executed, output = asyncio.run(check_cancellation())
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+    cancelled_ok = executed == ["print(1)", "print(3)"] and "run 2" in output
+    print(f"cancellation: executed {executed} -> {'ok' if cancelled_ok else 'FAILED'}")
+    return 0 if cancelled_ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Test script for the warm interpreter pool in backend/main.py
+
+Runs against a local fake AgentCore interpreter that models session-start
+latency, so it needs no AWS access. strands and bedrock_agentcore are
+replaced with stand-ins when they are not installed.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root / 'backend'))
+
+START_LATENCY = 0.2  # Seconds to start an interpreter session
+INVOKE_LATENCY = 0.01  # Seconds per writeFiles or executeCode call
+
+class FakeInterpreter:
+    """Stand-in for bedrock_agentcore's CodeInterpreter with simulated latencies"""
+
+    starts = 0
+    stops = 0
+
+    def __init__(self, region='us-east-1', session=None):
+        self.region = region
+        self.session_id = None
+        self.files = {}
+        self.executed = []
+        self.uploads = 0
+        self.active_calls = 0
+        self.max_active_calls = 0
+        self.fail_next = False
+        self._lock = threading.Lock()
+
+    def start(self, identifier=None, name=None, session_timeout_seconds=900):
+        time.sleep(START_LATENCY)
+        FakeInterpreter.starts += 1
+        self.session_id = f"fake-{FakeInterpreter.starts}"
+        return self.session_id
+
+    def stop(self):
+        FakeInterpreter.stops += 1
+        self.session_id = None
+        return True
+
+    def invoke(self, method, params=None):
+        if self.session_id is None:
+            raise RuntimeError("Session is not started")
+        if self.fail_next:
+            self.fail_next = False
+            raise RuntimeError("Session expired")
+        with self._lock:
+            self.active_calls += 1
+            self.max_active_calls = max(self.max_active_calls, self.active_calls)
+        try:
+            time.sleep(INVOKE_LATENCY)
+            if method == "writeFiles":
+                self.uploads += 1
+                for item in params["content"]:
+                    self.files[item["path"]] = item["text"]
+                text = f"Wrote {len(params['content'])} files"
+                return {"stream": [{"result": {"content": [{"type": "text", "text": text}]}}]}
+            self.executed.append(params["code"])
+            stdout = f"run {len(self.executed)} in {self.session_id}\n"
+            return {"stream": [{"result": {"structuredContent": {"stdout": stdout, "stderr": ""}}}]}
+        finally:
+            with self._lock:
+                self.active_calls -= 1
+
+def install_fake_dependencies():
+    """Register stand-ins for strands and bedrock_agentcore if they are missing"""
+    try:
+        import strands  # noqa: F401
+    except ImportError:
+        strands = types.ModuleType('strands')
+        strands.Agent = lambda *args, **kwargs: None
+        strands.tool = lambda func: func
+        models = types.ModuleType('strands.models')
+        models.BedrockModel = object
+        strands.models = models
+        sys.modules['strands'] = strands
+        sys.modules['strands.models'] = models
+
+    try:
+        import bedrock_agentcore.tools.code_interpreter_client  # noqa: F401
+    except ImportError:
+        client_module = types.ModuleType('bedrock_agentcore.tools.code_interpreter_client')
+        client_module.CodeInterpreter = FakeInterpreter
+        client_module.code_session = None
+        for name in ('bedrock_agentcore', 'bedrock_agentcore.tools'):
+            sys.modules[name] = types.ModuleType(name)
+        sys.modules['bedrock_agentcore.tools.code_interpreter_client'] = client_module
+
+install_fake_dependencies()
+import main  # noqa: E402
+
+def new_pool(**kwargs):
+    pool = main.InterpreterPool('us-east-1', client_factory=FakeInterpreter, **kwargs)
+    main.interpreter_pool = pool
+    return pool
+
+def csv_files(content="a,b\n1,2\n"):
+    return [{"filename": "data.csv", "content": content}]
+
+def test_reuse_and_upload_dedup():
+    """Repeated executions reuse one interpreter and upload the CSV once"""
+    pool = new_pool()
+    session = main.CodeInterpreterSession("reuse")
+
+    started = time.perf_counter()
+    for _ in range(5):
+        output, _ = main.execute_chart_code_direct("print(1)", csv_files(), session)
+    pooled_time = time.perf_counter() - started
+
+    interpreter = session.interpreter
+    assert pool.started == 1 and pool.reused == 4, (pool.started, pool.reused)
+    assert interpreter.uploads == 1, interpreter.uploads
+    assert "run 5" in output, output
+
+    # Changed content is uploaded again
+    main.execute_chart_code_direct("print(1)", csv_files("a,b\n3,4\n"), session)
+    assert interpreter.uploads == 2 and interpreter.files["data.csv"] == "a,b\n3,4\n"
+
+    # One-off interpreters (no session) pay the start for every execution
+    started = time.perf_counter()
+    for _ in range(5):
+        main.execute_chart_code_direct("print(1)", csv_files(), None)
+    one_off_time = time.perf_counter() - started
+
+    assert pooled_time < one_off_time / 2
+    return f"5 executions: {pooled_time:.2f}s pooled, {one_off_time:.2f}s with a new session each"
+
+def test_session_tool_binds_session():
+    """The session's execute_python_code tool runs in its interpreter from any thread"""
+    new_pool()
+    session = main.CodeInterpreterSession("tool")
+    execute_python_code = main.create_session_code_tool(session)
+    outputs = []
+
+    # Strands may call tools on its own threads, without the request's context
+    def agent_thread():
+        execute_python_code("x = 1", files=csv_files())
+        outputs.append(execute_python_code("print(x)", files=csv_files()))
+
+    thread = threading.Thread(target=agent_thread)
+    thread.start()
+    thread.join()
+    assert session.interpreter.executed == ["x = 1", "print(x)"], session.interpreter.executed
+    assert session.interpreter.uploads == 1
+    assert "run 2" in outputs[0], outputs
+    return "Both tool calls ran in the same interpreter"
+
+def test_idle_eviction():
+    """Idle interpreters are stopped, and the next execution starts a fresh one"""
+    pool = new_pool(idle_timeout=60)
+    session = main.CodeInterpreterSession("idle")
+    main.execute_chart_code_direct("print(1)", csv_files(), session)
+
+    assert pool.evict_idle(now=time.time() + 30) == 0
+    assert pool.evict_idle(now=time.time() + 120) == 1
+    assert session.interpreter is None and len(pool) == 0
+
+    main.execute_chart_code_direct("print(1)", csv_files(), session)
+    assert pool.started == 2 and session.interpreter.uploads == 1
+    return "Idle interpreter stopped and replaced on next use, CSV uploaded again"
+
+def test_expiry_and_failure():
+    """Interpreters near AgentCore's timeout, or that failed, are replaced"""
+    pool = new_pool(session_timeout=900)
+    session = main.CodeInterpreterSession("expiry")
+    main.execute_chart_code_direct("print(1)", None, session)
+    session.interpreter_started -= 900
+    main.execute_chart_code_direct("print(1)", None, session)
+    assert pool.started == 2, pool.started
+
+    session.interpreter.fail_next = True
+    output, _ = main.execute_chart_code_direct("print(1)", None, session)
+    assert "failed" in output and session.interpreter is None, output
+    main.execute_chart_code_direct("print(1)", None, session)
+    assert pool.started == 3, pool.started
+    return "Expiring and failed interpreters replaced"
+
+def test_max_pool_size():
+    """A full pool evicts the least recently used idle interpreter"""
+    pool = new_pool(max_size=2)
+    sessions = [main.CodeInterpreterSession(f"s{i}") for i in range(3)]
+    for session in sessions:
+        main.execute_chart_code_direct("print(1)", None, session)
+    assert len(pool) == 2
+    assert sessions[0].interpreter is None
+    assert sessions[1].interpreter is not None and sessions[2].interpreter is not None
+
+    # With every pooled interpreter busy a one-off interpreter is used
+    with sessions[1].interpreter_lock, sessions[2].interpreter_lock:
+        with pool.acquire(sessions[0]) as client:
+            assert client is not sessions[0].interpreter
+    assert len(pool) == 2
+    return "Least recently used interpreter evicted, pool stays at 2"
+
+def test_session_serialization():
+    """Concurrent executions in one session never overlap in its interpreter"""
+    new_pool()
+    session = main.CodeInterpreterSession("concurrent")
+    threads = [
+        threading.Thread(target=main.execute_chart_code_direct, args=("print(1)", csv_files(), session))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    interpreter = session.interpreter
+    assert len(interpreter.executed) == 8 and interpreter.max_active_calls == 1
+    assert interpreter.uploads == 1
+    return "8 concurrent executions ran one at a time in one interpreter"
+
+def test_cancel_skips_remaining_tool_calls():
+    """Cancelling a request stops the session tool's later calls on other threads"""
+    new_pool()
+    session = main.CodeInterpreterSession("cancel")
+    execute_python_code = main.create_session_code_tool(session)
+    first_call_done = threading.Event()
+    resume = threading.Event()
+
+    def agent(prompt):
+        # Tool calls on a thread of their own, as Strands may make them
+        def call(code):
+            outputs = []
+            thread = threading.Thread(target=lambda: outputs.append(execute_python_code(code)))
+            thread.start()
+            thread.join()
+            return outputs[0]
+
+        first = call("print(1)")
+        first_call_done.set()
+        resume.wait()
+        return first, call("print(2)")
+
+    async def cancel_mid_request():
+        task = asyncio.create_task(main.run_in_session(session, agent, "prompt"))
+        await asyncio.to_thread(first_call_done.wait)
+        task.cancel()
+        # run_in_session tells the running call to skip its remaining tool calls
+        await asyncio.to_thread(session.cancelled.wait, 5)
+        resume.set()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return await main.run_in_session(session, execute_python_code, "print(3)")
+
+    output = asyncio.run(cancel_mid_request())
+    assert session.interpreter.executed == ["print(1)", "print(3)"], session.interpreter.executed
+    assert "run 2" in output, output
+    return "Second tool call skipped after cancel; the next request ran normally"
+
+def main_tests():
+    """Run all interpreter pool tests"""
+    print("Interpreter Pool Tests")
+    print("=" * 50)
+
+    tests = [
+        test_reuse_and_upload_dedup,
+        test_session_tool_binds_session,
+        test_cancel_skips_remaining_tool_calls,
+        test_idle_eviction,
+        test_expiry_and_failure,
+        test_max_pool_size,
+        test_session_serialization,
+    ]
+
+    passed = 0
+    real_stdout = sys.stdout
+    for test in tests:
+        # Each test returns a one-line summary
+        try:
+            # Silence the backend's progress output
+            sys.stdout = open(os.devnull, 'w')
+            try:
+                summary = test()
+            finally:
+                sys.stdout.close()
+                sys.stdout = real_stdout
+            passed += 1
+            print(f"✓ {test.__doc__}\n  {summary}")
+        except AssertionError as e:
+            print(f"✗ {test.__doc__}: assertion failed {e}")
+        except Exception as e:
+            print(f"✗ {test.__doc__}: {e}")
+
+    print("=" * 50)
+    print(f"Tests passed: {passed}/{len(tests)}")
+    return 0 if passed == len(tests) else 1
+
+if __name__ == "__main__":
+    sys.exit(main_tests())